@@ -333,6 +333,19 @@ def compute_amplitude(tn, config, chi, optimize):
 
 
 def compute_amplitudes(tn, configs, chi, optimize):
+    if chi is None:
+        # exact contraction -> every amplitude shares the same geometry and
+        # can be computed as a single batched contraction
+        from quimb.tensor import tensor_network_contract_batched
+
+        tnis = [
+            tn.isel({tn.site_ind(site): v for site, v in config.items()})
+            for config in configs
+        ]
+        return tensor_network_contract_batched(
+            tnis, output_inds=(), optimize=optimize
+        )
+
     with ar.lazy.shared_intermediates():
         tnlz = tn.copy()
         tnlz.apply_to_arrays(ar.lazy.array)
@@ -10,6 +10,7 @@ import scipy.sparse.linalg as spla
 from ..core import dag, isdense, issparse, ldmul, qarray, vdot
 from ..utils import raise_cant_find_library_function
 from . import SLEPC4PY_FOUND
+from .davidson import eigs_davidson
 from .numpy_linalg import (
     eig_numpy,
     eigs_numpy,
@@ -72,6 +73,7 @@ _EIGS_METHODS = {
     "SCIPY": eigs_scipy,
     "PRIMME": eigs_primme,
     "LOBPCG": eigs_lobpcg,
+    "DAVIDSON": eigs_davidson,
     "SLEPC": eigs_slepc_spawn,
     "SLEPC-NOMPI": eigs_slepc,
 }
@@ -122,7 +124,7 @@ def eigensystem_partial(
     sort : bool, optional
         Whether to explicitly sort by ascending eigenvalue order.
     backend : {'AUTO', 'NUMPY', 'SCIPY',
-               'LOBPCG', 'SLEPC', 'SLEPC-NOMPI'}, optional
+               'LOBPCG', 'DAVIDSON', 'SLEPC', 'SLEPC-NOMPI'}, optional
         Which solver to use.
     fallback_to_scipy : bool, optional
         If an error occurs and scipy is not being used, try using scipy.
@@ -0,0 +1,187 @@
+"""Block Davidson eigensolver for extremal eigenpairs of hermitian operators,
+with optional diagonal preconditioning and warm starting.
+"""
+
+import numpy as np
+import scipy.linalg as scla
+
+import quimb as qu
+
+
+def _orthonormalize_against(V, T, drop_tol=1e-10):
+    """Orthonormalize the columns of ``T`` against the orthonormal columns of
+    ``V``, and each other, dropping any that become linearly dependent.
+    """
+    # two rounds of classical gram-schmidt for stability
+    for _ in range(2):
+        if V.shape[1]:
+            T = T - V @ (V.conj().T @ T)
+
+    Q, R = scla.qr(T, mode="economic")
+    keep = np.abs(np.diag(R)) > drop_tol * max(1.0, np.abs(R).max())
+    return Q[:, keep]
+
+
+def eigs_davidson(
+    A,
+    k=1,
+    *,
+    B=None,
+    which=None,
+    return_vecs=True,
+    sigma=None,
+    isherm=True,
+    sort=True,
+    v0=None,
+    tol=None,
+    ncv=None,
+    maxiter=None,
+    precond=None,
+    info=None,
+    **_,
+):
+    """Block Davidson (Davidson-Liu) solver for a few extremal eigenpairs of a
+    hermitian operator, using only matrix-vector products. Suited to many
+    successive, similar, problems (e.g. the local effective hamiltonians of
+    DMRG) as it can be warm started with a whole subspace and accelerated
+    with a cheap diagonal preconditioner.
+
+    Parameters
+    ----------
+    A : array_like, sparse_matrix or LinearOperator
+        The hermitian operator to solve for.
+    k : int, optional
+        The number of eigenpairs to find, these are solved for together.
+    B : None
+        Generalized eigenproblems are not supported.
+    which : {'SA', 'LA'}, optional
+        Whether to find the smallest or largest eigenvalues.
+    return_vecs : bool, optional
+        Whether to return the eigenvectors.
+    sigma : None
+        Interior eigenpairs are not supported.
+    isherm : bool, optional
+        Must be ``True``.
+    sort : bool, optional
+        Whether to sort the eigenpairs in ascending eigenvalue order.
+    v0 : array_like, optional
+        The initial vector, shape ``(d,)``, or subspace, shape ``(d, m)``,
+        to start the search from, padded with random vectors if ``m < k``.
+    tol : float, optional
+        Converge each eigenpair until its residual norm is less than
+        ``tol * max(1, |eigenvalue|)``, default: 1e-10.
+    ncv : int, optional
+        The maximum size of the search subspace, after which it is restarted
+        with the current best ``max(k, ncv // 2)`` Ritz vectors. Default: 20,
+        with a minimum of ``k + 2``.
+    maxiter : int, optional
+        The maximum number of iterations, default: 1000.
+    precond : array_like, optional
+        The diagonal of ``A`` (or an approximation of it), if given, used as
+        a preconditioner for the correction vectors.
+    info : dict, optional
+        If given, this is updated with the number of matrix-vector products
+        ``'nmatvec'``, the number of iterations ``'niter'``, whether all
+        eigenpairs ``'converged'``, and the final Ritz vectors
+        ``'subspace'``, which can be used to warm start a subsequent solve.
+
+    Returns
+    -------
+    lk : (k,) array
+        The eigenvalues.
+    vk : (d, k) qarray
+        The eigenvectors, if ``return_vecs=True``.
+    """
+    if B is not None:
+        raise ValueError("The davidson solver doesn't support ``B``.")
+    if sigma is not None:
+        raise ValueError("The davidson solver only finds extremal pairs.")
+    if not isherm:
+        raise ValueError("The davidson solver only supports hermitian ``A``.")
+
+    if isinstance(A, qu.Lazy):
+        A = A()
+    if isinstance(A, qu.qarray):
+        A = A.toarray()
+
+    which = "SA" if which is None else which.upper()
+    largest = {"SA": False, "LA": True}[which]
+    tol = 1e-10 if tol is None else tol
+    maxiter = 1000 if maxiter is None else maxiter
+    d = A.shape[0]
+    k = min(k, d)
+    ncv = min(d, max(20 if ncv is None else ncv, k + 2))
+    nkeep = max(k, ncv // 2)
+
+    dtype = A.dtype
+    if v0 is not None:
+        dtype = np.result_type(dtype, v0.dtype)
+        V = np.asarray(v0, dtype=dtype).reshape(d, -1)[:, :ncv]
+    else:
+        V = np.empty((d, 0), dtype=dtype)
+    if V.shape[1] < k:
+        V = np.hstack([V, qu.randn((d, k - V.shape[1]), dtype=dtype)])
+
+    V = _orthonormalize_against(V[:, :0], V)
+    AV = np.asarray(A @ V)
+    nmatvec = V.shape[1]
+
+    if precond is not None:
+        precond = np.asarray(precond).real
+
+    converged = False
+    for niter in range(1, maxiter + 1):
+        # rayleigh-ritz in the current subspace
+        H = V.conj().T @ AV
+        theta, S = scla.eigh((H + H.conj().T) / 2)
+        if largest:
+            theta, S = theta[::-1], S[:, ::-1]
+        V_ritz, S_ritz = V, S
+
+        X = V @ S[:, :k]
+        AX = AV @ S[:, :k]
+        lk = theta[:k]
+        R = AX - X * lk
+        rnorms = np.linalg.norm(R, axis=0)
+
+        unconverged = rnorms > tol * np.maximum(1.0, np.abs(lk))
+        if not unconverged.any():
+            converged = True
+            break
+
+        # form the correction vectors for unconverged pairs
+        T = R[:, unconverged]
+        if precond is not None:
+            denom = lk[unconverged] - precond[:, None]
+            # avoid dividing by (near) zero
+            small = np.abs(denom) < 1e-8
+            denom[small] = np.where(denom[small] >= 0, 1e-8, -1e-8)
+            T = T / denom
+
+        # thick restart with the current best ritz vectors
+        if V.shape[1] + T.shape[1] > ncv:
+            V = V @ S[:, :nkeep]
+            AV = AV @ S[:, :nkeep]
+
+        T = _orthonormalize_against(V, T)
+        if T.shape[1] == 0:
+            # subspace can't be extended
+            break
+
+        V = np.hstack([V, T])
+        AV = np.hstack([AV, np.asarray(A @ T).reshape(d, -1)])
+        nmatvec += T.shape[1]
+
+    if info is not None:
+        info["nmatvec"] = nmatvec
+        info["niter"] = niter
+        info["converged"] = converged
+        info["subspace"] = V_ritz @ S_ritz[:, :nkeep]
+
+    if sort:
+        order = np.argsort(lk)
+        lk, X = lk[order], X[:, order]
+
+    if return_vecs:
+        return lk, qu.qarray(X)
+    return lk
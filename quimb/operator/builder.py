@@ -16,7 +16,12 @@ import operator
 import numpy as np
 
 from . import configcore
-from .hilbertspace import HilbertSpace
+from .hilbertspace import (
+    HilbertSpace,
+    get_local_charges,
+    get_symmray_symmetry,
+    parse_symmetry_and_sector,
+)
 
 _OPMAP = {
     "I": {0: (0, 1.0), 1: (1, 1.0)},
@@ -64,6 +69,36 @@ def get_mat(op, dtype=None):
     return a
 
 
+@functools.lru_cache(maxsize=None)
+def get_op_charge_change(op, symmetry):
+    """Get the definite change in charge (number of up spins / particles)
+    that local operator ``op`` causes, raising an error if it doesn't have
+    one, e.g. ``'x'`` with U1 symmetry.
+
+    Parameters
+    ----------
+    op : str
+        The local operator, e.g. ``'+'``.
+    symmetry : {"Z2", "U1"}
+        The symmetry, for U1U1 use U1 per site.
+
+    Returns
+    -------
+    int
+    """
+    changes = {out - inp for inp, (out, _) in _OPMAP[op].items()}
+    if symmetry == "Z2":
+        changes = {c % 2 for c in changes}
+    if len(changes) != 1:
+        raise ValueError(
+            f"Operator '{op}' doesn't change the {symmetry} charge by a "
+            "definite amount, try writing terms using e.g. '+', '-', 'n' "
+            "and 'z' instead."
+        )
+    (change,) = changes
+    return change
+
+
 def _identity_fn(x):
     return x
 
@@ -1309,7 +1344,27 @@ class SparseOperatorBuilder:
             dtype=dtype,
         )
 
-    def build_local_terms(self, dtype=None):
+    def _build_local_array_abelian(self, sites, hk, symmetry, sector):
+        """Convert the dense local matrix ``hk``, acting on ``sites``, into a
+        ``symmray`` block sparse array with ``2 * len(sites)`` indices, the
+        output (non-dual) indices first, then the input (dual) indices.
+        """
+        import symmray as sr
+
+        k = len(sites)
+        qs = [
+            get_local_charges(self.site_to_reg(site), symmetry, sector)
+            for site in sites
+        ]
+        return sr.AbelianArray.from_dense(
+            np.reshape(hk, (2,) * (2 * k)),
+            index_maps=qs + qs,
+            duals=[False] * k + [True] * k,
+            symmetry=symmetry,
+            invalid_sectors="raise",
+        )
+
+    def build_local_terms(self, dtype=None, symmetry=None, sector=None):
         """Get a dictionary of local terms, where each key is a sorted tuple
         of sites, and each value is the local matrix representation of the
         operator on those sites. For use with e.g. tensor network algorithms.
@@ -1317,6 +1372,19 @@ class SparseOperatorBuilder:
         Note terms acting on the same sites are summed together and the size of
         each local matrix is exponential in the locality of that term.
 
+        Parameters
+        ----------
+        dtype : numpy.dtype, optional
+            The data type of the matrices. If not provided, will be
+            automatically determined based on the terms in the operator.
+        symmetry : {None, True, "Z2", "U1", "U1U1"}, optional
+            If given, make each local term a charge conserving ``symmray``
+            block sparse array, with shape ``(2,) * (2 * k)``, rather than
+            a matrix. See :meth:`build_mpo` for details.
+        sector : {None, str, int, ((int, int), (int, int))}, optional
+            The sector, only needed for U1U1 symmetry. Defaults to the sector
+            of the Hilbert space.
+
         Returns
         -------
         Hk : dict[tuple[hashable], numpy.ndarray]
@@ -1325,6 +1393,7 @@ class SparseOperatorBuilder:
         Hk = {}
 
         dtype = self.get_dtype(dtype)
+        symmetry, sector = self._parse_mpo_symmetry(symmetry, sector)
 
         for term, coeff in self._get_terms_final().items():
             ops, sites = zip(*term)
@@ -1335,9 +1404,17 @@ class SparseOperatorBuilder:
             else:
                 Hk[sites] = Hk[sites] + hk
 
+        if symmetry is not None:
+            Hk = {
+                sites: self._build_local_array_abelian(
+                    sites, hk, symmetry, sector
+                )
+                for sites, hk in Hk.items()
+            }
+
         return Hk
 
-    def build_local_ham(self, dtype=None):
+    def build_local_ham(self, dtype=None, symmetry=None, sector=None):
         """Get a `LocalHamGen` object for this operator.
 
         Parameters
@@ -1345,6 +1422,14 @@ class SparseOperatorBuilder:
         dtype : numpy.dtype, optional
             The data type of the matrix. If not provided, will be
             automatically determined based on the terms in the operator.
+        symmetry : {None, True, "Z2", "U1", "U1U1"}, optional
+            If given, make each (combined) two site term a charge conserving
+            ``symmray`` block sparse array with shape ``(2, 2, 2, 2)``, for
+            use with e.g. ``TEBDGen`` on a symmetric state. See
+            :meth:`build_mpo` for details.
+        sector : {None, str, int, ((int, int), (int, int))}, optional
+            The sector, only needed for U1U1 symmetry. Defaults to the sector
+            of the Hilbert space.
 
         Returns
         -------
@@ -1353,6 +1438,19 @@ class SparseOperatorBuilder:
         """
         from quimb.tensor import LocalHamGen
 
+        symmetry, sector = self._parse_mpo_symmetry(symmetry, sector)
+        if symmetry is not None:
+            # absorb the one site terms into the pairs densely, then convert
+            H = self.build_local_ham(dtype=dtype)
+            return LocalHamGen(
+                {
+                    sites: self._build_local_array_abelian(
+                        sites, hk, symmetry, sector
+                    )
+                    for sites, hk in H.terms.items()
+                }
+            )
+
         terms = self.build_local_terms(dtype=dtype)
 
         H2 = {}
@@ -1629,7 +1727,125 @@ class SparseOperatorBuilder:
         plt.show()
         plt.close(fig)
 
-    def build_mpo(self, method="greedy", dtype=None, **mpo_opts):
+    def _parse_mpo_symmetry(self, symmetry, sector):
+        """Get the symmetry and sector to build a tensor network operator
+        with, defaulting to those of the Hilbert space.
+        """
+        if symmetry is None:
+            return None, None
+
+        if symmetry is True:
+            symmetry = self.hilbert_space.symmetry
+            if symmetry is None:
+                raise ValueError(
+                    "`symmetry=True` but the Hilbert space has no symmetry."
+                )
+        if sector is None:
+            sector = self.hilbert_space.sector
+
+        if sector is None:
+            # the operator itself only needs the sector for U1U1
+            if symmetry not in ("Z2", "U1", "U1U1"):
+                raise ValueError(f"Invalid `symmetry` {symmetry}.")
+            if symmetry == "U1U1":
+                raise ValueError("U1U1 symmetry requires a `sector`.")
+            return symmetry, None
+
+        return parse_symmetry_and_sector(
+            nsites=self.nsites,
+            sector=sector,
+            symmetry=symmetry,
+        )
+
+    def _get_op_charge_change(self, op, reg, symmetry, sector):
+        if symmetry != "U1U1":
+            return get_op_charge_change(op, symmetry)
+        # charge change is U1 within whichever group ``reg`` is in
+        change = get_op_charge_change(op, "U1")
+        q0, q1 = get_local_charges(reg, symmetry, sector)
+        return tuple(change * (b - a) for a, b in zip(q0, q1))
+
+    def _build_mpo_abelian_arrays(self, G, Wts, symmetry, sector):
+        """Convert the dense MPO arrays ``Wts``, built from state machine
+        ``G``, into ``symmray`` abelian block sparse arrays, by assigning each
+        rail of the state machine the (negated) charge change of the
+        operators preceding it.
+        """
+        import symmray as sr
+
+        sym = get_symmray_symmetry(symmetry)
+        zero = sym.combine()
+
+        # propagate charges along rails, register by register
+        rail_charges = {(0, 0): zero}
+        for node_a, node_b in sorted(G.edges, key=lambda e: e[0]):
+            reg = node_a[0]
+            dq = self._get_op_charge_change(
+                G.edges[node_a, node_b]["op"], reg, symmetry, sector
+            )
+            qb = sym.combine(rail_charges[node_a], sym.sign(dq))
+            if rail_charges.setdefault(node_b, qb) != qb:
+                raise ValueError(
+                    "The terms of the operator don't all change the "
+                    f"{symmetry} charge by the same amount."
+                )
+
+        # the final rails have been summed, so must share a charge,
+        #     which then gives the total charge of the operator
+        final_charges = {
+            rail_charges[self.nsites, rail]
+            for rail in range(G.graph["num_rails"][-1])
+        }
+        if len(final_charges) != 1:
+            raise ValueError(
+                "The terms of the operator don't all change the "
+                f"{symmetry} charge by the same amount."
+            )
+        (final_charge,) = final_charges
+
+        arrays = []
+        for reg, W in enumerate(Wts):
+            qs = get_local_charges(reg, symmetry, sector)
+            index_maps = [qs, qs]
+            duals = [False, True]
+            if reg < self.nsites - 1:
+                rail_qs = [
+                    rail_charges[reg + 1, rail]
+                    for rail in range(G.graph["num_rails"][reg + 1])
+                ]
+                index_maps.insert(0, rail_qs)
+                duals.insert(0, False)
+            if reg > 0:
+                rail_qs = [
+                    rail_charges[reg, rail]
+                    for rail in range(G.graph["num_rails"][reg])
+                ]
+                index_maps.insert(0, rail_qs)
+                duals.insert(0, True)
+
+            charge = sym.sign(final_charge) if reg == self.nsites - 1 else zero
+
+            arrays.append(
+                sr.AbelianArray.from_dense(
+                    W,
+                    index_maps=index_maps,
+                    duals=duals,
+                    charge=charge,
+                    symmetry=symmetry,
+                    invalid_sectors="raise",
+                )
+            )
+
+        return arrays
+
+    def build_mpo(
+        self,
+        method="greedy",
+        dtype=None,
+        symmetry=None,
+        sector=None,
+        **mpo_opts,
+    ):
         """Build a matrix product operator (MPO) representation of this
         operator.
 
@@ -1641,6 +1857,17 @@ class SparseOperatorBuilder:
         dtype : type, optional
             The data type of the MPO. If not supplied, will be chosen
             automatically based on the terms in the operator.
+        symmetry : {None, True, "Z2", "U1", "U1U1"}, optional
+            If given, build the MPO from ``symmray`` block sparse arrays that
+            explicitly conserve this symmetry, with each state machine rail
+            carrying a definite charge. Every term must then change the
+            charge by the same definite amount, so e.g. for U1 use ``'+'`` and
+            ``'-'`` rather than ``'x'`` and ``'y'``. If ``True``, use the
+            symmetry of the Hilbert space. If ``None`` (the default), build a
+            dense MPO.
+        sector : {None, str, int, ((int, int), (int, int))}, optional
+            The sector, only needed to locate the two groups of sites for
+            U1U1 symmetry. Defaults to the sector of the Hilbert space.
         mpo_opts : keyword arguments
             Additional options to pass to the MPO constructor.
             See `MatrixProductOperator` for details.
@@ -1656,10 +1883,22 @@ class SparseOperatorBuilder:
         import quimb.tensor as qtn
 
         dtype = self.get_dtype(dtype)
+        symmetry, sector = self._parse_mpo_symmetry(symmetry, sector)
 
         if self.nsites == 1:
             # single site operator, just sum them
             Wt0 = self.build_dense(dtype=dtype)
+            if symmetry is not None:
+                import symmray as sr
+
+                qs = get_local_charges(0, symmetry, sector)
+                Wt0 = sr.AbelianArray.from_dense(
+                    Wt0,
+                    index_maps=[qs, qs],
+                    duals=[False, True],
+                    symmetry=symmetry,
+                    invalid_sectors="raise",
+                )
             return qtn.MatrixProductOperator([Wt0], **mpo_opts)
 
         if method == "greedy":
@@ -1687,6 +1926,9 @@ class SparseOperatorBuilder:
         Wts[0] = Wts[0].sum(axis=0)
         Wts[-1] = Wts[-1].sum(axis=1)
 
+        if symmetry is not None:
+            Wts = self._build_mpo_abelian_arrays(G, Wts, symmetry, sector)
+
         return qtn.MatrixProductOperator(Wts, **mpo_opts)
 
     def __repr__(self):
@@ -124,6 +124,55 @@ def parse_symmetry_and_sector(nsites, sector=None, symmetry=None):
     return symmetry, sector
 
 
+def get_symmray_symmetry(symmetry):
+    """Get the ``symmray`` symmetry object, which defines how charges are
+    combined, for ``symmetry`` in {"Z2", "U1", "U1U1"}.
+    """
+    import symmray as sr
+
+    return sr.get_symmetry(symmetry)
+
+
+def get_local_charges(reg, symmetry, sector=None):
+    """Get the charge of each local basis state, ``|0>`` and ``|1>``, of the
+    qubit at register ``reg``, in the form used by ``symmray``.
+
+    Parameters
+    ----------
+    reg : int
+        The register (linear index) of the site.
+    symmetry : {"Z2", "U1", "U1U1"}
+        The symmetry.
+    sector : ((int, int), (int, int)), optional
+        The sector, only needed for "U1U1" symmetry, where the first ``na``
+        registers carry the first charge and the rest the second.
+
+    Returns
+    -------
+    tuple[hashable, hashable]
+    """
+    if symmetry in ("Z2", "U1"):
+        return (0, 1)
+
+    if symmetry == "U1U1":
+        if sector is None:
+            raise ValueError("U1U1 symmetry requires a `sector` to be given.")
+        (na, _), _ = sector
+        if reg < na:
+            return ((0, 0), (1, 0))
+        return ((0, 0), (0, 1))
+
+    raise ValueError(f"Invalid `symmetry` {symmetry}.")
+
+
+def get_sector_charge(symmetry, sector):
+    """Get the total charge, in the form used by ``symmray``, of ``sector``."""
+    if symmetry == "U1U1":
+        (_, ka), (_, kb) = sector
+        return (ka, kb)
+    return sector
+
+
 def parse_sites_dims(sites, dims):
     """Parse a site and dimension specification.
 
@@ -3,11 +3,15 @@
 from .circuit import (
     Circuit,
     CircuitDense,
+    CircuitDensityMatrix,
+    CircuitDensityMatrixMPS,
     CircuitMPS,
     CircuitMPSLazy,
     CircuitPEPOSimpleUpdate,
     CircuitPEPSSimpleUpdate,
     CircuitPermMPS,
+    CircuitStatevector,
+    CircuitTrajectories,
     Gate,
 )
 from .circuit_gen import (
@@ -18,16 +22,21 @@ from .circuit_gen import (
     circ_qaoa,
 )
 from .contraction import (
+    ContractionPlan,
+    ContractionTreeCache,
     array_contract,
     contract_backend,
     contract_strategy,
+    contract_tree_cache,
     get_contract_backend,
     get_contract_strategy,
+    get_contract_tree_cache,
     get_symbol,
     get_tensor_linop_backend,
     inds_to_eq,
     set_contract_backend,
     set_contract_strategy,
+    set_contract_tree_cache,
     set_tensor_linop_backend,
     tensor_linop_backend,
 )
@@ -52,6 +61,11 @@ from .interface import (
 from .optimize import (
     TNOptimizer,
 )
+from .storage import (
+    TensorNetworkCheckpoint,
+    load_tensor_network,
+    save_tensor_network,
+)
 from .tensor_builder import (
     MPS_COPY,
     HTN2D_classical_ising_partition_function,
@@ -154,6 +168,7 @@ from .tensor_core import (
     tensor_direct_product,
     tensor_fuse_squeeze,
     tensor_gauge_simple_bond,
+    tensor_network_contract_batched,
     tensor_network_distance,
     tensor_network_fit_als,
     tensor_network_fit_autodiff,
@@ -170,6 +185,7 @@ from .tn1d.core import (
     Dense1D,
     MatrixProductOperator,
     MatrixProductState,
+    MPSEnvironmentCache,
     SuperOperator1D,
     TensorNetwork1D,
     TNLinearOperator1D,
@@ -182,6 +198,7 @@ from .tn1d.dmrg import (
     DMRG,
     DMRG1,
     DMRG2,
+    DMRG3S,
     DMRGX,
     MovingEnvironment,
 )
@@ -248,11 +265,18 @@ __all__ = (
     "CircuitPEPOSimpleUpdate",
     "CircuitPEPSSimpleUpdate",
     "CircuitPermMPS",
+    "CircuitStatevector",
+    "CircuitTrajectories",
+    "CircuitDensityMatrix",
+    "CircuitDensityMatrixMPS",
     "CircuitMPSLazy",
     "cnf_file_parse",
     "connect",
     "contract_backend",
     "contract_strategy",
+    "contract_tree_cache",
+    "ContractionPlan",
+    "ContractionTreeCache",
     "convert_to_2d",
     "convert_to_3d",
     "COPY_tensor",
@@ -260,6 +284,7 @@ __all__ = (
     "DMRG",
     "DMRG1",
     "DMRG2",
+    "DMRG3S",
     "DMRGX",
     "edge_coloring",
     "edges_1d_chain",
@@ -282,6 +307,7 @@ __all__ = (
     "gen_3d_bonds",
     "get_contract_backend",
     "get_contract_strategy",
+    "get_contract_tree_cache",
     "get_symbol",
     "get_tensor_linop_backend",
     "group_inds",
@@ -310,6 +336,7 @@ __all__ = (
     "LocalHam3D",
     "LocalHamGen",
     "LatticeBondMap",
+    "load_tensor_network",
     "MatrixProductOperator",
     "MatrixProductState",
     "MERA",
@@ -335,6 +362,7 @@ __all__ = (
     "MPS_sampler",
     "MPS_w_state",
     "MPS_zero_state",
+    "MPSEnvironmentCache",
     "new_bond",
     "NNI_ham_heis",
     "NNI_ham_ising",
@@ -352,8 +380,10 @@ __all__ = (
     "rand_tensor",
     "rand_uuid",
     "random_ksat_instance",
+    "save_tensor_network",
     "set_contract_backend",
     "set_contract_strategy",
+    "set_contract_tree_cache",
     "set_tensor_linop_backend",
     "SimpleUpdate",
     "SimpleUpdateGen",
@@ -379,6 +409,7 @@ __all__ = (
     "tensor_network_align",
     "tensor_network_apply_op_op",
     "tensor_network_apply_op_vec",
+    "tensor_network_contract_batched",
     "tensor_network_distance",
     "tensor_network_fit_als",
     "tensor_network_fit_autodiff",
@@ -391,6 +422,7 @@ __all__ = (
     "TensorNetwork1D",
     "TensorNetwork2D",
     "TensorNetwork3D",
+    "TensorNetworkCheckpoint",
     "TensorNetworkGen",
     "TensorNetworkGenOperator",
     "TensorNetworkGenVector",
@@ -62,7 +62,7 @@ Overall that gives 12 possible BP flavors, some implemented here:
 - [x] (D1BP) simple, dense, 1-norm - simple BP for simple tensor networks
 - [x] (D2BP) simple, dense, 2-norm - this is the standard PEPS BP algorithm
 - [ ] (V1BP) simple, vectorized, 1-norm
-- [ ] (V2BP) simple, vectorized, 2-norm
+- [x] (V2BP) simple, vectorized, 2-norm
 - [x] (L1BP) simple, lazy, 1-norm
 - [x] (L2BP) simple, lazy, 2-norm
 
@@ -75,16 +75,23 @@ tensors, but do currently require all dimensions to match.
 
 The dense and lazy methods can can converge messages *locally*, i.e. only
 update messages adjacent to messages which have changed.
+
+Generalized BP (G1BP, G2BP) instead exchanges messages between the regions of
+a :class:`RegionGraph`, for example plaquettes of a PEPS and their
+intersections, which accounts for short loops and can give much more accurate
+contraction and norm estimates.
 """
 
 from .bp_common import combine_local_contractions, initialize_hyper_messages
 from .d1bp import D1BP, contract_d1bp
 from .d2bp import D2BP, compress_d2bp, contract_d2bp, sample_d2bp
+from .gbp import G1BP, G2BP, contract_g1bp, contract_g2bp
 from .hd1bp import HD1BP, contract_hd1bp, sample_hd1bp
 from .hv1bp import HV1BP, contract_hv1bp, sample_hv1bp
 from .l1bp import L1BP, contract_l1bp
 from .l2bp import L2BP, compress_l2bp, contract_l2bp
 from .regions import RegionGraph, gen_region_counts
+from .v2bp import V2BP, contract_v2bp
 
 __all__ = (
     "combine_local_contractions",
@@ -92,12 +99,17 @@ __all__ = (
     "compress_l2bp",
     "contract_d1bp",
     "contract_d2bp",
+    "contract_g1bp",
+    "contract_g2bp",
     "contract_hd1bp",
     "contract_hv1bp",
     "contract_l1bp",
     "contract_l2bp",
+    "contract_v2bp",
     "D1BP",
     "D2BP",
+    "G1BP",
+    "G2BP",
     "gen_region_counts",
     "HD1BP",
     "HV1BP",
@@ -108,4 +120,5 @@ __all__ = (
     "sample_d2bp",
     "sample_hd1bp",
     "sample_hv1bp",
+    "V2BP",
 )
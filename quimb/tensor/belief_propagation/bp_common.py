@@ -1,11 +1,13 @@
 import functools
+import heapq
+import itertools
 import math
 import operator
 
 import autoray as ar
 
 from quimb.tensor import TensorNetwork, array_contract, bonds
-from quimb.utils import RollingDiffMean
+from quimb.utils import RollingDiffMean, oset
 
 
 def prod(xs):
@@ -25,12 +27,14 @@ class BeliefPropagationCommon:
         of the old message into the new one, with the final message being
         ``damping * old + (1 - damping) * new``. This makes convergence more
         reliable but slower.
-    update : {'sequential', 'parallel'}, optional
+    update : {'sequential', 'parallel', 'residual'}, optional
         Whether to update messages sequentially (newly computed messages are
         immediately used for other updates in the same iteration round) or in
         parallel (all messages are comptued using messages from the previous
         round only). Sequential generally helps convergence but parallel can
-        possibly converge to differnt solutions.
+        possibly converge to differnt solutions. 'residual' is like
+        sequential but always updates the message that would change the most
+        next, for subclasses that support it.
     normalize : {'L1', 'L2', 'L2phased', 'Linf', callable}, optional
         How to normalize messages after each update. If None choose
         automatically. If a callable, it should take a message and return the
@@ -101,6 +105,8 @@ class BeliefPropagationCommon:
         self.rdiffs = []
         self.zval_its = []
         self.zvals = []
+        # optional executor for computing independent messages concurrently
+        self.pool = None
 
     @property
     def damping(self):
@@ -253,6 +259,135 @@ class BeliefPropagationCommon:
             self.zval_its.append(self.n)
             self.zvals.append(self.contract())
 
+    def _map_maybe_parallel(self, fn, keys):
+        """Call ``fn`` on each of ``keys``, possibly concurrently using
+        ``self.pool``. The results are always returned in the same order as
+        ``keys``, so that any subsequent reduction is deterministic.
+        """
+        if self.pool is None:
+            return [fn(key) for key in keys]
+        futs = [self.pool.submit(fn, key) for key in keys]
+        return [fut.result() for fut in futs]
+
+    def _iterate_residual(
+        self,
+        units,
+        compute_fn,
+        residual_fn,
+        commit_fn,
+        dependents_fn,
+        tol,
+    ):
+        """Perform a single round of residual belief propagation, where the
+        update with the largest residual (the distance between the current and
+        freshly computed message) is always applied first. Residuals are kept
+        in a priority queue and re-prioritized lazily: when a unit is updated,
+        the units depending on it are not recomputed, but are marked *stale*
+        with an estimated residual of half the residual just applied (or their
+        previous residual if larger). Only once a stale unit reaches the top
+        of the queue is it recomputed and re-inserted with its exact residual.
+
+        A round stops once every residual is known to be below ``tol``, or
+        after as many updates as there were units to start with, i.e. roughly
+        the same number of message updates as one sequential sweep.
+
+        Parameters
+        ----------
+        units : sequence of hashable
+            The units of update to check initially, e.g. message keys.
+        compute_fn : callable
+            ``compute_fn(unit) -> candidate``, compute the new messages of a
+            unit given the current messages.
+        residual_fn : callable
+            ``residual_fn(unit, candidate) -> float``, the distance between
+            the current and candidate messages of a unit.
+        commit_fn : callable
+            ``commit_fn(unit, candidate)``, insert (with damping) the
+            candidate messages of a unit.
+        dependents_fn : callable
+            ``dependents_fn(unit) -> iterable``, the units whose computation
+            depends on the messages of ``unit``.
+        tol : float
+            The convergence tolerance, below which units are not updated.
+
+        Returns
+        -------
+        dict
+            With the usual keys ``nconv``, ``ncheck`` and ``max_mdiff``, as
+            well as ``nupdates``, the number of units actually updated.
+        """
+        units = tuple(units)
+        counter = itertools.count()
+        heap = []
+        # unit -> (estimated residual, unique id of latest heap entry)
+        priorities = {}
+        # unit -> candidate, only present if up to date with inputs
+        candidates = {}
+
+        def _push(unit, r):
+            c = next(counter)
+            priorities[unit] = (r, c)
+            heapq.heappush(heap, (-r, c, unit))
+
+        # the initial candidates can be computed concurrently
+        for unit, candidate in zip(
+            units, self._map_maybe_parallel(compute_fn, units)
+        ):
+            candidates[unit] = candidate
+            _push(unit, residual_fn(unit, candidate))
+
+        nupdates = 0
+        while heap:
+            negr, c, unit = heapq.heappop(heap)
+            r = -negr
+
+            if priorities.get(unit, (None, None))[1] != c:
+                # superseded or already applied heap entry
+                continue
+
+            if unit not in candidates:
+                # stale -> compute the exact residual and reinsert
+                candidate = compute_fn(unit)
+                candidates[unit] = candidate
+                _push(unit, residual_fn(unit, candidate))
+                continue
+
+            if r <= tol:
+                # converged, unless any of its inputs change again
+                continue
+
+            if nupdates >= len(units):
+                # this round is done
+                break
+
+            commit_fn(unit, candidates.pop(unit))
+            nupdates += 1
+
+            if self.damping:
+                # only part of the update has been applied, leave stale
+                _push(unit, r)
+            else:
+                del priorities[unit]
+
+            for dep in dependents_fn(unit):
+                # lazily mark as stale with an estimate of the residual
+                candidates.pop(dep, None)
+                _push(dep, max(priorities.get(dep, (0.0, None))[0], 0.5 * r))
+
+        # units which still need updating or checking
+        self.touched = oset(
+            unit
+            for unit, (r, _) in priorities.items()
+            if (r > tol) or (unit not in candidates)
+        )
+
+        return {
+            "nconv": sum(unit not in self.touched for unit in units),
+            "ncheck": len(units),
+            "nupdates": nupdates,
+            "max_mdiff": max((r for r, _ in priorities.values()), default=0.0),
+        }
+
     def run(
         self,
         max_iterations=1000,
@@ -262,6 +397,7 @@ class BeliefPropagationCommon:
         tol_rolling_diff=None,
         info=None,
         progbar=False,
+        thread_pool=None,
     ):
         """
         Parameters
@@ -289,7 +425,31 @@ class BeliefPropagationCommon:
             ``rolling_abs_mean_diff`` (float).
         progbar : bool, optional
             Whether to show a progress bar.
+        thread_pool : bool, int or ThreadPoolExecutor, optional
+            If given, use this thread pool to compute the messages of each
+            round concurrently, for ``update='parallel'`` only. If ``True``
+            use the default thread pool, if an integer a pool with that many
+            workers, and if ``False`` explicitly disable any pool. The new
+            messages are always inserted in a fixed order, so results are
+            the same as the serial version. If ``None`` (the default), use
+            whatever pool the instance already has, if any.
         """
+        if thread_pool is not None:
+            # temporarily set the pool for the duration of this run
+            old_pool, self.pool = self.pool, maybe_get_thread_pool(thread_pool)
+            try:
+                return self.run(
+                    max_iterations=max_iterations,
+                    diis=diis,
+                    tol=tol,
+                    tol_abs=tol_abs,
+                    tol_rolling_diff=tol_rolling_diff,
+                    info=info,
+                    progbar=progbar,
+                )
+            finally:
+                self.pool = old_pool
+
         if tol_abs is None:
             tol_abs = tol
         if tol_rolling_diff is None:
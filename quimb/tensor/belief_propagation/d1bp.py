@@ -66,12 +66,15 @@ class D1BP(BeliefPropagationCommon):
         of the old message into the new one, with the final message being
         ``damping * old + (1 - damping) * new``. This makes convergence more
         reliable but slower.
-    update : {'sequential', 'parallel'}, optional
+    update : {'sequential', 'parallel', 'residual'}, optional
         Whether to update messages sequentially (newly computed messages are
         immediately used for other updates in the same iteration round) or in
         parallel (all messages are comptued using messages from the previous
         round only). Sequential generally helps convergence but parallel can
-        possibly converge to differnt solutions.
+        possibly converge to differnt solutions. 'residual' is like
+        sequential but always updates the message that would change the most
+        next, which can require far fewer updates on slowly converging or
+        frustrated networks.
     normalize : {'L1', 'L2', 'L2phased', 'Linf', callable}, optional
         How to normalize messages after each update. If None choose
         automatically. If a callable, it should take a message and return the
@@ -206,16 +209,48 @@ class D1BP(BeliefPropagationCommon):
                     _update_m(key, new_m)
 
         elif self.update == "parallel":
-            new_data = {}
-            # compute all new messages
+            tids = []
             while self.touched:
-                tid = self.touched.pop()
-                keys, new_ms = _compute_ms(tid)
+                tids.append(self.touched.pop())
+            # compute all new messages, possibly concurrently
+            results = self._map_maybe_parallel(_compute_ms, tids)
+            # insert all new messages, in a fixed order
+            for keys, new_ms in results:
                 for key, new_m in zip(keys, new_ms):
-                    new_data[key] = new_m
-            # insert all new messages
-            for key, new_m in new_data.items():
-                _update_m(key, new_m)
+                    _update_m(key, new_m)
+
+        elif self.update == "residual":
+            # update tensors in order of how much their messages would change
+
+            def _residual(tid, new_kms):
+                return max(
+                    (
+                        self._distance_fn(self.messages[key], new_m)
+                        for key, new_m in zip(*new_kms)
+                    ),
+                    default=0.0,
+                )
+
+            def _commit(tid, new_kms):
+                for key, new_m in zip(*new_kms):
+                    self.messages[key] = self._damping_fn(
+                        self.messages[key], new_m
+                    )
+
+            def _dependents(tid):
+                return [
+                    self.key_pairs[ix, tid][1]
+                    for ix in self.tn.tensor_map[tid].inds
+                ]
+
+            return self._iterate_residual(
+                self.touched,
+                _compute_ms,
+                _residual,
+                _commit,
+                _dependents,
+                tol,
+            )
 
         self.touched = new_touched
 
@@ -575,6 +610,7 @@ def contract_d1bp(
     check_zero=True,
     info=None,
     progbar=False,
+    thread_pool=None,
     **contract_opts,
 ):
     """Estimate the contraction of standard tensor network ``tn`` using dense
@@ -596,8 +632,9 @@ def contract_d1bp(
         help converge the messages by extrapolating to low error guesses.
         If a dict, should contain options for the DIIS algorithm. The
         relevant options are {`max_history`, `beta`, `rcond`}.
-    update : {'sequential', 'parallel'}, optional
-        Whether to update messages sequentially or in parallel.
+    update : {'sequential', 'parallel', 'residual'}, optional
+        Whether to update messages sequentially, in parallel, or in order of
+        largest change first.
     normalize : {'L1', 'L2', 'L2phased', 'Linf', callable}, optional
         How to normalize messages after each update. If None choose
         automatically. If a callable, it should take a message and return the
@@ -634,6 +671,10 @@ def contract_d1bp(
         ``rolling_abs_mean_diff`` (float).
     progbar : bool, optional
         Whether to show a progress bar.
+    thread_pool : bool, int or ThreadPoolExecutor, optional
+        Whether to compute the messages of each round concurrently using a
+        thread pool, only relevant for ``update='parallel'``. If an integer,
+        then use a pool with that many workers.
     """
     bp = D1BP(
         tn,
@@ -652,6 +693,7 @@ def contract_d1bp(
         tol_rolling_diff=tol_rolling_diff,
         info=info,
         progbar=progbar,
+        thread_pool=thread_pool,
     )
     return bp.contract(
         strip_exponent=strip_exponent,
@@ -71,12 +71,15 @@ class D2BP(BeliefPropagationCommon):
         of the old message into the new one, with the final message being
         ``damping * old + (1 - damping) * new``. This makes convergence more
         reliable but slower.
-    update : {'sequential', 'parallel'}, optional
+    update : {'sequential', 'parallel', 'residual'}, optional
         Whether to update messages sequentially (newly computed messages are
         immediately used for other updates in the same iteration round) or in
         parallel (all messages are comptued using messages from the previous
         round only). Sequential generally helps convergence but parallel can
-        possibly converge to differnt solutions.
+        possibly converge to differnt solutions. 'residual' is like
+        sequential but always updates the message that would change the most
+        next, which can require far fewer updates on slowly converging or
+        frustrated networks.
     normalize : {'L1', 'L2', 'L2phased', 'Linf', callable}, optional
         How to normalize messages after each update. If None choose
         automatically. If a callable, it should take a message and return the
@@ -157,8 +160,6 @@ class D2BP(BeliefPropagationCommon):
         """Setup any missing input messages and build contraction expressions
         for output message updates for each bond around tensor at `tid`.
         """
-        from quimb.tensor.contraction import array_contract_expression
-
         t = self.tn.tensor_map[tid]
         ix_neighbors = {}
         axs_output = []
@@ -228,14 +229,20 @@ class D2BP(BeliefPropagationCommon):
                 # else:
                 # global output -> directly traced without message
 
-            expr = array_contract_expression(
-                inputs=inputs,
-                output=output,
-                shapes=shapes,
-                **self.contract_opts,
-            )
+            expr = self._build_expr(inputs, output, shapes)
             self.exprs[ix_next, tid_next] = expr, data
 
+    def _build_expr(self, inputs, output, shapes):
+        """Build the contraction expression for a single message update."""
+        from quimb.tensor.contraction import array_contract_expression
+
+        return array_contract_expression(
+            inputs=inputs,
+            output=output,
+            shapes=shapes,
+            **self.contract_opts,
+        )
+
     def update_touched_from_tids(self, *tids):
         """Specify that the messages for the given ``tids`` have changed."""
         for tid in tids:
@@ -309,13 +316,13 @@ class D2BP(BeliefPropagationCommon):
             self.messages[key] = new_m
 
         if self.update == "parallel":
-            new_messages = {}
-            # compute all new messages
+            keys = []
             while self.touched:
-                key = self.touched.pop()
-                new_messages[key] = _compute_m(key)
-            # insert all new messages
-            for key, new_m in new_messages.items():
+                keys.append(self.touched.pop())
+            # compute all new messages, possibly concurrently
+            new_ms = self._map_maybe_parallel(_compute_m, keys)
+            # insert all new messages, in a fixed order
+            for key, new_m in zip(keys, new_ms):
                 _update_m(key, new_m)
 
         elif self.update == "sequential":
@@ -325,6 +332,26 @@ class D2BP(BeliefPropagationCommon):
                 new_m = _compute_m(key)
                 _update_m(key, new_m)
 
+        elif self.update == "residual":
+            # update messages in order of how much they would change
+
+            def _residual(key, new_m):
+                return self._distance_fn(self.messages[key], new_m)
+
+            def _commit(key, new_m):
+                self.messages[key] = self._damping_fn(
+                    self.messages[key], new_m
+                )
+
+            return self._iterate_residual(
+                self.touched,
+                _compute_m,
+                _residual,
+                _commit,
+                self.touch_map.__getitem__,
+                tol,
+            )
+
         self.touched = new_touched
 
         return {
@@ -960,6 +987,10 @@ class D2BP(BeliefPropagationCommon):
         if len(where) == 1:
             # single site gate
             self.tn.gate_(G, where, contract=True)
+            # the tensor has changed -> rebuild its contraction expressions
+            (tid,) = self.tn._get_tids_from_tags(self.tn.site_tag(where[0]))
+            self.update_touched_from_tids(tid)
+            self._init_tid(tid)
             return
 
         gate_opts.setdefault("contract", "reduce-split")
@@ -1239,6 +1270,7 @@ def contract_d2bp(
     check_zero=True,
     info=None,
     progbar=False,
+    thread_pool=None,
     **contract_opts,
 ):
     """Estimate the norm squared of ``tn`` using dense 2-norm belief
@@ -1265,8 +1297,9 @@ def contract_d2bp(
         help converge the messages by extrapolating to low error guesses.
         If a dict, should contain options for the DIIS algorithm. The
         relevant options are {`max_history`, `beta`, `rcond`}.
-    update : {'sequential', 'parallel'}, optional
-        Whether to update messages sequentially or in parallel.
+    update : {'sequential', 'parallel', 'residual'}, optional
+        Whether to update messages sequentially, in parallel, or in order of
+        largest change first.
     normalize : {'L1', 'L2', 'L2phased', 'Linf', callable}, optional
         How to normalize messages after each update. If None choose
         automatically. If a callable, it should take a message and return the
@@ -1305,6 +1338,10 @@ def contract_d2bp(
         ``rolling_abs_mean_diff`` (float).
     progbar : bool, optional
         Whether to show a progress bar.
+    thread_pool : bool, int or ThreadPoolExecutor, optional
+        Whether to compute the messages of each round concurrently using a
+        thread pool, only relevant for ``update='parallel'``. If an integer,
+        then use a pool with that many workers.
     contract_opts
         Other options supplied to ``cotengra.array_contract``.
 
@@ -1332,6 +1369,7 @@ def contract_d2bp(
         tol_rolling_diff=tol_rolling_diff,
         info=info,
         progbar=progbar,
+        thread_pool=thread_pool,
     )
     return bp.contract(
         strip_exponent=strip_exponent,
@@ -1395,8 +1433,9 @@ def compress_d2bp(
         help converge the messages by extrapolating to low error guesses.
         If a dict, should contain options for the DIIS algorithm. The
         relevant options are {`max_history`, `beta`, `rcond`}.
-    update : {'sequential', 'parallel'}, optional
-        Whether to update messages sequentially or in parallel.
+    update : {'sequential', 'parallel', 'residual'}, optional
+        Whether to update messages sequentially, in parallel, or in order of
+        largest change first.
     normalize : {'L1', 'L2', 'L2phased', 'Linf', callable}, optional
         How to normalize messages after each update. If None choose
         automatically. If a callable, it should take a message and return the
@@ -1520,8 +1559,9 @@ def sample_d2bp(
         help converge the messages by extrapolating to low error guesses.
         If a dict, should contain options for the DIIS algorithm. The
         relevant options are {`max_history`, `beta`, `rcond`}.
-    update : {'sequential', 'parallel'}, optional
-        Whether to update messages sequentially or in parallel.
+    update : {'sequential', 'parallel', 'residual'}, optional
+        Whether to update messages sequentially, in parallel, or in order of
+        largest change first.
     normalize : {'L1', 'L2', 'L2phased', 'Linf', callable}, optional
         How to normalize messages after each update. If None choose
         automatically. If a callable, it should take a message and return the
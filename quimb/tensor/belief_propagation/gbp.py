@@ -0,0 +1,705 @@
+"""Generalized belief propagation (GBP) on a region graph, with 1-norm and
+dense 2-norm messages, and cached contraction expressions for every message
+and belief.
+"""
+
+import autoray as ar
+
+import quimb.tensor as qtn
+from quimb.tensor.contraction import array_contract_expression
+
+from .bp_common import BeliefPropagationCommon, combine_local_contractions
+from .regions import RegionGraph
+
+
+def _parse_gbp_regions(tn, regions=None):
+    """Parse the generating regions for GBP into sets of tids. If
+    ``regions`` is None, use the smallest generalized loops of ``tn``.
+    Regions can be specified as sequences of tids or tags.
+    """
+    if isinstance(regions, int):
+        regions = tuple(tn.gen_gloops(max_size=regions))
+    elif regions is None:
+        regions = tuple(tn.gen_gloops())
+
+    tid_regions = []
+    for region in regions:
+        tids = set()
+        for x in region:
+            if isinstance(x, int):
+                tids.add(x)
+            else:
+                tids.update(tn._get_tids_from_tags(x, "any"))
+        tid_regions.append(frozenset(tids))
+
+    # every tensor should be in at least one region, tensors outside loops
+    # communicate via regions of just their shared indices
+    tid_regions.extend(frozenset((tid,)) for tid in tn.tensor_map)
+
+    return tid_regions
+
+
+class G1BP(BeliefPropagationCommon):
+    """Generalized (as in messages between regions of a region graph) 1-norm
+    (as in for estimating the contracted value) belief propagation. The
+    regions are formed from the supplied sets of tensors together with all
+    their indices, such that singleton regions and their shared indices
+    recover standard BP, while larger regions such as plaquettes account for
+    short loops.
+
+    The structure of every message update, i.e. which factors and messages
+    are multiplied or divided into it and with which output indices, is found
+    once upon initialization, and a contraction expression is cached for it.
+    Messages are then updated in batches of the same target region size -
+    messages into smaller regions first, since they appear in the
+    'denominator' of messages into larger regions. Messages within a batch are
+    independent and can be computed concurrently by supplying ``thread_pool``
+    to :meth:`run`.
+
+    Parameters
+    ----------
+    tn : TensorNetwork
+        The tensor network to run GBP on, it can have hyper indices.
+    regions : sequence[sequence[int | str]] or int, optional
+        The generating regions, each a sequence of tids or tags. If ``None``,
+        use the smallest generalized loops of ``tn``. If an integer, use all
+        generalized loops up to this size. All intersections are automatically
+        added to the region graph.
+    messages : dict[(frozenset, frozenset), array_like], optional
+        Initial messages to use, keyed by ``(parent, child)`` region pairs. If
+        not given, messages are initialized uniformly.
+    damping : float or callable, optional
+        The damping factor to apply to messages. This simply mixes some part
+        of the old message into the new one, with the final message being
+        ``damping * old + (1 - damping) * new``. GBP generally needs some
+        damping to converge.
+    update : {'parallel'}, optional
+        Only parallel (batched) updates are supported.
+    normalize : {'L1', 'L2', 'L2phased', 'Linf', callable}, optional
+        How to normalize messages after each update. If None choose
+        automatically. If a callable, it should take a message and return the
+        normalized message. If a string, it should be one of 'L1', 'L2',
+        'L2phased', 'Linf' for the corresponding norms. 'L2phased' is like 'L2'
+        but also normalizes the phase of the message, by default used for
+        complex dtypes.
+    distance : {'L1', 'L2', 'L2phased', 'Linf', 'cosine', callable}, optional
+        How to compute the distance between messages to check for convergence.
+        If None choose automatically. If a callable, it should take two
+        messages and return the distance. If a string, it should be one of
+        'L1', 'L2', 'L2phased', 'Linf', or 'cosine' for the corresponding
+        norms. 'L2phased' is like 'L2' but also normalizes the phases of the
+        messages, by default used for complex dtypes if phased normalization is
+        not already being used.
+    autoprune : bool, optional
+        Whether to remove regions with a counting number of zero.
+    optimize : str or PathOptimizer, optional
+        The path optimizer to use when building the contraction expressions.
+    contract_every : int, optional
+        If not None, 'contract' (via GBP) the tensor network every
+        ``contract_every`` iterations. The resulting values are stored in
+        ``zvals`` at corresponding points ``zval_its``.
+    inplace : bool, optional
+        Whether to perform any operations inplace on the input tensor network.
+    contract_opts
+        Other options supplied to ``cotengra.array_contract_expression``.
+
+    Attributes
+    ----------
+    rg : RegionGraph
+        The region graph, where each region is a frozenset of factor keys and
+        indices.
+    messages : dict[(frozenset, frozenset), array_like]
+        The current (damped) messages, keyed by ``(parent, child)``.
+    message_inds : dict[(frozenset, frozenset), tuple[str]]
+        The indices of each message.
+    """
+
+    def __init__(
+        self,
+        tn,
+        regions=None,
+        *,
+        messages=None,
+        damping=0.5,
+        update="parallel",
+        normalize=None,
+        distance=None,
+        autoprune=True,
+        optimize="auto-hq",
+        contract_every=None,
+        inplace=False,
+        **contract_opts,
+    ):
+        super().__init__(
+            tn,
+            damping=damping,
+            update=update,
+            normalize=normalize,
+            distance=distance,
+            contract_every=contract_every,
+            inplace=inplace,
+        )
+
+        if update != "parallel":
+            raise ValueError("Only parallel update supported.")
+
+        self.contract_opts = contract_opts
+        self.contract_opts.setdefault("optimize", optimize)
+
+        # factor key -> (inds, array), and tid -> factor keys
+        self.factors, self.tid_factors = self._get_factors()
+        self.size_dict = {
+            ix: d
+            for inds, data in self.factors.values()
+            for ix, d in zip(inds, ar.shape(data))
+        }
+
+        # regions are sets of factors plus all of their indices
+        region_factors = [
+            frozenset(key for tid in tids for key in self.tid_factors[tid])
+            for tids in _parse_gbp_regions(self.tn, regions)
+        ]
+        self.rg = RegionGraph(
+            (
+                rf.union(ix for key in rf for ix in self.factors[key][0])
+                for rf in region_factors
+            ),
+            autocomplete=True,
+            autoprune=autoprune,
+        )
+
+        self._build_messages(messages)
+        # belief expressions are only needed for contracting, build lazily
+        self.beliefs = None
+
+    def _get_factors(self):
+        """Get the factors to run GBP with, as a mapping of key to
+        ``(inds, array)``, and a mapping of tid to the keys of its factors.
+        """
+        factors = {}
+        tid_factors = {}
+        for tid, t in self.tn.tensor_map.items():
+            factors[tid] = (t.inds, t.data)
+            tid_factors[tid] = (tid,)
+        return factors, tid_factors
+
+    def _region_inds(self, region):
+        return frozenset(x for x in region if x not in self.factors)
+
+    def _build_messages(self, messages=None):
+        """Find the parts and indices of every message, and build cached
+        contraction expressions for them.
+        """
+        pairs = [
+            (parent, child)
+            for child in self.rg.regions
+            for parent in self.rg.get_parents(child)
+        ]
+        parts = {}
+        for pair in pairs:
+            rdiff, pairs_mul, pairs_div = self.rg.get_message_parts(pair)
+            fkeys = tuple(x for x in rdiff if x in self.factors)
+            parts[pair] = (fkeys, tuple(pairs_mul), tuple(pairs_div))
+
+        # the indices of each message are those of the target region which
+        # appear in any of its inputs, these can depend on other messages
+        minds = {}
+        for pair, (fkeys, _, _) in parts.items():
+            rinds = self._region_inds(pair[1])
+            minds[pair] = rinds.intersection(
+                ix for key in fkeys for ix in self.factors[key][0]
+            )
+        changed = True
+        while changed:
+            changed = False
+            for pair, (_, pairs_mul, pairs_div) in parts.items():
+                rinds = self._region_inds(pair[1])
+                new = minds[pair].union(
+                    rinds.intersection(
+                        ix for q in (*pairs_mul, *pairs_div) for ix in minds[q]
+                    )
+                )
+                if new != minds[pair]:
+                    minds[pair] = new
+                    changed = True
+
+        # messages with no indices are constant and can be dropped
+        self.message_inds = {
+            pair: tuple(sorted(inds)) for pair, inds in minds.items() if inds
+        }
+        self.parts = {}
+        self.exprs = {}
+        for pair, output in self.message_inds.items():
+            fkeys, pairs_mul, pairs_div = parts[pair]
+            pairs_mul = tuple(q for q in pairs_mul if q in self.message_inds)
+            pairs_div = tuple(q for q in pairs_div if q in self.message_inds)
+            self.parts[pair] = (fkeys, pairs_mul, pairs_div)
+
+            inputs = [self.factors[key][0] for key in fkeys]
+            inputs.extend(self.message_inds[q] for q in pairs_mul)
+            inputs.extend(self.message_inds[q] for q in pairs_div)
+            self.exprs[pair] = array_contract_expression(
+                inputs=inputs,
+                output=output,
+                shapes=[tuple(self.size_dict[ix] for ix in i) for i in inputs],
+                **self.contract_opts,
+            )
+
+        # messages into smaller regions first, since they can appear in the
+        # denominator of messages into larger regions
+        batches = {}
+        for pair in self.message_inds:
+            batches.setdefault(len(pair[1]), []).append(pair)
+        self.batches = tuple(tuple(batches[k]) for k in sorted(batches))
+
+        # initial messages
+        if messages is None:
+            messages = {}
+        self.messages = {}
+        for pair, inds in self.message_inds.items():
+            try:
+                self.messages[pair] = messages[pair]
+            except KeyError:
+                shape = tuple(self.size_dict[ix] for ix in inds)
+                m = ar.do("ones", shape, like=self.backend, dtype=self.dtype)
+                self.messages[pair] = self._normalize_fn(m)
+        # the latest undamped messages, used for division
+        self.new_messages = self.messages.copy()
+
+    def _build_beliefs(self):
+        """Build cached contraction expressions for the (unnormalized) belief
+        of every region, used to estimate the contraction.
+        """
+        self.beliefs = {}
+        for region in self.rg.regions:
+            fkeys = tuple(x for x in region if x in self.factors)
+            pairs = tuple(
+                q
+                for q in self.rg.get_coparent_pairs(region)
+                if q in self.message_inds
+            )
+            if not (fkeys or pairs):
+                continue
+            inputs = [self.factors[key][0] for key in fkeys]
+            inputs.extend(self.message_inds[q] for q in pairs)
+            expr = array_contract_expression(
+                inputs=inputs,
+                output=(),
+                shapes=[tuple(self.size_dict[ix] for ix in i) for i in inputs],
+                **self.contract_opts,
+            )
+            self.beliefs[region] = (fkeys, pairs, expr)
+
+    def iterate(self, tol=5e-6):
+        """Perform a single round of GBP message updates."""
+        inverses = {}
+
+        def _compute_m(pair):
+            fkeys, pairs_mul, pairs_div = self.parts[pair]
+            arrays = [self.factors[key][1] for key in fkeys]
+            arrays.extend(self.messages[q] for q in pairs_mul)
+            arrays.extend(inverses[q] for q in pairs_div)
+            m = self.exprs[pair](*arrays)
+            return self._normalize_fn(m)
+
+        for batch in self.batches:
+            # messages in the denominator use the latest undamped messages,
+            # from earlier batches this round or otherwise the previous round
+            inverses.clear()
+            for pair in batch:
+                for q in self.parts[pair][2]:
+                    if q not in inverses:
+                        inverses[q] = 1 / self.new_messages[q]
+
+            new_ms = self._map_maybe_parallel(_compute_m, batch)
+            self.new_messages.update(zip(batch, new_ms))
+
+        nconv = 0
+        max_mdiff = 0.0
+        for pair, new_m in self.new_messages.items():
+            old_m = self.messages[pair]
+            mdiff = self._distance_fn(old_m, new_m)
+            if mdiff <= tol:
+                nconv += 1
+            max_mdiff = max(max_mdiff, mdiff)
+            self.messages[pair] = self._damping_fn(old_m, new_m)
+
+        return {
+            "nconv": nconv,
+            "ncheck": len(self.new_messages),
+            "max_mdiff": max_mdiff,
+        }
+
+    def _contract_beliefs(self):
+        if self.beliefs is None:
+            self._build_beliefs()
+        zvals = []
+        for region, (fkeys, pairs, expr) in self.beliefs.items():
+            arrays = [self.factors[key][1] for key in fkeys]
+            arrays.extend(self.messages[q] for q in pairs)
+            zvals.append((expr(*arrays), self.rg.get_count(region)))
+        return zvals
+
+    def contract(self, strip_exponent=False, check_zero=True, **kwargs):
+        """Estimate the contraction of the tensor network, as the product of
+        every region belief raised to the power of its counting number.
+
+        Parameters
+        ----------
+        strip_exponent : bool, optional
+            Whether to return the mantissa and exponent separately.
+        check_zero : bool, optional
+            Whether to check for zero values and return zero early.
+
+        Returns
+        -------
+        scalar or (scalar, float)
+        """
+        return combine_local_contractions(
+            self._contract_beliefs(),
+            backend=self.backend,
+            strip_exponent=strip_exponent,
+            check_zero=check_zero,
+            mantissa=self.sign,
+            exponent=self.exponent,
+            **kwargs,
+        )
+
+
+class G2BP(G1BP):
+    """Generalized (as in messages between regions of a region graph) dense
+    2-norm (as in for wavefunctions and operators) belief propagation. This
+    runs :class:`G1BP` on the norm network ``tn.H @ tn``, where each site of
+    the ket is always grouped with the matching site of the bra, such that
+    messages are dense operators on the ket and bra bonds crossing into a
+    region. With plaquette regions this can give much more accurate norm
+    estimates than :class:`D2BP`, at the cost of messages of size ``D^4``.
+
+    Parameters
+    ----------
+    tn : TensorNetwork
+        The tensor network to form the 2-norm of and run GBP on.
+    regions : sequence[sequence[int | str]] or int, optional
+        The generating regions, each a sequence of tids or tags of ``tn``. If
+        ``None``, use the smallest generalized loops of ``tn``. If an integer,
+        use all generalized loops up to this size.
+    messages : dict[(frozenset, frozenset), array_like], optional
+        Initial messages to use, keyed by ``(parent, child)`` region pairs.
+    output_inds : set[str], optional
+        The indices to consider as output (dangling) indices of the tn, which
+        are traced between ket and bra. Computed automatically if not
+        specified.
+    damping : float or callable, optional
+        The damping factor to apply to messages.
+    update : {'parallel'}, optional
+        Only parallel (batched) updates are supported.
+    normalize : {'L1', 'L2', 'L2phased', 'Linf', callable}, optional
+        How to normalize messages after each update.
+    distance : {'L1', 'L2', 'L2phased', 'Linf', 'cosine', callable}, optional
+        How to compute the distance between messages to check for convergence.
+    autoprune : bool, optional
+        Whether to remove regions with a counting number of zero.
+    optimize : str or PathOptimizer, optional
+        The path optimizer to use when building the contraction expressions.
+    contract_every : int, optional
+        If not None, 'contract' (via GBP) the tensor network every
+        ``contract_every`` iterations.
+    inplace : bool, optional
+        Whether to perform any operations inplace on the input tensor network.
+    contract_opts
+        Other options supplied to ``cotengra.array_contract_expression``.
+    """
+
+    def __init__(
+        self,
+        tn,
+        regions=None,
+        *,
+        messages=None,
+        output_inds=None,
+        damping=0.5,
+        update="parallel",
+        normalize=None,
+        distance=None,
+        autoprune=True,
+        optimize="auto-hq",
+        contract_every=None,
+        inplace=False,
+        **contract_opts,
+    ):
+        if output_inds is None:
+            self.output_inds = set(tn.outer_inds())
+        else:
+            self.output_inds = set(output_inds)
+
+        super().__init__(
+            tn,
+            regions,
+            messages=messages,
+            damping=damping,
+            update=update,
+            normalize=normalize,
+            distance=distance,
+            autoprune=autoprune,
+            optimize=optimize,
+            contract_every=contract_every,
+            inplace=inplace,
+            **contract_opts,
+        )
+
+    def _get_factors(self):
+        # mangle all non-output indices of the bra
+        self.index_dual_map = {
+            ix: qtn.rand_uuid()
+            for ix in self.tn.ind_map
+            if ix not in self.output_inds
+        }
+        factors = {}
+        tid_factors = {}
+        for tid, t in self.tn.tensor_map.items():
+            kkey, bkey = (tid, "ket"), (tid, "bra")
+            factors[kkey] = (t.inds, t.data)
+            factors[bkey] = (
+                tuple(self.index_dual_map.get(ix, ix) for ix in t.inds),
+                ar.do("conj", t.data),
+            )
+            tid_factors[tid] = (kkey, bkey)
+        return factors, tid_factors
+
+    def contract(self, strip_exponent=False, check_zero=True, **kwargs):
+        """Estimate the norm squared of the tensor network, as the product of
+        every region belief raised to the power of its counting number.
+
+        Parameters
+        ----------
+        strip_exponent : bool, optional
+            Whether to return the mantissa and exponent separately.
+        check_zero : bool, optional
+            Whether to check for zero values and return zero early.
+
+        Returns
+        -------
+        scalar or (scalar, float)
+        """
+        return combine_local_contractions(
+            self._contract_beliefs(),
+            backend=self.backend,
+            strip_exponent=strip_exponent,
+            check_zero=check_zero,
+            mantissa=self.sign**2,
+            exponent=self.exponent * 2,
+            **kwargs,
+        )
+
+
+def contract_g1bp(
+    tn,
+    regions=None,
+    *,
+    messages=None,
+    max_iterations=1000,
+    tol=5e-6,
+    damping=0.5,
+    diis=False,
+    normalize=None,
+    distance=None,
+    tol_abs=None,
+    tol_rolling_diff=None,
+    optimize="auto-hq",
+    strip_exponent=False,
+    check_zero=True,
+    info=None,
+    progbar=False,
+    thread_pool=None,
+    **contract_opts,
+):
+    """Estimate the contraction of ``tn`` using generalized 1-norm belief
+    propagation on a region graph, see :class:`G1BP`.
+
+    Parameters
+    ----------
+    tn : TensorNetwork
+        The tensor network to estimate the contraction of.
+    regions : sequence[sequence[int | str]] or int, optional
+        The generating regions, each a sequence of tids or tags. If ``None``,
+        use the smallest generalized loops of ``tn``. If an integer, use all
+        generalized loops up to this size.
+    messages : dict[(frozenset, frozenset), array_like], optional
+        The initial messages to use, effectively defaults to all ones if not
+        specified.
+    max_iterations : int, optional
+        The maximum number of iterations to perform.
+    tol : float, optional
+        The convergence tolerance for messages.
+    damping : float, optional
+        The damping parameter to use.
+    diis : bool or dict, optional
+        Whether to use direct inversion in the iterative subspace to
+        help converge the messages by extrapolating to low error guesses.
+        If a dict, should contain options for the DIIS algorithm. The
+        relevant options are {`max_history`, `beta`, `rcond`}.
+    normalize : {'L1', 'L2', 'L2phased', 'Linf', callable}, optional
+        How to normalize messages after each update.
+    distance : {'L1', 'L2', 'L2phased', 'Linf', 'cosine', callable}, optional
+        How to compute the distance between messages to check for convergence.
+    tol_abs : float, optional
+        The absolute convergence tolerance for maximum message update
+        distance, if not given then taken as ``tol``.
+    tol_rolling_diff : float, optional
+        The rolling mean convergence tolerance for maximum message update
+        distance, if not given then taken as ``tol``.
+    optimize : str or PathOptimizer, optional
+        The path optimizer to use when contracting the messages.
+    strip_exponent : bool, optional
+        Whether to return the mantissa and exponent separately.
+    check_zero : bool, optional
+        Whether to check for zero values and return zero early.
+    info : dict, optional
+        If supplied, the following information will be added to it:
+        ``converged`` (bool), ``iterations`` (int), ``max_mdiff`` (float),
+        ``rolling_abs_mean_diff`` (float).
+    progbar : bool, optional
+        Whether to show a progress bar.
+    thread_pool : bool, int or ThreadPoolExecutor, optional
+        Whether to compute the messages of each batch concurrently using a
+        thread pool. If an integer, then use a pool with that many workers.
+    contract_opts
+        Other options supplied to ``cotengra.array_contract_expression``.
+
+    Returns
+    -------
+    scalar or (scalar, float)
+    """
+    bp = G1BP(
+        tn,
+        regions,
+        messages=messages,
+        damping=damping,
+        normalize=normalize,
+        distance=distance,
+        optimize=optimize,
+        **contract_opts,
+    )
+    bp.run(
+        max_iterations=max_iterations,
+        diis=diis,
+        tol=tol,
+        tol_abs=tol_abs,
+        tol_rolling_diff=tol_rolling_diff,
+        info=info,
+        progbar=progbar,
+        thread_pool=thread_pool,
+    )
+    return bp.contract(
+        strip_exponent=strip_exponent,
+        check_zero=check_zero,
+    )
+
+
+def contract_g2bp(
+    tn,
+    regions=None,
+    *,
+    messages=None,
+    output_inds=None,
+    max_iterations=1000,
+    tol=5e-6,
+    damping=0.5,
+    diis=False,
+    normalize=None,
+    distance=None,
+    tol_abs=None,
+    tol_rolling_diff=None,
+    optimize="auto-hq",
+    strip_exponent=False,
+    check_zero=True,
+    info=None,
+    progbar=False,
+    thread_pool=None,
+    **contract_opts,
+):
+    """Estimate the norm squared of ``tn`` using generalized dense 2-norm
+    belief propagation on a region graph, see :class:`G2BP`.
+
+    Parameters
+    ----------
+    tn : TensorNetwork
+        The tensor network to estimate the norm squared of.
+    regions : sequence[sequence[int | str]] or int, optional
+        The generating regions, each a sequence of tids or tags. If ``None``,
+        use the smallest generalized loops of ``tn``. If an integer, use all
+        generalized loops up to this size.
+    messages : dict[(frozenset, frozenset), array_like], optional
+        The initial messages to use, effectively defaults to all ones if not
+        specified.
+    output_inds : set[str], optional
+        The indices to consider as output (dangling) indices of the tn.
+        Computed automatically if not specified.
+    max_iterations : int, optional
+        The maximum number of iterations to perform.
+    tol : float, optional
+        The convergence tolerance for messages.
+    damping : float, optional
+        The damping parameter to use.
+    diis : bool or dict, optional
+        Whether to use direct inversion in the iterative subspace to
+        help converge the messages by extrapolating to low error guesses.
+        If a dict, should contain options for the DIIS algorithm. The
+        relevant options are {`max_history`, `beta`, `rcond`}.
+    normalize : {'L1', 'L2', 'L2phased', 'Linf', callable}, optional
+        How to normalize messages after each update.
+    distance : {'L1', 'L2', 'L2phased', 'Linf', 'cosine', callable}, optional
+        How to compute the distance between messages to check for convergence.
+    tol_abs : float, optional
+        The absolute convergence tolerance for maximum message update
+        distance, if not given then taken as ``tol``.
+    tol_rolling_diff : float, optional
+        The rolling mean convergence tolerance for maximum message update
+        distance, if not given then taken as ``tol``.
+    optimize : str or PathOptimizer, optional
+        The path optimizer to use when contracting the messages.
+    strip_exponent : bool, optional
+        Whether to return the mantissa and exponent separately.
+    check_zero : bool, optional
+        Whether to check for zero values and return zero early.
+    info : dict, optional
+        If supplied, the following information will be added to it:
+        ``converged`` (bool), ``iterations`` (int), ``max_mdiff`` (float),
+        ``rolling_abs_mean_diff`` (float).
+    progbar : bool, optional
+        Whether to show a progress bar.
+    thread_pool : bool, int or ThreadPoolExecutor, optional
+        Whether to compute the messages of each batch concurrently using a
+        thread pool. If an integer, then use a pool with that many workers.
+    contract_opts
+        Other options supplied to ``cotengra.array_contract_expression``.
+
+    Returns
+    -------
+    scalar or (scalar, float)
+    """
+    bp = G2BP(
+        tn,
+        regions,
+        messages=messages,
+        output_inds=output_inds,
+        damping=damping,
+        normalize=normalize,
+        distance=distance,
+        optimize=optimize,
+        **contract_opts,
+    )
+    bp.run(
+        max_iterations=max_iterations,
+        diis=diis,
+        tol=tol,
+        tol_abs=tol_abs,
+        tol_rolling_diff=tol_rolling_diff,
+        info=info,
+        progbar=progbar,
+        thread_pool=thread_pool,
+    )
+    return bp.contract(
+        strip_exponent=strip_exponent,
+        check_zero=check_zero,
+    )
@@ -25,12 +25,15 @@ class L1BP(BeliefPropagationCommon):
         of the old message into the new one, with the final message being
         ``damping * old + (1 - damping) * new``. This makes convergence more
         reliable but slower.
-    update : {'sequential', 'parallel'}, optional
+    update : {'sequential', 'parallel', 'residual'}, optional
         Whether to update messages sequentially (newly computed messages are
         immediately used for other updates in the same iteration round) or in
         parallel (all messages are comptued using messages from the previous
         round only). Sequential generally helps convergence but parallel can
-        possibly converge to differnt solutions.
+        possibly converge to differnt solutions. 'residual' is like
+        sequential but always updates the message that would change the most
+        next, which can require far fewer updates on slowly converging or
+        frustrated networks.
     normalize : {'L1', 'L2', 'L2phased', 'Linf', callable}, optional
         How to normalize messages after each update. If None choose
         automatically. If a callable, it should take a message and return the
@@ -210,6 +213,25 @@ class L1BP(BeliefPropagationCommon):
                 data = _compute_m(key)
                 _update_m(key, data)
 
+        elif self.update == "residual":
+            # update messages in order of how much they would change
+
+            def _residual(key, data):
+                return self._distance_fn(data, self.messages[key].data)
+
+            def _commit(key, data):
+                tm = self.messages[key]
+                tm.modify(data=self._damping_fn(tm.data, data))
+
+            return self._iterate_residual(
+                self.touched,
+                _compute_m,
+                _residual,
+                _commit,
+                self.touch_map.__getitem__,
+                tol,
+            )
+
         self.touched = new_touched
         return {
             "nconv": nconv,
@@ -305,8 +327,9 @@ def contract_l1bp(
         automatically.
     damping : float, optional
         The damping parameter to use, defaults to no damping.
-    update : {'parallel', 'sequential'}, optional
-        Whether to update all messages in parallel or sequentially.
+    update : {'parallel', 'sequential', 'residual'}, optional
+        Whether to update all messages in parallel, sequentially, or in order
+        of largest change first.
     local_convergence : bool, optional
         Whether to allow messages to locally converge - i.e. if all their
         input messages have converged then stop updating them.
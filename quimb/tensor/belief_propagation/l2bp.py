@@ -33,12 +33,15 @@ class L2BP(BeliefPropagationCommon):
         of the old message into the new one, with the final message being
         ``damping * old + (1 - damping) * new``. This makes convergence more
         reliable but slower.
-    update : {'sequential', 'parallel'}, optional
+    update : {'sequential', 'parallel', 'residual'}, optional
         Whether to update messages sequentially (newly computed messages are
         immediately used for other updates in the same iteration round) or in
         parallel (all messages are comptued using messages from the previous
         round only). Sequential generally helps convergence but parallel can
-        possibly converge to differnt solutions.
+        possibly converge to differnt solutions. 'residual' is like
+        sequential but always updates the message that would change the most
+        next, which can require far fewer updates on slowly converging or
+        frustrated networks.
     normalize : {'L1', 'L2', 'L2phased', 'Linf', callable}, optional
         How to normalize messages after each update. If None choose
         automatically. If a callable, it should take a message and return the
@@ -261,13 +264,13 @@ class L2BP(BeliefPropagationCommon):
             tm.modify(data=data)
 
         if self.update == "parallel":
-            new_data = {}
-            # compute all new messages
+            keys = []
             while self.touched:
-                key = self.touched.pop()
-                new_data[key] = _compute_m(key)
-            # insert all new messages
-            for key, data in new_data.items():
+                keys.append(self.touched.pop())
+            # compute all new messages, possibly concurrently
+            new_data = self._map_maybe_parallel(_compute_m, keys)
+            # insert all new messages, in a fixed order
+            for key, data in zip(keys, new_data):
                 _update_m(key, data)
 
         elif self.update == "sequential":
@@ -277,6 +280,25 @@ class L2BP(BeliefPropagationCommon):
                 data = _compute_m(key)
                 _update_m(key, data)
 
+        elif self.update == "residual":
+            # update messages in order of how much they would change
+
+            def _residual(key, data):
+                return self._distance_fn(data, self.messages[key].data)
+
+            def _commit(key, data):
+                tm = self.messages[key]
+                tm.modify(data=self._damping_fn(tm.data, data))
+
+            return self._iterate_residual(
+                self.touched,
+                _compute_m,
+                _residual,
+                _commit,
+                self.touch_map.__getitem__,
+                tol,
+            )
+
         self.touched = new_touched
 
         return {
@@ -470,6 +492,7 @@ def contract_l2bp(
     strip_exponent=False,
     info=None,
     progbar=False,
+    thread_pool=None,
     **contract_opts,
 ):
     """Estimate the norm squared of ``tn`` using lazy belief propagation.
@@ -482,8 +505,9 @@ def contract_l2bp(
         The tags identifying the sites in ``tn``, each tag forms a region.
     damping : float, optional
         The damping parameter to use, defaults to no damping.
-    update : {'parallel', 'sequential'}, optional
-        Whether to update all messages in parallel or sequentially.
+    update : {'parallel', 'sequential', 'residual'}, optional
+        Whether to update all messages in parallel, sequentially, or in order
+        of largest change first.
     local_convergence : bool, optional
         Whether to allow messages to locally converge - i.e. if all their
         input messages have converged then stop updating them.
@@ -501,6 +525,10 @@ def contract_l2bp(
         belief propagation run.
     progbar : bool, optional
         Whether to show a progress bar.
+    thread_pool : bool, int or ThreadPoolExecutor, optional
+        Whether to compute the messages of each round concurrently using a
+        thread pool, only relevant for ``update='parallel'``. If an integer,
+        then use a pool with that many workers.
     contract_opts
         Other options supplied to ``cotengra.array_contract``.
     """
@@ -518,6 +546,7 @@ def contract_l2bp(
         tol=tol,
         info=info,
         progbar=progbar,
+        thread_pool=thread_pool,
     )
     return bp.contract(strip_exponent=strip_exponent)
 
@@ -563,8 +592,9 @@ def compress_l2bp(
         automatically.
     damping : float, optional
         The damping parameter to use, defaults to no damping.
-    update : {'parallel', 'sequential'}, optional
-        Whether to update all messages in parallel or sequentially.
+    update : {'parallel', 'sequential', 'residual'}, optional
+        Whether to update all messages in parallel, sequentially, or in order
+        of largest change first.
     local_convergence : bool, optional
         Whether to allow messages to locally converge - i.e. if all their
         input messages have converged then stop updating them.
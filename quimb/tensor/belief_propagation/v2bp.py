@@ -0,0 +1,564 @@
+"""Simple (no hyper indices), vectorized, 2-norm, belief propagation."""
+
+import autoray as ar
+import numpy as np
+
+from quimb.tensor.contraction import array_contract, array_contract_path
+from quimb.utils import oset
+
+from .d2bp import D2BP
+
+
+def _get_batched_normalize_fn(normalize, normalize_fn, xp):
+    """Get a function that normalizes each message in a stack of messages,
+    with shape ``(batch, d, d)``, matching ``normalize``.
+    """
+    if callable(normalize):
+
+        def _normalize(bx):
+            return xp.stack([normalize_fn(x) for x in bx])
+
+    elif normalize == "L1":
+
+        def _normalize(bx):
+            return bx / xp.sum(xp.abs(bx), axis=(1, 2), keepdims=True)
+
+    elif normalize == "L2":
+
+        def _normalize(bx):
+            bxn = xp.sum(xp.abs(bx) ** 2, axis=(1, 2), keepdims=True) ** 0.5
+            return bx / bxn
+
+    elif normalize == "L2phased":
+
+        def _normalize(bx):
+            bxn = xp.sum(xp.abs(bx) ** 2, axis=(1, 2), keepdims=True) ** 0.5
+            sumx = xp.sum(bx, axis=(1, 2), keepdims=True)
+            # only phase messages with non-zero sum
+            iszero = xp.abs(sumx) == 0.0
+            sumx = xp.where(iszero, 1.0, sumx)
+            return bx / (bxn * sumx / xp.abs(sumx))
+
+    elif normalize == "Linf":
+
+        def _normalize(bx):
+            return bx / xp.max(xp.abs(bx), axis=(1, 2), keepdims=True)
+
+    else:
+        raise ValueError(f"Unrecognized normalize={normalize}")
+
+    return _normalize
+
+
+def _get_batched_distance_fn(distance, distance_fn, xp):
+    """Get a function that computes the distance between each pair of messages
+    in two stacks of messages, with shape ``(batch, d, d)``, matching
+    ``distance``.
+    """
+    if callable(distance):
+
+        def _distance(bx, by):
+            return np.array([distance_fn(x, y) for x, y in zip(bx, by)])
+
+    elif distance == "L1":
+
+        def _distance(bx, by):
+            return xp.sum(xp.abs(bx - by), axis=(1, 2))
+
+    elif distance == "L2":
+
+        def _distance(bx, by):
+            return xp.sum(xp.abs(bx - by) ** 2, axis=(1, 2)) ** 0.5
+
+    elif distance == "L2phased":
+
+        def _distance(bx, by):
+            bxn = xp.sum(xp.abs(bx) ** 2, axis=(1, 2), keepdims=True) ** 0.5
+            byn = xp.sum(xp.abs(by) ** 2, axis=(1, 2), keepdims=True) ** 0.5
+            # cosine similarity with phase
+            cs = xp.sum(xp.conj(bx) * by, axis=(1, 2), keepdims=True)
+            phase = cs / xp.abs(cs)
+            bxn = bx / bxn
+            byn = by / (byn * phase)
+            return xp.sum(xp.abs(bxn - byn) ** 2, axis=(1, 2)) ** 0.5
+
+    elif distance == "Linf":
+
+        def _distance(bx, by):
+            return xp.max(xp.abs(bx - by), axis=(1, 2))
+
+    elif distance == "cosine":
+
+        def _distance(bx, by):
+            bxn = xp.sum(xp.abs(bx) ** 2, axis=(1, 2)) ** 0.5
+            byn = xp.sum(xp.abs(by) ** 2, axis=(1, 2)) ** 0.5
+            cs = xp.abs(xp.sum(xp.conj(bx) * by, axis=(1, 2))) / (bxn * byn)
+            cs = xp.clip(cs, -1.0, 1.0)
+            return (2 - 2 * cs) ** 0.5
+
+    else:
+        raise ValueError(f"Unrecognized distance={distance}")
+
+    return _distance
+
+
+class V2BP(D2BP):
+    """Simple (no hyper indices), vectorized, 2-norm belief propagation. This
+    is the same algorithm as :class:`D2BP`, but the messages are kept in
+    stacks of matching shape, and the tensors are grouped into buckets of
+    matching shape and bond positions, such that each round of message updates
+    is performed with a single batched contraction per bucket and bond, rather
+    than one contraction per message. This is much faster when there are many
+    small tensors, e.g. for large PEPS norms. Only parallel updates are
+    supported, but local convergence is, with only the touched messages of
+    each bucket being recomputed.
+
+    All the other functionality of :class:`D2BP`, such as contraction,
+    compression and gauging, is inherited, with the messages being unstacked
+    into ``messages`` on access.
+
+    Parameters
+    ----------
+    tn : TensorNetwork
+        The tensor network to form the 2-norm of and run BP on.
+    messages : dict[(str, int), array_like], optional
+        The initial messages to use, effectively defaults to all ones if not
+        specified.
+    output_inds : set[str], optional
+        The indices to consider as output (dangling) indices of the tn.
+        Computed automatically if not specified.
+    optimize : str or PathOptimizer, optional
+        The path optimizer to use when finding the contraction path for each
+        batched message update, which is then reused.
+    damping : float or callable, optional
+        The damping factor to apply to messages. This simply mixes some part
+        of the old message into the new one, with the final message being
+        ``damping * old + (1 - damping) * new``. This makes convergence more
+        reliable but slower. If a callable, it is called on stacks of
+        messages.
+    update : {'parallel'}, optional
+        Only parallel updates are supported, all messages are computed using
+        messages from the previous round only.
+    normalize : {'L1', 'L2', 'L2phased', 'Linf', callable}, optional
+        How to normalize messages after each update. If None choose
+        automatically. If a callable, it is called on each message
+        individually.
+    distance : {'L1', 'L2', 'L2phased', 'Linf', 'cosine', callable}, optional
+        How to compute the distance between messages to check for convergence.
+        If None choose automatically. If a callable, it is called on each pair
+        of messages individually.
+    local_convergence : bool, optional
+        Whether to allow messages to locally converge - i.e. if all their
+        input messages have converged then stop updating them.
+    contract_every : int, optional
+        If not None, 'contract' (via BP) the tensor network every
+        ``contract_every`` iterations. The resulting values are stored in
+        ``zvals`` at corresponding points ``zval_its``.
+    inplace : bool, optional
+        Whether to perform any operations inplace on the input tensor network.
+    contract_opts
+        Other options supplied to ``cotengra.array_contract``.
+    """
+
+    # the stacks are built lazily, and until then the messages dict is used
+    _mstacks = None
+    _touched_mask = None
+
+    def __init__(
+        self,
+        tn,
+        *,
+        messages=None,
+        output_inds=None,
+        optimize="auto-hq",
+        damping=0.0,
+        update="parallel",
+        normalize=None,
+        distance=None,
+        local_convergence=True,
+        contract_every=None,
+        inplace=False,
+        **contract_opts,
+    ):
+        if update != "parallel":
+            raise ValueError("Only parallel update supported.")
+
+        if any(t.isfermionic() for t in tn):
+            raise ValueError("Fermionic tensor networks are not supported.")
+
+        self._buckets = None
+        self._bucket_data = None
+        super().__init__(
+            tn,
+            messages=messages,
+            output_inds=output_inds,
+            optimize=optimize,
+            damping=damping,
+            update=update,
+            normalize=normalize,
+            distance=distance,
+            local_convergence=local_convergence,
+            contract_every=contract_every,
+            inplace=inplace,
+            **contract_opts,
+        )
+
+    def _build_expr(self, inputs, output, shapes):
+        # messages are updated in batches, not individually
+        return None
+
+    def _unstack_messages(self):
+        """Unstack the current messages into the messages dict, which is then
+        authoritative since it might be modified externally.
+        """
+        if self._mstacks is None:
+            return
+        for key, shape, pos in zip(self._mkeys, self._mshape, self._mpos):
+            self._messages[key] = self._mstacks[shape][pos]
+        self._mstacks = None
+
+    @property
+    def messages(self):
+        self._unstack_messages()
+        return self._messages
+
+    @messages.setter
+    def messages(self, messages):
+        self._messages = messages
+        self._mstacks = None
+
+    def _stack_messages(self):
+        """Stack the current messages, grouped by shape."""
+        xp = self.tn.get_namespace()
+
+        if self._mstacks is not None:
+            return
+
+        groups = {}
+        for key in self._mkeys:
+            groups.setdefault(self._messages[key].shape, []).append(key)
+
+        self._mstacks = {
+            shape: xp.stack([self._messages[key] for key in keys])
+            for shape, keys in groups.items()
+        }
+
+    def _build_buckets(self):
+        """Group the tensors by shape and bond positions, and record for each
+        bucket and bond which messages are input and output.
+        """
+        self._mkeys = tuple(self.exprs)
+        self._mids = {key: i for i, key in enumerate(self._mkeys)}
+
+        # location of each message in the stacks
+        shapes = {}
+        mshape = []
+        mpos = []
+        for key in self._mkeys:
+            shape = self._messages[key].shape
+            mshape.append(shape)
+            mpos.append(shapes.setdefault(shape, [0])[0])
+            shapes[shape][0] += 1
+        self._mshape = tuple(mshape)
+        self._mpos = np.array(mpos)
+
+        buckets = {}
+        for tid, t in self.tn.tensor_map.items():
+            bond_axs = tuple(
+                ax
+                for ax, ix in enumerate(t.inds)
+                if ix not in self.output_inds
+            )
+            buckets.setdefault((t.shape, bond_axs), []).append(tid)
+
+        # map of which messages each message touches, for local convergence
+        touch_rows = []
+        touch_cols = []
+        for key, touched in self.touch_map.items():
+            i = self._mids[key]
+            for tkey in touched:
+                touch_rows.append(self._mids[tkey])
+                touch_cols.append(i)
+        self._touch_rows = np.array(touch_rows, dtype=int)
+        self._touch_cols = np.array(touch_cols, dtype=int)
+
+        self._buckets = []
+        for (shape, bond_axs), tids in buckets.items():
+            ndim = len(shape)
+            # ket indices are 0..ndim-1, bra bond indices ndim..2ndim-1,
+            # and the batch index is -1
+            kix = tuple(range(ndim))
+            bix = tuple(ax + ndim if ax in bond_axs else ax for ax in kix)
+
+            in_mids = {}
+            out_mids = {}
+            for ax in bond_axs:
+                in_mids[ax] = []
+                out_mids[ax] = []
+                for tid in tids:
+                    ix = self.tn.tensor_map[tid].inds[ax]
+                    (tidn,) = (x for x in self.tn.ind_map[ix] if x != tid)
+                    in_mids[ax].append(self._mids[ix, tid])
+                    out_mids[ax].append(self._mids[ix, tidn])
+                in_mids[ax] = np.array(in_mids[ax])
+                out_mids[ax] = np.array(out_mids[ax])
+
+            contractions = []
+            for ax_out in bond_axs:
+                axs_in = tuple(ax for ax in bond_axs if ax != ax_out)
+                inputs = (
+                    (-1, *kix),
+                    (-1, *bix),
+                    *((-1, bix[ax], kix[ax]) for ax in axs_in),
+                )
+                output = (-1, bix[ax_out], kix[ax_out])
+                shapes = (
+                    (len(tids), *shape),
+                    (len(tids), *shape),
+                    *((len(tids), shape[ax], shape[ax]) for ax in axs_in),
+                )
+                path = array_contract_path(
+                    inputs, output, shapes=shapes, **self.contract_opts
+                )
+                contractions.append((ax_out, axs_in, inputs, output, path))
+
+            self._buckets.append((tids, in_mids, out_mids, contractions))
+
+        self._bucket_data = None
+
+    def _maybe_stack_tensors(self):
+        """Stack the ket and bra tensors of each bucket, if they have changed
+        since last time.
+        """
+        xp = self.tn.get_namespace()
+
+        if self._bucket_data is not None and all(
+            self.tn.tensor_map[tid].data is x
+            for tid, x in self._bucket_data.items()
+        ):
+            return
+
+        self._bucket_data = {}
+        self._bucket_stacks = []
+        for tids, *_ in self._buckets:
+            xs = [self.tn.tensor_map[tid].data for tid in tids]
+            self._bucket_data.update(zip(tids, xs))
+            x = xp.stack(xs)
+            self._bucket_stacks.append((x, xp.conj(x)))
+
+    def _init_tid(self, tid):
+        super()._init_tid(tid)
+        # the structure might have changed -> rebuild lazily
+        self._buckets = None
+
+    def iterate(self, tol=5e-6):
+        """Perform a single round of vectorized dense 2-norm belief
+        propagation.
+        """
+        xp = self.tn.get_namespace()
+
+        if self._buckets is None:
+            # make sure the dict is authoritative before rebuilding
+            self._unstack_messages()
+            self._build_buckets()
+        self._stack_messages()
+        self._maybe_stack_tensors()
+
+        batched_normalize = _get_batched_normalize_fn(
+            self.normalize, self._normalize_fn, xp
+        )
+        batched_distance = _get_batched_distance_fn(
+            self.distance, self._distance_fn, xp
+        )
+
+        touched = np.zeros(len(self._mkeys), dtype=bool)
+        if self.local_convergence and self._touched_mask is not None:
+            touched |= self._touched_mask
+        for key in self.touched:
+            touched[self._mids[key]] = True
+        self.touched = oset()
+        if (not self.local_convergence) or (not touched.any()):
+            # assume if asked to iterate that we want to check all messages
+            touched[:] = True
+
+        stacks = self._mstacks
+        mshape = self._mshape
+        mpos = self._mpos
+
+        # compute all new messages from the current stacks
+        new = {}
+        for (tids, in_mids, out_mids, contractions), (x, xc) in zip(
+            self._buckets, self._bucket_stacks
+        ):
+            for ax_out, axs_in, inputs, output, path in contractions:
+                mids_out = out_mids[ax_out]
+                rows = np.flatnonzero(touched[mids_out])
+                if len(rows) == 0:
+                    continue
+                if len(rows) == len(mids_out):
+                    rows = slice(None)
+
+                arrays = [x[rows], xc[rows]]
+                for ax in axs_in:
+                    mids_in = in_mids[ax][rows]
+                    arrays.append(stacks[mshape[mids_in[0]]][mpos[mids_in]])
+
+                bm = array_contract(
+                    arrays, inputs, output, optimize=path, backend=self.backend
+                )
+                # for stability enforce hermiticity
+                bm = bm + xp.conj(xp.swapaxes(bm, 1, 2))
+                bm = batched_normalize(bm)
+
+                shape = mshape[mids_out[0]]
+                new.setdefault(shape, []).append((mids_out[rows], bm))
+
+        # then insert them into new stacks
+        ncheck = 0
+        nconv = 0
+        max_mdiff = -1.0
+        changed = np.zeros(len(self._mkeys), dtype=bool)
+        new_stacks = dict(stacks)
+        for shape, updates in new.items():
+            mids = np.concatenate([m for m, _ in updates])
+            bm = xp.concatenate([b for _, b in updates])
+            pos = mpos[mids]
+
+            old = stacks[shape][pos]
+            mdiffs = ar.to_numpy(batched_distance(old, bm))
+            if self.damping:
+                bm = self._damping_fn(old, bm)
+
+            stack = stacks[shape]
+            if ar.get_dtype_name(stack) != ar.get_dtype_name(bm):
+                # e.g. real messages becoming complex
+                stack = ar.astype(stack, ar.get_dtype_name(bm))
+            # insert via a gather rather than inplace assignment, so that
+            # immutable array backends such as jax are also supported
+            n = ar.shape(stack)[0]
+            idx = np.arange(n)
+            idx[pos] = n + np.arange(len(pos))
+            new_stacks[shape] = xp.concatenate([stack, bm])[idx]
+
+            is_changed = mdiffs > tol
+            changed[mids[is_changed]] = True
+            ncheck += len(mids)
+            nconv += len(mids) - int(is_changed.sum())
+            max_mdiff = max(max_mdiff, float(mdiffs.max()))
+
+        self._mstacks = new_stacks
+
+        # mark messages touching changed messages for the next round
+        self._touched_mask = np.zeros(len(self._mkeys), dtype=bool)
+        self._touched_mask[self._touch_rows[changed[self._touch_cols]]] = True
+
+        return {
+            "nconv": nconv,
+            "ncheck": ncheck,
+            "max_mdiff": max_mdiff,
+        }
+
+
+def contract_v2bp(
+    tn,
+    *,
+    messages=None,
+    output_inds=None,
+    max_iterations=1000,
+    tol=5e-6,
+    damping=0.0,
+    diis=False,
+    normalize=None,
+    distance=None,
+    tol_abs=None,
+    tol_rolling_diff=None,
+    local_convergence=True,
+    optimize="auto-hq",
+    strip_exponent=False,
+    check_zero=True,
+    info=None,
+    progbar=False,
+    **contract_opts,
+):
+    """Estimate the norm squared of ``tn`` using vectorized, dense 2-norm
+    belief propagation (no hyper indices), see :class:`V2BP`.
+
+    Parameters
+    ----------
+    tn : TensorNetwork
+        The tensor network to form the 2-norm of and run BP on.
+    messages : dict[(str, int), array_like], optional
+        The initial messages to use, effectively defaults to all ones if not
+        specified.
+    output_inds : set[str], optional
+        The indices to consider as output (dangling) indices of the tn.
+        Computed automatically if not specified.
+    max_iterations : int, optional
+        The maximum number of iterations to perform.
+    tol : float, optional
+        The convergence tolerance for messages.
+    damping : float, optional
+        The damping parameter to use, defaults to no damping.
+    diis : bool or dict, optional
+        Whether to use direct inversion in the iterative subspace to
+        help converge the messages by extrapolating to low error guesses.
+        If a dict, should contain options for the DIIS algorithm. The
+        relevant options are {`max_history`, `beta`, `rcond`}.
+    normalize : {'L1', 'L2', 'L2phased', 'Linf', callable}, optional
+        How to normalize messages after each update. If None choose
+        automatically.
+    distance : {'L1', 'L2', 'L2phased', 'Linf', 'cosine', callable}, optional
+        How to compute the distance between messages to check for convergence.
+        If None choose automatically.
+    tol_abs : float, optional
+        The absolute convergence tolerance for maximum message update
+        distance, if not given then taken as ``tol``.
+    tol_rolling_diff : float, optional
+        The rolling mean convergence tolerance for maximum message update
+        distance, if not given then taken as ``tol``.
+    local_convergence : bool, optional
+        Whether to allow messages to locally converge - i.e. if all their
+        input messages have converged then stop updating them.
+    optimize : str or PathOptimizer, optional
+        The path optimizer to use when contracting the messages.
+    strip_exponent : bool, optional
+        Whether to return the mantissa and exponent separately.
+    check_zero : bool, optional
+        Whether to check for zero values and return zero early.
+    info : dict, optional
+        If supplied, the following information will be added to it:
+        ``converged`` (bool), ``iterations`` (int), ``max_mdiff`` (float),
+        ``rolling_abs_mean_diff`` (float).
+    progbar : bool, optional
+        Whether to show a progress bar.
+    contract_opts
+        Other options supplied to ``cotengra.array_contract``.
+
+    Returns
+    -------
+    scalar or (scalar, float)
+    """
+    bp = V2BP(
+        tn,
+        messages=messages,
+        output_inds=output_inds,
+        optimize=optimize,
+        local_convergence=local_convergence,
+        damping=damping,
+        normalize=normalize,
+        distance=distance,
+        **contract_opts,
+    )
+    bp.run(
+        max_iterations=max_iterations,
+        diis=diis,
+        tol=tol,
+        tol_abs=tol_abs,
+        tol_rolling_diff=tol_rolling_diff,
+        info=info,
+        progbar=progbar,
+    )
+    return bp.contract(
+        strip_exponent=strip_exponent,
+        check_zero=check_zero,
+    )
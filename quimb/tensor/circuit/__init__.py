@@ -22,7 +22,9 @@ from .gates import (
     SPECIAL_GATES,
     TWO_QUBIT_GATES,
     TWO_QUBIT_PARAM_GATES,
+    Channel,
     Gate,
+    amplitude_damping_channel,
     apply_controlled_gate,
     apply_swap,
     build_controlled_gate_htn,
@@ -32,8 +34,11 @@ from .gates import (
     cu1_param_gen,
     cu2_param_gen,
     cu3_param_gen,
+    dephasing_channel,
+    depolarizing_channel,
     fsim_param_gen,
     fsimg_param_gen,
+    fuse_gates,
     givens2_param_gen,
     givens_param_gen,
     parse_to_gate,
@@ -60,6 +65,13 @@ from .mps import (
     CircuitMPS,
     CircuitMPSLazy,
     CircuitPermMPS,
+    calc_mps_qubit_ordering,
+    count_mps_swaps,
+)
+from .noise import (
+    CircuitDensityMatrix,
+    CircuitDensityMatrixMPS,
+    CircuitTrajectories,
 )
 from .pepo import (
     CircuitPEPOSimpleUpdate,
@@ -72,26 +84,40 @@ from .qasm import (
     get_openqasm3_regexes,
     multi_replace,
     parse_openqasm2_file,
+    parse_openqasm2_iter,
     parse_openqasm2_str,
     parse_openqasm2_url,
     parse_openqasm3_file,
+    parse_openqasm3_iter,
     parse_openqasm3_str,
     parse_openqasm3_url,
     parse_qsim_file,
+    parse_qsim_iter,
     parse_qsim_str,
     parse_qsim_url,
     to_clean_list,
 )
+from .statevector import (
+    CircuitStatevector,
+    apply_gate_statevector,
+    expec_statevector,
+    sample_statevector,
+)
 
 # pin canonical module path (pickle + Sphinx xref stability)
 for _cls in (
+    Channel,
     Circuit,
     CircuitDense,
+    CircuitDensityMatrix,
+    CircuitDensityMatrixMPS,
     CircuitMPS,
     CircuitMPSLazy,
     CircuitPEPOSimpleUpdate,
     CircuitPEPSSimpleUpdate,
     CircuitPermMPS,
+    CircuitStatevector,
+    CircuitTrajectories,
     Gate,
 ):
     _cls.__module__ = "quimb.tensor.circuit"
@@ -100,25 +126,38 @@ del _cls
 __all__ = (
     "ALL_GATES",
     "ALL_PARAM_GATES",
+    "amplitude_damping_channel",
     "apply_controlled_gate",
+    "apply_gate_statevector",
     "apply_swap",
     "build_controlled_gate_htn",
+    "calc_mps_qubit_ordering",
+    "Channel",
     "Circuit",
     "CircuitDense",
+    "CircuitDensityMatrix",
+    "CircuitDensityMatrixMPS",
     "CircuitMPS",
     "CircuitMPSLazy",
     "CircuitPEPOSimpleUpdate",
     "CircuitPEPSSimpleUpdate",
     "CircuitPermMPS",
+    "CircuitStatevector",
+    "CircuitTrajectories",
     "CONSTANT_GATES",
+    "count_mps_swaps",
     "crx_param_gen",
     "cry_param_gen",
     "crz_param_gen",
     "cu1_param_gen",
     "cu2_param_gen",
     "cu3_param_gen",
+    "dephasing_channel",
+    "depolarizing_channel",
+    "expec_statevector",
     "fsim_param_gen",
     "fsimg_param_gen",
+    "fuse_gates",
     "GATE_SIZE",
     "GATE_TAGS",
     "Gate",
@@ -131,12 +170,15 @@ __all__ = (
     "ONE_QUBIT_PARAM_GATES",
     "PARAM_GATES",
     "parse_openqasm2_file",
+    "parse_openqasm2_iter",
     "parse_openqasm2_str",
     "parse_openqasm2_url",
     "parse_openqasm3_file",
+    "parse_openqasm3_iter",
     "parse_openqasm3_str",
     "parse_openqasm3_url",
     "parse_qsim_file",
+    "parse_qsim_iter",
     "parse_qsim_str",
     "parse_qsim_url",
     "parse_to_gate",
@@ -152,6 +194,7 @@ __all__ = (
     "rz_gate_param_gen",
     "rzz_param_gen",
     "sample_bitstring_from_prob_ndarray",
+    "sample_statevector",
     "SPECIAL_GATES",
     "su4_gate_param_gen",
     "to_clean_list",
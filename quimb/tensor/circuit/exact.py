@@ -1,12 +1,18 @@
 """Exact tensor-network circuit simulators (``Circuit``, ``CircuitDense``)."""
 
+import collections
 import collections.abc
+import concurrent.futures
 import copy
 import functools
+import hashlib
 import itertools
 import numbers
 import operator
+import os
+import pickle
 import re
+import threading
 import warnings
 
 import numpy as np
@@ -28,6 +34,12 @@ from ...utils import (
 )
 from ...utils import progbar as _progbar
 from .. import array_ops as ops
+from ..contraction import (
+    array_contract,
+    array_contract_tree,
+    get_symbol,
+    maybe_get_cached_tree,
+)
 from ..tensor_builder import (
     TN_from_sites_computational_state,
 )
@@ -39,13 +51,17 @@ from ..tensor_core import (
     oset_union,
     rand_uuid,
     tags_to_oset,
+    tensor_network_contract_batched,
 )
 from ..tn1d.core import Dense1D
 from ..tnag.core import TensorNetworkGenOperator
 from .gates import (
     SPECIAL_GATES,
+    Channel,
     Gate,
+    _parse_fuse_opts,
     apply_controlled_gate,
+    fuse_gates,
     parse_to_gate,
     rehearsal_dict,
     sample_bitstring_from_prob_ndarray,
@@ -54,441 +70,387 @@ from .qasm import (
     _is_interface_placeholder,
     _openqasm_eval_expr,
     _placeholder_param_vector,
-    parse_openqasm2_file,
+    _scan_num_qubits_file,
+    parse_openqasm2_iter,
     parse_openqasm2_str,
     parse_openqasm2_url,
+    parse_openqasm3_iter,
     parse_openqasm3_str,
-    parse_qsim_file,
+    parse_qsim_iter,
     parse_qsim_str,
     parse_qsim_url,
 )
 
-# --------------------------- main circuit class ---------------------------- #
+# ----------------------------- sampling helpers ---------------------------- #
 
 
-class Circuit:
-    """Class for simulating quantum circuits using tensor networks. The class
-    keeps a list of :class:`Gate` objects in sync with a tensor network
-    representing the current state of the circuit.
+class _MarginalTrieNode:
+    __slots__ = ("parent", "step", "children", "marginals")
 
-    Parameters
-    ----------
-    N : int, optional
-        The number of qubits.
-    psi0 : TensorNetwork1DVector, optional
-        The initial state, assumed to be ``|00000....0>`` if not given. The
-        state is always copied and the tag ``PSI0`` added.
-    gate_opts : dict_like, optional
-        Default keyword arguments to supply to each
-        :func:`~quimb.tensor.tn1d.core.gate_TN_1D` call during the circuit.
-    gate_contract : str, optional
-        Shortcut for setting the default `'contract'` option in `gate_opts`.
-    gate_propagate_tags : str, optional
-        Shortcut for setting the default `'propagate_tags'` option in
-        `gate_opts`.
-    tags : str or sequence of str, optional
-        Tag(s) to add to the initial wavefunction tensors (whether these are
-        propagated to the rest of the circuit's tensors depends on
-        ``gate_opts``).
-    psi0_dtype : str, optional
-        Ensure the initial state has this dtype.
-    psi0_tag : str, optional
-        Ensure the initial state has this tag.
-    tag_gate_numbers : bool, optional
-        Whether to tag each gate tensor with its number in the circuit, like
-        ``"GATE_{g}"``. This is required for updating the circuit parameters.
-    gate_tag_id : str, optional
-        The format string for tagging each gate tensor, by default e.g.
-        ``"GATE_{g}"``.
-    tag_gate_rounds : bool, optional
-        Whether to tag each gate tensor with its number in the circuit, like
-        ``"ROUND_{r}"``.
-    round_tag_id : str, optional
-        The format string for tagging each round of gates, by default e.g.
-        ``"ROUND_{r}"``.
-    tag_gate_labels : bool, optional
-        Whether to tag each gate tensor with its gate type label, e.g.
-        ``{"X_1/2", "ISWAP", "CCX", ...}``..
-    bra_site_ind_id : str, optional
-        Use this to label 'bra' site indices when creating certain (mostly
-        internal) intermediate tensor networks.
-    dtype : str, optional
-        A default dtype to perform calculations in. Depending on
-        `convert_eager`, this is enforced *after* circuit construction
-        and simplification (the default for exact simulation), or eagerly to
-        the initial state and as gates are applied (the default for MPS
-        simulation).
-    to_backend : callable, optional
-        If given, apply this function to both the initial state arrays and to
-        every gate as it is applied.
-    convert_eager : bool, optional
-        Whether to eagerly perform dtype casting and application of
-        `to_backend` as gates are supplied, or wait until after the necessary
-        TNs for a particular task such as sampling are formed and simplified.
-        Deferred conversion (`convert_eager=False`) is the default mode for
-        full contraction.
+    def __init__(self, parent=None, step=None):
+        self.parent = parent
+        self.step = step
+        self.children = {}
+        self.marginals = {}
 
-    Attributes
+
+class _MarginalTrie:
+    """A trie of the conditional marginal distributions computed while
+    sampling a circuit. Each node corresponds to a prefix of measurement
+    outcomes, reached via steps ``(where, bitstring)``, and stores the
+    distributions ``p(where | prefix)`` of the next qubit group(s). Samples
+    sharing a prefix thus share all marginals along it, and the total memory
+    is bounded by evicting the least recently used marginals, by bytes.
+
+    Parameters
     ----------
-    psi : TensorNetwork1DVector
-        The current circuit wavefunction as a tensor network.
-    uni : TensorNetwork1DOperator
-        The current circuit unitary operator as a tensor network.
-    gates : tuple[Gate]
-        The gates in the circuit.
+    max_bytes : int, optional
+        The maximum total number of bytes of marginals to keep.
+    """
 
-    Examples
-    --------
+    def __init__(self, max_bytes=2**23):
+        self.root = _MarginalTrieNode()
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        # (node, where) -> marginal, ordered from least recently used
+        self._lru = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._lru)
+
+    def num_nodes(self):
+        """Get the number of nodes in the trie, including the root."""
+        n = 0
+        queue = [self.root]
+        while queue:
+            node = queue.pop()
+            n += 1
+            queue.extend(node.children.values())
+        return n
+
+    def child(self, node, step):
+        """Get the child of ``node`` reached by ``step``, which should be
+        ``(where, bitstring)``, creating it if necessary.
+        """
+        try:
+            return node.children[step]
+        except KeyError:
+            new = node.children[step] = _MarginalTrieNode(node, step)
+            return new
+
+    def node_at(self, path):
+        """Get the node at the end of the sequence of steps ``path``."""
+        node = self.root
+        for step in path:
+            node = self.child(node, step)
+        return node
+
+    def path(self, node):
+        """Get the sequence of steps from the root to ``node``."""
+        steps = []
+        while node.parent is not None:
+            steps.append(node.step)
+            node = node.parent
+        return tuple(reversed(steps))
+
+    def get(self, node, where):
+        """Get the marginal of ``where`` conditioned on the prefix of ``node``
+        if it is cached, else ``None``.
+        """
+        p = node.marginals.get(where, None)
+        if p is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._lru.move_to_end((node, where))
+        return p
 
-    Create 3-qubit GHZ-state:
+    def put(self, node, where, p):
+        """Cache the marginal ``p`` of ``where`` at ``node``, then evict the
+        least recently used marginals until within ``max_bytes``.
+        """
+        if where in node.marginals:
+            return
+        if p.nbytes > self.max_bytes:
+            # too large to ever store, don't keep the node around either
+            self.prune(node)
+            return
+        node.marginals[where] = p
+        self._lru[node, where] = p
+        self.nbytes += p.nbytes
+        self.evict()
+
+    def evict(self):
+        """Evict least recently used marginals until within ``max_bytes``,
+        pruning any nodes left empty.
+        """
+        while self.nbytes > self.max_bytes:
+            (node, where), p = self._lru.popitem(last=False)
+            del node.marginals[where]
+            self.nbytes -= p.nbytes
+            self.prune(node)
+
+    def prune(self, node):
+        """Remove ``node``, and then any ancestors, while they hold no
+        marginals and have no children.
+        """
+        while (
+            (node.parent is not None)
+            and (not node.children)
+            and (not node.marginals)
+        ):
+            del node.parent.children[node.step]
+            node = node.parent
+
+    def items(self):
+        """Iterate over ``((where, path), p)`` for every cached marginal."""
+        for node, where in self._lru:
+            yield (where, self.path(node)), node.marginals[where]
 
-        >>> qc = qtn.Circuit(3)
-        >>> gates = [
-                ('H', 0),
-                ('H', 1),
-                ('CNOT', 1, 2),
-                ('CNOT', 0, 2),
-                ('H', 0),
-                ('H', 1),
-                ('H', 2),
-            ]
-        >>> qc.apply_gates(gates)
-        >>> qc.psi
-        <TensorNetwork1DVector(tensors=12, indices=14, L=3, max_bond=2)>
+    def copy(self):
+        new = self.__class__(self.max_bytes)
+        for (where, path), p in self.items():
+            new.put(new.node_at(path), where, p)
+        return new
 
-        >>> qc.psi.to_dense().round(4)
-        qarray([[ 0.7071+0.j],
-                [ 0.    +0.j],
-                [ 0.    +0.j],
-                [-0.    +0.j],
-                [-0.    +0.j],
-                [ 0.    +0.j],
-                [ 0.    +0.j],
-                [ 0.7071+0.j]])
+    def clear(self):
+        self.root = _MarginalTrieNode()
+        self.nbytes = 0
+        self._lru.clear()
 
-        >>> for b in qc.sample(10):
-        ...     print(b)
-        000
-        000
-        111
-        000
-        111
-        111
-        000
-        111
-        000
-        000
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(size={len(self)}, "
+            f"nbytes={self.nbytes}, max_bytes={self.max_bytes}, "
+            f"hits={self.hits}, misses={self.misses})"
+        )
 
-    See Also
-    --------
-    Gate
-    """
 
-    def __init__(
-        self,
-        N=None,
-        psi0=None,
-        gate_opts=None,
-        gate_contract="auto-split-gate",
-        gate_propagate_tags="register",
-        tags=None,
-        psi0_dtype="complex128",
-        psi0_tag="PSI0",
-        tag_gate_numbers=True,
-        gate_tag_id="GATE_{}",
-        tag_gate_rounds=True,
-        round_tag_id="ROUND_{}",
-        tag_gate_labels=True,
-        bra_site_ind_id="b{}",
-        dtype=None,
-        to_backend=None,
-        convert_eager=False,
-    ):
-        if (N is None) and (psi0 is None):
-            raise ValueError("You must supply one of `N` or `psi0`.")
+class _SampleStore:
+    """A directory, shared between processes, that caches the simplified
+    lightcone tensor networks and the conditional marginal distributions
+    computed by :meth:`Circuit.sample`. Tensor networks are saved in the
+    native memory-mappable format (see :mod:`quimb.tensor.storage`), so that
+    workers on the same node share their data through the page cache, and all
+    files are written atomically.
 
-        elif psi0 is None:
-            self.N = N
-            self._psi = self._init_state(N, dtype=psi0_dtype)
+    Parameters
+    ----------
+    directory : str or path-like
+        The directory to store everything in, created if needed.
+    key : str, optional
+        Identifies the circuit and the options affecting its marginals, see
+        :meth:`Circuit._get_sample_store_key`. If given, everything is stored
+        in a subdirectory named by it, so that different circuits can safely
+        share the same ``directory``.
+    """
 
-        elif N is None:
-            self._psi = psi0.copy()
-            self.N = psi0.nsites
+    def __init__(self, directory, key=None):
+        self.directory = os.fspath(directory)
+        if key is not None:
+            self.directory = os.path.join(self.directory, key)
+        for sub in ("tns", "marginals"):
+            os.makedirs(os.path.join(self.directory, sub), exist_ok=True)
 
-        else:
-            if N != psi0.nsites:
-                raise ValueError("`N` doesn't match `psi0`.")
-            self.N = N
-            self._psi = psi0.copy()
+    def _path(self, sub, key):
+        name = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, sub, name)
 
-        self._psi.add_tag(psi0_tag)
+    def save_tns(self, storage):
+        """Save the dict ``storage`` of tensor networks, and an index of it."""
+        from ..storage import save_tensor_network
 
-        if tags is not None:
-            if isinstance(tags, str):
-                tags = (tags,)
-            for tag in tags:
-                self._psi.add_tag(tag)
+        for key, tn in storage.items():
+            save_tensor_network(tn, self._path("tns", key))
 
-        self.tag_gate_numbers = tag_gate_numbers
-        self.tag_gate_rounds = tag_gate_rounds
-        self.tag_gate_labels = tag_gate_labels
+        tmp = os.path.join(self.directory, f"index.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(tuple(storage), f)
+        os.replace(tmp, os.path.join(self.directory, "index.pkl"))
 
-        self.dtype = dtype
-        self.to_backend = to_backend
-        self.convert_eager = convert_eager
-        if self.convert_eager:
-            self._maybe_convert(self._psi)
-        self._backend_gate_cache = {}
+    def load_tns(self):
+        """Load all the saved tensor networks, memory mapped."""
+        from ..storage import load_tensor_network
 
-        self.gate_opts = ensure_dict(gate_opts)
-        self.gate_opts.setdefault("contract", gate_contract)
-        self.gate_opts.setdefault("propagate_tags", gate_propagate_tags)
-        self._gates = []
+        try:
+            with open(os.path.join(self.directory, "index.pkl"), "rb") as f:
+                keys = pickle.load(f)
+        except FileNotFoundError:
+            return {}
 
-        self._ket_site_ind_id = self._psi.site_ind_id
-        self._bra_site_ind_id = bra_site_ind_id
-        self._gate_tag_id = gate_tag_id
-        self._round_tag_id = round_tag_id
+        return {
+            key: load_tensor_network(self._path("tns", key)) for key in keys
+        }
 
-        if self._ket_site_ind_id == self._bra_site_ind_id:
-            raise ValueError(
-                "The 'ket' and 'bra' site ind ids clash : '{}' and '{}".format(
-                    self._ket_site_ind_id, self._bra_site_ind_id
-                )
-            )
+    def save_marginal(self, key, p):
+        """Save the marginal distribution ``p`` under ``key``."""
+        path = self._path("marginals", key)
+        # unique per process and thread, then atomically move into place
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, p)
+        os.replace(tmp, path)
+
+    def load_marginal(self, key):
+        """Load the marginal distribution under ``key``, if any worker has
+        computed it yet, else return ``None``.
+        """
+        try:
+            with open(self._path("marginals", key), "rb") as f:
+                return np.load(f)
+        except FileNotFoundError:
+            return None
 
-        self._sample_n_gates = -1
-        self._storage = dict()
-        self._sampled_conditionals = dict()
-        self._named_params = {}
-        self._named_param_exprs = {}
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.directory!r})"
 
-    def copy(self):
-        """Copy the circuit and its state."""
-        new = object.__new__(self.__class__)
-        new.N = self.N
-        new._psi = self._psi.copy()
-        new.gate_opts = tree_map(lambda x: x, self.gate_opts)
-        new.tag_gate_numbers = self.tag_gate_numbers
-        new.tag_gate_rounds = self.tag_gate_rounds
-        new.tag_gate_labels = self.tag_gate_labels
-        new.to_backend = self.to_backend
-        new.dtype = self.dtype
-        new.convert_eager = self.convert_eager
-        new._backend_gate_cache = self._backend_gate_cache
-        new._gates = self._gates.copy()
-        new._ket_site_ind_id = self._ket_site_ind_id
-        new._bra_site_ind_id = self._bra_site_ind_id
-        new._gate_tag_id = self._gate_tag_id
-        new._round_tag_id = self._round_tag_id
-        new._sample_n_gates = self._sample_n_gates
-        new._storage = self._storage.copy()
-        new._sampled_conditionals = self._sampled_conditionals.copy()
-        new._named_params = copy.copy(self._named_params)
-        new._named_param_exprs = copy.copy(self._named_param_exprs)
-        return new
 
-    def _maybe_convert(self, obj, dtype=None):
-        istn = isinstance(obj, TensorNetwork)
+class _SliceAccumulator:
+    """A running sum over the slices of a contraction, which if ``path`` is
+    given is saved there (atomically) after every update, along with the
+    contraction tree, so that an interrupted contraction can be resumed,
+    skipping the slices already done.
 
-        if dtype is None:
-            # use default dtype
-            dtype = self.dtype
+    Parameters
+    ----------
+    path : str or path-like, optional
+        The file to save the accumulator in, and resume from if it exists.
+    key : hashable, optional
+        Identifies the contraction, resuming from a file with a different
+        key raises an error.
+    """
 
-        if dtype is not None:
-            # cast array or TN to dtype
-            if istn:
-                obj.astype_(dtype)
-            else:
-                if get_dtype_name(obj) != dtype:
-                    obj = astype(obj, dtype)
+    def __init__(self, path=None, key=None):
+        self.path = None if path is None else os.fspath(path)
+        self.key = key
+        self.tree = None
+        self.done = set()
+        self.total = 0.0
 
-        if self.to_backend is not None:
-            # once dtype is enforced, apply to_backend
-            # for e.g. gpu transfer etc
-            if istn:
-                obj.apply_to_arrays(self.to_backend)
+        if self.path is not None:
+            try:
+                with open(self.path, "rb") as f:
+                    key, self.tree, self.done, self.total = pickle.load(f)
+            except FileNotFoundError:
+                pass
             else:
-                obj = self.to_backend(obj)
+                if key != self.key:
+                    raise ValueError(
+                        f"The checkpoint {self.path} is for a different "
+                        "contraction."
+                    )
 
-        return obj
+    def add(self, ids, x):
+        """Add the sum ``x`` of the slices ``ids`` and save."""
+        self.total = self.total + x
+        self.done.update(ids)
+        self.save()
 
-    def apply_to_arrays(self, fn):
-        """Apply a function to all the arrays in the circuit."""
-        self._psi.apply_to_arrays(fn)
-        self._named_params = tree_map(fn, self._named_params)
+    def save(self):
+        if self.path is None:
+            return
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump((self.key, self.tree, self.done, self.total), f)
+        os.replace(tmp, self.path)
 
-    @staticmethod
-    def _normalize_named_param_value(value):
-        if _is_interface_placeholder(value):
-            return value
-        if isinstance(value, numbers.Number):
-            return ops.asarray(value)
-        return value
-
-    @property
-    def named_params(self):
-        """Named circuit parameters and their current values."""
-        return copy.copy(self._named_params)
-
-    @property
-    def named_param_names(self):
-        """Names of registered circuit parameters."""
-        return tuple(self._named_params)
-
-    @property
-    def param_expressions(self):
-        """Gate parameter expressions keyed by gate index."""
-        return copy.copy(self._named_param_exprs)
-
-    def register_named_params(self, named_params, gate_expressions=None):
-        """Register named circuit parameters and gate dependencies.
-
-        Parameters
-        ----------
-        named_params : sequence[str] or mapping[str, scalar]
-            Either names to register, which default to ``nan`` until bound,
-            or a mapping supplying initial values.
-        gate_expressions : mapping[int, tuple], optional
-            Mapping from gate index to the expressions used to generate that
-            gate's parameters. Each expression can be a constant, a string
-            expression referencing the named parameters, or a callable taking
-            the current named parameter mapping.
-        """
-        if isinstance(named_params, collections.abc.Mapping):
-            self._named_params = {
-                name: self._normalize_named_param_value(value)
-                for name, value in named_params.items()
-            }
-        else:
-            self._named_params = {
-                name: self._normalize_named_param_value(float("nan"))
-                for name in tuple(named_params)
-            }
-
-        if gate_expressions is None:
-            gate_expressions = {}
-
-        normalized_gate_expressions = {}
-        for i, exprs in gate_expressions.items():
-            i = int(i)
-            exprs = tuple(exprs)
-
-            if not (0 <= int(i) < len(self._gates)):
-                raise ValueError(
-                    "Named parameter expressions reference unknown gate "
-                    f"index: {i}"
-                )
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(path={self.path!r}, "
+            f"num_done={len(self.done)})"
+        )
 
-            gate = self._gates[i]
-            if not gate.parametrize:
-                raise ValueError(
-                    "Named parameter expressions require parametrized gate "
-                    f"indices, got non-parametrized gate: {i}"
-                )
 
-            if len(exprs) != len(gate.params):
-                raise ValueError(
-                    "Named parameter expression arity does not match gate "
-                    f"{i}: expected {len(gate.params)}, got {len(exprs)}"
-                )
+def _sample_shard(circ, C, seed, store, sample_opts):
+    """Draw ``C`` samples from ``circ`` in a worker, returning them along with
+    any new conditional marginals computed, to be merged back by the parent.
+    """
+    if store is not None:
+        circ._storage.update(store.load_tns())
+
+    keys_before = {key for key, _ in circ._marginal_trie.items()}
+    bitstrings = list(circ.sample(C, seed=seed, store=store, **sample_opts))
+    new = {
+        key: p
+        for key, p in circ._marginal_trie.items()
+        if key not in keys_before
+    }
+    return bitstrings, new
+
+
+def _contract_slices(tree, arrays, ids, backend=None):
+    """Contract and sum the slices ``ids`` of ``tree``, in a worker."""
+    return functools.reduce(
+        operator.add,
+        (tree.contract_slice(arrays, i, backend=backend) for i in ids),
+    )
 
-            normalized_gate_expressions[i] = exprs
 
-        self._named_param_exprs = normalized_gate_expressions
-        self._apply_named_param_updates()
-        self.clear_storage()
+def _full_simplify_preserving_params_(
+    tn, output_inds, tids=None, **simplify_opts
+):
+    """Simplify ``tn`` inplace, but leave any parametrized tensors (or those
+    in ``tids`` if given), and the indices they are attached to, untouched.
+    The result has the same structure whatever the parameters, so new
+    parameters can be injected into it directly, with the preserved tensors
+    placed last.
+    """
+    if tids is None:
+        ptids = [
+            tid for tid, t in tn.tensor_map.items() if isinstance(t, PTensor)
+        ]
+    else:
+        ptids = list(tids)
+    pts = [tn.pop_tensor(tid) for tid in ptids]
+    output_inds = tuple(
+        ix
+        for ix in oset_union((output_inds, *(t.inds for t in pts)))
+        if ix in tn.ind_map
+    )
+    tn.full_simplify_(output_inds=output_inds, **simplify_opts)
+    for t in pts:
+        tn.add_tensor(t, virtual=True)
+    return tn
 
-    def _set_gate_params(self, i, params):
-        self._psi[self.gate_tag(i)].params = params
-        self._gates[i] = self._gates[i].copy_with(params=ops.asarray(params))
 
-    def _apply_named_param_updates(self):
-        if not self._named_param_exprs:
-            return
+# ------------------------- gate stream base class -------------------------- #
 
-        env = dict(self._named_params)
-        for i, exprs in self._named_param_exprs.items():
-            values = tuple(_openqasm_eval_expr(expr, env) for expr in exprs)
-            if any(isinstance(x, str) for x in values):
-                raise ValueError(
-                    "Named parameter binding left unresolved symbolic values "
-                    f"for gate {i}: {values!r}"
-                )
-            if any(_is_interface_placeholder(x) for x in values):
-                values = _placeholder_param_vector(values)
-            self._set_gate_params(i, values)
 
-    def get_params(self):
-        """Get a pytree - in this case a dict - of all the parameters in the
-        circuit.
+class _CircuitGatesMixin:
+    """The parts of a circuit simulator that only treat it as a stream of
+    gates - the constructors, :meth:`apply_gate` and the named gate
+    shortcuts. Subclasses just need to set ``N`` and a ``_gates`` list, and
+    implement ``_apply_gate``.
+    """
 
-        Returns
-        -------
-        dict
-            Dictionary containing any named parameters plus any directly
-            parametrized gates not driven by named parameter expressions.
-        """
-        params = dict(self._named_params)
-        managed_gates = set(self._named_param_exprs)
-        params.update(
-            {
-                i: self._psi[self.gate_tag(i)].params
-                for i, gate in enumerate(self._gates)
-                if gate.parametrize and i not in managed_gates
-            }
-        )
-        return params
+    def _apply_gate(self, gate, tags=None, **gate_opts):
+        raise NotImplementedError
 
-    def set_params(self, params):
-        """Set the parameters of the circuit.
+    @classmethod
+    def from_gates_iter(cls, gates, N, progbar=False, **circuit_opts):
+        """Generate a ``Circuit`` instance from a lazy iterator of gates, such
+        as produced by :func:`~quimb.tensor.circuit.parse_openqasm2_iter`,
+        applying each gate as soon as it is parsed, so that the full gate
+        list is never formed.
 
         Parameters
         ----------
-        params : dict
-            Dictionary mapping gate numbers and/or registered named parameter
-            names to new values.
+        gates : iterable[Gate] or iterable[tuple]
+            The gates to apply.
+        N : int
+            The total number of qubits. Since registers can be declared after
+            gates that act on other registers, this generally can't be
+            inferred from the gates seen so far and needs to be known upfront.
+        progbar : bool, optional
+            Whether to show a progress bar.
+        circuit_opts
+            Supplied to the ``Circuit`` constructor.
         """
-        if params is None:
-            params = {}
-
-        named_updates = {k: v for k, v in params.items() if isinstance(k, str)}
-        gate_updates = {
-            k: v for k, v in params.items() if not isinstance(k, str)
-        }
-
-        if named_updates and not self._named_params:
-            raise TypeError(
-                "String-keyed parameters require registered named parameters."
-            )
-
-        extra = set(named_updates) - set(self._named_params)
-        if extra:
-            raise ValueError(
-                "Unknown named parameter values supplied for: "
-                + ", ".join(sorted(extra))
-            )
-
-        overlap = set(gate_updates) & set(self._named_param_exprs)
-        if overlap:
-            raise ValueError(
-                "Cannot directly set gate parameters managed by named "
-                "parameter expressions: "
-                + ", ".join(map(str, sorted(overlap)))
-            )
-
-        if named_updates:
-            self._named_params.update(
-                {
-                    name: self._normalize_named_param_value(value)
-                    for name, value in named_updates.items()
-                }
-            )
-            self._apply_named_param_updates()
-
-        for i, p in gate_updates.items():
-            self._set_gate_params(i, p)
-        self.clear_storage()
+        qc = cls(N, **circuit_opts)
+        qc.apply_gates(gates, progbar=progbar)
+        return qc
 
     @classmethod
     def from_qsim_str(cls, contents, progbar=False, **circuit_opts):
@@ -505,10 +467,11 @@ class Circuit:
         The qsim file format is described here:
         https://quantumai.google/qsim/input_format.
         """
-        info = parse_qsim_file(fname)
-        qc = cls(info["n"], **circuit_opts)
-        qc.apply_gates(info["gates"], progbar=progbar)
-        return qc
+        N = _scan_num_qubits_file(fname, parse_qsim_iter)
+        with open(fname) as f:
+            return cls.from_gates_iter(
+                parse_qsim_iter(f), N, progbar=progbar, **circuit_opts
+            )
 
     @classmethod
     def from_qsim_url(cls, url, progbar=False, **circuit_opts):
@@ -534,11 +497,17 @@ class Circuit:
 
     @classmethod
     def from_openqasm2_file(cls, fname, progbar=False, **circuit_opts):
-        """Generate a ``Circuit`` instance from an OpenQASM 2.0 file."""
-        info = parse_openqasm2_file(fname)
-        qc = cls(info["n"], **circuit_opts)
-        qc.apply_gates(info["gates"], progbar=progbar)
-        return qc
+        """Generate a ``Circuit`` instance from an OpenQASM 2.0 file. The
+        file is parsed lazily, with each gate applied as soon as it is read.
+        """
+        N = _scan_num_qubits_file(fname, parse_openqasm2_iter)
+        with open(fname) as f:
+            return cls.from_gates_iter(
+                parse_openqasm2_iter(f),
+                N,
+                progbar=progbar,
+                **circuit_opts,
+            )
 
     @classmethod
     def from_openqasm2_url(cls, url, progbar=False, **circuit_opts):
@@ -549,193 +518,43 @@ class Circuit:
         return qc
 
     @classmethod
-    def from_openqasm3_str(cls, contents, progbar=False, **circuit_opts):
-        """Construct a circuit from an OpenQASM 3.0 string.
+    def from_gates(cls, gates, N=None, progbar=False, **kwargs):
+        """Generate a ``Circuit`` instance from a sequence of gates.
 
         Parameters
         ----------
-        contents : str
-            The OpenQASM 3 source code to parse.
+        gates : sequence[Gate] or sequence[tuple]
+            The sequence of gates to apply.
+        N : int, optional
+            The number of qubits. If not given, will be inferred from the
+            gates.
         progbar : bool, optional
-            Whether to show a progress bar while applying the parsed gates.
-        **circuit_opts
-            Options forwarded to the ``Circuit`` constructor.
-
-        Returns
-        -------
-        Circuit
-            A circuit populated with the parsed gates. If symbolic ``input``
-            declarations are present, they are registered as generic named
-            circuit parameters so that :meth:`set_params` can bind them later.
+            Whether to show a progress bar.
+        kwargs
+            Supplied to the ``Circuit`` constructor.
         """
-        info = parse_openqasm3_str(contents)
-        qc = cls(info["n"], **circuit_opts)
-        qc.apply_gates(info["gates"], progbar=progbar)
-        qc.register_named_params(
-            {
-                name: (value if not isinstance(value, str) else float("nan"))
-                for name, value in info["symbols"].items()
-            },
-            info["expressions"],
-        )
-        return qc
+        if N is None:
+            gates = tuple(gates)
 
-    @classmethod
-    def from_openqasm3_file(cls, fname, progbar=False, **circuit_opts):
-        """Construct a circuit from an OpenQASM 3.0 file.
+            N = 0
+            for gate in gates:
+                gate = parse_to_gate(gate)
+                if gate.qubits:
+                    N = max(N, max(gate.qubits) + 1)
+                if gate.controls:
+                    N = max(N, max(gate.controls) + 1)
 
-        Parameters
-        ----------
-        fname : str or path-like
-            Path to the OpenQASM 3 file.
-        progbar : bool, optional
-            Whether to show a progress bar while applying the parsed gates.
-        **circuit_opts
-            Options forwarded to the ``Circuit`` constructor.
+        qc = cls(N, **kwargs)
+        qc.apply_gates(gates, progbar=progbar)
+        return qc
 
-        Returns
-        -------
-        Circuit
-            The parsed circuit instance.
-        """
-        with open(fname) as f:
-            return cls.from_openqasm3_str(
-                f.read(), progbar=progbar, **circuit_opts
-            )
+    @property
+    def gates(self):
+        return tuple(self._gates)
 
-    @classmethod
-    def from_openqasm3_url(cls, url, progbar=False, **circuit_opts):
-        """Construct a circuit from an OpenQASM 3.0 URL.
-
-        Parameters
-        ----------
-        url : str
-            URL pointing to an OpenQASM 3 source file.
-        progbar : bool, optional
-            Whether to show a progress bar while applying the parsed gates.
-        **circuit_opts
-            Options forwarded to the ``Circuit`` constructor.
-
-        Returns
-        -------
-        Circuit
-            The parsed circuit instance.
-        """
-        from urllib import request
-
-        return cls.from_openqasm3_str(
-            request.urlopen(url).read().decode(),
-            progbar=progbar,
-            **circuit_opts,
-        )
-
-    @classmethod
-    def from_gates(cls, gates, N=None, progbar=False, **kwargs):
-        """Generate a ``Circuit`` instance from a sequence of gates.
-
-        Parameters
-        ----------
-        gates : sequence[Gate] or sequence[tuple]
-            The sequence of gates to apply.
-        N : int, optional
-            The number of qubits. If not given, will be inferred from the
-            gates.
-        progbar : bool, optional
-            Whether to show a progress bar.
-        kwargs
-            Supplied to the ``Circuit`` constructor.
-        """
-        if N is None:
-            gates = tuple(gates)
-
-            N = 0
-            for gate in gates:
-                gate = parse_to_gate(gate)
-                if gate.qubits:
-                    N = max(N, max(gate.qubits) + 1)
-                if gate.controls:
-                    N = max(N, max(gate.controls) + 1)
-
-        qc = cls(N, **kwargs)
-        qc.apply_gates(gates, progbar=progbar)
-        return qc
-
-    @property
-    def gates(self):
-        return tuple(self._gates)
-
-    @property
-    def num_gates(self):
-        return len(self._gates)
-
-    def ket_site_ind(self, i):
-        """Get the site index for the given qubit."""
-        return self._ket_site_ind_id.format(i)
-
-    def bra_site_ind(self, i):
-        """Get the 'bra' site index for the given qubit, if forming an operator."""
-        return self._bra_site_ind_id.format(i)
-
-    def gate_tag(self, g):
-        """Get the tag for the given gate, indexed linearly."""
-        return self._gate_tag_id.format(g)
-
-    def round_tag(self, r):
-        """Get the tag for the given round (/layer)."""
-        return self._round_tag_id.format(r)
-
-    def _init_state(self, N, dtype="complex128"):
-        return TN_from_sites_computational_state(
-            site_map={i: "0" for i in range(N)}, dtype=dtype
-        )
-
-    def _apply_gate(self, gate, tags=None, **gate_opts):
-        """Apply a ``Gate`` to this ``Circuit``. This is the main method that
-        all calls to apply a gate should go through.
-
-        Parameters
-        ----------
-        gate : Gate
-            The gate to apply.
-        tags : str or sequence of str, optional
-            Tags to add to the gate tensor(s).
-        """
-        tags = tags_to_oset(tags)
-        if self.tag_gate_numbers:
-            tags.add(self.gate_tag(self.num_gates))
-        if self.tag_gate_rounds and (gate.round is not None):
-            tags.add(self.round_tag(gate.round))
-        if self.tag_gate_labels and (gate.tag is not None):
-            tags.add(gate.tag)
-
-        # overide any default gate opts
-        opts = {**self.gate_opts, **gate_opts}
-
-        if gate.controls:
-            # handle extra (low-rank) control structure
-            apply_controlled_gate(self._psi, gate, tags=tags, **opts)
-
-        elif gate.special:
-            # these are specified as a general function
-            SPECIAL_GATES[gate.label](
-                self._psi, *gate.params, *gate.qubits, **opts
-            )
-
-        else:
-            # gate supplied as a matrix/tensor
-            G = gate.array
-
-            if self.convert_eager:
-                key = id(G)
-                if key not in self._backend_gate_cache:
-                    self._backend_gate_cache[key] = self._maybe_convert(G)
-                G = self._backend_gate_cache[key]
-
-            # apply the gate to the TN!
-            self._psi.gate_(G, gate.qubits, tags=tags, **opts)
-
-        # keep track of the gates applied
-        self._gates.append(gate)
+    @property
+    def num_gates(self):
+        return len(self._gates)
 
     def apply_gate(
         self,
@@ -748,7 +567,7 @@ class Circuit:
         parametrize=None,
         **gate_opts,
     ):
-        """Apply a single gate to this tensor network quantum circuit. If
+        """Apply a single gate to this quantum circuit. If
         ``gate_round`` is supplied the tensor(s) added will be tagged with
         ``'ROUND_{gate_round}'``. Alternatively, putting an integer first like
         so::
@@ -801,16 +620,26 @@ class Circuit:
         gate = Gate.from_raw(U, where, controls=controls, round=gate_round)
         self._apply_gate(gate, **gate_opts)
 
-    def apply_gates(self, gates, progbar=False, **gate_opts):
-        """Apply a sequence of gates to this tensor network quantum circuit.
+    def apply_gates(self, gates, progbar=False, fuse=False, **gate_opts):
+        """Apply a sequence of gates to this quantum circuit.
 
         Parameters
         ----------
         gates : Sequence[Gate] or Sequence[Tuple]
             The sequence of gates to apply.
+        progbar : bool, optional
+            Whether to show a progress bar.
+        fuse : bool, int or dict, optional
+            Whether to first fuse the gates into fewer, larger gates, see
+            :func:`~quimb.tensor.circuit.fuse_gates`. If an integer, the
+            maximum number of qubits a fused gate can act on, if a dict,
+            options supplied to :func:`~quimb.tensor.circuit.fuse_gates`.
         gate_opts
             Supplied to :meth:`~quimb.tensor.circuit.Circuit.apply_gate`.
         """
+        if fuse:
+            gates = fuse_gates(gates, **_parse_fuse_opts(fuse))
+
         if progbar:
             from ...utils import progbar as _progbar
 
@@ -819,10 +648,33 @@ class Circuit:
         for gate in gates:
             if isinstance(gate, Gate):
                 self._apply_gate(gate, **gate_opts)
+            elif isinstance(gate, Channel):
+                self.apply_channel(gate, **gate_opts)
             else:
                 self.apply_gate(*gate, **gate_opts)
 
-        self._psi.squeeze_()
+    def apply_channel(self, channel, *qubits, gate_round=None, **gate_opts):
+        """Apply a noise channel. Only the noisy circuit simulators,
+        :class:`~quimb.tensor.circuit.CircuitDensityMatrix`,
+        :class:`~quimb.tensor.circuit.CircuitDensityMatrixMPS` and
+        :class:`~quimb.tensor.circuit.CircuitTrajectories` support this.
+
+        Parameters
+        ----------
+        channel : Channel or sequence of array
+            The channel, or its Kraus operators, in which case ``qubits``
+            should also be supplied.
+        qubits : int
+            The qubits to act on, if ``channel`` is given as Kraus operators.
+        gate_round : int, optional
+            The gate round, if ``channel`` is given as Kraus operators.
+        gate_opts
+            Supplied to the gate function.
+        """
+        raise TypeError(
+            f"{self.__class__.__name__} can only simulate unitary gates, use "
+            "`CircuitDensityMatrix` or `CircuitTrajectories` for noise."
+        )
 
     def h(self, i, gate_round=None, **kwargs):
         self.apply_gate("H", i, gate_round=gate_round, **kwargs)
@@ -1179,95 +1031,703 @@ class Circuit:
             **kwargs,
         )
 
-    def cry(self, theta, i, j, gate_round=None, parametrize=False, **kwargs):
-        self.apply_gate(
-            "CRY",
-            theta,
-            i,
-            j,
-            gate_round=gate_round,
-            parametrize=parametrize,
-            **kwargs,
+    def cry(self, theta, i, j, gate_round=None, parametrize=False, **kwargs):
+        self.apply_gate(
+            "CRY",
+            theta,
+            i,
+            j,
+            gate_round=gate_round,
+            parametrize=parametrize,
+            **kwargs,
+        )
+
+    def crz(self, theta, i, j, gate_round=None, parametrize=False, **kwargs):
+        self.apply_gate(
+            "CRZ",
+            theta,
+            i,
+            j,
+            gate_round=gate_round,
+            parametrize=parametrize,
+            **kwargs,
+        )
+
+    def su4(
+        self,
+        theta1,
+        phi1,
+        lamda1,
+        theta2,
+        phi2,
+        lamda2,
+        theta3,
+        phi3,
+        lamda3,
+        theta4,
+        phi4,
+        lamda4,
+        t1,
+        t2,
+        t3,
+        i,
+        j,
+        gate_round=None,
+        parametrize=False,
+        **kwargs,
+    ):
+        self.apply_gate(
+            "SU4",
+            theta1,
+            phi1,
+            lamda1,
+            theta2,
+            phi2,
+            lamda2,
+            theta3,
+            phi3,
+            lamda3,
+            theta4,
+            phi4,
+            lamda4,
+            t1,
+            t2,
+            t3,
+            i,
+            j,
+            gate_round=gate_round,
+            parametrize=parametrize,
+            **kwargs,
+        )
+
+    def ccx(self, i, j, k, gate_round=None, **kwargs):
+        self.apply_gate("CCX", i, j, k, gate_round=gate_round, **kwargs)
+
+    def ccnot(self, i, j, k, gate_round=None, **kwargs):
+        self.apply_gate("CCNOT", i, j, k, gate_round=gate_round, **kwargs)
+
+    def toffoli(self, i, j, k, gate_round=None, **kwargs):
+        self.apply_gate("TOFFOLI", i, j, k, gate_round=gate_round, **kwargs)
+
+    def ccy(self, i, j, k, gate_round=None, **kwargs):
+        self.apply_gate("CCY", i, j, k, gate_round=gate_round, **kwargs)
+
+    def ccz(self, i, j, k, gate_round=None, **kwargs):
+        self.apply_gate("CCZ", i, j, k, gate_round=gate_round, **kwargs)
+
+    def cswap(self, i, j, k, gate_round=None, **kwargs):
+        self.apply_gate("CSWAP", i, j, k, gate_round=gate_round, **kwargs)
+
+    def fredkin(self, i, j, k, gate_round=None, **kwargs):
+        self.apply_gate("FREDKIN", i, j, k, gate_round=gate_round, **kwargs)
+
+
+# --------------------------- main circuit class ---------------------------- #
+
+
+class Circuit(_CircuitGatesMixin):
+    """Class for simulating quantum circuits using tensor networks. The class
+    keeps a list of :class:`Gate` objects in sync with a tensor network
+    representing the current state of the circuit.
+
+    Parameters
+    ----------
+    N : int, optional
+        The number of qubits.
+    psi0 : TensorNetwork1DVector, optional
+        The initial state, assumed to be ``|00000....0>`` if not given. The
+        state is always copied and the tag ``PSI0`` added.
+    gate_opts : dict_like, optional
+        Default keyword arguments to supply to each
+        :func:`~quimb.tensor.tn1d.core.gate_TN_1D` call during the circuit.
+    gate_contract : str, optional
+        Shortcut for setting the default `'contract'` option in `gate_opts`.
+    gate_propagate_tags : str, optional
+        Shortcut for setting the default `'propagate_tags'` option in
+        `gate_opts`.
+    tags : str or sequence of str, optional
+        Tag(s) to add to the initial wavefunction tensors (whether these are
+        propagated to the rest of the circuit's tensors depends on
+        ``gate_opts``).
+    psi0_dtype : str, optional
+        Ensure the initial state has this dtype.
+    psi0_tag : str, optional
+        Ensure the initial state has this tag.
+    tag_gate_numbers : bool, optional
+        Whether to tag each gate tensor with its number in the circuit, like
+        ``"GATE_{g}"``. This is required for updating the circuit parameters.
+    gate_tag_id : str, optional
+        The format string for tagging each gate tensor, by default e.g.
+        ``"GATE_{g}"``.
+    tag_gate_rounds : bool, optional
+        Whether to tag each gate tensor with its number in the circuit, like
+        ``"ROUND_{r}"``.
+    round_tag_id : str, optional
+        The format string for tagging each round of gates, by default e.g.
+        ``"ROUND_{r}"``.
+    tag_gate_labels : bool, optional
+        Whether to tag each gate tensor with its gate type label, e.g.
+        ``{"X_1/2", "ISWAP", "CCX", ...}``..
+    bra_site_ind_id : str, optional
+        Use this to label 'bra' site indices when creating certain (mostly
+        internal) intermediate tensor networks.
+    dtype : str, optional
+        A default dtype to perform calculations in. Depending on
+        `convert_eager`, this is enforced *after* circuit construction
+        and simplification (the default for exact simulation), or eagerly to
+        the initial state and as gates are applied (the default for MPS
+        simulation).
+    to_backend : callable, optional
+        If given, apply this function to both the initial state arrays and to
+        every gate as it is applied.
+    convert_eager : bool, optional
+        Whether to eagerly perform dtype casting and application of
+        `to_backend` as gates are supplied, or wait until after the necessary
+        TNs for a particular task such as sampling are formed and simplified.
+        Deferred conversion (`convert_eager=False`) is the default mode for
+        full contraction.
+
+    Attributes
+    ----------
+    psi : TensorNetwork1DVector
+        The current circuit wavefunction as a tensor network.
+    uni : TensorNetwork1DOperator
+        The current circuit unitary operator as a tensor network.
+    gates : tuple[Gate]
+        The gates in the circuit.
+
+    Examples
+    --------
+
+    Create 3-qubit GHZ-state:
+
+        >>> qc = qtn.Circuit(3)
+        >>> gates = [
+                ('H', 0),
+                ('H', 1),
+                ('CNOT', 1, 2),
+                ('CNOT', 0, 2),
+                ('H', 0),
+                ('H', 1),
+                ('H', 2),
+            ]
+        >>> qc.apply_gates(gates)
+        >>> qc.psi
+        <TensorNetwork1DVector(tensors=12, indices=14, L=3, max_bond=2)>
+
+        >>> qc.psi.to_dense().round(4)
+        qarray([[ 0.7071+0.j],
+                [ 0.    +0.j],
+                [ 0.    +0.j],
+                [-0.    +0.j],
+                [-0.    +0.j],
+                [ 0.    +0.j],
+                [ 0.    +0.j],
+                [ 0.7071+0.j]])
+
+        >>> for b in qc.sample(10):
+        ...     print(b)
+        000
+        000
+        111
+        000
+        111
+        111
+        000
+        111
+        000
+        000
+
+    See Also
+    --------
+    Gate
+    """
+
+    def __init__(
+        self,
+        N=None,
+        psi0=None,
+        gate_opts=None,
+        gate_contract="auto-split-gate",
+        gate_propagate_tags="register",
+        tags=None,
+        psi0_dtype="complex128",
+        psi0_tag="PSI0",
+        tag_gate_numbers=True,
+        gate_tag_id="GATE_{}",
+        tag_gate_rounds=True,
+        round_tag_id="ROUND_{}",
+        tag_gate_labels=True,
+        bra_site_ind_id="b{}",
+        dtype=None,
+        to_backend=None,
+        convert_eager=False,
+    ):
+        if (N is None) and (psi0 is None):
+            raise ValueError("You must supply one of `N` or `psi0`.")
+
+        elif psi0 is None:
+            self.N = N
+            self._psi = self._init_state(N, dtype=psi0_dtype)
+
+        elif N is None:
+            self._psi = psi0.copy()
+            self.N = psi0.nsites
+
+        else:
+            if N != psi0.nsites:
+                raise ValueError("`N` doesn't match `psi0`.")
+            self.N = N
+            self._psi = psi0.copy()
+
+        self._psi.add_tag(psi0_tag)
+
+        if tags is not None:
+            if isinstance(tags, str):
+                tags = (tags,)
+            for tag in tags:
+                self._psi.add_tag(tag)
+
+        self.tag_gate_numbers = tag_gate_numbers
+        self.tag_gate_rounds = tag_gate_rounds
+        self.tag_gate_labels = tag_gate_labels
+
+        self.dtype = dtype
+        self.to_backend = to_backend
+        self.convert_eager = convert_eager
+        if self.convert_eager:
+            self._maybe_convert(self._psi)
+        self._backend_gate_cache = {}
+
+        self.gate_opts = ensure_dict(gate_opts)
+        self.gate_opts.setdefault("contract", gate_contract)
+        self.gate_opts.setdefault("propagate_tags", gate_propagate_tags)
+        self._gates = []
+
+        self._ket_site_ind_id = self._psi.site_ind_id
+        self._bra_site_ind_id = bra_site_ind_id
+        self._gate_tag_id = gate_tag_id
+        self._round_tag_id = round_tag_id
+
+        if self._ket_site_ind_id == self._bra_site_ind_id:
+            raise ValueError(
+                "The 'ket' and 'bra' site ind ids clash : '{}' and '{}".format(
+                    self._ket_site_ind_id, self._bra_site_ind_id
+                )
+            )
+
+        self._sample_n_gates = -1
+        self._storage = dict()
+        self._sampled_conditionals = dict()
+        self._marginal_storage_size = 0
+        self._marginal_trie = _MarginalTrie()
+        self._named_params = {}
+        self._named_param_exprs = {}
+
+    def copy(self):
+        """Copy the circuit and its state."""
+        new = object.__new__(self.__class__)
+        new.N = self.N
+        new._psi = self._psi.copy()
+        new.gate_opts = tree_map(lambda x: x, self.gate_opts)
+        new.tag_gate_numbers = self.tag_gate_numbers
+        new.tag_gate_rounds = self.tag_gate_rounds
+        new.tag_gate_labels = self.tag_gate_labels
+        new.to_backend = self.to_backend
+        new.dtype = self.dtype
+        new.convert_eager = self.convert_eager
+        new._backend_gate_cache = self._backend_gate_cache
+        new._gates = self._gates.copy()
+        new._ket_site_ind_id = self._ket_site_ind_id
+        new._bra_site_ind_id = self._bra_site_ind_id
+        new._gate_tag_id = self._gate_tag_id
+        new._round_tag_id = self._round_tag_id
+        new._sample_n_gates = self._sample_n_gates
+        new._storage = self._storage.copy()
+        new._sampled_conditionals = self._sampled_conditionals.copy()
+        new._marginal_storage_size = self._marginal_storage_size
+        new._marginal_trie = self._marginal_trie.copy()
+        new._named_params = copy.copy(self._named_params)
+        new._named_param_exprs = copy.copy(self._named_param_exprs)
+        return new
+
+    def _maybe_convert(self, obj, dtype=None):
+        istn = isinstance(obj, TensorNetwork)
+
+        if dtype is None:
+            # use default dtype
+            dtype = self.dtype
+
+        if dtype is not None:
+            # cast array or TN to dtype
+            if istn:
+                obj.astype_(dtype)
+            else:
+                if get_dtype_name(obj) != dtype:
+                    obj = astype(obj, dtype)
+
+        if self.to_backend is not None:
+            # once dtype is enforced, apply to_backend
+            # for e.g. gpu transfer etc
+            if istn:
+                obj.apply_to_arrays(self.to_backend)
+            else:
+                obj = self.to_backend(obj)
+
+        return obj
+
+    def apply_to_arrays(self, fn):
+        """Apply a function to all the arrays in the circuit."""
+        self._psi.apply_to_arrays(fn)
+        self._named_params = tree_map(fn, self._named_params)
+
+    @staticmethod
+    def _normalize_named_param_value(value):
+        if _is_interface_placeholder(value):
+            return value
+        if isinstance(value, numbers.Number):
+            return ops.asarray(value)
+        return value
+
+    @property
+    def named_params(self):
+        """Named circuit parameters and their current values."""
+        return copy.copy(self._named_params)
+
+    @property
+    def named_param_names(self):
+        """Names of registered circuit parameters."""
+        return tuple(self._named_params)
+
+    @property
+    def param_expressions(self):
+        """Gate parameter expressions keyed by gate index."""
+        return copy.copy(self._named_param_exprs)
+
+    def register_named_params(self, named_params, gate_expressions=None):
+        """Register named circuit parameters and gate dependencies.
+
+        Parameters
+        ----------
+        named_params : sequence[str] or mapping[str, scalar]
+            Either names to register, which default to ``nan`` until bound,
+            or a mapping supplying initial values.
+        gate_expressions : mapping[int, tuple], optional
+            Mapping from gate index to the expressions used to generate that
+            gate's parameters. Each expression can be a constant, a string
+            expression referencing the named parameters, or a callable taking
+            the current named parameter mapping.
+        """
+        if isinstance(named_params, collections.abc.Mapping):
+            self._named_params = {
+                name: self._normalize_named_param_value(value)
+                for name, value in named_params.items()
+            }
+        else:
+            self._named_params = {
+                name: self._normalize_named_param_value(float("nan"))
+                for name in tuple(named_params)
+            }
+
+        if gate_expressions is None:
+            gate_expressions = {}
+
+        normalized_gate_expressions = {}
+        for i, exprs in gate_expressions.items():
+            i = int(i)
+            exprs = tuple(exprs)
+
+            if not (0 <= int(i) < len(self._gates)):
+                raise ValueError(
+                    "Named parameter expressions reference unknown gate "
+                    f"index: {i}"
+                )
+
+            gate = self._gates[i]
+            if not gate.parametrize:
+                raise ValueError(
+                    "Named parameter expressions require parametrized gate "
+                    f"indices, got non-parametrized gate: {i}"
+                )
+
+            if len(exprs) != len(gate.params):
+                raise ValueError(
+                    "Named parameter expression arity does not match gate "
+                    f"{i}: expected {len(gate.params)}, got {len(exprs)}"
+                )
+
+            normalized_gate_expressions[i] = exprs
+
+        self._named_param_exprs = normalized_gate_expressions
+        self._apply_named_param_updates()
+        self.clear_storage()
+
+    def _set_gate_params(self, i, params):
+        self._psi[self.gate_tag(i)].params = params
+        self._gates[i] = self._gates[i].copy_with(params=ops.asarray(params))
+
+    def _apply_named_param_updates(self):
+        if not self._named_param_exprs:
+            return
+
+        env = dict(self._named_params)
+        for i, exprs in self._named_param_exprs.items():
+            values = tuple(_openqasm_eval_expr(expr, env) for expr in exprs)
+            if any(isinstance(x, str) for x in values):
+                raise ValueError(
+                    "Named parameter binding left unresolved symbolic values "
+                    f"for gate {i}: {values!r}"
+                )
+            if any(_is_interface_placeholder(x) for x in values):
+                values = _placeholder_param_vector(values)
+            self._set_gate_params(i, values)
+
+    def get_params(self):
+        """Get a pytree - in this case a dict - of all the parameters in the
+        circuit.
+
+        Returns
+        -------
+        dict
+            Dictionary containing any named parameters plus any directly
+            parametrized gates not driven by named parameter expressions.
+        """
+        params = dict(self._named_params)
+        managed_gates = set(self._named_param_exprs)
+        params.update(
+            {
+                i: self._psi[self.gate_tag(i)].params
+                for i, gate in enumerate(self._gates)
+                if gate.parametrize and i not in managed_gates
+            }
+        )
+        return params
+
+    def _param_gate_tags(self):
+        return {
+            self.gate_tag(i)
+            for i, gate in enumerate(self._gates)
+            if gate.parametrize
+        }
+
+    def set_params(self, params):
+        """Set the parameters of the circuit.
+
+        Parameters
+        ----------
+        params : dict
+            Dictionary mapping gate numbers and/or registered named parameter
+            names to new values.
+        """
+        if params is None:
+            params = {}
+
+        named_updates = {k: v for k, v in params.items() if isinstance(k, str)}
+        gate_updates = {
+            k: v for k, v in params.items() if not isinstance(k, str)
+        }
+
+        if named_updates and not self._named_params:
+            raise TypeError(
+                "String-keyed parameters require registered named parameters."
+            )
+
+        extra = set(named_updates) - set(self._named_params)
+        if extra:
+            raise ValueError(
+                "Unknown named parameter values supplied for: "
+                + ", ".join(sorted(extra))
+            )
+
+        overlap = set(gate_updates) & set(self._named_param_exprs)
+        if overlap:
+            raise ValueError(
+                "Cannot directly set gate parameters managed by named "
+                "parameter expressions: "
+                + ", ".join(map(str, sorted(overlap)))
+            )
+
+        if named_updates:
+            self._named_params.update(
+                {
+                    name: self._normalize_named_param_value(value)
+                    for name, value in named_updates.items()
+                }
+            )
+            self._apply_named_param_updates()
+
+        for i, p in gate_updates.items():
+            self._set_gate_params(i, p)
+        self.clear_storage(keep_structure=True)
+
+    @classmethod
+    def from_openqasm3_str(cls, contents, progbar=False, **circuit_opts):
+        """Construct a circuit from an OpenQASM 3.0 string.
+
+        Parameters
+        ----------
+        contents : str
+            The OpenQASM 3 source code to parse.
+        progbar : bool, optional
+            Whether to show a progress bar while applying the parsed gates.
+        **circuit_opts
+            Options forwarded to the ``Circuit`` constructor.
+
+        Returns
+        -------
+        Circuit
+            A circuit populated with the parsed gates. If symbolic ``input``
+            declarations are present, they are registered as generic named
+            circuit parameters so that :meth:`set_params` can bind them later.
+        """
+        info = parse_openqasm3_str(contents)
+        qc = cls(info["n"], **circuit_opts)
+        qc.apply_gates(info["gates"], progbar=progbar)
+        qc.register_named_params(
+            {
+                name: (value if not isinstance(value, str) else float("nan"))
+                for name, value in info["symbols"].items()
+            },
+            info["expressions"],
+        )
+        return qc
+
+    @classmethod
+    def from_openqasm3_file(cls, fname, progbar=False, **circuit_opts):
+        """Construct a circuit from an OpenQASM 3.0 file. The file is parsed
+        lazily, with each gate applied as soon as it is read.
+
+        Parameters
+        ----------
+        fname : str or path-like
+            Path to the OpenQASM 3 file.
+        progbar : bool, optional
+            Whether to show a progress bar while applying the parsed gates.
+        **circuit_opts
+            Options forwarded to the ``Circuit`` constructor.
+
+        Returns
+        -------
+        Circuit
+            The parsed circuit instance.
+        """
+        N = _scan_num_qubits_file(fname, parse_openqasm3_iter)
+        info = {}
+        with open(fname) as f:
+            qc = cls.from_gates_iter(
+                parse_openqasm3_iter(f, info),
+                N,
+                progbar=progbar,
+                **circuit_opts,
+            )
+        qc.register_named_params(
+            {
+                name: (value if not isinstance(value, str) else float("nan"))
+                for name, value in info["symbols"].items()
+            },
+            info["expressions"],
+        )
+        return qc
+
+    @classmethod
+    def from_openqasm3_url(cls, url, progbar=False, **circuit_opts):
+        """Construct a circuit from an OpenQASM 3.0 URL.
+
+        Parameters
+        ----------
+        url : str
+            URL pointing to an OpenQASM 3 source file.
+        progbar : bool, optional
+            Whether to show a progress bar while applying the parsed gates.
+        **circuit_opts
+            Options forwarded to the ``Circuit`` constructor.
+
+        Returns
+        -------
+        Circuit
+            The parsed circuit instance.
+        """
+        from urllib import request
+
+        return cls.from_openqasm3_str(
+            request.urlopen(url).read().decode(),
+            progbar=progbar,
+            **circuit_opts,
         )
 
-    def crz(self, theta, i, j, gate_round=None, parametrize=False, **kwargs):
-        self.apply_gate(
-            "CRZ",
-            theta,
-            i,
-            j,
-            gate_round=gate_round,
-            parametrize=parametrize,
-            **kwargs,
-        )
+    def ket_site_ind(self, i):
+        """Get the site index for the given qubit."""
+        return self._ket_site_ind_id.format(i)
 
-    def su4(
-        self,
-        theta1,
-        phi1,
-        lamda1,
-        theta2,
-        phi2,
-        lamda2,
-        theta3,
-        phi3,
-        lamda3,
-        theta4,
-        phi4,
-        lamda4,
-        t1,
-        t2,
-        t3,
-        i,
-        j,
-        gate_round=None,
-        parametrize=False,
-        **kwargs,
-    ):
-        self.apply_gate(
-            "SU4",
-            theta1,
-            phi1,
-            lamda1,
-            theta2,
-            phi2,
-            lamda2,
-            theta3,
-            phi3,
-            lamda3,
-            theta4,
-            phi4,
-            lamda4,
-            t1,
-            t2,
-            t3,
-            i,
-            j,
-            gate_round=gate_round,
-            parametrize=parametrize,
-            **kwargs,
+    def bra_site_ind(self, i):
+        """Get the 'bra' site index for the given qubit, if forming an operator."""
+        return self._bra_site_ind_id.format(i)
+
+    def gate_tag(self, g):
+        """Get the tag for the given gate, indexed linearly."""
+        return self._gate_tag_id.format(g)
+
+    def round_tag(self, r):
+        """Get the tag for the given round (/layer)."""
+        return self._round_tag_id.format(r)
+
+    def _init_state(self, N, dtype="complex128"):
+        return TN_from_sites_computational_state(
+            site_map={i: "0" for i in range(N)}, dtype=dtype
         )
 
-    def ccx(self, i, j, k, gate_round=None, **kwargs):
-        self.apply_gate("CCX", i, j, k, gate_round=gate_round, **kwargs)
+    def _apply_gate(self, gate, tags=None, **gate_opts):
+        """Apply a ``Gate`` to this ``Circuit``. This is the main method that
+        all calls to apply a gate should go through.
 
-    def ccnot(self, i, j, k, gate_round=None, **kwargs):
-        self.apply_gate("CCNOT", i, j, k, gate_round=gate_round, **kwargs)
+        Parameters
+        ----------
+        gate : Gate
+            The gate to apply.
+        tags : str or sequence of str, optional
+            Tags to add to the gate tensor(s).
+        """
+        tags = tags_to_oset(tags)
+        if self.tag_gate_numbers:
+            tags.add(self.gate_tag(self.num_gates))
+        if self.tag_gate_rounds and (gate.round is not None):
+            tags.add(self.round_tag(gate.round))
+        if self.tag_gate_labels and (gate.tag is not None):
+            tags.add(gate.tag)
 
-    def toffoli(self, i, j, k, gate_round=None, **kwargs):
-        self.apply_gate("TOFFOLI", i, j, k, gate_round=gate_round, **kwargs)
+        # overide any default gate opts
+        opts = {**self.gate_opts, **gate_opts}
 
-    def ccy(self, i, j, k, gate_round=None, **kwargs):
-        self.apply_gate("CCY", i, j, k, gate_round=gate_round, **kwargs)
+        if gate.controls:
+            # handle extra (low-rank) control structure
+            apply_controlled_gate(self._psi, gate, tags=tags, **opts)
 
-    def ccz(self, i, j, k, gate_round=None, **kwargs):
-        self.apply_gate("CCZ", i, j, k, gate_round=gate_round, **kwargs)
+        elif gate.special:
+            # these are specified as a general function
+            SPECIAL_GATES[gate.label](
+                self._psi, *gate.params, *gate.qubits, **opts
+            )
 
-    def cswap(self, i, j, k, gate_round=None, **kwargs):
-        self.apply_gate("CSWAP", i, j, k, gate_round=gate_round, **kwargs)
+        else:
+            # gate supplied as a matrix/tensor
+            G = gate.array
 
-    def fredkin(self, i, j, k, gate_round=None, **kwargs):
-        self.apply_gate("FREDKIN", i, j, k, gate_round=gate_round, **kwargs)
+            if self.convert_eager:
+                key = id(G)
+                if key not in self._backend_gate_cache:
+                    self._backend_gate_cache[key] = self._maybe_convert(G)
+                G = self._backend_gate_cache[key]
+
+            # apply the gate to the TN!
+            self._psi.gate_(G, gate.qubits, tags=tags, **opts)
+
+        # keep track of the gates applied
+        self._gates.append(gate)
+
+    @functools.wraps(_CircuitGatesMixin.apply_gates)
+    def apply_gates(self, gates, progbar=False, fuse=False, **gate_opts):
+        super().apply_gates(gates, progbar=progbar, fuse=fuse, **gate_opts)
+        self._psi.squeeze_()
 
     @property
     def psi(self):
@@ -1422,11 +1882,27 @@ class Circuit:
 
         return psi_lc
 
-    def clear_storage(self):
-        """Clear all cached data."""
-        self._storage.clear()
+    def clear_storage(self, keep_structure=False):
+        """Clear all cached data.
+
+        Parameters
+        ----------
+        keep_structure : bool, optional
+            Keep cached networks that only depend on the structure of the
+            circuit, not the values of its parameters, i.e. those generated
+            with ``preserve_params=True``.
+        """
+        if keep_structure:
+            self._storage = {
+                key: x
+                for key, x in self._storage.items()
+                if key[0] == "rdm_lightcone_param_simplified"
+            }
+        else:
+            self._storage.clear()
         self._sampled_conditionals.clear()
         self._marginal_storage_size = 0
+        self._marginal_trie.clear()
         self._sample_n_gates = self.num_gates
 
     def _maybe_init_storage(self):
@@ -1434,6 +1910,40 @@ class Circuit:
         if self._sample_n_gates != self.num_gates:
             self.clear_storage()
 
+    def _get_sample_store_key(
+        self,
+        dtype,
+        simplify_sequence,
+        simplify_atol,
+        simplify_equalize_norms,
+        **_,
+    ):
+        """Get a key identifying this circuit - its initial state, gates and
+        parameters, independent of the randomly generated index names - as
+        well as the options that affect the marginals computed by
+        :meth:`sample`, used to namespace a sample ``store``.
+        """
+        psi = self._psi
+        h = hashlib.sha1(
+            pickle.dumps(
+                (
+                    self.N,
+                    psi.exponent,
+                    dtype,
+                    simplify_sequence,
+                    simplify_atol,
+                    simplify_equalize_norms,
+                )
+            )
+        )
+        symbols = {psi.site_ind(i): i for i in range(self.N)}
+        for t in psi:
+            inds = tuple(symbols.setdefault(ix, len(symbols)) for ix in t.inds)
+            x = np.ascontiguousarray(do("to_numpy", t.data))
+            h.update(pickle.dumps((inds, sorted(t.tags), x.dtype.str)))
+            h.update(x.tobytes())
+        return h.hexdigest()
+
     def get_psi_simplified(
         self, seq="ADCRS", atol=1e-12, equalize_norms=False
     ):
@@ -1486,6 +1996,7 @@ class Circuit:
         seq="ADCRS",
         atol=1e-12,
         equalize_norms=False,
+        preserve_params=False,
     ):
         """Get a simplified TN of the norm of the wavefunction, with
         gates outside reverse lightcone of ``where`` cancelled, and physical
@@ -1507,14 +2018,34 @@ class Circuit:
             :meth:`~quimb.tensor.tensor_core.TensorNetwork.full_simplify`.
         equalize_norms : bool, optional
             Actively renormalize tensor norms during simplification.
+        preserve_params : bool, optional
+            Leave the tensors of parametrized gates, and everything they are
+            directly attached to, out of the simplification. The resulting
+            network then has the same structure for any parameter values,
+            and is kept in the cache when the parameters are changed with
+            :meth:`~quimb.tensor.circuit.Circuit.set_params`, with only the
+            parametrized tensors updated on retrieval.
 
         Returns
         -------
         TensorNetwork
         """
-        key = ("rdm_lightcone_simplified", tuple(sorted(where)), seq, atol)
-        if key in self._storage:
-            return self._storage[key].copy()
+        if preserve_params:
+            key = ("rdm_lightcone_param_simplified", tuple(sorted(where)))
+            key += (seq, atol, equalize_norms)
+            if key in self._storage:
+                rho_lc = self._storage[key].copy()
+                # inject the current parameters
+                param_tags = self._param_gate_tags()
+                for t in rho_lc:
+                    if isinstance(t, PTensor):
+                        (tag,) = (tag for tag in t.tags if tag in param_tags)
+                        t.params = self._psi[tag].params
+                return rho_lc
+        else:
+            key = ("rdm_lightcone_simplified", tuple(sorted(where)), seq, atol)
+            if key in self._storage:
+                return self._storage[key].copy()
 
         ket_lc = self.get_psi_reverse_lightcone(where)
 
@@ -1528,12 +2059,17 @@ class Circuit:
         output_inds = b_inds + k_inds
 
         # # simplify the norm and cache it
-        rho_lc.full_simplify_(
-            seq=seq,
-            atol=atol,
-            output_inds=output_inds,
-            equalize_norms=equalize_norms,
-        )
+        simplify_opts = {
+            "seq": seq,
+            "atol": atol,
+            "equalize_norms": equalize_norms,
+        }
+        if preserve_params:
+            _full_simplify_preserving_params_(
+                rho_lc, output_inds, **simplify_opts
+            )
+        else:
+            rho_lc.full_simplify_(output_inds=output_inds, **simplify_opts)
         self._storage[key] = rho_lc
 
         # return a copy so we can modify it inplace
@@ -1658,30 +2194,285 @@ class Circuit:
         simplify_equalize_norms : bool, optional
             Actively renormalize tensor norms during simplification.
         backend : str, optional
-            Backend to perform the marginal contraction with, e.g. ``'numpy'``,
+            Backend to perform the marginal contraction with, e.g. ``'numpy'``,
+            ``'cupy'`` or ``'jax'``. Passed to ``cotengra``.
+        dtype : str, optional
+            Data type to cast the TN to before contraction.
+
+        Returns
+        -------
+        dict
+
+        """
+        if b == "random":
+            b = "r" * self.N
+
+        return self.amplitude(
+            b=b,
+            optimize=optimize,
+            dtype=dtype,
+            rehearse=rehearse,
+            simplify_sequence=simplify_sequence,
+            simplify_atol=simplify_atol,
+            simplify_equalize_norms=simplify_equalize_norms,
+        )
+
+    amplitude_tn = functools.partialmethod(amplitude_rehearse, rehearse="tn")
+
+    def amplitudes(
+        self,
+        bs,
+        optimize="auto-hq",
+        simplify_sequence="ADCRS",
+        simplify_atol=1e-12,
+        simplify_equalize_norms=True,
+        backend=None,
+        dtype=None,
+    ):
+        r"""Get the amplitude coefficients of many bitstrings ``bs`` at once.
+        Unlike :meth:`~quimb.tensor.circuit.Circuit.amplitude`, no further
+        simplification is performed after fixing each bitstring, so that all
+        the resulting networks share the same geometry and can be contracted
+        as a single batched contraction with a shared tree, see
+        :func:`~quimb.tensor.tensor_core.tensor_network_contract_batched`.
+
+        Parameters
+        ----------
+        bs : sequence of str or sequence of sequence of int
+            The bitstrings to compute the transition amplitudes for.
+        optimize : str, optional
+            Contraction path optimizer to use for the batched contraction.
+        simplify_sequence : str, optional
+            Which local tensor network simplifications to perform and in which
+            order, see
+            :meth:`~quimb.tensor.tensor_core.TensorNetwork.full_simplify`.
+        simplify_atol : float, optional
+            The tolerance with which to compare to zero when applying
+            :meth:`~quimb.tensor.tensor_core.TensorNetwork.full_simplify`.
+        simplify_equalize_norms : bool, optional
+            Actively renormalize tensor norms during simplification.
+        backend : str, optional
+            Backend to perform the contraction with, e.g. ``'numpy'``,
+            ``'cupy'`` or ``'jax'``. Passed to ``cotengra``.
+        dtype : str, optional
+            Data type to cast the TN to before contraction.
+
+        Returns
+        -------
+        array_like
+            The amplitudes, with shape ``(len(bs),)``.
+        """
+        self._maybe_init_storage()
+
+        for b in bs:
+            if len(b) != self.N:
+                raise ValueError(
+                    f"Bit-string {b} length does not "
+                    f"match number of qubits {self.N}."
+                )
+
+        # get the full wavefunction simplified
+        psi = self.get_psi_simplified(
+            seq=simplify_sequence,
+            atol=simplify_atol,
+            equalize_norms=simplify_equalize_norms,
+        )
+        self._maybe_convert(psi, dtype)
+        site_inds = tuple(map(psi.site_ind, range(self.N)))
+
+        # fixing the bits only changes the arrays of the site tensors
+        psi_bs = [psi.isel(dict(zip(site_inds, b))) for b in bs]
+
+        return tensor_network_contract_batched(
+            psi_bs,
+            output_inds=(),
+            optimize=optimize,
+            backend=backend,
+            check=False,
+        )
+
+    def amplitudes_sliced(
+        self,
+        bs,
+        optimize="greedy",
+        target_size=None,
+        target_slices=None,
+        executor=None,
+        num_tasks=None,
+        checkpoint=None,
+        progbar=False,
+        simplify_sequence="ADCRS",
+        simplify_atol=1e-12,
+        simplify_equalize_norms=True,
+        backend=None,
+        dtype=None,
+    ):
+        r"""Get the amplitude coefficients of many bitstrings ``bs`` at once,
+        executing the slices of the contraction in parallel with
+        ``executor``, and optionally checkpointing the running sum, for very
+        large contractions. The bitstrings are all fixed by projectors
+        sharing a single batch index, so that every slice yields a partial
+        sum of all the amplitudes, and the contraction tree is shared.
+
+        Parameters
+        ----------
+        bs : sequence of str or sequence of sequence of int
+            The bitstrings to compute the transition amplitudes for.
+        optimize : str, PathOptimizer or ContractionTree, optional
+            Contraction path optimizer to use, which may itself slice the
+            contraction, as long as the batch (output) index is not sliced.
+            The batch index is a hyper index joining every projector, which
+            is slow for exhaustive optimizers, so for large circuits a
+            ``cotengra.HyperOptimizer`` is recommended.
+        target_size : int, optional
+            If given, slice the tree until the largest intermediate is at most
+            this size, see :meth:`cotengra.ContractionTree.slice`.
+        target_slices : int, optional
+            If given, slice the tree into at least this many slices.
+        executor : Executor, optional
+            If given, a ``concurrent.futures`` style executor, e.g. a
+            ``ThreadPoolExecutor`` or ``ProcessPoolExecutor``, to contract
+            the slices with.
+        num_tasks : int, optional
+            How many tasks to split the slices into, the running sum is
+            updated and checkpointed as each completes. Defaults to four per
+            worker of ``executor``, or one per slice if no ``executor``.
+        checkpoint : str or path-like, optional
+            A file to save the running sum, completed slices and contraction
+            tree in after each task, and to resume from, if it exists. It is
+            keyed on the geometry and data of the network and the bitstrings.
+        progbar : bool, optional
+            Whether to show progress in terms of slices contracted.
+        simplify_sequence : str, optional
+            Which local tensor network simplifications to perform and in which
+            order, see
+            :meth:`~quimb.tensor.tensor_core.TensorNetwork.full_simplify`.
+        simplify_atol : float, optional
+            The tolerance with which to compare to zero when applying
+            :meth:`~quimb.tensor.tensor_core.TensorNetwork.full_simplify`.
+        simplify_equalize_norms : bool, optional
+            Actively renormalize tensor norms during simplification.
+        backend : str, optional
+            Backend to perform the contraction with, e.g. ``'numpy'``,
             ``'cupy'`` or ``'jax'``. Passed to ``cotengra``.
         dtype : str, optional
             Data type to cast the TN to before contraction.
 
         Returns
         -------
-        dict
-
+        array_like
+            The amplitudes, with shape ``(len(bs),)``.
         """
-        if b == "random":
-            b = "r" * self.N
+        self._maybe_init_storage()
 
-        return self.amplitude(
-            b=b,
-            optimize=optimize,
-            dtype=dtype,
-            rehearse=rehearse,
-            simplify_sequence=simplify_sequence,
-            simplify_atol=simplify_atol,
-            simplify_equalize_norms=simplify_equalize_norms,
+        if len(bs) == 0:
+            return np.zeros(0, dtype=dtype or "complex128")
+
+        bits = np.array([[int(x) for x in b] for b in bs], dtype=int)
+        if bits.shape[1:] != (self.N,):
+            raise ValueError(
+                f"Bit-strings do not all match number of qubits {self.N}."
+            )
+
+        psi = self.get_psi_simplified(
+            seq=simplify_sequence,
+            atol=simplify_atol,
+            equalize_norms=simplify_equalize_norms,
         )
+        self._maybe_convert(psi, dtype)
 
-    amplitude_tn = functools.partialmethod(amplitude_rehearse, rehearse="tn")
+        # canonical index names, so that the tree can be checkpointed
+        symbols = {}
+        for t in psi:
+            for ix in t.inds:
+                symbols.setdefault(ix, get_symbol(len(symbols)))
+        batch_ind = get_symbol(len(symbols))
+
+        inputs = [tuple(symbols[ix] for ix in t.inds) for t in psi]
+        arrays = list(psi.arrays)
+        for i in range(self.N):
+            # project each qubit with a batch of one-hot vectors
+            P = np.eye(2)[bits[:, i]]
+            inputs.append((batch_ind, symbols[psi.site_ind(i)]))
+            arrays.append(self._maybe_convert(P, dtype))
+        output = (batch_ind,)
+        shapes = [tuple(map(int, do("shape", x))) for x in arrays]
+
+        if checkpoint is None:
+            key = None
+        else:
+            # key on the actual data too, so that resuming after e.g. changing
+            # parameters, dtype or simplification options is caught
+            h = hashlib.sha1(
+                pickle.dumps((inputs, shapes, bits.tobytes(), psi.exponent))
+            )
+            for x in arrays:
+                x = np.ascontiguousarray(do("to_numpy", x))
+                h.update(x.dtype.str.encode())
+                h.update(x.tobytes())
+            key = h.hexdigest()
+        acc = _SliceAccumulator(checkpoint, key)
+
+        tree = acc.tree
+        if tree is None:
+            tree = array_contract_tree(
+                inputs,
+                output,
+                shapes=shapes,
+                optimize=maybe_get_cached_tree(
+                    inputs, output, shapes, optimize
+                ),
+            )
+            if (target_size is not None) or (target_slices is not None):
+                tree = tree.slice(
+                    target_size=target_size,
+                    target_slices=target_slices,
+                    allow_outer=False,
+                )
+            if any(not s.inner for s in tree.sliced_inds.values()):
+                raise ValueError("The batch (output) index can't be sliced.")
+            acc.tree = tree
+            acc.save()
+
+        todo = [i for i in range(tree.nslices) if i not in acc.done]
+        if num_tasks is None:
+            if executor is None:
+                num_tasks = len(todo)
+            else:
+                num_tasks = 4 * getattr(executor, "_max_workers", 1)
+        chunksize = max(1, -(-len(todo) // max(1, num_tasks)))
+        chunks = list(partition_all(chunksize, todo))
+
+        if executor is None:
+            results = (
+                (ids, _contract_slices(tree, arrays, ids, backend))
+                for ids in chunks
+            )
+        else:
+            futures = {
+                executor.submit(
+                    _contract_slices, tree, arrays, ids, backend
+                ): (ids)
+                for ids in chunks
+            }
+            results = (
+                (futures[f], f.result())
+                for f in concurrent.futures.as_completed(futures)
+            )
+
+        if progbar:
+            pbar = _progbar(total=tree.nslices, initial=len(acc.done))
+        for ids, x in results:
+            acc.add(ids, x)
+            if progbar:
+                pbar.update(len(ids))
+        if progbar:
+            pbar.close()
+
+        c_bs = acc.total
+        if psi.exponent:
+            c_bs = c_bs * 10**psi.exponent
+        return c_bs
 
     def partial_trace(
         self,
@@ -1900,6 +2691,310 @@ class Circuit:
         local_expectation, rehearse="tn"
     )
 
+    def local_expectation_sweep(
+        self,
+        G,
+        where,
+        params,
+        optimize="auto-hq",
+        simplify_sequence="ADCRS",
+        simplify_atol=1e-12,
+        simplify_equalize_norms=True,
+        backend=None,
+        dtype=None,
+        progbar=False,
+    ):
+        """Compute the local expectation of operator(s) ``G`` on ``where``
+        for each of a sequence of parameter settings, e.g. over a grid for a
+        QAOA energy landscape. Unlike calling
+        :meth:`~quimb.tensor.circuit.Circuit.set_params` and
+        :meth:`~quimb.tensor.circuit.Circuit.local_expectation` repeatedly,
+        the network is only simplified (leaving parametrized gates intact,
+        see ``preserve_params`` in
+        :meth:`~quimb.tensor.circuit.Circuit.get_rdm_lightcone_simplified`)
+        and its contraction compiled once, such that each point only costs
+        the numeric contraction. The parameters of this circuit itself are
+        left unchanged.
+
+        Parameters
+        ----------
+        G : array or sequence[array]
+            The raw operator(s) to find the expectation of.
+        where : int or sequence of int
+            Which qubits the operator acts on.
+        params : iterable[dict]
+            The parameter settings to sweep over, each supplied to
+            :meth:`~quimb.tensor.circuit.Circuit.set_params` in turn, so
+            may be partial updates, and can use named parameters.
+        optimize : str, optional
+            Contraction path optimizer to use, only called once.
+        simplify_sequence : str, optional
+            Which local tensor network simplifications to perform and in which
+            order, see
+            :meth:`~quimb.tensor.tensor_core.TensorNetwork.full_simplify`.
+        simplify_atol : float, optional
+            The tolerance with which to compare to zero when applying
+            :meth:`~quimb.tensor.tensor_core.TensorNetwork.full_simplify`.
+        simplify_equalize_norms : bool, optional
+            Actively renormalize tensor norms during simplification.
+        backend : str, optional
+            Backend to perform the contractions with, e.g. ``'numpy'``,
+            ``'cupy'`` or ``'jax'``. Passed to ``cotengra``.
+        dtype : str, optional
+            Data type to cast the TN to before contraction.
+        progbar : bool, optional
+            Whether to show a progress bar over the parameter settings.
+
+        Returns
+        -------
+        list[scalar] or list[tuple[scalar]]
+        """
+        if isinstance(where, numbers.Integral):
+            where = (where,)
+
+        self._maybe_init_storage()
+
+        fs_opts = {
+            "seq": simplify_sequence,
+            "atol": simplify_atol,
+            "equalize_norms": simplify_equalize_norms,
+        }
+
+        rho = self.get_rdm_lightcone_simplified(
+            where=where, preserve_params=True, **fs_opts
+        )
+        k_inds = tuple(self.ket_site_ind(i) for i in where)
+        b_inds = tuple(self.bra_site_ind(i) for i in where)
+
+        multi = isinstance(G, (list, tuple))
+        if multi:
+            nG = len(G)
+            G_data = do("stack", G)
+            G_data = reshape(G_data, (nG,) + (2,) * 2 * len(where))
+            output_inds = (rand_uuid(),)
+        else:
+            G_data = reshape(G, (2,) * 2 * len(where))
+            output_inds = ()
+
+        rhoG = rho | Tensor(data=G_data, inds=output_inds + b_inds + k_inds)
+        _full_simplify_preserving_params_(rhoG, output_inds, **fs_opts)
+        self._maybe_convert(rhoG, dtype)
+
+        plan = rhoG.compile_contraction(
+            output_inds=output_inds, optimize=optimize, backend=backend
+        )
+
+        # sweep a copy, whose gate tensors the parameters are read from
+        circ = self.copy()
+        param_tags = circ._param_gate_tags()
+        pairs = []
+        for t in rhoG:
+            if isinstance(t, PTensor):
+                (tag,) = (tag for tag in t.tags if tag in param_tags)
+                pairs.append((t, circ._psi[tag]))
+
+        results = []
+        for point in _progbar(params, disable=not progbar):
+            circ.set_params(point)
+            for t, t_src in pairs:
+                t.params = t_src.params
+
+            g_ex = plan(rhoG)
+            if multi:
+                g_ex = tuple(g_ex)
+            results.append(g_ex)
+
+        return results
+
+    def get_local_expectation_groups(self, wheres, max_group_qubits=4):
+        """Cluster the qubit regions ``wheres`` into groups whose reverse
+        lightcones overlap, such that each group can be handled with a single
+        reduced density matrix, of at most ``max_group_qubits`` qubits.
+
+        Regions are processed largest lightcone first, and each joins the
+        existing group that it adds the fewest new gates to, provided it
+        shares at least one gate with it (or lies entirely within its
+        qubits), else it starts a new group.
+
+        Parameters
+        ----------
+        wheres : sequence[int or sequence of int]
+            The regions to group, e.g. the keys of a dict of terms.
+        max_group_qubits : int, optional
+            The maximum number of qubits in any group's reduced density
+            matrix, whose dense size is ``4**max_group_qubits``.
+
+        Returns
+        -------
+        groups : list[tuple[tuple[int], list[tuple[int]]]]
+            Each group as a pair of the sorted qubits of the reduced density
+            matrix and the list of regions it covers.
+        """
+        wheres = [
+            (w,) if isinstance(w, numbers.Integral) else tuple(w)
+            for w in wheres
+        ]
+        cones = {}
+        for w in wheres:
+            if w not in cones:
+                # the initial state is shared by every lightcone
+                cones[w] = set(self.get_reverse_lightcone_tags(w))
+                cones[w].discard("PSI0")
+
+        # each group is [qubits, lightcone tags, regions]
+        groups = []
+        for w in sorted(cones, key=lambda w: -len(cones[w])):
+            cone = cones[w]
+            best = None
+            best_cost = float("inf")
+            for group in groups:
+                qubits, group_cone, _ = group
+                if len(qubits.union(w)) > max_group_qubits:
+                    continue
+                cost = len(cone - group_cone)
+                if (cost < len(cone) or qubits.issuperset(w)) and (
+                    cost < best_cost
+                ):
+                    best, best_cost = group, cost
+
+            if best is None:
+                if len(w) > max_group_qubits:
+                    raise ValueError(
+                        f"Region {w} is larger than "
+                        f"`max_group_qubits={max_group_qubits}`."
+                    )
+                groups.append([set(w), set(cone), [w]])
+            else:
+                best[0].update(w)
+                best[1].update(cone)
+                best[2].append(w)
+
+        return [(tuple(sorted(qubits)), ws) for qubits, _, ws in groups]
+
+    def compute_local_expectation(
+        self,
+        terms,
+        max_group_qubits=4,
+        optimize="auto-hq",
+        simplify_sequence="ADCRS",
+        simplify_atol=1e-12,
+        simplify_equalize_norms=True,
+        backend=None,
+        dtype=None,
+        return_all=False,
+    ):
+        r"""Compute many local expectations at once, e.g. the energy of a
+        sum of Pauli terms. Terms are first clustered by overlapping reverse
+        lightcone (see
+        :meth:`~quimb.tensor.circuit.Circuit.get_local_expectation_groups`),
+        then the reduced density matrix of each group is contracted just once
+        from :meth:`~quimb.tensor.circuit.Circuit.get_rdm_lightcone_simplified`
+        and every term in the group is evaluated as a cheap trace against it:
+
+        .. math::
+
+            \langle G_{\bar{q}} \rangle = Tr[\rho_{\bar{p}} G_{\bar{q}}],
+            \quad \bar{q} \subseteq \bar{p}
+
+        Groups whose simplified networks have the same geometry (as given by
+        :meth:`~quimb.tensor.tensor_core.TensorNetwork.geometry_hash`) reuse
+        the same contraction path, so ``optimize`` is only called once per
+        distinct geometry.
+
+        Parameters
+        ----------
+        terms : dict[int or tuple[int], array]
+            Mapping of qubit region to raw operator acting on it.
+        max_group_qubits : int, optional
+            The maximum number of qubits of each group's reduced density
+            matrix.
+        optimize : str, optional
+            Contraction path optimizer to use for each reduced density matrix.
+        simplify_sequence : str, optional
+            Which local tensor network simplifications to perform and in which
+            order, see
+            :meth:`~quimb.tensor.tensor_core.TensorNetwork.full_simplify`.
+        simplify_atol : float, optional
+            The tolerance with which to compare to zero when applying
+            :meth:`~quimb.tensor.tensor_core.TensorNetwork.full_simplify`.
+        simplify_equalize_norms : bool, optional
+            Actively renormalize tensor norms during simplification.
+        backend : str, optional
+            Backend to perform the contractions with, e.g. ``'numpy'``,
+            ``'cupy'`` or ``'jax'``. Passed to ``cotengra``.
+        dtype : str, optional
+            Data type to cast the TNs to before contraction.
+        return_all : bool, optional
+            Whether to return each expectation individually as a dictionary
+            mapping region to value, rather than their sum.
+
+        Returns
+        -------
+        scalar or dict
+        """
+        terms = {
+            (where,)
+            if isinstance(where, numbers.Integral)
+            else tuple(where): G
+            for where, G in terms.items()
+        }
+        groups = self.get_local_expectation_groups(terms, max_group_qubits)
+
+        # contraction paths, keyed by the geometry of each simplified rdm
+        paths = {}
+        expecs = {}
+
+        for qubits, wheres in groups:
+            rho = self.get_rdm_lightcone_simplified(
+                where=qubits,
+                seq=simplify_sequence,
+                atol=simplify_atol,
+                equalize_norms=simplify_equalize_norms,
+            )
+            self._maybe_convert(rho, dtype)
+
+            output_inds = tuple(map(self.ket_site_ind, qubits)) + tuple(
+                map(self.bra_site_ind, qubits)
+            )
+            key = rho.geometry_hash(
+                output_inds=output_inds, strict_index_order=True
+            )
+            try:
+                tree = rho.contraction_tree(
+                    output_inds=output_inds, optimize=paths[key]
+                )
+            except KeyError:
+                tree = rho.contraction_tree(
+                    output_inds=output_inds, optimize=optimize
+                )
+                paths[key] = tree.get_path()
+
+            rho_dense = rho.contract(
+                all,
+                output_inds=output_inds,
+                optimize=tree,
+                backend=backend,
+            ).data
+
+            for where in wheres:
+                # trace out the qubits of the group not in this term
+                k_inds = [("k", q) for q in qubits]
+                b_inds = [("b", q) if q in where else ("k", q) for q in qubits]
+                G_inds = tuple(("b", q) for q in where) + tuple(
+                    ("k", q) for q in where
+                )
+                G = reshape(terms[where], (2,) * 2 * len(where))
+                expecs[where] = array_contract(
+                    (rho_dense, G),
+                    inputs=(tuple(k_inds + b_inds), G_inds),
+                    output=(),
+                    backend=backend,
+                )
+
+        if return_all:
+            return expecs
+        return sum(expecs.values())
+
     def compute_marginal(
         self,
         where,
@@ -2268,6 +3363,10 @@ class Circuit:
         simplify_sequence="ADCRS",
         simplify_atol=1e-6,
         simplify_equalize_norms=True,
+        executor=None,
+        num_shards=None,
+        store=None,
+        batch=False,
     ):
         r"""Sample the circuit given by ``gates``, ``C`` times, using lightcone
         cancelling and caching marginal distribution results. This is a
@@ -2328,8 +3427,10 @@ class Circuit:
             the cost of higher memory. The marginal themselves will each be
             of size ``2**group_size``.
         max_marginal_storage : int, optional
-            The total cumulative number of marginal probabilites to cache, once
-            this is exceeded caching will be turned off.
+            The total number of marginal probabilites to cache. The marginals
+            are stored in a trie of measurement prefixes, so that samples
+            sharing a prefix share all the marginals along it, and once this
+            is exceeded the least recently used marginals are evicted.
         seed : None or int, optional
             A random seed, passed to ``numpy.random.seed`` if given.
         optimize : str, optional
@@ -2350,11 +3451,58 @@ class Circuit:
             :meth:`~quimb.tensor.tensor_core.TensorNetwork.full_simplify`.
         simplify_equalize_norms : bool, optional
             Actively renormalize tensor norms during simplification.
+        batch : bool, optional
+            Whether to sample all ``C`` shots together, breadth first: the
+            marginal of each distinct prefix is computed exactly once and its
+            shots are split among the outcomes multinomially. This computes
+            far fewer marginals when the output distribution is concentrated,
+            but all the samples are only yielded at the end, in random order.
+        executor : Executor, optional
+            If given, a ``concurrent.futures`` style executor, e.g. a
+            ``ProcessPoolExecutor``, to shard the ``C`` samples across. The
+            simplified lightcone tensor networks are computed once here and
+            shipped to each worker, and any marginals the workers compute are
+            merged back into this circuit's cache. Each shard has an
+            independent random stream spawned from ``seed``, so the samples
+            are reproducible for a fixed ``num_shards``.
+        num_shards : int, optional
+            How many shards to split the samples into when using an
+            ``executor``, defaults to its number of workers.
+        store : str or path-like, optional
+            A directory, e.g. on a node local disk, through which to share
+            the simplified lightcone tensor networks (memory mapped by each
+            worker rather than pickled) and all conditional marginals as soon
+            as any worker computes them. Can also be used without
+            ``executor`` to share marginals between separate runs. Everything
+            is namespaced by a hash of the circuit (including its parameters)
+            and the ``dtype`` and simplification options, so different
+            circuits can safely share the same directory.
 
         Yields
         ------
         bitstrings : sequence of str
         """
+        if executor is not None:
+            yield from self._sample_parallel(
+                C,
+                executor=executor,
+                num_shards=num_shards,
+                store=store,
+                qubits=qubits,
+                order=order,
+                group_size=group_size,
+                max_marginal_storage=max_marginal_storage,
+                seed=seed,
+                batch=batch,
+                optimize=optimize,
+                backend=backend,
+                dtype=dtype,
+                simplify_sequence=simplify_sequence,
+                simplify_atol=simplify_atol,
+                simplify_equalize_norms=simplify_equalize_norms,
+            )
+            return
+
         # init TN norms, contraction trees, and marginals
         self._maybe_init_storage()
 
@@ -2366,36 +3514,38 @@ class Circuit:
         # group the ordering e.g. ((5, 3), (4, 2))
         groups = self._group_order(order, group_size)
 
+        # marginals are cached in a trie of prefixes, bounded in bytes
+        trie = self._marginal_trie
+        trie.max_bytes = 8 * max_marginal_storage
+        trie.evict()
+
+        marginal_opts = {
+            "optimize": optimize,
+            "backend": backend,
+            "dtype": dtype,
+            "simplify_sequence": simplify_sequence,
+            "simplify_atol": simplify_atol,
+            "simplify_equalize_norms": simplify_equalize_norms,
+        }
+
+        if (store is not None) and not isinstance(store, _SampleStore):
+            store = _SampleStore(
+                store, self._get_sample_store_key(**marginal_opts)
+            )
+
+        if batch:
+            yield from self._sample_batch(
+                C, qubits, groups, rng, store, marginal_opts
+            )
+            return
+
         result = dict()
         for _ in range(C):
-            for where in groups:
-                # key - (tuple[int] where, tuple[tuple[int q, str b])
-                # value  - marginal probability distribution of `where` given
-                #     prior results, as an ndarray
-                # e.g. ((2,), ((0, '0'), (1, '0'))): array([1., 0.]), means
-                #     prob(qubit2='0')=1 given qubit0='0' and qubit1='0'
-                #     prob(qubit2='1')=0 given qubit0='0' and qubit1='0'
-                key = (where, tuple(sorted(result.items())))
-                if key not in self._sampled_conditionals:
-                    # compute p(qs=x | current bitstring)
-                    p = self.compute_marginal(
-                        where=where,
-                        fix=result,
-                        optimize=optimize,
-                        backend=backend,
-                        dtype=dtype,
-                        simplify_sequence=simplify_sequence,
-                        simplify_atol=simplify_atol,
-                        simplify_equalize_norms=simplify_equalize_norms,
-                    )
-                    p = do("to_numpy", p).astype("float64")
-                    p /= p.sum()
-
-                    if self._marginal_storage_size <= max_marginal_storage:
-                        self._sampled_conditionals[key] = p
-                        self._marginal_storage_size += p.size
-                else:
-                    p = self._sampled_conditionals[key]
+            node = trie.root
+            for i, where in enumerate(groups):
+                p = self._get_sample_marginal(
+                    node, where, result, store, marginal_opts
+                )
 
                 # the sampled bitstring e.g. '1' or '001010101'
                 b_where = sample_bitstring_from_prob_ndarray(p, seed=rng)
@@ -2404,9 +3554,174 @@ class Circuit:
                 for q, b in zip(where, b_where):
                     result[q] = b
 
+                # descend to the prefix including this result, no marginals
+                # are ever needed after the final group
+                if i < len(groups) - 1:
+                    node = trie.child(node, (where, b_where))
+
             yield "".join(result[i] for i in qubits)
             result.clear()
 
+    def _get_sample_marginal(self, node, where, fix, store, marginal_opts):
+        """Get the marginal distribution of ``where`` conditioned on the
+        measurement results ``fix``, which correspond to prefix ``node`` of
+        the marginal trie, either from the cache, ``store``, or by computing
+        it.
+        """
+        trie = self._marginal_trie
+
+        p = trie.get(node, where)
+        if p is not None:
+            return p
+
+        # maybe another worker has already computed it
+        key = None if store is None else (where, trie.path(node))
+        p = None if store is None else store.load_marginal(key)
+
+        if p is None:
+            # compute p(qs=x | current bitstring)
+            p = self.compute_marginal(where=where, fix=fix, **marginal_opts)
+            p = do("to_numpy", p).astype("float64")
+            p /= p.sum()
+            if store is not None:
+                store.save_marginal(key, p)
+
+        trie.put(node, where, p)
+        return p
+
+    def _sample_batch(self, C, qubits, groups, rng, store, marginal_opts):
+        """Sample breadth first, computing the marginal of each distinct
+        prefix only once and splitting its shots among the outcomes
+        multinomially, see :meth:`sample`.
+        """
+        trie = self._marginal_trie
+
+        # each entry is (trie path, results so far, number of shots), nodes
+        # are only looked up (or recreated) when processed, since evicting
+        # marginals can prune nodes of the frontier in the meantime
+        frontier = [((), {}, C)]
+        for where in groups:
+            new_frontier = []
+            for path, fix, n in frontier:
+                p = self._get_sample_marginal(
+                    trie.node_at(path), where, fix, store, marginal_opts
+                )
+                counts = rng.multinomial(n, p.ravel())
+                for x in np.flatnonzero(counts):
+                    b_where = f"{x:0>{len(where)}b}"
+                    new_frontier.append(
+                        (
+                            (*path, (where, b_where)),
+                            {**fix, **dict(zip(where, b_where))},
+                            counts[x],
+                        )
+                    )
+            frontier = new_frontier
+
+        bitstrings = [
+            "".join(fix[i] for i in qubits) for _, fix, _ in frontier
+        ]
+        counts = [n for _, _, n in frontier]
+
+        # the shots are grouped by outcome -> yield in a random order
+        for i in rng.permutation(np.repeat(np.arange(len(frontier)), counts)):
+            yield bitstrings[i]
+
+    def _sample_parallel(
+        self,
+        C,
+        executor,
+        num_shards=None,
+        store=None,
+        qubits=None,
+        order=None,
+        group_size=10,
+        max_marginal_storage=2**20,
+        seed=None,
+        batch=False,
+        **marginal_opts,
+    ):
+        """Shard ``C`` samples across ``executor``, see :meth:`sample`."""
+        self._maybe_init_storage()
+
+        # fix the ordering here so workers don't each recompute it
+        qubits, order = self._parse_qubits_order(qubits, order)
+        qubits, order = tuple(qubits), tuple(order)
+        groups = self._group_order(order, group_size)
+
+        # the simplified lightcone TNs only depend on which qubits have been
+        #     fixed, not their values -> compute them all once upfront
+        fs_opts = {
+            "seq": marginal_opts["simplify_sequence"],
+            "atol": marginal_opts["simplify_atol"],
+            "equalize_norms": marginal_opts["simplify_equalize_norms"],
+        }
+        region = set()
+        for where in groups:
+            region.update(where)
+            if len(region) == self.N:
+                self.get_psi_simplified(**fs_opts)
+            else:
+                self.get_rdm_lightcone_simplified(
+                    tuple(sorted(region)), **fs_opts
+                )
+
+        if store is not None:
+            if not isinstance(store, _SampleStore):
+                store = _SampleStore(
+                    store, self._get_sample_store_key(**marginal_opts)
+                )
+            # share the TNs via the store rather than pickling them
+            tns = {
+                key: x
+                for key, x in self._storage.items()
+                if isinstance(x, TensorNetwork)
+            }
+            store.save_tns(tns)
+            circ = self.copy()
+            for key in tns:
+                del circ._storage[key]
+        else:
+            circ = self
+
+        if num_shards is None:
+            num_shards = getattr(executor, "_max_workers", None)
+            num_shards = num_shards or os.cpu_count() or 1
+        num_shards = max(1, min(num_shards, C))
+
+        sample_opts = {
+            "qubits": qubits,
+            "order": order,
+            "group_size": group_size,
+            "max_marginal_storage": max_marginal_storage,
+            "batch": batch,
+            **marginal_opts,
+        }
+        seeds = np.random.SeedSequence(seed).spawn(num_shards)
+        fs = [
+            executor.submit(
+                _sample_shard,
+                # each shard gets its own circuit to cache marginals in
+                circ.copy(),
+                C // num_shards + int(i < C % num_shards),
+                seeds[i],
+                store,
+                sample_opts,
+            )
+            for i in range(num_shards)
+        ]
+
+        for f in fs:
+            bitstrings, new = f.result()
+
+            # merge the workers' marginals back into our own cache
+            for (where, path), p in new.items():
+                self._marginal_trie.put(
+                    self._marginal_trie.node_at(path), where, p
+                )
+
+            yield from bitstrings
+
     def sample_rehearse(
         self,
         qubits=None,
@@ -3101,10 +4416,11 @@ class Circuit:
         cache=None,
         cache_maxsize=2**20,
         progbar=False,
+        sliced=False,
         **amplitude_opts,
     ):
         """Compute the linear cross entropy benchmark (XEB) for samples or
-        counts, amplitude per amplitude.
+        counts, amplitude per amplitude, or all at once if ``sliced=True``.
 
         Parameters
         ----------
@@ -3118,23 +4434,38 @@ class Circuit:
             The maximum size of the cache to be used.
         progbar, optional
             Whether to show progress as the bitstrings are iterated over.
+        sliced : bool, optional
+            Whether to compute all the uncached amplitudes in a single batched
+            and sliced contraction, using
+            :meth:`~quimb.tensor.circuit.Circuit.amplitudes_sliced`.
         amplitude_opts
-            Supplied to :meth:`~quimb.tensor.circuit.Circuit.amplitude`.
+            Supplied to :meth:`~quimb.tensor.circuit.Circuit.amplitude`, or
+            :meth:`~quimb.tensor.circuit.Circuit.amplitudes_sliced` if
+            ``sliced=True``.
         """
         try:
             it = samples_or_counts.items()
         except AttributeError:
             it = zip(samples_or_counts, itertools.repeat(1))
 
-        if progbar:
+        if cache is None:
+            cache = LRU(cache_maxsize)
+
+        if sliced:
+            it = tuple(it)
+            bs = tuple({b: None for b, _ in it if b not in cache})
+            if bs:
+                c_bs = self.amplitudes_sliced(
+                    bs, progbar=progbar, **amplitude_opts
+                )
+                for b, c in zip(bs, do("to_numpy", c_bs)):
+                    cache[b] = abs(c) ** 2
+        elif progbar:
             it = _progbar(it)
 
         M = 0
         psum = 0.0
 
-        if cache is None:
-            cache = LRU(cache_maxsize)
-
         for b, cnt in it:
             try:
                 p = cache[b]
@@ -10,6 +10,8 @@ from autoray import (
     backend_like,
     do,
     reshape,
+    shape,
+    size,
 )
 
 import quimb as qu
@@ -998,6 +1000,7 @@ class Gate:
             new._controls = tuple(controls)
         new._round = int(round) if round is not None else round
         new._special = False
+        new._constant = False
         new._parametrize = isinstance(U, ops.PArray)
         new._tag = None
         new._array = U
@@ -1072,9 +1075,14 @@ class Gate:
         round = kwargs.get("round", self._round)
         parametrize = kwargs.get("parametrize", self._parametrize)
 
-        if isinstance(params, str) and (params == "raw"):
+        if isinstance(self._params, str) and (self._params == "raw"):
+            U = self._array
+            if ("params" in kwargs) and isinstance(U, ops.PArray):
+                # raw parametrized gate, e.g. fused, update its array
+                U = U.copy()
+                U.params = params
             return self.from_raw(
-                U=self._array,
+                U=U,
                 qubits=qubits,
                 controls=controls,
                 round=round,
@@ -1286,3 +1294,381 @@ def parse_to_gate(
         round=gate_round,
         parametrize=parametrize,
     )
+
+
+class Channel:
+    r"""A quantum channel acting on ``qubits``, specified by its Kraus
+    operators, which can be placed in the gate stream of the noisy circuit
+    simulators, :class:`~quimb.tensor.circuit.CircuitDensityMatrix` and
+    :class:`~quimb.tensor.circuit.CircuitTrajectories`. The convention is
+    the same as :func:`~quimb.calc.kraus_op`:
+
+    .. math::
+
+        \rho \rightarrow \sum_k E_k \rho E_k^{\dagger}
+
+    Parameters
+    ----------
+    kraus : (K, d, d) array or sequence of K (d, d) arrays
+        The Kraus operators, with ``d = 2**len(qubits)``.
+    qubits : int or sequence of int
+        Which qubits the channel acts on.
+    label : str, optional
+        A name for the channel.
+    round : int, optional
+        If given, which round or layer the channel is part of.
+    check : bool, optional
+        Whether to check ``sum_k(Ek.H @ Ek) == 1``.
+    """
+
+    __slots__ = ("_kraus", "_qubits", "_label", "_round")
+
+    def __init__(self, kraus, qubits, label=None, round=None, check=False):
+        if isinstance(qubits, numbers.Integral):
+            qubits = (qubits,)
+        self._qubits = tuple(qubits)
+        d = 2 ** len(self._qubits)
+
+        self._kraus = np.stack([np.asarray(E) for E in kraus])
+        if self._kraus.shape[1:] != (d, d):
+            raise ValueError(
+                f"Kraus operators of shape {self._kraus.shape[1:]} don't "
+                f"match the {len(self._qubits)} qubit(s) {self._qubits}."
+            )
+        if check:
+            S = np.einsum("kji,kjl->il", self._kraus.conj(), self._kraus)
+            if not np.allclose(S, np.eye(d)):
+                raise ValueError("Did not find ``sum(E_k.H @ Ek) == 1``.")
+
+        self._label = "KRAUS" if label is None else label.upper()
+        self._round = int(round) if round is not None else round
+
+    @property
+    def kraus(self):
+        return self._kraus
+
+    @property
+    def num_kraus(self):
+        return len(self._kraus)
+
+    @property
+    def qubits(self):
+        return self._qubits
+
+    @property
+    def controls(self):
+        return None
+
+    @property
+    def label(self):
+        return self._label
+
+    @property
+    def round(self):
+        return self._round
+
+    def copy_with(self, **kwargs):
+        """Take a copy of this channel but with some attributes changed."""
+        return self.__class__(
+            kraus=kwargs.get("kraus", self._kraus),
+            qubits=kwargs.get("qubits", self._qubits),
+            label=kwargs.get("label", self._label),
+            round=kwargs.get("round", self._round),
+        )
+
+    def superoperator(self):
+        r"""Get the superoperator :math:`\sum_k E_k \otimes E_k^*` of this
+        channel, acting on the vectorized density matrix, with the ket and
+        bra index of each qubit *interleaved*, i.e. ordered like
+        ``(ket_0, bra_0, ket_1, bra_1, ...)``.
+
+        Returns
+        -------
+        array
+            The superoperator, with shape ``(4**k, 4**k)``.
+        """
+        k = len(self._qubits)
+        S = sum(np.kron(E, E.conj()) for E in self._kraus)
+        S = S.reshape((2,) * 4 * k)
+        perm = [x for q in range(k) for x in (q, k + q)]
+        perm += [2 * k + x for x in perm]
+        return S.transpose(perm).reshape(4**k, 4**k)
+
+    def unravelling_probs(self):
+        r"""The state independent probabilities,
+        :math:`p_k = \mathrm{Tr}(E_k^{\dagger} E_k) / d`, with which each
+        Kraus operator (rescaled by :math:`1 / \sqrt{p_k}`) is chosen when
+        unravelling this channel into stochastic trajectories. Averaging over
+        trajectories then reproduces the channel exactly.
+
+        Returns
+        -------
+        array
+        """
+        p = np.einsum("kij,kij->k", self._kraus.conj(), self._kraus).real
+        return p / p.sum()
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__}(label={self._label}, "
+            f"num_kraus={self.num_kraus}, qubits={self._qubits}, "
+            f"round={self._round})>"
+        )
+
+
+def depolarizing_channel(p, qubit, round=None):
+    r"""The single qubit depolarizing channel,
+    :math:`\rho \rightarrow (1 - p) \rho + p I / 2`.
+
+    Parameters
+    ----------
+    p : float
+        The depolarizing probability.
+    qubit : int
+        The qubit to act on.
+    round : int, optional
+        The gate round.
+
+    Returns
+    -------
+    Channel
+    """
+    I, X, Y, Z = (qu.pauli(s) for s in "IXYZ")
+    kraus = [
+        (1 - 3 * p / 4) ** 0.5 * I,
+        (p / 4) ** 0.5 * X,
+        (p / 4) ** 0.5 * Y,
+        (p / 4) ** 0.5 * Z,
+    ]
+    return Channel(kraus, qubit, label="DEPOLARIZE", round=round)
+
+
+def dephasing_channel(p, qubit, round=None):
+    r"""The single qubit dephasing channel,
+    :math:`\rho \rightarrow (1 - p) \rho + p Z \rho Z`.
+
+    Parameters
+    ----------
+    p : float
+        The probability of a phase flip.
+    qubit : int
+        The qubit to act on.
+    round : int, optional
+        The gate round.
+
+    Returns
+    -------
+    Channel
+    """
+    kraus = [(1 - p) ** 0.5 * qu.pauli("I"), p**0.5 * qu.pauli("Z")]
+    return Channel(kraus, qubit, label="DEPHASE", round=round)
+
+
+def amplitude_damping_channel(gamma, qubit, round=None):
+    r"""The single qubit amplitude damping channel, with Kraus operators
+    :math:`E_0 = |0\rangle\langle0| + \sqrt{1 - \gamma}|1\rangle\langle1|`
+    and :math:`E_1 = \sqrt{\gamma} |0\rangle\langle1|`.
+
+    Parameters
+    ----------
+    gamma : float
+        The probability of decaying from ``|1>`` to ``|0>``.
+    qubit : int
+        The qubit to act on.
+    round : int, optional
+        The gate round.
+
+    Returns
+    -------
+    Channel
+    """
+    kraus = [
+        np.array([[1.0, 0.0], [0.0, (1 - gamma) ** 0.5]]),
+        np.array([[0.0, gamma**0.5], [0.0, 0.0]]),
+    ]
+    return Channel(kraus, qubit, label="AMPDAMP", round=round)
+
+
+def _fused_gate_array(arrays, positions, k, like=None):
+    """Multiply the sequence of gate ``arrays``, each acting on qubit
+    ``positions`` out of ``k``, into a single ``(2**k, 2**k)`` matrix.
+    """
+    U = np.eye(2**k, dtype="complex128")
+    if like is not None:
+        U = do("asarray", U, like=like)
+    U = reshape(U, (2,) * (2 * k))
+
+    # U indices are (out_0, ..., out_{k - 1}, in_0, ..., in_{k - 1})
+    uix = [chr(ord("a") + i) for i in range(2 * k)]
+    for G, pos in zip(arrays, positions):
+        m = len(pos)
+        if like is not None:
+            G = do("asarray", G, like=like)
+        G = reshape(G, (2,) * (2 * m))
+        gout = [chr(ord("A") + i) for i in range(m)]
+        gin = [uix[p] for p in pos]
+        new_uix = uix.copy()
+        for p, ix in zip(pos, gout):
+            new_uix[p] = ix
+        eq = f"{''.join(gout + gin)},{''.join(uix)}->{''.join(new_uix)}"
+        U = do("einsum", eq, G, U)
+
+    return reshape(U, (2**k, 2**k))
+
+
+def _fused_param_fn(members, k, params):
+    # members are (array or (fn, size, shape), positions) tuples
+    arrays, positions = [], []
+    i = 0
+    for A, pos in members:
+        if isinstance(A, tuple):
+            fn, n, pshape = A
+            A = fn(reshape(params[i : i + n], pshape))
+            i += n
+        arrays.append(A)
+        positions.append(pos)
+    U = _fused_gate_array(arrays, positions, k, like=params)
+    return reshape(U, (2,) * (2 * k))
+
+
+class _GateBlock:
+    __slots__ = ("qubits", "gates", "fusable")
+
+    def __init__(self, gates, qubits, fusable):
+        self.gates = gates
+        self.qubits = qubits
+        self.fusable = fusable
+
+    def to_gate(self):
+        if len(self.gates) == 1:
+            return self.gates[0]
+
+        qubits = tuple(self.qubits)
+        k = len(qubits)
+        loc = {q: i for i, q in enumerate(qubits)}
+
+        rounds = {g.round for g in self.gates}
+        round = rounds.pop() if len(rounds) == 1 else None
+
+        members = []
+        pparams = []
+        for g in self.gates:
+            pos = tuple(loc[q] for q in g.qubits)
+            A = g.array
+            if isinstance(A, ops.PArray):
+                p = A.params
+                members.append(((A.fn, size(p), shape(p)), pos))
+                pparams.append(do("reshape", p, (-1,)))
+            else:
+                members.append((A, pos))
+
+        if pparams:
+            # fuse symbolically, the parameters of all parametrized
+            #     members are concatenated into the new parameters
+            U = ops.PArray(
+                functools.partial(_fused_param_fn, tuple(members), k),
+                do("concatenate", pparams),
+                shape=(2,) * (2 * k),
+            )
+        else:
+            arrays, positions = zip(*members)
+            U = _fused_gate_array(arrays, positions, k)
+
+        return Gate.from_raw(U, qubits, round=round)
+
+
+def fuse_gates(gates, max_qubits=2, fuse_parametrized=False):
+    """Fuse a sequence of gates into fewer, larger gates, acting on up to
+    ``max_qubits`` qubits each. Consecutive single qubit gates are merged,
+    and absorbed into neighbouring multi-qubit gates, so that a tensor
+    network built from the fused gates has far fewer, but still small,
+    tensors - making simplification, path finding and contraction cheaper.
+    The fused gates are raw gates with array the product of their
+    constituents, special and controlled gates, and noise channels, are never
+    fused.
+
+    Parameters
+    ----------
+    gates : sequence[Gate] or sequence[tuple]
+        The gates to fuse, in the order they are applied.
+    max_qubits : int, optional
+        The maximum number of qubits a fused gate can act on.
+    fuse_parametrized : bool, optional
+        Whether to fuse parametrized gates as well. If ``True`` they are
+        fused symbolically, into a fused gate with an
+        :class:`~quimb.tensor.array_ops.PArray` whose parameters are the
+        concatenated parameters of all its parametrized constituents. If
+        ``False``, they are kept as is, and act as barriers to fusion.
+
+    Returns
+    -------
+    list[Gate]
+    """
+    blocks = []
+    # the index of the latest block acting on each qubit
+    last = {}
+
+    for gate in gates:
+        if isinstance(gate, Channel):
+            # noise channels are never fused, but block their qubits
+            qubits = gate.qubits
+            fusable = False
+        else:
+            gate = parse_to_gate(gate)
+
+            qubits = gate.qubits
+            if gate.controls:
+                qubits = (*gate.controls, *qubits)
+
+            fusable = not (
+                gate.special
+                or gate.controls
+                or (gate.parametrize and not fuse_parametrized)
+                or (len(qubits) > max_qubits)
+            )
+
+        # the previous blocks this gate directly depends on
+        deps = sorted({last[q] for q in qubits if q in last})
+
+        if fusable and deps:
+            new_qubits = dict.fromkeys(qubits)
+            for i in deps:
+                new_qubits.update(dict.fromkeys(blocks[i].qubits))
+
+            if (
+                (len(new_qubits) <= max_qubits)
+                and all(blocks[i].fusable for i in deps)
+                # earlier blocks can only be moved later, to merge with the
+                #     latest, if no other blocks act on their qubits since
+                and all(
+                    last[q] == i for i in deps[:-1] for q in blocks[i].qubits
+                )
+            ):
+                # merge all dependencies, and this gate, into the latest
+                target = blocks[deps[-1]]
+                merged = []
+                for i in deps[:-1]:
+                    merged.extend(blocks[i].gates)
+                    for q in blocks[i].qubits:
+                        last[q] = deps[-1]
+                    blocks[i] = None
+                target.gates[:0] = merged
+                target.gates.append(gate)
+                target.qubits = tuple(new_qubits)
+                for q in qubits:
+                    last[q] = deps[-1]
+                continue
+
+        blocks.append(_GateBlock([gate], tuple(qubits), fusable))
+        for q in qubits:
+            last[q] = len(blocks) - 1
+
+    return [block.to_gate() for block in blocks if block is not None]
+
+
+def _parse_fuse_opts(fuse):
+    if isinstance(fuse, dict):
+        return fuse
+    if fuse is True:
+        return {}
+    return {"max_qubits": int(fuse)}
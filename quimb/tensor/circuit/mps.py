@@ -16,7 +16,132 @@ from ..tensor_builder import (
 )
 from ..tnag.core import TensorNetworkGenVector
 from .exact import Circuit
-from .gates import parse_to_gate
+from .gates import Channel, _parse_fuse_opts, fuse_gates, parse_to_gate
+
+
+def _parse_multi_qubit_gates(gates):
+    """Get the qubits of every gate acting on two or more qubits (including
+    controls), ignoring channels and any other entries.
+    """
+    for gate in gates:
+        if isinstance(gate, Channel):
+            continue
+        gate = parse_to_gate(gate)
+        qubits = (*(gate.controls or ()), *gate.qubits)
+        if len(qubits) >= 2:
+            yield qubits
+
+
+def count_mps_swaps(gates, qubit_order=None, swap_back=True):
+    """Count the number of swaps needed to apply ``gates`` to an MPS, with
+    the qubits laid out along the chain in ``qubit_order``, using
+    'swap+split' for the multi-qubit gates.
+
+    Parameters
+    ----------
+    gates : sequence of Gate or tuple
+        The gates, in any form accepted by
+        :func:`~quimb.tensor.circuit.parse_to_gate`.
+    qubit_order : sequence of int, optional
+        The qubit at each site of the MPS, by default ``range(N)``.
+    swap_back : bool, optional
+        Whether the qubits are swapped back after each gate, or the layout
+        is instead updated, as for :class:`CircuitPermMPS`.
+
+    Returns
+    -------
+    int
+    """
+    gates = tuple(_parse_multi_qubit_gates(gates))
+    if qubit_order is None:
+        N = 1 + max((max(qs) for qs in gates), default=-1)
+        qubit_order = range(N)
+    layout = list(qubit_order)
+    site_of = {q: i for i, q in enumerate(layout)}
+
+    nswaps = 0
+    for qubits in gates:
+        sites = sorted(site_of[q] for q in qubits)
+        nswaps += sites[-1] - sites[0] + 1 - len(sites)
+        if not swap_back and len(sites) == 2:
+            i, j = sites
+            layout.insert(i + 1, layout.pop(j))
+            site_of = {q: i for i, q in enumerate(layout)}
+
+    if swap_back:
+        nswaps *= 2
+    return nswaps
+
+
+def calc_mps_qubit_ordering(gates, N=None, max_passes=16):
+    """Find an ordering of the qubits along an MPS that minimizes the number
+    of swaps needed to apply ``gates`` (see :func:`count_mps_swaps`). The
+    ordering with the lowest total gate distance out of the identity and
+    spectral (Fiedler vector) orderings of the interaction graph is refined
+    by repeatedly moving single qubits to their best position.
+
+    Parameters
+    ----------
+    gates : sequence of Gate or tuple
+        The gates, in any form accepted by
+        :func:`~quimb.tensor.circuit.parse_to_gate`.
+    N : int, optional
+        The number of qubits, by default inferred from ``gates``.
+    max_passes : int, optional
+        The maximum number of refinement sweeps over all the qubits.
+
+    Returns
+    -------
+    tuple[int]
+        The qubit to place at each site of the MPS.
+    """
+    weights = {}
+    for qubits in _parse_multi_qubit_gates(gates):
+        qubits = sorted(qubits)
+        for a, b in zip(qubits[:-1], qubits[1:]):
+            weights[a, b] = weights.get((a, b), 0) + 1
+
+    if N is None:
+        N = 1 + max((max(ab) for ab in weights), default=-1)
+
+    if not weights:
+        return tuple(range(N))
+
+    A, B = map(np.array, zip(*weights))
+    W = np.array(tuple(weights.values()))
+
+    def cost(order):
+        pos = np.empty(N, dtype=int)
+        pos[order] = np.arange(N)
+        return W @ np.abs(pos[A] - pos[B])
+
+    # spectral ordering of the weighted interaction graph
+    L = np.zeros((N, N))
+    np.add.at(L, (A, B), -W)
+    np.add.at(L, (B, A), -W)
+    L[np.diag_indices(N)] = -L.sum(axis=1)
+    _, V = np.linalg.eigh(L)
+
+    order = min(
+        (list(range(N)), list(np.argsort(V[:, 1], kind="stable"))),
+        key=cost,
+    )
+    best = cost(order)
+
+    for _ in range(max_passes):
+        improved = False
+        for q in range(N):
+            others = [x for x in order if x != q]
+            cands = [others[:i] + [q] + others[i:] for i in range(N)]
+            costs = [cost(c) for c in cands]
+            i = int(np.argmin(costs))
+            if costs[i] < best:
+                order, best = cands[i], costs[i]
+                improved = True
+        if not improved:
+            break
+
+    return tuple(map(int, order))
 
 
 class CircuitMPS(Circuit):
@@ -38,6 +163,21 @@ class CircuitMPS(Circuit):
     cutoff : float, optional
         The singular value cutoff to use when truncating the state.
         This is simply a shortcut for setting ``gate_opts['cutoff']``.
+    target_fidelity : float, optional
+        If given, choose the truncation of each multi-qubit gate adaptively,
+        such that the estimated fidelity of the final state is
+        ``target_fidelity``, by spreading the remaining budget evenly over
+        the remaining gates of each :meth:`apply_gates` call. Each split is
+        then truncated with the ``'rsum2'`` cutoff mode, i.e. discarding
+        at most a fixed fraction of the norm squared, subject still to
+        ``max_bond``. Gates applied individually use ``cutoff`` as usual.
+    qubit_order : sequence of int or "auto", optional
+        The qubit to place at each site of the MPS. If ``"auto"``, the
+        ordering is computed from the first batch of gates supplied to
+        :meth:`apply_gates` (e.g. with :meth:`from_gates`) to minimize the
+        number of swaps, see :func:`calc_mps_qubit_ordering`. The qubit
+        ordering is tracked in the attribute ``qubits`` and undone by
+        ``psi`` and the other methods, but not by ``get_psi_unordered``.
     gate_opts : dict, optional
         Default options to pass to each gate, for example, "max_bond" and
         "cutoff" etc.
@@ -96,6 +236,8 @@ class CircuitMPS(Circuit):
         psi0=None,
         max_bond=None,
         cutoff=1e-10,
+        target_fidelity=None,
+        qubit_order=None,
         gate_opts=None,
         gate_contract="auto-mps",
         dtype=None,
@@ -121,10 +263,99 @@ class CircuitMPS(Circuit):
 
         super().__init__(N, psi0, gate_opts, **circuit_opts)
 
+        self.target_fidelity = target_fidelity
+        self._num_budget_gates = None
+
+        self._auto_qubit_order = isinstance(qubit_order, str)
+        if self._auto_qubit_order:
+            if qubit_order != "auto":
+                raise ValueError(f"Unknown qubit_order {qubit_order!r}.")
+            qubit_order = None
+        if qubit_order is None:
+            qubit_order = range(self.N)
+        self.qubits = list(qubit_order)
+        if sorted(self.qubits) != list(range(self.N)):
+            raise ValueError(
+                f"qubit_order {self.qubits} isn't a permutation of the "
+                f"{self.N} qubits."
+            )
+
     def _init_state(self, N, dtype="complex128"):
         return MPS_computational_state("0" * N, dtype=dtype)
 
-    def apply_gates(self, gates, progbar=False, **gate_opts):
+    def copy(self):
+        new = super().copy()
+        new.target_fidelity = self.target_fidelity
+        new._num_budget_gates = self._num_budget_gates
+        new._auto_qubit_order = self._auto_qubit_order
+        new.qubits = list(self.qubits)
+        return new
+
+    def _is_permuted(self):
+        return any(i != q for i, q in enumerate(self.qubits))
+
+    def _get_budget_gate_opts(self, sites, gate_opts):
+        """Get the cutoff options for the multi-qubit gate acting on MPS
+        ``sites``, spreading the remaining fidelity budget evenly over this
+        and the remaining gates, and over each split this gate requires.
+        """
+        self._num_budget_gates -= 1
+        n = self._num_budget_gates + 1
+        f = self.fidelity_estimate()
+        if f > self.target_fidelity:
+            eps = 1 - (self.target_fidelity / f) ** (1 / n)
+        else:
+            eps = 0.0
+
+        # the number of truncated bonds: each swap and the final split
+        span = max(sites) - min(sites)
+        if len(sites) == 2:
+            swap_back = {**self.gate_opts, **gate_opts}.get("swap_back", True)
+            nsplits = 1 + (span - 1) * (2 if swap_back else 1)
+        else:
+            nsplits = span
+
+        return {"cutoff": eps / nsplits, "cutoff_mode": "rsum2"}
+
+    def _apply_gate(self, gate, tags=None, **gate_opts):
+        if self._is_permuted():
+            # translate the gate's logical qubits to their MPS sites
+            site_of = {q: i for i, q in enumerate(self.qubits)}
+            gate = gate.copy_with(
+                qubits=tuple(site_of[q] for q in gate.qubits),
+                controls=(
+                    None
+                    if gate.controls is None
+                    else tuple(site_of[q] for q in gate.controls)
+                ),
+            )
+
+        if (self._num_budget_gates is not None) and (
+            gate.total_qubit_count >= 2
+        ):
+            sites = (*(gate.controls or ()), *gate.qubits)
+            gate_opts = {
+                **self._get_budget_gate_opts(sites, gate_opts),
+                **gate_opts,
+            }
+
+        super()._apply_gate(gate, tags=tags, **gate_opts)
+
+    def apply_gates(self, gates, progbar=False, fuse=False, **gate_opts):
+        if fuse:
+            gates = fuse_gates(gates, **_parse_fuse_opts(fuse))
+
+        if self._auto_qubit_order and (self.num_gates == 0):
+            gates = tuple(gates)
+            self.qubits = list(calc_mps_qubit_ordering(gates, N=self.N))
+            self._auto_qubit_order = False
+
+        if self.target_fidelity is not None:
+            gates = tuple(gates)
+            self._num_budget_gates = sum(
+                1 for _ in _parse_multi_qubit_gates(gates)
+            )
+
         if progbar:
             from ...utils import progbar as _progbar
 
@@ -136,6 +367,10 @@ class CircuitMPS(Circuit):
             )
 
         for gate in gates:
+            if isinstance(gate, Channel):
+                self.apply_channel(gate, **gate_opts)
+                continue
+
             gate = parse_to_gate(gate)
             self._apply_gate(gate, **gate_opts)
 
@@ -146,14 +381,48 @@ class CircuitMPS(Circuit):
                     f"error~={self.error_estimate():.3g}"
                 )
 
+        self._num_budget_gates = None
+
+    def _relabel_to_qubits(self, psi):
+        """Reindex and retag ``psi`` inplace from MPS sites to qubits."""
+        if self._is_permuted():
+            psi.view_as_(TensorNetworkGenVector)
+            psi.reindex_(
+                {
+                    psi.site_ind(i): psi.site_ind(q)
+                    for i, q in enumerate(self.qubits)
+                }
+            )
+            psi.retag_(
+                {
+                    psi.site_tag(i): psi.site_tag(q)
+                    for i, q in enumerate(self.qubits)
+                }
+            )
+        return psi
+
     @property
     def psi(self):
         # no squeeze so that bond dims of 1 preserved
-        psi = self._psi.copy()
+        psi = self._relabel_to_qubits(self._psi.copy())
         if not self.convert_eager:
             self._maybe_convert(psi)
         return psi
 
+    def get_psi_unordered(self):
+        """Return the MPS representing the state but without reordering the
+        sites.
+        """
+        return self._psi.copy()
+
+    def get_psi_simplified(
+        self, seq="ADCRS", atol=1e-12, equalize_norms=False
+    ):
+        psi = super().get_psi_simplified(
+            seq=seq, atol=atol, equalize_norms=equalize_norms
+        )
+        return self._relabel_to_qubits(psi)
+
     @property
     def uni(self):
         raise ValueError(
@@ -161,11 +430,11 @@ class CircuitMPS(Circuit):
         )
 
     def calc_qubit_ordering(self, qubits=None):
-        """MPS already has a natural ordering."""
+        """MPS already has a natural ordering, given by ``qubits``."""
         if qubits is None:
-            return tuple(range(self.N))
+            return tuple(self.qubits)
         else:
-            return tuple(sorted(qubits))
+            return tuple(sorted(qubits, key=self.qubits.index))
 
     def get_psi_reverse_lightcone(self, where, keep_psi0=False):
         """Override ``get_psi_reverse_lightcone`` as for an MPS the lightcone
@@ -222,8 +491,16 @@ class CircuitMPS(Circuit):
         else:
             psi = self._psi
 
+        if not self._is_permuted():
+            for config, _ in psi.sample(C, seed=seed):
+                yield "".join(map(str, config))
+            return
+
+        # configurations are sampled in site order, so invert the
+        # site-to-qubit mapping for logical bitstring output
+        site_of = {q: i for i, q in enumerate(self.qubits)}
         for config, _ in psi.sample(C, seed=seed):
-            yield "".join(map(str, config))
+            yield "".join(str(config[site_of[i]]) for i in range(self.N))
 
     def fidelity_estimate(self):
         r"""Estimate the fidelity of the current state based on its norm, which
@@ -317,6 +594,12 @@ class CircuitMPS(Circuit):
         else:
             psi = self._psi
 
+        # translate logical qubit(s) to their MPS site(s)
+        if isinstance(where, numbers.Integral):
+            where = self.qubits.index(where)
+        else:
+            where = tuple(self.qubits.index(w) for w in where)
+
         return psi.local_expectation_canonical(
             G,
             where,
@@ -350,96 +633,17 @@ class CircuitPermMPS(CircuitMPS):
         # this is used to pass around the canonical form
         gate_opts.setdefault("info", {})
         super().__init__(N, psi0=psi0, gate_opts=gate_opts, **circuit_opts)
-        # keep track of the current qubit ordering
-        self.qubits = list(range(self.N))
 
     def _apply_gate(self, gate, tags=None, **gate_opts):
-        # first translate gate qubits to their current 'physical' location
-        qubits = gate.qubits
-        phys_sites = [self.qubits.index(q) for q in qubits]
-        gate = gate.copy_with(qubits=phys_sites)
-
-        # if the gate is non-local, account for swap (without swap back)
-        if len(phys_sites) == 2:
-            i, j = sorted(phys_sites)
-            q = self.qubits.pop(j)
-            self.qubits.insert(i + 1, q)
-            gate_opts["swap_back"] = False
+        if len(gate.qubits) != 2:
+            return super()._apply_gate(gate, tags=tags, **gate_opts)
 
+        # the gate is possibly non-local, account for swap (without swap
+        # back), the qubits are translated to sites by the parent class
+        i, j = sorted(self.qubits.index(q) for q in gate.qubits)
+        gate_opts["swap_back"] = False
         super()._apply_gate(gate, tags=tags, **gate_opts)
-
-    def calc_qubit_ordering(self, qubits=None):
-        """Given by the current qubit permutation."""
-        if qubits is None:
-            return tuple(self.qubits)
-        else:
-            return tuple(sorted(qubits, key=self.qubits.index))
-
-    def get_psi_unordered(self):
-        """Return the MPS representing the state but without reordering the
-        sites.
-        """
-        return self._psi.copy()
-
-    def sample(
-        self,
-        C,
-        seed=None,
-        dtype=None,
-    ):
-        """Sample the PermMPS circuit ``C`` times.
-
-        Parameters
-        ----------
-        C : int
-            The number of samples to generate.
-        seed : None, int, or generator, optional
-            A random seed or generator to use for reproducibility.
-
-        Yields
-        ------
-        str
-            The next sample bitstring.
-        """
-        if dtype is not None or not self.convert_eager:
-            psi = self._psi.copy()
-            self._maybe_convert(psi, dtype)
-        else:
-            psi = self._psi
-
-        # configurations are sampled in physical order, so invert the current
-        # physical-site-to-logical-qubit mapping for logical bitstring output
-        site_from_qubit = {
-            qubit: site for site, qubit in enumerate(self.qubits)
-        }
-        for config, _ in psi.sample(C, seed=seed):
-            yield "".join(
-                str(config[site_from_qubit[i]]) for i in range(self.N)
-            )
-
-    @property
-    def psi(self):
-        # need to reindex and retag the MPS
-        psi = self._psi.copy()
-
-        psi.view_as_(TensorNetworkGenVector)
-        psi.reindex_(
-            {
-                psi.site_ind(i): psi.site_ind(q)
-                for i, q in enumerate(self.qubits)
-            }
-        )
-        psi.retag_(
-            {
-                psi.site_tag(i): psi.site_tag(q)
-                for i, q in enumerate(self.qubits)
-            }
-        )
-
-        if not self.convert_eager:
-            self._maybe_convert(psi)
-
-        return psi
+        self.qubits.insert(i + 1, self.qubits.pop(j))
 
     def to_dense(
         self, reverse=False, optimize="auto-hq", backend=None, dtype=None
@@ -475,15 +679,6 @@ class CircuitPermMPS(CircuitMPS):
             all, output_inds=(), optimize=optimize, backend=backend
         )
 
-    def local_expectation(self, G, where, *args, **kwargs):
-        # translate logical qubit(s) to their current physical site(s), since
-        # the underlying MPS is stored in permuted (physical) order
-        if isinstance(where, numbers.Integral):
-            where = self.qubits.index(where)
-        else:
-            where = tuple(self.qubits.index(w) for w in where)
-        return super().local_expectation(G, where, *args, **kwargs)
-
 
 class CircuitMPSLazy(CircuitMPS):
     """Quantum circuit simulation keeping the state always in an MPS form, but
@@ -601,6 +796,16 @@ class CircuitMPSLazy(CircuitMPS):
         self._uncompressed_sites = dict()
         self.compress_every = compress_every
 
+        if (
+            self._is_permuted()
+            or self._auto_qubit_order
+            or (self.target_fidelity is not None)
+        ):
+            raise ValueError(
+                "`qubit_order` and `target_fidelity` are not supported by "
+                f"{self.__class__.__name__}."
+            )
+
     @property
     def max_bond(self):
         return self.compress_opts.get("max_bond", None)
@@ -0,0 +1,461 @@
+"""Noisy circuit simulators, either evolving the density matrix as a doubled
+network (``CircuitDensityMatrix``, ``CircuitDensityMatrixMPS``), or
+unravelling channels into batches of stochastic trajectories
+(``CircuitTrajectories``).
+"""
+
+import numbers
+
+import numpy as np
+from autoray import do, reshape, to_numpy
+
+from .. import array_ops as ops
+from ..contraction import ContractionPlan
+from ..tensor_core import Tensor, rand_uuid
+from .exact import Circuit, _full_simplify_preserving_params_
+from .gates import Channel, Gate
+from .mps import CircuitMPS
+
+
+def _parse_to_channel(channel, qubits, gate_round=None):
+    if isinstance(channel, Channel):
+        if qubits or (gate_round is not None):
+            raise ValueError(
+                "You cannot specify ``qubits`` or ``gate_round`` for an "
+                "already encapsulated `Channel` object."
+            )
+        return channel
+    return Channel(channel, qubits, round=gate_round)
+
+
+class _DensityMatrixMixin:
+    """Evolve the density matrix of ``N`` qubits as the vectorized state of
+    ``2N`` sites, with the ket and bra index of qubit ``q`` on sites ``2q``
+    and ``2q + 1`` respectively. A unitary gate ``U`` is applied as ``U`` to
+    the ket sites and ``U*`` to the bra sites, and a channel as its
+    superoperator on both.
+    """
+
+    def __init__(self, N, **circuit_opts):
+        self.num_qubits = N
+        super().__init__(2 * N, **circuit_opts)
+
+    def copy(self):
+        new = super().copy()
+        new.num_qubits = self.num_qubits
+        return new
+
+    def _apply_gate(self, gate, tags=None, **gate_opts):
+        if gate.parametrize:
+            raise ValueError(
+                "Parametrized gates are not supported when evolving a "
+                "density matrix, since the ket and bra copies of the gate "
+                "would need tied parameters."
+            )
+
+        ket_qubits = tuple(2 * q for q in gate.qubits)
+        bra_qubits = tuple(2 * q + 1 for q in gate.qubits)
+        if gate.controls:
+            ket_controls = tuple(2 * q for q in gate.controls)
+            bra_controls = tuple(2 * q + 1 for q in gate.controls)
+        else:
+            ket_controls = bra_controls = None
+
+        if gate.special:
+            # permutations, e.g. swap, are real
+            ket = gate.copy_with(qubits=ket_qubits, controls=ket_controls)
+            bra = gate.copy_with(qubits=bra_qubits, controls=bra_controls)
+        else:
+            ket = gate.copy_with(qubits=ket_qubits, controls=ket_controls)
+            bra = Gate.from_raw(
+                do("conj", gate.array), bra_qubits, bra_controls, gate.round
+            )
+
+        super()._apply_gate(ket, tags=tags, **gate_opts)
+        super()._apply_gate(bra, tags=tags, **gate_opts)
+
+    def apply_channel(self, channel, *qubits, gate_round=None, **gate_opts):
+        channel = _parse_to_channel(channel, qubits, gate_round)
+        sites = tuple(x for q in channel.qubits for x in (2 * q, 2 * q + 1))
+        gate = Gate.from_raw(
+            channel.superoperator(), sites, round=channel.round
+        )
+        super()._apply_gate(gate, tags=channel.label, **gate_opts)
+
+    apply_channel.__doc__ = Circuit.apply_channel.__doc__
+
+    def _get_rho_tn(self, keep=()):
+        # trace out every qubit not in ``keep`` by joining its ket and bra
+        rho = self.psi
+        rho.reindex_(
+            {
+                self.ket_site_ind(2 * q + 1): self.ket_site_ind(2 * q)
+                for q in range(self.num_qubits)
+                if q not in keep
+            }
+        )
+        k_inds = tuple(self.ket_site_ind(2 * q) for q in keep)
+        b_inds = tuple(self.ket_site_ind(2 * q + 1) for q in keep)
+        return rho, k_inds, b_inds
+
+    def trace(self, optimize="auto-hq", backend=None):
+        """Compute the trace of the density matrix, which should be one."""
+        rho, _, _ = self._get_rho_tn()
+        return rho.contract(
+            all, output_inds=(), optimize=optimize, backend=backend
+        )
+
+    def to_dense(self, optimize="auto-hq", backend=None):
+        """Generate the dense density matrix of this circuit.
+
+        Returns
+        -------
+        array
+            The density matrix, with shape ``(2**N, 2**N)``.
+        """
+        N = self.num_qubits
+        rho, k_inds, b_inds = self._get_rho_tn(keep=range(N))
+        rho_dense = rho.contract(
+            all,
+            output_inds=k_inds + b_inds,
+            optimize=optimize,
+            backend=backend,
+        ).data
+        return ops.reshape(rho_dense, [2**N, 2**N])
+
+    def local_expectation(
+        self,
+        G,
+        where,
+        optimize="auto-hq",
+        simplify_sequence="ADCRS",
+        simplify_atol=1e-12,
+        simplify_equalize_norms=True,
+        backend=None,
+        dtype=None,
+    ):
+        r"""Compute the expectation, :math:`\mathrm{Tr}(\rho G)`, of operator
+        ``G`` acting on qubits ``where``. All other qubits are traced out by
+        joining the ket and bra index of each.
+
+        Parameters
+        ----------
+        G : array or sequence[array]
+            The raw operator(s) to find the expectation of.
+        where : int or sequence of int
+            Which qubits the operator acts on.
+        optimize : str, optional
+            Contraction path optimizer to use.
+        simplify_sequence : str, optional
+            Which local tensor network simplifications to perform and in which
+            order, see
+            :meth:`~quimb.tensor.tensor_core.TensorNetwork.full_simplify`.
+        simplify_atol : float, optional
+            The tolerance with which to compare to zero when applying
+            :meth:`~quimb.tensor.tensor_core.TensorNetwork.full_simplify`.
+        simplify_equalize_norms : bool, optional
+            Actively renormalize tensor norms during simplification.
+        backend : str, optional
+            Backend to perform the contraction with, e.g. ``'numpy'``,
+            ``'cupy'`` or ``'jax'``. Passed to ``cotengra``.
+        dtype : str, optional
+            Data type to cast the TN to before contraction.
+
+        Returns
+        -------
+        scalar or tuple[scalar]
+        """
+        if isinstance(where, numbers.Integral):
+            where = (where,)
+
+        rho, k_inds, b_inds = self._get_rho_tn(keep=where)
+
+        if isinstance(G, (list, tuple)):
+            nG = len(G)
+            G_data = do("stack", G)
+            G_data = reshape(G_data, (nG,) + (2,) * 2 * len(where))
+            output_inds = (rand_uuid(),)
+        else:
+            G_data = reshape(G, (2,) * 2 * len(where))
+            output_inds = ()
+
+        rhoG = rho | Tensor(data=G_data, inds=output_inds + b_inds + k_inds)
+        rhoG.full_simplify_(
+            seq=simplify_sequence,
+            atol=simplify_atol,
+            equalize_norms=simplify_equalize_norms,
+            output_inds=output_inds,
+        )
+        self._maybe_convert(rhoG, dtype)
+
+        g_ex = rhoG.contract(
+            all,
+            output_inds=output_inds,
+            optimize=optimize,
+            backend=backend,
+        )
+        if isinstance(g_ex, Tensor):
+            g_ex = tuple(g_ex.data)
+        return g_ex
+
+    def __repr__(self):
+        r = "<{}(n={}, num_gates={}, gate_opts={})>"
+        return r.format(
+            self.__class__.__name__,
+            self.num_qubits,
+            self.num_gates,
+            self.gate_opts,
+        )
+
+
+class CircuitDensityMatrix(_DensityMatrixMixin, Circuit):
+    """Noisy quantum circuit simulation, evolving the full density matrix as
+    a doubled tensor network. The density matrix of ``N`` qubits is stored
+    as a vectorized state on ``2N`` sites, with the ket and bra index of
+    qubit ``q`` on sites ``2q`` and ``2q + 1``. Unitary gates act on both,
+    and noise is supplied as :class:`~quimb.tensor.circuit.Channel` objects
+    (e.g. from :func:`~quimb.tensor.circuit.depolarizing_channel`), either
+    with :meth:`apply_channel` or directly in the gate stream of
+    :meth:`apply_gates`, where they are applied as superoperators.
+
+    Since the underlying network is the vectorized density matrix, use the
+    methods :meth:`local_expectation`, :meth:`to_dense` and :meth:`trace`
+    here, rather than those which assume a pure state.
+
+    Parameters
+    ----------
+    N : int
+        The number of qubits.
+    circuit_opts
+        Supplied to :class:`~quimb.tensor.circuit.Circuit`.
+    """
+
+
+class CircuitDensityMatrixMPS(_DensityMatrixMixin, CircuitMPS):
+    """Noisy quantum circuit simulation, evolving the full density matrix as
+    a doubled matrix product state, with the ket and bra index of each qubit
+    on neighbouring sites. See
+    :class:`~quimb.tensor.circuit.CircuitDensityMatrix` for details, and
+    :class:`~quimb.tensor.circuit.CircuitMPS` for the truncation options.
+
+    Parameters
+    ----------
+    N : int
+        The number of qubits.
+    circuit_opts
+        Supplied to :class:`~quimb.tensor.circuit.CircuitMPS`.
+    """
+
+
+class CircuitTrajectories(Circuit):
+    r"""Noisy quantum circuit simulation by unravelling each
+    :class:`~quimb.tensor.circuit.Channel` into stochastic trajectories. In
+    each trajectory, Kraus operator :math:`E_k` of a channel is chosen with
+    the state independent probability
+    :math:`p_k = \mathrm{Tr}(E_k^{\dagger} E_k) / d` and applied as
+    :math:`E_k / \sqrt{p_k}`, such that averaging over trajectories gives
+    unbiased estimates of the noisy expectations. Because the choice doesn't
+    depend on the state, every trajectory shares the same network, and many
+    of them are contracted in a single batched contraction, with the channel
+    tensors stacked along a batch index.
+
+    Channels are kept as single tensors, tagged ``CHANNEL_{i}``, where ``i``
+    is their gate number. Use :meth:`local_expectation` to estimate
+    expectations - other methods treat each channel as its first (rescaled)
+    Kraus operator.
+
+    Parameters
+    ----------
+    N : int, optional
+        The number of qubits.
+    psi0 : TensorNetwork1DVector, optional
+        The initial state, assumed to be ``|00000....0>`` if not given.
+    gate_opts : dict, optional
+        Default options to pass to each gate.
+    circuit_opts
+        Supplied to :class:`~quimb.tensor.circuit.Circuit`.
+    """
+
+    def __init__(self, N=None, psi0=None, gate_opts=None, **circuit_opts):
+        super().__init__(N, psi0, gate_opts, **circuit_opts)
+        self._channels = {}
+
+    def copy(self):
+        new = super().copy()
+        new._channels = self._channels.copy()
+        return new
+
+    def channel_tag(self, i):
+        """Get the tag for the channel applied as gate number ``i``."""
+        return f"CHANNEL_{i}"
+
+    def apply_channel(self, channel, *qubits, gate_round=None, **gate_opts):
+        channel = _parse_to_channel(channel, qubits, gate_round)
+        i = self.num_gates
+        self._channels[i] = channel
+
+        # place the first rescaled kraus operator, as a single tensor, so
+        #     that it can be swapped for any other in each trajectory
+        p0 = channel.unravelling_probs()[0]
+        gate = Gate.from_raw(
+            channel.kraus[0] / p0**0.5, channel.qubits, round=channel.round
+        )
+        gate_opts["contract"] = False
+        self._apply_gate(
+            gate, tags=(channel.label, self.channel_tag(i)), **gate_opts
+        )
+
+    apply_channel.__doc__ = Circuit.apply_channel.__doc__
+
+    @property
+    def num_channels(self):
+        return len(self._channels)
+
+    def local_expectation(
+        self,
+        G,
+        where,
+        num_trajectories=1024,
+        batch_size=256,
+        seed=None,
+        optimize="auto-hq",
+        simplify_sequence="ADCRS",
+        simplify_atol=1e-12,
+        simplify_equalize_norms=True,
+        backend=None,
+        dtype=None,
+        return_std_err=False,
+    ):
+        r"""Estimate the noisy expectation, :math:`\mathrm{Tr}(\rho G)`, of
+        operator ``G`` acting on qubits ``where``, by averaging
+        :math:`\langle \psi_t | G | \psi_t \rangle` over
+        ``num_trajectories`` trajectories :math:`t`. Only the reverse
+        lightcone of ``where`` is kept, and its network simplified and its
+        contraction compiled just once, with ``batch_size`` trajectories
+        then contracted at a time.
+
+        Parameters
+        ----------
+        G : array
+            The raw operator to find the expectation of.
+        where : int or sequence of int
+            Which qubits the operator acts on.
+        num_trajectories : int, optional
+            The total number of trajectories to average over.
+        batch_size : int, optional
+            How many trajectories to contract at once.
+        seed : None, int or numpy.random.Generator, optional
+            The random seed or generator to use.
+        optimize : str, optional
+            Contraction path optimizer to use for the batched contraction.
+        simplify_sequence : str, optional
+            Which local tensor network simplifications to perform and in which
+            order, see
+            :meth:`~quimb.tensor.tensor_core.TensorNetwork.full_simplify`.
+        simplify_atol : float, optional
+            The tolerance with which to compare to zero when applying
+            :meth:`~quimb.tensor.tensor_core.TensorNetwork.full_simplify`.
+        simplify_equalize_norms : bool, optional
+            Actively renormalize tensor norms during simplification.
+        backend : str, optional
+            Backend to perform the contraction with, e.g. ``'numpy'``,
+            ``'cupy'`` or ``'jax'``. Passed to ``cotengra``.
+        dtype : str, optional
+            Data type to cast the TN to before contraction.
+        return_std_err : bool, optional
+            Whether to also return the standard error of the estimate.
+
+        Returns
+        -------
+        scalar or (scalar, float)
+        """
+        if isinstance(where, numbers.Integral):
+            where = (where,)
+
+        rng = np.random.default_rng(seed)
+
+        ket = self.get_psi_reverse_lightcone(where)
+        k_inds = tuple(map(self.ket_site_ind, where))
+        b_inds = tuple(map(self.bra_site_ind, where))
+        bra = ket.conj(mangle_inner=True).reindex_(dict(zip(k_inds, b_inds)))
+
+        # find the channel tensors in the lightcone, and which side
+        holes = {}
+        for i, channel in self._channels.items():
+            tag = self.channel_tag(i)
+            if tag in ket.tag_map:
+                (tid,) = ket.tag_map[tag]
+                (btid,) = bra.tag_map[tag]
+                holes[id(ket.tensor_map[tid])] = (i, False)
+                holes[id(bra.tensor_map[btid])] = (i, True)
+
+        G_data = reshape(G, (2,) * 2 * len(where))
+        tn = bra | ket | Tensor(data=G_data, inds=b_inds + k_inds)
+        _full_simplify_preserving_params_(
+            tn,
+            (),
+            tids=[tid for tid, t in tn.tensor_map.items() if id(t) in holes],
+            seq=simplify_sequence,
+            atol=simplify_atol,
+            equalize_norms=simplify_equalize_norms,
+        )
+        self._maybe_convert(tn, dtype)
+
+        batch_ind = rand_uuid()
+        arrays = []
+        inputs = []
+        slots = []
+        for t in tn:
+            if id(t) in holes:
+                slots.append((len(arrays), *holes[id(t)]))
+                arrays.append(None)
+                inputs.append((batch_ind, *t.inds))
+            else:
+                arrays.append(t.data)
+                inputs.append(t.inds)
+
+        chosen = {i: self._channels[i] for _, i, _ in slots}
+        probs = {i: c.unravelling_probs() for i, c in chosen.items()}
+        scaled = {
+            i: c.kraus / (probs[i] ** 0.5)[:, None, None]
+            for i, c in chosen.items()
+        }
+
+        plans = {}
+        xs = []
+        while len(xs) < num_trajectories:
+            B = min(batch_size, num_trajectories - len(xs))
+
+            batch = {}
+            for i, channel in chosen.items():
+                ks = rng.choice(channel.num_kraus, size=B, p=probs[i])
+                Es = scaled[i][ks].reshape(
+                    (B,) + (2,) * 2 * len(channel.qubits)
+                )
+                Es = self._maybe_convert(Es, dtype)
+                batch[i] = (Es, do("conj", Es))
+
+            for pos, i, is_bra in slots:
+                arrays[pos] = batch[i][is_bra]
+
+            try:
+                plan = plans[B]
+            except KeyError:
+                plan = plans[B] = ContractionPlan(
+                    inputs,
+                    (batch_ind,),
+                    [do("shape", x) for x in arrays],
+                    optimize=optimize,
+                    backend=backend,
+                )
+
+            x = plan(arrays)
+            if tn.exponent:
+                x = x * 10**tn.exponent
+            xs.extend(to_numpy(x))
+
+        xs = np.asarray(xs)
+        ex = xs.mean()
+        if return_std_err:
+            return ex, xs.std() / len(xs) ** 0.5
+        return ex
@@ -13,7 +13,7 @@ from ..tensor_builder import (
     gen_unique_edges,
 )
 from .exact import Circuit
-from .gates import parse_to_gate
+from .gates import _parse_fuse_opts, fuse_gates, parse_to_gate
 
 
 class CircuitPEPOSimpleUpdate(Circuit):
@@ -222,7 +222,10 @@ class CircuitPEPOSimpleUpdate(Circuit):
 
         self._gates.append(gate)
 
-    def apply_gates(self, gates, progbar=False, **gate_opts):
+    def apply_gates(self, gates, progbar=False, fuse=False, **gate_opts):
+        if fuse:
+            gates = fuse_gates(gates, **_parse_fuse_opts(fuse))
+
         if progbar:
             from ...utils import progbar as _progbar
 
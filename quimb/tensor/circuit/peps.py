@@ -15,7 +15,7 @@ from ..tensor_core import (
     Tensor,
 )
 from .exact import Circuit
-from .gates import parse_to_gate
+from .gates import _parse_fuse_opts, fuse_gates, parse_to_gate
 
 
 class CircuitPEPSSimpleUpdate(Circuit):
@@ -278,7 +278,10 @@ class CircuitPEPSSimpleUpdate(Circuit):
         ):
             self.equilibrate()
 
-    def apply_gates(self, gates, progbar=False, **gate_opts):
+    def apply_gates(self, gates, progbar=False, fuse=False, **gate_opts):
+        if fuse:
+            gates = fuse_gates(gates, **_parse_fuse_opts(fuse))
+
         if progbar:
             from ...utils import progbar as _progbar
 
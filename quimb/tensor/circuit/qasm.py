@@ -1,6 +1,7 @@
 """Parsing of qsim and OpenQASM 2/3 into circuit gate lists."""
 
 import ast
+import collections
 import copy
 import functools
 import math
@@ -46,6 +47,80 @@ def _put_registers_last(x):
     return tuple(concatv(*parts[:-2], parts[-1], parts[-2]))
 
 
+class _LineFeed:
+    """Iterate over the lines of some source, e.g. a string split into lines
+    or an open file (which is read lazily in buffered chunks), with support
+    for pushing lines back onto the front, for example to expand custom gate
+    definitions inplace.
+    """
+
+    __slots__ = ("_lines", "_pending")
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._pending = collections.deque()
+
+    def push(self, lines):
+        """Push ``lines`` to be iterated over next, in order."""
+        self._pending.extendleft(reversed(lines))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._pending:
+            return self._pending.popleft()
+        return next(self._lines).rstrip("\r\n")
+
+
+def parse_qsim_iter(lines, info=None):
+    """Lazily parse the lines of a 'qsim' input format, for example an open
+    file, yielding each gate as soon as it is parsed.
+
+    Parameters
+    ----------
+    lines : iterable[str]
+        The lines of the qsim file, the first being the number of qubits.
+    info : dict, optional
+        If given, the number of qubits is stored in ``info['n']``, as soon as
+        the first line is parsed.
+
+    Yields
+    ------
+    gate : tuple
+        The gate, as a tuple of python types read from a line of the file.
+    """
+    if info is None:
+        info = {}
+
+    lines = _LineFeed(lines)
+    for line in lines:
+        if line.strip():
+            info["n"] = int(line)
+            break
+
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield _put_registers_last(
+                tuple(map(_convert_ints_and_floats, line.split(" ")))
+            )
+
+
+def _scan_num_qubits_file(fname, parse_iter):
+    """Find the total number of qubits declared in the file ``fname``, via a
+    first pass of the lazy parser ``parse_iter`` that discards the gates. A
+    register can be declared after gates acting on other registers, so this is
+    needed to size a circuit before streaming the gates into it.
+    """
+    info = {}
+    with open(fname) as f, warnings.catch_warnings():
+        # any warnings are emitted by the second, actual pass
+        warnings.simplefilter("ignore")
+        collections.deque(parse_iter(f, info), maxlen=0)
+    return info["n"]
+
+
 def parse_qsim_str(contents):
     """Parse a 'qsim' input format string into circuit information.
 
@@ -67,32 +142,32 @@ def parse_qsim_str(contents):
           is a list of strings read from a line of the qsim file.
     """
 
-    lines = contents.split("\n")
-    n = int(lines[0])
-
-    # turn into tuples of python types
-    gates = [
-        tuple(map(_convert_ints_and_floats, line.strip().split(" ")))
-        for line in lines[1:]
-        if line
-    ]
-
-    # put registers/parameters in standard order and detect if gate round used
-    gates = tuple(map(_put_registers_last, gates))
+    info = {}
+    # turn into tuples of python types, with registers/parameters in standard
+    #     order, and detect if gate round used
+    gates = tuple(parse_qsim_iter(contents.split("\n"), info))
     round_specified = isinstance(gates[0][0], numbers.Integral)
 
     return {
-        "n": n,
+        "n": info["n"],
         "gates": gates,
         "n_gates": len(gates),
         "round_specified": round_specified,
     }
 
 
-def parse_qsim_file(fname, **kwargs):
+def parse_qsim_file(fname):
     """Parse a qsim file."""
+    info = {}
     with open(fname) as f:
-        return parse_qsim_str(f.read(), **kwargs)
+        gates = tuple(parse_qsim_iter(f, info))
+
+    return {
+        "n": info["n"],
+        "gates": gates,
+        "n_gates": len(gates),
+        "round_specified": isinstance(gates[0][0], numbers.Integral),
+    }
 
 
 def parse_qsim_url(url, **kwargs):
@@ -144,9 +219,15 @@ def get_openqasm2_regexes():
         "ignore": re.compile(r"^(creg|measure|barrier)"),
         "gate_def": re.compile(r"^gate\s+"),
         "gate_sig": re.compile(r"^gate\s+(\w+)\s*(\((.+)\))?\s*(.*)"),
+        "gate_split": re.compile(r"(.*)\s*{(.*)}"),
     }
 
 
+@functools.lru_cache(2**12)
+def _openqasm2_eval_param(param):
+    return eval(param, {"pi": math.pi})
+
+
 @functools.lru_cache(None)
 def get_openqasm3_regexes():
     return {
@@ -177,6 +258,8 @@ def get_openqasm3_regexes():
         "gate_def": re.compile(r"^gate\s+"),
         "gate_sig": re.compile(r"^gate\s+(\w+)\s*(?:\((.*?)\))?\s*(.*?)\s*$"),
         "gate": re.compile(r"(\w+)\s*(?:\((.*)\))?\s*(.*);"),
+        "gate_split": re.compile(r"(.*)\s*{(.*)}"),
+        "qubit_index": re.compile(r"(\w+)\[(.+)\]"),
     }
 
 
@@ -442,26 +525,43 @@ def _placeholder_param_vector(values):
     raise TypeError("No placeholder values supplied.")
 
 
-def parse_openqasm2_str(contents):
-    """Parse the string contents of an OpenQASM 2.0 file. This parser does not
+def parse_openqasm2_iter(lines, info=None):
+    """Lazily parse the lines of an OpenQASM 2.0 program, for example an open
+    file, yielding each gate as soon as it is parsed. This parser does not
     support classical control flow is not guaranteed to check the full openqasm
     grammar.
+
+    Parameters
+    ----------
+    lines : iterable[str]
+        The lines of the OpenQASM 2.0 program.
+    info : dict, optional
+        If given, updated inplace with the number of qubits ``info['n']`` and
+        the ``info['sitemap']`` of qubits declared so far. Registers only need
+        to be declared before their own use, so these are only complete once
+        the iterator is exhausted.
+
+    Yields
+    ------
+    Gate
     """
     # define regular expressions for parsing
     rgxs = get_openqasm2_regexes()
 
-    # initialise number of qubits to zero and an empty list for gates
-    sitemap = {}
-    gates = []
+    if info is None:
+        info = {}
+    sitemap = info["sitemap"] = {}
+    info["n"] = 0
+
     custom_gates = {}
     # only want to warn once about each ignored instruction
     warned = {}
 
     # Process each line
     in_comment = False
-    lines = contents.split("\n")
-    while lines:
-        line = lines.pop(0).strip()
+    lines = _LineFeed(lines)
+    for line in lines:
+        line = line.strip()
         if not line:
             # blank line
             continue
@@ -485,6 +585,7 @@ def parse_openqasm2_str(contents):
             name, nq = match.groups()
             for i in range(int(nq)):
                 sitemap[f"{name}[{i}]"] = len(sitemap)
+            info["n"] = len(sitemap)
             continue
 
         match = rgxs["ignore"].match(line)
@@ -514,15 +615,13 @@ def parse_openqasm2_str(contents):
                     break
                 else:
                     # not finished -> need next line
-                    line = lines.pop(0)
+                    line = next(lines)
                     gate_lines.append(line)
 
             # then combine this full gate definition, without newlines
             gate_body = "".join(gate_lines)
             # separate the signature and body
-            gate_sig, gate_body = re.match(
-                r"(.*)\s*{(.*)}", gate_body
-            ).groups()
+            gate_sig, gate_body = rgxs["gate_split"].match(gate_body).groups()
 
             # parse the signature
             match = rgxs["gate_sig"].match(gate_sig)
@@ -572,40 +671,48 @@ def parse_openqasm2_str(contents):
                 }
 
                 # recurse by prepending the translated gate body
-                for gl in reversed(gate_body):
-                    lines.insert(0, gl.format(**replacer))
-
+                lines.push([gl.format(**replacer) for gl in gate_body])
                 continue
 
-            # standard gate -> add to list directly
+            # standard gate -> yield directly
             if params:
-                params = tuple(
-                    eval(param, {"pi": math.pi}) for param in params.split(",")
-                )
+                params = tuple(map(_openqasm2_eval_param, params.split(",")))
             else:
                 params = ()
 
             qubits = tuple(
                 sitemap[qubit.strip()] for qubit in qubits.split(",")
             )
-            gates.append(Gate(label, params, qubits))
+            yield Gate(label, params, qubits)
             continue
 
         # if not covered by previous checks, simply raise
         raise SyntaxError(f"{line}")
 
+
+def _parse_openqasm2_lines(lines):
+    info = {}
+    gates = list(parse_openqasm2_iter(lines, info))
     return {
-        "n": len(sitemap),
-        "sitemap": sitemap,
+        "n": info["n"],
+        "sitemap": info["sitemap"],
         "gates": gates,
         "n_gates": len(gates),
     }
 
 
-def parse_openqasm2_file(fname, **kwargs):
+def parse_openqasm2_str(contents):
+    """Parse the string contents of an OpenQASM 2.0 file. This parser does not
+    support classical control flow is not guaranteed to check the full openqasm
+    grammar.
+    """
+    return _parse_openqasm2_lines(contents.split("\n"))
+
+
+def parse_openqasm2_file(fname):
     """Parse an OpenQASM 2.0 file."""
     with open(fname) as f:
-        return parse_openqasm2_str(f.read(), **kwargs)
+        return _parse_openqasm2_lines(f)
 
 
 def parse_openqasm2_url(url, **kwargs):
@@ -615,54 +722,40 @@ def parse_openqasm2_url(url, **kwargs):
     return parse_openqasm2_str(request.urlopen(url).read().decode(), **kwargs)
 
 
-def parse_openqasm3_str(contents):
-    """Parse an OpenQASM 3.0 program from a string.
-
-    This parser is dependency free and supports a practical subset of
-    OpenQASM 3 for circuit import, including qubit declarations, input
-    declarations, arithmetic expressions, custom gates, and register
-    broadcasting.
+def parse_openqasm3_iter(lines, info=None):
+    """Lazily parse the lines of an OpenQASM 3.0 program, for example an open
+    file, yielding each gate as soon as it is parsed. See
+    :func:`parse_openqasm3_str` for the supported subset of OpenQASM 3.
 
     Parameters
     ----------
-    contents : str
-        The OpenQASM 3 source code to parse.
-
-    Returns
-    -------
-    dict
-        A dictionary describing the circuit with the following entries:
-
-        - ``"n"``: total number of qubits.
-        - ``"sitemap"``: mapping from OpenQASM qubit names to qubit indices.
-        - ``"gates"``: parsed sequence of :class:`Gate` objects.
-        - ``"n_gates"``: total number of parsed gates.
-        - ``"inputs"``: tuple of symbolic input names declared with
-          ``input``.
-        - ``"symbols"``: mapping of symbolic names to their current values or
-          symbolic placeholders.
-        - ``"expressions"``: mapping from gate indices to symbolic parameter
-          expressions requiring later binding.
-
-    Raises
+    lines : iterable[str]
+        The lines of the OpenQASM 3 program.
+    info : dict, optional
+        If given, updated inplace as parsing proceeds with the entries
+        ``"n"``, ``"sitemap"``, ``"inputs"``, ``"symbols"`` and
+        ``"expressions"``, as described in :func:`parse_openqasm3_str`.
+        Qubits only need to be declared before their own use, so ``"n"`` and
+        ``"sitemap"`` are only complete once the iterator is exhausted.
+
+    Yields
     ------
-    NotImplementedError
-        If the program uses unsupported OpenQASM 3 features such as control
-        flow, calibration blocks, output declarations, or unsupported
-        operations.
-    SyntaxError
-        If the source contains an instruction that does not match the
-        supported grammar subset.
+    Gate
     """
     rgxs = get_openqasm3_regexes()
-    sitemap = {}
+
+    if info is None:
+        info = {}
+    info["n"] = 0
+    sitemap = info["sitemap"] = {}
+    inputs = info["inputs"] = []
+    symbols = info["symbols"] = {}
+    expressions = info["expressions"] = {}
+
     registers = {}
-    gates = []
+    ngates = 0
     custom_gates = {}
     env = {}
-    inputs = []
-    symbols = {}
-    expressions = {}
     warned = {}
 
     aliases = {
@@ -716,7 +809,7 @@ def parse_openqasm3_str(contents):
             reg = registers[token]
             return reg if len(reg) > 1 else reg[0]
 
-        match = re.fullmatch(r"(\w+)\[(.+)\]", token)
+        match = rgxs["qubit_index"].fullmatch(token)
         if match:
             base, idx_expr = match.groups()
             idx = _openqasm_eval_expr(idx_expr, env)
@@ -732,9 +825,9 @@ def parse_openqasm3_str(contents):
         raise NotImplementedError(f"Unknown qubit identifier: {token}")
 
     in_comment = False
-    lines = contents.split("\n")
-    while lines:
-        line = lines.pop(0).strip()
+    lines = _LineFeed(lines)
+    for line in lines:
+        line = line.strip()
         if not line:
             continue
         if rgxs["comment"].match(line):
@@ -758,6 +851,7 @@ def parse_openqasm3_str(contents):
             registers[name] = tuple(range(len(sitemap), len(sitemap) + size))
             for i, q in enumerate(registers[name]):
                 sitemap[f"{name}[{i}]"] = q
+            info["n"] = len(sitemap)
             continue
 
         match = rgxs["input"].match(line)
@@ -848,12 +942,12 @@ def parse_openqasm3_str(contents):
             gate_lines = [line]
             brace_count = line.count("{") - line.count("}")
             while brace_count > 0:
-                line = lines.pop(0)
+                line = next(lines)
                 gate_lines.append(line)
                 brace_count += line.count("{") - line.count("}")
 
             gate_def = " ".join(gl.strip() for gl in gate_lines)
-            gate_sig, gate_body = re.match(r"(.*)\s*{(.*)}", gate_def).groups()
+            gate_sig, gate_body = rgxs["gate_split"].match(gate_def).groups()
             match = rgxs["gate_sig"].match(gate_sig)
             label = match[1]
             sig_params = _openqasm_split_top_level(match[2])
@@ -915,7 +1009,8 @@ def parse_openqasm3_str(contents):
                         for i in range(size)
                     ]
 
-                for call_qubits in reversed(qubit_calls):
+                expanded = []
+                for call_qubits in qubit_calls:
                     if len(sig_qubits) != len(call_qubits):
                         raise NotImplementedError(
                             f"Custom gate {label} expected "
@@ -926,8 +1021,8 @@ def parse_openqasm3_str(contents):
                         **replacer_base,
                         **dict(zip(sig_qubits, map(str, call_qubits))),
                     }
-                    for gl in reversed(gate_body):
-                        lines.insert(0, gl.format(**replacer))
+                    expanded.extend(gl.format(**replacer) for gl in gate_body)
+                lines.push(expanded)
                 continue
 
             label = aliases.get(label.lower(), label)
@@ -962,48 +1057,91 @@ def parse_openqasm3_str(contents):
             )
             for call_qubits in qubit_calls:
                 if parametrize:
-                    expressions[len(gates)] = raw_params
-                gates.append(
-                    Gate(
-                        label=label,
-                        params=params,
-                        qubits=call_qubits,
-                        parametrize=parametrize,
-                    )
+                    expressions[ngates] = raw_params
+                ngates += 1
+                yield Gate(
+                    label=label,
+                    params=params,
+                    qubits=call_qubits,
+                    parametrize=parametrize,
                 )
             continue
 
         raise SyntaxError(f"{line}")
 
+
+def _parse_openqasm3_lines(lines):
+    info = {}
+    gates = list(parse_openqasm3_iter(lines, info))
     return {
-        "n": len(sitemap),
-        "sitemap": sitemap,
+        "n": info["n"],
+        "sitemap": info["sitemap"],
         "gates": gates,
         "n_gates": len(gates),
-        "inputs": tuple(inputs),
-        "symbols": copy.copy(symbols),
-        "expressions": copy.copy(expressions),
+        "inputs": tuple(info["inputs"]),
+        "symbols": copy.copy(info["symbols"]),
+        "expressions": copy.copy(info["expressions"]),
     }
 
 
-def parse_openqasm3_file(fname, **kwargs):
+def parse_openqasm3_str(contents):
+    """Parse an OpenQASM 3.0 program from a string.
+
+    This parser is dependency free and supports a practical subset of
+    OpenQASM 3 for circuit import, including qubit declarations, input
+    declarations, arithmetic expressions, custom gates, and register
+    broadcasting.
+
+    Parameters
+    ----------
+    contents : str
+        The OpenQASM 3 source code to parse.
+
+    Returns
+    -------
+    dict
+        A dictionary describing the circuit with the following entries:
+
+        - ``"n"``: total number of qubits.
+        - ``"sitemap"``: mapping from OpenQASM qubit names to qubit indices.
+        - ``"gates"``: parsed sequence of :class:`Gate` objects.
+        - ``"n_gates"``: total number of parsed gates.
+        - ``"inputs"``: tuple of symbolic input names declared with
+          ``input``.
+        - ``"symbols"``: mapping of symbolic names to their current values or
+          symbolic placeholders.
+        - ``"expressions"``: mapping from gate indices to symbolic parameter
+          expressions requiring later binding.
+
+    Raises
+    ------
+    NotImplementedError
+        If the program uses unsupported OpenQASM 3 features such as control
+        flow, calibration blocks, output declarations, or unsupported
+        operations.
+    SyntaxError
+        If the source contains an instruction that does not match the
+        supported grammar subset.
+    """
+    return _parse_openqasm3_lines(contents.split("\n"))
+
+
+def parse_openqasm3_file(fname):
     """Parse an OpenQASM 3.0 file.
 
     Parameters
     ----------
     fname : str or path-like
         Path to the OpenQASM 3 file.
-    **kwargs
-        Forwarded to :func:`parse_openqasm3_str`.
 
     Returns
     -------
     dict
-        The parsed circuit information returned by
+        The parsed circuit information, as returned by
         :func:`parse_openqasm3_str`.
     """
     with open(fname) as f:
-        return parse_openqasm3_str(f.read(), **kwargs)
+        return _parse_openqasm3_lines(f)
 
 
 def parse_openqasm3_url(url, **kwargs):
@@ -0,0 +1,531 @@
+"""Statevector circuit simulator, applying gates in place with numba."""
+
+import math
+import numbers
+import warnings
+
+import numpy as np
+
+import quimb as qu
+
+from ...core import (
+    _NUM_THREAD_WORKERS,
+    maybe_multithread,
+    njit,
+    threading_choose_num_blocks,
+    threading_get_block_range,
+)
+from ...utils import (
+    ensure_dict,
+)
+from .. import array_ops as ops
+from ..tn1d.core import Dense1D
+from .exact import _CircuitGatesMixin
+
+# ------------------------------ numba kernels ------------------------------ #
+
+
+@njit(nogil=True)  # pragma: no cover
+def _insert_zero_bits(i, shifts):
+    # shifts should be sorted ascending
+    for s in shifts:
+        lo = i & ((1 << s) - 1)
+        i = ((i >> s) << (s + 1)) | lo
+    return i
+
+
+@njit(nogil=True)  # pragma: no cover
+def _apply_dense_numba(
+    sv,
+    G,
+    shifts,
+    offsets,
+    cmask,
+    thread_rank=0,
+    num_threads=1,
+    target_block_size=2**12,
+):
+    K = offsets.size
+    nbase = sv.size >> shifts.size
+
+    num_blocks, base_block_size, block_remainder = threading_choose_num_blocks(
+        nbase, target_block_size, num_threads
+    )
+    amps = np.empty(K, dtype=sv.dtype)
+    for b in range(thread_rank, num_blocks, num_threads):
+        istart, istop = threading_get_block_range(
+            b, base_block_size, block_remainder
+        )
+        for j in range(istart, istop):
+            i = _insert_zero_bits(j, shifts) | cmask
+            for a in range(K):
+                amps[a] = sv[i + offsets[a]]
+            for a in range(K):
+                x = G[a, 0] * amps[0]
+                for c in range(1, K):
+                    x += G[a, c] * amps[c]
+                sv[i + offsets[a]] = x
+
+
+@njit(nogil=True)  # pragma: no cover
+def _apply_diag_numba(
+    sv,
+    d,
+    tshifts,
+    cmask,
+    thread_rank=0,
+    num_threads=1,
+    target_block_size=2**12,
+):
+    N = sv.size
+
+    num_blocks, base_block_size, block_remainder = threading_choose_num_blocks(
+        N, target_block_size, num_threads
+    )
+    for b in range(thread_rank, num_blocks, num_threads):
+        istart, istop = threading_get_block_range(
+            b, base_block_size, block_remainder
+        )
+        for i in range(istart, istop):
+            if (i & cmask) == cmask:
+                a = 0
+                for s in tshifts:
+                    a = (a << 1) | ((i >> s) & 1)
+                sv[i] *= d[a]
+
+
+@njit(nogil=True)  # pragma: no cover
+def _expec_dense_numba(
+    sv,
+    G,
+    shifts,
+    offsets,
+    out,
+    thread_rank=0,
+    num_threads=1,
+    target_block_size=2**12,
+):
+    K = offsets.size
+    nbase = sv.size >> shifts.size
+
+    num_blocks, base_block_size, block_remainder = threading_choose_num_blocks(
+        nbase, target_block_size, num_threads
+    )
+    amps = np.empty(K, dtype=sv.dtype)
+    for b in range(thread_rank, num_blocks, num_threads):
+        istart, istop = threading_get_block_range(
+            b, base_block_size, block_remainder
+        )
+        for j in range(istart, istop):
+            i = _insert_zero_bits(j, shifts)
+            for a in range(K):
+                amps[a] = sv[i + offsets[a]]
+            for a in range(K):
+                x = G[a, 0] * amps[0]
+                for c in range(1, K):
+                    x += G[a, c] * amps[c]
+                out[thread_rank] += np.conj(amps[a]) * x
+
+
+@njit(nogil=True)  # pragma: no cover
+def _block_probs_numba(
+    sv,
+    block_size,
+    out,
+    thread_rank=0,
+    num_threads=1,
+    target_block_size=2**4,
+):
+    num_blocks, base_block_size, block_remainder = threading_choose_num_blocks(
+        out.size, target_block_size, num_threads
+    )
+    for b in range(thread_rank, num_blocks, num_threads):
+        istart, istop = threading_get_block_range(
+            b, base_block_size, block_remainder
+        )
+        for k in range(istart, istop):
+            x = 0.0
+            for i in range(k * block_size, (k + 1) * block_size):
+                x += sv[i].real ** 2 + sv[i].imag ** 2
+            out[k] = x
+
+
+# ----------------------------- python wrappers ----------------------------- #
+
+
+def _get_shifts_offsets(N, targets, controls=()):
+    # qubit 0 is the most significant bit
+    tshifts = np.array([N - 1 - q for q in targets], dtype=np.int64)
+    cshifts = [N - 1 - q for q in controls]
+    shifts = np.array(sorted((*tshifts, *cshifts)), dtype=np.int64)
+    cmask = sum(1 << s for s in cshifts)
+
+    k = len(targets)
+    offsets = np.zeros(2**k, dtype=np.int64)
+    for a in range(2**k):
+        for t, s in enumerate(tshifts):
+            if (a >> (k - 1 - t)) & 1:
+                offsets[a] |= 1 << s
+
+    return tshifts, shifts, offsets, cmask
+
+
+def _split_controls(G):
+    """Find how many of the leading qubits of the matrix ``G`` act purely as
+    controls, returning that number and the gate acting on the remaining
+    qubits when they are all in the state ``|1>``.
+    """
+    nc = 0
+    while G.shape[0] > 2:
+        h = G.shape[0] // 2
+        if not (
+            np.allclose(G[:h, :h], np.eye(h))
+            and not np.any(G[:h, h:])
+            and not np.any(G[h:, :h])
+        ):
+            break
+        G = G[h:, h:]
+        nc += 1
+    return nc, G
+
+
+def apply_gate_statevector(
+    sv,
+    G,
+    targets,
+    controls=(),
+    num_threads=None,
+    target_block_size=2**12,
+):
+    """Apply the dense gate ``G`` to qubits ``targets`` of the flat
+    statevector ``sv`` inplace, optionally only when all qubits in
+    ``controls`` are in the state ``|1>``. Diagonal gates, and gates with
+    leading qubits that are effectively controls, such as ``CX``, ``CZ`` or
+    ``CCX``, are detected and applied with cheaper kernels.
+
+    Parameters
+    ----------
+    sv : numpy.ndarray
+        The flat, complex statevector of ``N`` qubits, with qubit 0 as the
+        most significant bit.
+    G : array_like
+        The gate, of shape ``(2**k, 2**k)`` or ``(2,) * 2 * k``.
+    targets : sequence of int
+        The ``k`` qubits the gate acts on.
+    controls : sequence of int, optional
+        Qubits to control the gate on.
+    num_threads : int, optional
+        The number of threads to use, defaults to the quimb default.
+    target_block_size : int, optional
+        The number of amplitude groups below which not to multithread.
+    """
+    N = round(math.log2(sv.size))
+    targets = tuple(targets)
+    controls = tuple(controls)
+
+    K = 2 ** len(targets)
+    G = np.asarray(G, dtype=sv.dtype).reshape(K, K)
+
+    nc, G = _split_controls(G)
+    if nc:
+        controls = (*controls, *targets[:nc])
+        targets = targets[nc:]
+
+    tshifts, shifts, offsets, cmask = _get_shifts_offsets(N, targets, controls)
+
+    d = np.diag(G)
+    if np.count_nonzero(G) == np.count_nonzero(d):
+        maybe_multithread(
+            _apply_diag_numba,
+            sv,
+            np.ascontiguousarray(d),
+            tshifts,
+            cmask,
+            size_total=sv.size,
+            target_block_size=target_block_size,
+            num_threads=num_threads,
+        )
+    else:
+        maybe_multithread(
+            _apply_dense_numba,
+            sv,
+            np.ascontiguousarray(G),
+            shifts,
+            offsets,
+            cmask,
+            size_total=sv.size >> shifts.size,
+            target_block_size=target_block_size,
+            num_threads=num_threads,
+        )
+
+
+def expec_statevector(
+    sv,
+    G,
+    where,
+    num_threads=None,
+    target_block_size=2**12,
+):
+    r"""Compute the expectation :math:`\langle \psi | G | \psi \rangle`
+    of operator ``G`` acting on qubits ``where`` of the flat statevector
+    ``sv``, without forming any copies of it.
+    """
+    N = round(math.log2(sv.size))
+    K = 2 ** len(where)
+    G = np.asarray(G, dtype=sv.dtype).reshape(K, K)
+    _, shifts, offsets, _ = _get_shifts_offsets(N, where)
+
+    if num_threads is None:
+        num_threads = _NUM_THREAD_WORKERS
+    out = np.zeros(num_threads, dtype=sv.dtype)
+
+    maybe_multithread(
+        _expec_dense_numba,
+        sv,
+        np.ascontiguousarray(G),
+        shifts,
+        offsets,
+        out,
+        size_total=sv.size >> shifts.size,
+        target_block_size=target_block_size,
+        num_threads=num_threads,
+    )
+    return out.sum()
+
+
+def sample_statevector(sv, C, seed=None, num_threads=None, block_size=2**10):
+    """Sample ``C`` bitstring indices from the flat statevector ``sv``,
+    without forming the full probability distribution. The probability of
+    each contiguous block of ``block_size`` amplitudes is computed first, then
+    shots are split among blocks multinomially and sampled within each.
+
+    Returns
+    -------
+    numpy.ndarray[int]
+        The sampled basis state indices, in random order.
+    """
+    rng = np.random.default_rng(seed)
+
+    block_size = min(block_size, sv.size)
+    nblocks = sv.size // block_size
+    pb = np.empty(nblocks, dtype=np.float64)
+    maybe_multithread(
+        _block_probs_numba,
+        sv,
+        block_size,
+        pb,
+        size_total=nblocks,
+        target_block_size=2**4,
+        num_threads=num_threads,
+    )
+    pb /= pb.sum()
+
+    samples = []
+    counts = rng.multinomial(C, pb)
+    for k in np.flatnonzero(counts):
+        amps = sv[k * block_size : (k + 1) * block_size]
+        p = amps.real**2 + amps.imag**2
+        p /= p.sum()
+        samples.append(
+            k * block_size + rng.choice(block_size, size=counts[k], p=p)
+        )
+
+    return rng.permutation(np.concatenate(samples))
+
+
+# ------------------------------ circuit class ------------------------------ #
+
+
+class CircuitStatevector(_CircuitGatesMixin):
+    """Quantum circuit simulation keeping the state as a flat statevector,
+    that gates are applied to inplace by multithreaded numba kernels. This is
+    the most efficient choice for circuits on up to ~30 or so qubits with
+    lots of entanglement, the memory required being ``16 * 2**N`` bytes
+    (in double precision). Unlike the tensor network based
+    :class:`~quimb.tensor.circuit.Circuit` it only supports building up the
+    circuit gate by gate, and then computing amplitudes, local expectations
+    and samples.
+
+    Parameters
+    ----------
+    N : int, optional
+        The number of qubits in the circuit.
+    psi0 : array_like, optional
+        The initial dense state, assumed to be ``|00000....0>`` if not given.
+        The state is always copied.
+    dtype : str, optional
+        The data type of the statevector.
+    num_threads : int, optional
+        The number of threads to use for the gate kernels, defaults to the
+        quimb default.
+    gate_opts : dict, optional
+        Default options to pass to each gate, such as ``target_block_size``.
+
+    Attributes
+    ----------
+    sv : numpy.ndarray
+        The current flat statevector.
+    """
+
+    def __init__(
+        self,
+        N=None,
+        psi0=None,
+        dtype="complex128",
+        num_threads=None,
+        gate_opts=None,
+    ):
+        if (N is None) and (psi0 is None):
+            raise ValueError("You must supply one of `N` or `psi0`.")
+
+        if psi0 is None:
+            sv = np.zeros(2**N, dtype=dtype)
+            sv[0] = 1.0
+        else:
+            sv = np.array(psi0, dtype=dtype).reshape(-1)
+            nq = round(math.log2(sv.size))
+            if N is None:
+                N = nq
+            elif N != nq:
+                raise ValueError("`N` doesn't match `psi0`.")
+
+        self.N = N
+        self._sv = sv
+        self.dtype = dtype
+        self.num_threads = num_threads
+        self.gate_opts = ensure_dict(gate_opts)
+        self._gates = []
+
+    def copy(self):
+        """Copy the circuit and its state."""
+        new = object.__new__(self.__class__)
+        new.N = self.N
+        new._sv = self._sv.copy()
+        new.dtype = self.dtype
+        new.num_threads = self.num_threads
+        new.gate_opts = dict(self.gate_opts)
+        new._gates = self._gates.copy()
+        return new
+
+    @property
+    def sv(self):
+        return self._sv
+
+    def _apply_gate(self, gate, tags=None, **gate_opts):
+        if tags is not None:
+            warnings.warn("Tags are ignored for a ``CircuitStatevector``.")
+
+        opts = {**self.gate_opts, **gate_opts}
+        opts.setdefault("num_threads", self.num_threads)
+
+        if gate.label != "IDEN":
+            G = gate.array
+            if isinstance(G, ops.PArray):
+                G = G.data
+            apply_gate_statevector(
+                self._sv,
+                G,
+                gate.qubits,
+                controls=gate.controls or (),
+                **opts,
+            )
+
+        self._gates.append(gate)
+
+    @property
+    def psi(self):
+        return Dense1D(self._sv.copy())
+
+    def to_dense(self, reverse=False):
+        """Get a copy of the statevector as a dense column vector.
+
+        Parameters
+        ----------
+        reverse : bool, optional
+            Whether to reverse the order of the subsystems, to match the
+            convention of qiskit for example.
+
+        Returns
+        -------
+        qarray
+        """
+        sv = self._sv
+        if reverse:
+            sv = sv.reshape((2,) * self.N).transpose()
+        return qu.qarray(sv.reshape(-1, 1))
+
+    def amplitude(self, b):
+        """Get the amplitude coefficient of bitstring ``b``.
+
+        Parameters
+        ----------
+        b : str or sequence of int
+            The bitstring to compute the amplitude of.
+        """
+        if len(b) != self.N:
+            raise ValueError(
+                f"Bit-string {b} length does not "
+                f"match number of qubits {self.N}."
+            )
+        return self._sv[int("".join(map(str, b)), 2)]
+
+    def local_expectation(self, G, where):
+        """Compute the expectation value of the operator(s) ``G`` acting on
+        qubits ``where``, directly on the statevector.
+
+        Parameters
+        ----------
+        G : array or sequence[array]
+            The raw operator(s) to find the expectation of.
+        where : int or sequence of int
+            Which qubits the operator acts on.
+
+        Returns
+        -------
+        scalar or tuple[scalar]
+        """
+        if isinstance(where, numbers.Integral):
+            where = (where,)
+
+        if isinstance(G, (list, tuple)):
+            return tuple(self.local_expectation(g, where) for g in G)
+
+        return expec_statevector(
+            self._sv, G, where, num_threads=self.num_threads
+        )
+
+    def sample(self, C, seed=None, *, qubits=None, **kwargs):
+        """Sample the statevector ``C`` times.
+
+        Parameters
+        ----------
+        C : int
+            The number of samples to generate.
+        seed : None, int, or generator, optional
+            A random seed or generator to use for reproducibility.
+        qubits : None or sequence of int, optional
+            Which qubits to measure, defaults (``None``) to all qubits.
+
+        Yields
+        ------
+        str
+            The next sample bitstring.
+        """
+        if kwargs:
+            warnings.warn(
+                "Unsupported options for sampling a statevector circuit "
+                "supplied, ignoring: " + ", ".join(kwargs)
+            )
+
+        if qubits is None:
+            qubits = range(self.N)
+
+        for x in sample_statevector(
+            self._sv, C, seed=seed, num_threads=self.num_threads
+        ):
+            b = f"{x:0>{self.N}b}"
+            yield "".join(b[i] for i in qubits)
+
+    def __repr__(self):
+        r = "<CircuitStatevector(n={}, num_gates={}, dtype={})>"
+        return r.format(self.N, self.num_gates, self.dtype)
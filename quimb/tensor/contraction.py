@@ -3,7 +3,10 @@
 import collections
 import contextlib
 import functools
+import hashlib
 import itertools
+import os
+import pickle
 import threading
 
 import cotengra as ctg
@@ -337,3 +340,545 @@ def array_contract_pathinfo(*args, **kwargs):
         path = ((0,),)
 
     return oe.contract_path(eq, *shapes, shapes=True, optimize=path)[1]
+
+
+def compute_geometry_hash(
+    inputs,
+    output,
+    size_dict,
+    strict_index_order=False,
+):
+    """Compute a hash of the shapes & geometry of a contraction, that is
+    invariant to relabelling of the indices. If this matches for two
+    contractions then they can be performed using the same tree for the same
+    cost. See :meth:`~quimb.tensor.tensor_core.TensorNetwork.geometry_hash`.
+
+    Parameters
+    ----------
+    inputs : sequence of sequence of hashable
+        The input indices per tensor.
+    output : sequence of hashable
+        The output indices.
+    size_dict : dict[hashable, int]
+        The size of each index.
+    strict_index_order : bool, optional
+        If ``False``, then the permutation of the indices of each tensor
+        and the output does not matter.
+
+    Returns
+    -------
+    str
+    """
+    # map to symbols in order of appearance
+    symbols = empty_symbol_map()
+    terms = ["".join(symbols[ix] for ix in term) for term in inputs]
+    output = "".join(symbols[ix] for ix in output)
+    sizes = tuple(sorted((symbols[ix], int(d)) for ix, d in size_dict.items()))
+
+    if strict_index_order:
+        return hashlib.sha1(
+            pickle.dumps((tuple(map(tuple, terms)), tuple(output), sizes))
+        ).hexdigest()
+
+    edges = collections.defaultdict(list)
+    for ix in output:
+        edges[ix].append(-1)
+    for i, term in enumerate(terms):
+        for ix in term:
+            edges[ix].append(i)
+
+    # then sort edges by each's incidence nodes
+    canonical_edges = tuple(sorted(tuple(sorted(e)) for e in edges.values()))
+
+    return hashlib.sha1(pickle.dumps((canonical_edges, sizes))).hexdigest()
+
+
+def _get_canonical_edge_ids(inputs, output, size_dict):
+    """Get a mapping of each index to an identifier that is independent of
+    its label, based on which tensors it is incident to and its size. Indices
+    with identical incidence and size are interchangeable and simply counted.
+    """
+    incidences = collections.defaultdict(list)
+    for i, term in enumerate(inputs):
+        for ix in term:
+            incidences[ix].append(i)
+    for ix in output:
+        incidences[ix].append(-1)
+
+    counts = collections.defaultdict(int)
+    edge_ids = {}
+    for ix, nodes in incidences.items():
+        key = (tuple(sorted(nodes)), int(size_dict[ix]))
+        edge_ids[ix] = (*key, counts[key])
+        counts[key] += 1
+
+    return edge_ids
+
+
+_HYPER_OPTIMIZER_SETTINGS = (
+    "_methods",
+    "_minimize",
+    "max_repeats",
+    "max_time",
+    "max_training_steps",
+    "score_compression",
+    "slicing_opts",
+    "slicing_reconf_opts",
+    "reconf_opts",
+    "simulated_annealing_opts",
+)
+
+
+def _canonical_settings(x):
+    """Convert ``x`` into a deterministic, hashable form, sorting dicts."""
+    if isinstance(x, dict):
+        return tuple(sorted((k, _canonical_settings(v)) for k, v in x.items()))
+    if isinstance(x, (list, tuple)):
+        return tuple(map(_canonical_settings, x))
+    if isinstance(x, (str, int, float, bool, type(None))):
+        return x
+    cls = x.__class__
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _get_optimize_key(optimize):
+    """Get a hashable identifier for the path optimizer ``optimize``, which
+    for a :class:`cotengra.HyperOptimizer` includes its search settings.
+    """
+    if isinstance(optimize, str):
+        return optimize
+    cls = optimize.__class__
+    settings = tuple(
+        (k, _canonical_settings(getattr(optimize, k, None)))
+        for k in _HYPER_OPTIMIZER_SETTINGS
+    )
+    optlib = _canonical_settings(getattr(optimize, "_optimizer", None))
+    return (f"{cls.__module__}.{cls.__qualname__}", optlib, settings)
+
+
+def _is_cacheable_optimize(optimize):
+    """Check whether ``optimize`` is a path *search* (which is worth caching)
+    and whose settings are known, rather than an explicit tree or path or an
+    arbitrary optimizer object that can't be reliably identified.
+    """
+    if isinstance(optimize, str):
+        return True
+    # N.B. subclasses may take extra settings we don't know about
+    return type(optimize) is ctg.HyperOptimizer
+
+
+class ContractionTreeCache:
+    """A persistent, size bounded (with least recently used eviction), on-disk
+    cache of contraction trees. Trees are keyed by the geometry hash of the
+    contraction - see
+    :meth:`~quimb.tensor.tensor_core.TensorNetwork.geometry_hash` - which
+    includes the output indices, and the path optimizer - either its name or,
+    for a :class:`cotengra.HyperOptimizer`, its type and search settings
+    (other optimizer objects bypass the cache). They are stored in a label
+    independent form, such that they can be reused by other processes and for
+    contractions whose indices have been relabelled or permuted, being
+    remapped to the current (canonically labelled, as with all trees produced
+    by ``cotengra``) indices on retrieval.
+
+    Activate a cache with :func:`set_contract_tree_cache` or the
+    :func:`contract_tree_cache` context manager, after which
+    :func:`~quimb.tensor.tensor_core.tensor_contract`,
+    :meth:`~quimb.tensor.tensor_core.TensorNetwork.contract` and
+    :meth:`~quimb.tensor.tensor_core.TensorNetwork.contraction_tree` (and thus
+    e.g. :meth:`~quimb.tensor.circuit.Circuit.amplitude`) will check it first.
+
+    Parameters
+    ----------
+    directory : str, optional
+        The directory to store the trees in, by default
+        ``~/.cache/quimb/contraction_trees``.
+    max_size : int, optional
+        The maximum total size in bytes of the trees stored on disk, after
+        which the least recently used trees are evicted.
+    max_memory_entries : int, optional
+        The maximum number of trees to also keep in memory, avoiding disk
+        reads for repeated lookups within the same process.
+    """
+
+    def __init__(
+        self,
+        directory=None,
+        max_size=2**26,
+        max_memory_entries=2**10,
+    ):
+        if directory is None:
+            directory = os.path.join(
+                os.path.expanduser("~"), ".cache", "quimb", "contraction_trees"
+            )
+        self.directory = os.path.abspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_size = max_size
+        self.max_memory_entries = max_memory_entries
+        self._memory = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_key(self, inputs, output, size_dict, optimize):
+        """Get the key for a particular contraction and path optimizer."""
+        ghash = compute_geometry_hash(inputs, output, size_dict)
+        okey = _get_optimize_key(optimize)
+        return hashlib.sha1(pickle.dumps((ghash, okey))).hexdigest()
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _load(self, key):
+        try:
+            entry = self._memory[key]
+            self._memory.move_to_end(key)
+        except KeyError:
+            path = self._get_path(key)
+            try:
+                with open(path, "rb") as f:
+                    entry = pickle.load(f)
+            except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+                return None
+            self._remember(key, entry)
+
+        with contextlib.suppress(FileNotFoundError):
+            # mark as recently used for eviction purposes
+            os.utime(self._get_path(key))
+
+        return entry
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _dump(self, key, entry):
+        self._remember(key, entry)
+        path = self._get_path(key)
+        # write to temporary file then move for atomicity across processes
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used trees from disk until the total size
+        is below ``max_size``.
+        """
+        entries = []
+        total_size = 0
+        for fname in os.listdir(self.directory):
+            if not fname.endswith(".pkl"):
+                continue
+            path = os.path.join(self.directory, fname)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+        entries.sort()
+        for _, fsize, path in entries:
+            if total_size <= self.max_size:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            total_size -= fsize
+
+    def get_tree(self, inputs, output, shapes, optimize=None):
+        """Get the contraction tree for the given contraction, either by
+        remapping a previously cached tree to the current indices, or by
+        searching for a new one with ``optimize`` and caching it.
+
+        Parameters
+        ----------
+        inputs : sequence of sequence of hashable
+            The input indices per tensor.
+        output : sequence of hashable or None
+            The output indices, if ``None`` these are taken as every index
+            that appears exactly once, in order.
+        shapes : sequence of tuple[int]
+            The shape of each input.
+        optimize : str or PathOptimizer, optional
+            The path optimizer to use if the tree is not found.
+
+        Returns
+        -------
+        cotengra.ContractionTree
+        """
+        if optimize is None:
+            optimize = get_contract_strategy()
+
+        if output is None:
+            freqs = collections.Counter(itertools.chain.from_iterable(inputs))
+            output = tuple(ix for ix, c in freqs.items() if c == 1)
+
+        # label the indices canonically, as ``cotengra`` expects trees to be
+        symbols = empty_symbol_map()
+        inputs = tuple(tuple(symbols[ix] for ix in term) for term in inputs)
+        output = tuple(symbols[ix] for ix in output)
+        size_dict = {}
+        for term, shape in zip(inputs, shapes):
+            for ix, d in zip(term, shape):
+                size_dict[ix] = int(d)
+
+        key = self.get_key(inputs, output, size_dict, optimize)
+        entry = self._load(key)
+
+        if entry is not None:
+            edge_ids = _get_canonical_edge_ids(inputs, output, size_dict)
+            id_to_ind = {eid: ix for ix, eid in edge_ids.items()}
+            try:
+                sliced_inds = [id_to_ind[eid] for eid in entry["sliced"]]
+                tree = ctg.ContractionTree.from_path(
+                    inputs, output, size_dict, ssa_path=entry["ssa_path"]
+                )
+            except (KeyError, IndexError, ValueError):
+                # hash collision or incompatible entry -> treat as miss
+                pass
+            else:
+                for ix in sliced_inds:
+                    tree.remove_ind_(ix)
+                self.hits += 1
+                return tree
+
+        self.misses += 1
+        tree = array_contract_tree(
+            inputs, output, shapes=shapes, optimize=optimize
+        )
+        # n.b. the tree might have been relabelled by the optimizer
+        edge_ids = _get_canonical_edge_ids(
+            tree.inputs, tree.output, tree.size_dict
+        )
+        self._dump(
+            key,
+            {
+                "ssa_path": tree.get_ssa_path(),
+                "sliced": [edge_ids[ix] for ix in tree.sliced_inds],
+            },
+        )
+        return tree
+
+    def clear(self):
+        """Remove all trees from this cache, both in memory and on disk."""
+        self._memory.clear()
+        for fname in os.listdir(self.directory):
+            if fname.endswith(".pkl"):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(self.directory, fname))
+
+    def __len__(self):
+        return sum(
+            fname.endswith(".pkl") for fname in os.listdir(self.directory)
+        )
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(directory={self.directory!r}, "
+            f"max_size={self.max_size}, entries={len(self)})"
+        )
+
+
+_CONTRACT_TREE_CACHE = None
+_TEMP_CONTRACT_TREE_CACHES = collections.defaultdict(list)
+
+
+def _parse_tree_cache(cache):
+    if (cache is None) or isinstance(cache, ContractionTreeCache):
+        return cache
+    # assume a directory
+    return ContractionTreeCache(cache)
+
+
+def get_contract_tree_cache():
+    """Get the default persistent contraction tree cache, if any.
+
+    See Also
+    --------
+    set_contract_tree_cache, contract_tree_cache, ContractionTreeCache
+    """
+    if not _TEMP_CONTRACT_TREE_CACHES:
+        return _CONTRACT_TREE_CACHE
+
+    thread_id = threading.get_ident()
+    if thread_id not in _TEMP_CONTRACT_TREE_CACHES:
+        return _CONTRACT_TREE_CACHE
+
+    temp_caches = _TEMP_CONTRACT_TREE_CACHES[thread_id]
+    if not temp_caches:
+        del _TEMP_CONTRACT_TREE_CACHES[thread_id]
+        return _CONTRACT_TREE_CACHE
+
+    return temp_caches[-1]
+
+
+def set_contract_tree_cache(cache):
+    """Set the default persistent contraction tree cache.
+
+    Parameters
+    ----------
+    cache : None, str or ContractionTreeCache
+        The cache to use, a directory to create a cache in, or ``None`` to
+        disable caching.
+
+    See Also
+    --------
+    get_contract_tree_cache, contract_tree_cache, ContractionTreeCache
+    """
+    global _CONTRACT_TREE_CACHE
+    _CONTRACT_TREE_CACHE = _parse_tree_cache(cache)
+
+
+@contextlib.contextmanager
+def contract_tree_cache(cache, set_globally=False):
+    """A context manager to temporarily set the default persistent
+    contraction tree cache. By default, this only sets the cache for the
+    current thread.
+
+    Parameters
+    ----------
+    cache : None, str or ContractionTreeCache
+        The cache to use, a directory to create a cache in, or ``None`` to
+        disable caching.
+    set_globally : bool, optimize
+        Whether to set the cache just for this thread, or for all threads.
+    """
+    cache = _parse_tree_cache(cache)
+    if set_globally:
+        orig_cache = get_contract_tree_cache()
+        set_contract_tree_cache(cache)
+        try:
+            yield cache
+        finally:
+            set_contract_tree_cache(orig_cache)
+    else:
+        thread_id = threading.get_ident()
+        temp_caches = _TEMP_CONTRACT_TREE_CACHES[thread_id]
+        temp_caches.append(cache)
+        try:
+            yield cache
+        finally:
+            temp_caches.pop()
+
+
+def maybe_get_cached_tree(inputs, output, shapes, optimize=None):
+    """If a persistent contraction tree cache is active and ``optimize``
+    describes a path search, return the (possibly cached) contraction tree,
+    otherwise simply return ``optimize``.
+    """
+    cache = get_contract_tree_cache()
+    if (cache is None) or (not _is_cacheable_optimize(optimize)):
+        return optimize
+    return cache.get_tree(inputs, output, shapes, optimize)
+
+
+class ContractionPlan:
+    """A reusable, precompiled contraction of arrays with fixed geometry,
+    holding the equation, contraction tree and expression, such that calling
+    it performs only the numeric contraction with minimal python overhead.
+    Usually created with
+    :meth:`~quimb.tensor.tensor_core.TensorNetwork.compile_contraction`.
+
+    Parameters
+    ----------
+    inputs : sequence of sequence of hashable
+        The input indices per array.
+    output : sequence of hashable
+        The output indices.
+    shapes : sequence of tuple[int]
+        The shape of each input array.
+    optimize : str, PathOptimizer, ContractionTree or path_like, optional
+        The contraction path optimization strategy to use, only called once.
+    backend : str, optional
+        The default backend to perform the contraction with.
+    contract_opts
+        Supplied to :func:`cotengra.array_contract_expression`.
+
+    Attributes
+    ----------
+    inputs : tuple[tuple[hashable]]
+        The input indices per array.
+    output : tuple[hashable]
+        The output indices.
+    eq : str
+        The equation describing the contraction.
+    tree : cotengra.ContractionTree
+        The contraction tree used.
+    """
+
+    def __init__(
+        self,
+        inputs,
+        output,
+        shapes,
+        optimize=None,
+        backend=None,
+        **contract_opts,
+    ):
+        self.inputs = tuple(map(tuple, inputs))
+        self.output = tuple(output)
+        self.shapes = tuple(map(tuple, shapes))
+        self.eq = inds_to_eq(self.inputs, self.output)
+
+        optimize = maybe_get_cached_tree(
+            self.inputs, self.output, self.shapes, optimize
+        )
+        if isinstance(optimize, ctg.ContractionTree):
+            self.tree = optimize
+        else:
+            self.tree = array_contract_tree(
+                self.inputs,
+                self.output,
+                shapes=self.shapes,
+                optimize=optimize,
+            )
+
+        self.backend = backend
+        self._expr = array_contract_expression(
+            self.inputs,
+            self.output,
+            shapes=self.shapes,
+            optimize=self.tree,
+            **contract_opts,
+        )
+
+    def __call__(self, arrays, backend=None):
+        """Perform the contraction.
+
+        Parameters
+        ----------
+        arrays : sequence of array_like or TensorNetwork
+            The arrays to contract, in the same order as the inputs, or a
+            tensor network with the same geometry (and tensor order) as the
+            one the plan was compiled from, in which case its ``exponent`` is
+            also taken into account.
+        backend : str, optional
+            The backend to perform the contraction with, overriding the
+            default given at construction.
+
+        Returns
+        -------
+        array_like or scalar
+        """
+        exponent = 0.0
+        if hasattr(arrays, "tensor_map"):
+            # a tensor network - avoid circular import for isinstance
+            exponent = arrays.exponent
+            arrays = arrays.arrays
+
+        if backend is None:
+            backend = self.backend
+
+        out = self._expr(*arrays, backend=backend)
+
+        if exponent:
+            out = out * 10**exponent
+
+        return out
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(eq={self.eq!r}, "
+            f"log10[FLOPs]={self.tree.contraction_cost(log=10):.2f})"
+        )
@@ -22,6 +22,7 @@ from ..utils import (
 )
 from ..utils_plot import default_to_neutral_style, plot_multi_series_zoom
 from .interface import get_jax
+from .storage import parse_checkpoint
 from .tensor_core import (
     TensorNetwork,
     tags_to_oset,
@@ -1340,6 +1341,7 @@ class TNOptimizer:
         self.lgrdm = ExponentialGeometricRollingDiffMean()
         self._n = 0
         self._pbar = None
+        self._checkpoint = None
 
     def reset(self, tn=None, clear_info=True, loss_target=None):
         """Reset this optimizer without losing the compiled loss and gradient
@@ -1383,6 +1385,49 @@ class TNOptimizer:
         if self.callback is not None:
             self.callback(self)
 
+    _CHECKPOINT_ATTRS = (
+        "loss",
+        "loss_best",
+        "losses",
+        "loss_diffs",
+        "lgrdm",
+        "_n",
+    )
+
+    def _save_checkpoint(self, checkpoint, x, nit):
+        if isinstance(self._method, str):
+            method_state = None
+        else:
+            # e.g. the moments of a stateful stochastic gradient optimizer
+            method_state = {
+                k: v
+                for k, v in vars(self._method).items()
+                if k != "OptimizeResult"
+            }
+        checkpoint.save(
+            vector=np.array(x, copy=True),
+            method_state=method_state,
+            attrs={k: getattr(self, k) for k in self._CHECKPOINT_ATTRS},
+            nit=nit,
+        )
+
+    def _load_checkpoint(self, loaded):
+        _, state = loaded
+        self.vectorizer.vector[:] = state["vector"]
+        if state["method_state"] is not None:
+            vars(self._method).update(state["method_state"])
+        for k, v in state["attrs"].items():
+            setattr(self, k, v)
+        return state["nit"]
+
+    def _maybe_checkpoint(self, x):
+        # checkpointing of scipy optimizers is driven by each evaluation
+        if self._checkpoint is not None:
+            checkpoint, every, n0, nit0 = self._checkpoint
+            nit = nit0 + self._n - n0
+            if nit % every == 0:
+                self._save_checkpoint(checkpoint, x, nit)
+
     def vectorized_value(self, x):
         """The value of the loss function at vector ``x``."""
         self.vectorizer.vector[:] = x
@@ -1393,6 +1438,7 @@ class TNOptimizer:
         self.loss_diffs.append(self.lgrdm.value)
         self._n += 1
         self._maybe_update_pbar()
+        self._maybe_checkpoint(x)
         self._check_loss_target()
         self._maybe_call_callback()
         return self.loss
@@ -1409,6 +1455,7 @@ class TNOptimizer:
         self.loss_diffs.append(self.lgrdm.value)
         vec_grad = self.vectorizer.pack(grads, "grad")
         self._maybe_update_pbar()
+        self._maybe_checkpoint(x)
         self._check_loss_target()
         self._maybe_call_callback()
         return self.loss, vec_grad
@@ -1486,7 +1533,16 @@ class TNOptimizer:
         return tree_map(convert_variables_to_numpy, tn)
 
     def optimize(
-        self, n, tol=None, jac=True, hessp=False, optlib="scipy", **options
+        self,
+        n,
+        tol=None,
+        jac=True,
+        hessp=False,
+        optlib="scipy",
+        checkpoint=None,
+        checkpoint_every=None,
+        resume=None,
+        **options,
     ):
         """Run the optimizer for ``n`` function evaluations, using by default
         :func:`scipy.optimize.minimize` as the driver for the vectorized
@@ -1510,6 +1566,23 @@ class TNOptimizer:
             Whether to supply the hessian vector product of the loss function.
         optlib : {'scipy', 'nlopt'}, optional
             Which optimization library to use.
+        checkpoint : None, str or TensorNetworkCheckpoint, optional
+            If given, a directory to periodically save a checkpoint of the
+            parameter vector, tracked losses and the state of any stateful
+            optimizer (e.g. the moments of ``'adam'``) to. Only supported
+            for ``optlib='scipy'``. See
+            :class:`~quimb.tensor.storage.TensorNetworkCheckpoint`.
+        checkpoint_every : int, optional
+            For the stochastic gradient optimizers, the number of iterations
+            between checkpoints, for other scipy optimizers the number of
+            function evaluations. Defaults to ``max(1, n // 10)``.
+        resume : None, bool, str or TensorNetworkCheckpoint, optional
+            A checkpoint to resume an interrupted ``optimize`` call from, with
+            the same ``n``. Stochastic gradient optimizers resume exactly,
+            other scipy optimizers restart from the checkpointed parameters,
+            since their internal state, e.g. the quasi-Newton history, can't
+            be stored. If ``True``, resume from ``checkpoint`` only if it
+            exists. See :func:`~quimb.tensor.storage.parse_checkpoint`.
         options
             Supplied to :func:`scipy.optimize.minimize` or whichever optimizer
             is being used.
@@ -1518,12 +1591,38 @@ class TNOptimizer:
         -------
         tn_opt : TensorNetwork
         """
+        if optlib == "scipy":
+            return self.optimize_scipy(
+                n=n,
+                tol=tol,
+                jac=jac,
+                hessp=hessp,
+                checkpoint=checkpoint,
+                checkpoint_every=checkpoint_every,
+                resume=resume,
+                **options,
+            )
+
+        if (checkpoint is not None) or resume:
+            raise ValueError(
+                "Checkpointing is only supported for `optlib='scipy'`."
+            )
+
         return {
-            "scipy": self.optimize_scipy,
             "nlopt": self.optimize_nlopt,
         }[optlib](n=n, tol=tol, jac=jac, hessp=hessp, **options)
 
-    def optimize_scipy(self, n, tol=None, jac=True, hessp=False, **options):
+    def optimize_scipy(
+        self,
+        n,
+        tol=None,
+        jac=True,
+        hessp=False,
+        checkpoint=None,
+        checkpoint_every=None,
+        resume=None,
+        **options,
+    ):
         """Scipy based optimization, see
         :meth:`~quimb.tensor.optimize.TNOptimizer.optimize` for details.
         """
@@ -1534,11 +1633,20 @@ class TNOptimizer:
         else:
             fun = self.vectorized_value
 
-        if self._method in ("l-bfgs-b", "tnc"):
-            options.setdefault("maxfun", n)
+        checkpoint, loaded = parse_checkpoint(checkpoint, resume)
+        nit0 = 0 if loaded is None else self._load_checkpoint(loaded)
+        if checkpoint_every is None:
+            checkpoint_every = max(1, n // 10)
 
-        try:
-            self._maybe_init_pbar(n)
+        # stateful optimizers can be run in chunks, checkpointing in between
+        chunked = (checkpoint is not None) and not isinstance(
+            self._method, str
+        )
+
+        def run(maxiter):
+            opts = dict(maxiter=maxiter, **options)
+            if self._method in ("l-bfgs-b", "tnc"):
+                opts.setdefault("maxfun", maxiter)
             self.res = minimize(
                 fun=fun,
                 jac=jac,
@@ -1547,12 +1655,34 @@ class TNOptimizer:
                 tol=tol,
                 bounds=self.bounds,
                 method=self._method,
-                options=dict(maxiter=n, **options),
+                options=opts,
             )
             self.vectorizer.vector[:] = self.res.x
+
+        try:
+            self._maybe_init_pbar(n - nit0)
+            if chunked:
+                nit = nit0
+                while nit < n:
+                    nchunk = min(checkpoint_every, n - nit)
+                    run(nchunk)
+                    nit += nchunk
+                    self._save_checkpoint(
+                        checkpoint, self.vectorizer.vector, nit
+                    )
+            else:
+                if checkpoint is not None:
+                    self._checkpoint = (
+                        checkpoint,
+                        checkpoint_every,
+                        self._n,
+                        nit0,
+                    )
+                run(n - nit0)
         except KeyboardInterrupt:
             pass
         finally:
+            self._checkpoint = None
             self._maybe_close_pbar()
 
         return self.get_tn_opt()
@@ -0,0 +1,506 @@
+"""A native, memory-mappable on-disk format for tensors and tensor networks.
+
+The file layout is:
+
+- 8 bytes: the magic string ``b"\\x93QUIMBTN"``,
+- 8 bytes: the length of the header as a little endian unsigned integer,
+- the header: a small pickled dict describing the network, i.e. the class,
+  exponent, extra properties and for each tensor its tid, inds, tags,
+  left_inds, dtype, shape and the offset of its data block,
+- padding, then each array as a raw C-ordered block aligned to
+  ``ALIGNMENT`` bytes.
+
+Since the arrays are stored raw and aligned, they can be opened with
+``numpy.memmap`` such that data is only read from disk when it is accessed,
+and selecting only a few tensors touches only their blocks.
+"""
+
+import importlib
+import os
+import pickle
+import struct
+import weakref
+
+import numpy as np
+from autoray import do
+
+from .tensor_core import Tensor, TensorNetwork, oset
+
+MAGIC = b"\x93QUIMBTN"
+VERSION = 1
+ALIGNMENT = 64
+
+
+def _align(n, alignment=ALIGNMENT):
+    return -(-n // alignment) * alignment
+
+
+def _get_cls_path(cls):
+    return (cls.__module__, cls.__qualname__)
+
+
+def _get_cls_from_path(path):
+    module, qualname = path
+    obj = importlib.import_module(module)
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def _to_numpy_block(data):
+    x = np.ascontiguousarray(do("to_numpy", data))
+    if x.dtype.hasobject:
+        raise TypeError(
+            f"Can't save arrays with object dtype, got {x.dtype} for "
+            "tensor data. Only plain numeric arrays are supported."
+        )
+    return x
+
+
+def save_tensor_network(tn, fname):
+    """Save a tensor or tensor network to ``fname`` in a native format,
+    whose arrays can be lazily loaded via memory mapping, see
+    :func:`~quimb.tensor.storage.load_tensor_network`. The arrays are
+    converted to ``numpy`` before saving.
+
+    Parameters
+    ----------
+    tn : Tensor or TensorNetwork
+        The tensor or tensor network to save, the class (including any
+        subclass such as ``MatrixProductState``), exponent and extra
+        properties of the network are also stored.
+    fname : str or path-like
+        The file to save to.
+    """
+    if isinstance(tn, Tensor):
+        is_tensor = True
+        tensor_map = {0: tn}
+        cls = tn.__class__
+        extra_props = {}
+        exponent = 0.0
+        tid_counter = 1
+    else:
+        is_tensor = False
+        tensor_map = tn.tensor_map
+        cls = tn.__class__
+        extra_props = {ep: getattr(tn, ep) for ep in cls._EXTRA_PROPS}
+        exponent = tn.exponent
+        tid_counter = tn._tid_counter
+
+    arrays = []
+    entries = []
+    offset = 0
+    for tid, t in tensor_map.items():
+        x = _to_numpy_block(t.data)
+        arrays.append(x)
+        entries.append(
+            {
+                "tid": tid,
+                "inds": t.inds,
+                "tags": tuple(t.tags),
+                "left_inds": t.left_inds,
+                "dtype": x.dtype.str,
+                "shape": x.shape,
+                "offset": offset,
+                "nbytes": x.nbytes,
+            }
+        )
+        offset = _align(offset + x.nbytes)
+
+    header = pickle.dumps(
+        {
+            "version": VERSION,
+            "is_tensor": is_tensor,
+            "cls": _get_cls_path(cls),
+            "exponent": exponent,
+            "extra_props": extra_props,
+            "tid_counter": tid_counter,
+            "tensors": entries,
+        },
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+    data_start = _align(len(MAGIC) + 8 + len(header))
+
+    # write to a temporary file then move it into place, so that any arrays
+    # currently memory mapped from an existing ``fname`` remain valid
+    tmp_fname = f"{os.fspath(fname)}.{os.getpid()}.tmp"
+    with open(tmp_fname, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for entry, x in zip(entries, arrays):
+            f.seek(data_start + entry["offset"])
+            f.write(x.tobytes())
+        # make sure the file extends to cover any final padding
+        f.truncate(data_start + offset)
+    os.replace(tmp_fname, fname)
+
+
+def read_tensor_network_header(fname):
+    """Read only the header of a tensor network saved with
+    :func:`~quimb.tensor.storage.save_tensor_network`.
+
+    Parameters
+    ----------
+    fname : str or path-like
+        The file to read.
+
+    Returns
+    -------
+    header : dict
+        The header, describing the class, exponent, extra properties and
+        metadata of each tensor.
+    data_start : int
+        The byte offset at which the data blocks start.
+    """
+    with open(fname, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if magic != MAGIC:
+            raise ValueError(
+                f"File {fname} is not a quimb tensor network file."
+            )
+        (header_len,) = struct.unpack("<Q", f.read(8))
+        header = pickle.loads(f.read(header_len))
+
+    if header["version"] > VERSION:
+        raise ValueError(
+            f"File {fname} has version {header['version']}, newer than the "
+            f"supported version {VERSION}."
+        )
+
+    data_start = _align(len(MAGIC) + 8 + header_len)
+    return header, data_start
+
+
+def _select_entries(entries, tags, which):
+    if tags is None:
+        return entries
+
+    if isinstance(tags, (str, int)):
+        tags = (tags,)
+    tags = set(tags)
+
+    if which == "all":
+        return [e for e in entries if tags.issubset(e["tags"])]
+    if which == "any":
+        return [e for e in entries if not tags.isdisjoint(e["tags"])]
+    raise ValueError(f"Invalid option `which={which}`.")
+
+
+def load_tensor_network(fname, tags=None, which="all", mmap_mode="c"):
+    """Load a tensor or tensor network saved with
+    :func:`~quimb.tensor.storage.save_tensor_network`. By default the arrays
+    are memory mapped, so that data is only read from disk on access.
+
+    Parameters
+    ----------
+    fname : str or path-like
+        The file to load.
+    tags : str or sequence of str, optional
+        If given, only load the tensors matching these tags, only the blocks
+        of which are then ever read.
+    which : {'all', 'any'}, optional
+        Whether to require matching all or any of ``tags``.
+    mmap_mode : {'c', 'r', 'r+', None}, optional
+        The mode to memory map the arrays with, see ``numpy.memmap``. The
+        default ``'c'`` is copy-on-write, meaning arrays can be modified in
+        memory without affecting the file. If ``None``, the selected arrays
+        are eagerly read into memory.
+
+    Returns
+    -------
+    Tensor or TensorNetwork
+    """
+    header, data_start = read_tensor_network_header(fname)
+    entries = _select_entries(header["tensors"], tags, which)
+
+    if mmap_mode is not None and os.path.getsize(fname) > data_start:
+        # single mapping of the whole file -> pages only read on access
+        mm = np.memmap(fname, dtype=np.uint8, mode=mmap_mode)
+    else:
+        mm = None
+
+    ts = {}
+    with open(fname, "rb") as f:
+        for entry in entries:
+            start = data_start + entry["offset"]
+            dtype = np.dtype(entry["dtype"])
+            if (mm is not None) and entry["nbytes"]:
+                x = mm[start : start + entry["nbytes"]].view(dtype)
+            else:
+                f.seek(start)
+                x = np.fromfile(
+                    f, dtype=dtype, count=entry["nbytes"] // dtype.itemsize
+                )
+            x = x.reshape(entry["shape"])
+            ts[entry["tid"]] = (x, entry)
+
+    cls = _get_cls_from_path(header["cls"])
+
+    if header["is_tensor"]:
+        ((x, entry),) = ts.values()
+        return cls(
+            x,
+            inds=entry["inds"],
+            tags=entry["tags"],
+            left_inds=entry["left_inds"],
+        )
+
+    return _assemble_tensor_network(cls, header, ts.values())
+
+
+def _get_network_header(tn):
+    cls = tn.__class__
+    return {
+        "cls": _get_cls_path(cls),
+        "exponent": tn.exponent,
+        "extra_props": {ep: getattr(tn, ep) for ep in cls._EXTRA_PROPS},
+        "tid_counter": tn._tid_counter,
+    }
+
+
+def _assemble_tensor_network(cls, header, arrays_entries):
+    tn = cls.__new__(cls)
+    TensorNetwork.__init__(tn)
+    for x, entry in arrays_entries:
+        t = Tensor(
+            x,
+            inds=entry["inds"],
+            tags=oset(entry["tags"]),
+            left_inds=entry["left_inds"],
+        )
+        tn.add_tensor(t, tid=entry["tid"], virtual=True)
+    tn._tid_counter = max(tn._tid_counter, header["tid_counter"])
+    tn.exponent = header["exponent"]
+    for ep, value in header["extra_props"].items():
+        setattr(tn, ep, value)
+    return tn
+
+
+def _weakref_or_none(x):
+    try:
+        return weakref.ref(x)
+    except TypeError:
+        return None
+
+
+class TensorNetworkCheckpoint:
+    """An incremental on-disk checkpoint of one or more tensor networks plus
+    arbitrary picklable state, for restarting long running algorithms. Each
+    tensor array is stored in its own ``.npy`` file, and on each
+    :meth:`save` only those tensors whose data array object has changed
+    since the last save (or load) are written. Since quimb tensor methods
+    replace rather than modify data arrays, this generally corresponds to
+    only those tensors that have been updated, e.g. the few sites touched by
+    a sweep. New array files are written before the metadata file is
+    atomically replaced, so that if interrupted the last complete checkpoint
+    remains valid.
+
+    Parameters
+    ----------
+    directory : str or path-like
+        The directory to store the checkpoint in, created if necessary.
+    """
+
+    META_FNAME = "checkpoint.pkl"
+    ARRAYS_DIRNAME = "arrays"
+
+    def __init__(self, directory):
+        self.directory = os.fspath(directory)
+        self._meta_path = os.path.join(self.directory, self.META_FNAME)
+        self._arrays_dir = os.path.join(self.directory, self.ARRAYS_DIRNAME)
+        # map of (name, tid) -> (weakref to data, array file name)
+        self._written = {}
+        self._counter = self._get_initial_counter()
+        self.nwritten = 0
+
+    def _get_initial_counter(self):
+        # if opening an existing checkpoint, never reuse array file names
+        # which the current metadata might still refer to
+        counter = 0
+        try:
+            fnames = os.listdir(self._arrays_dir)
+        except FileNotFoundError:
+            fnames = ()
+        for fname in fnames:
+            c = os.path.splitext(fname)[0].rsplit("-", 1)[-1]
+            if c.isdigit():
+                counter = max(counter, int(c) + 1)
+        return counter
+
+    def exists(self):
+        """Whether a complete checkpoint exists in the directory."""
+        return os.path.isfile(self._meta_path)
+
+    def save(self, tns=None, **state):
+        """Save a checkpoint, only writing the tensors that have changed.
+
+        Parameters
+        ----------
+        tns : dict[str, TensorNetwork], optional
+            The tensor networks to store, keyed by name.
+        state
+            Any other picklable state to store.
+        """
+        tns = {} if tns is None else tns
+        os.makedirs(self._arrays_dir, exist_ok=True)
+
+        written = {}
+        networks = {}
+        for name, tn in tns.items():
+            entries = []
+            for tid, t in tn.tensor_map.items():
+                key = (name, tid)
+                data = t.data
+                ref_fname = self._written.get(key, None)
+                if (
+                    (ref_fname is None)
+                    or (ref_fname[0] is None)
+                    or (ref_fname[0]() is not data)
+                ):
+                    # new or changed tensor -> write a new file, never
+                    # overwriting any file the current checkpoint refers to
+                    fname = f"{name}-{tid}-{self._counter}.npy"
+                    self._counter += 1
+                    np.save(
+                        os.path.join(self._arrays_dir, fname),
+                        _to_numpy_block(data),
+                        allow_pickle=False,
+                    )
+                    self.nwritten += 1
+                    ref_fname = (_weakref_or_none(data), fname)
+                written[key] = ref_fname
+                entries.append(
+                    {
+                        "tid": tid,
+                        "inds": t.inds,
+                        "tags": tuple(t.tags),
+                        "left_inds": t.left_inds,
+                        "fname": ref_fname[1],
+                    }
+                )
+            networks[name] = {**_get_network_header(tn), "tensors": entries}
+
+        meta = pickle.dumps(
+            {
+                "version": VERSION,
+                "counter": self._counter,
+                "networks": networks,
+                "state": state,
+            },
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        tmp_path = f"{self._meta_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(meta)
+        os.replace(tmp_path, self._meta_path)
+
+        # clean up any array files no longer referenced
+        self._written = written
+        self._remove_stale()
+
+    def _remove_stale(self):
+        keep = {fname for _, fname in self._written.values()}
+        for fname in os.listdir(self._arrays_dir):
+            if fname not in keep:
+                os.remove(os.path.join(self._arrays_dir, fname))
+
+    def load(self):
+        """Load the checkpoint.
+
+        Returns
+        -------
+        tns : dict[str, TensorNetwork]
+            The stored tensor networks, keyed by name.
+        state : dict
+            The other stored state.
+        """
+        if not self.exists():
+            raise FileNotFoundError(
+                f"No checkpoint found in directory {self.directory}."
+            )
+        with open(self._meta_path, "rb") as f:
+            meta = pickle.load(f)
+
+        self._counter = max(self._counter, meta["counter"])
+        self._written = {}
+        tns = {}
+        for name, header in meta["networks"].items():
+            arrays_entries = [
+                (
+                    np.load(
+                        os.path.join(self._arrays_dir, entry["fname"]),
+                        allow_pickle=False,
+                    ),
+                    entry,
+                )
+                for entry in header["tensors"]
+            ]
+            cls = _get_cls_from_path(header["cls"])
+            tn = _assemble_tensor_network(cls, header, arrays_entries)
+            # loaded tensors don't need rewriting until they change
+            for entry in header["tensors"]:
+                data = tn.tensor_map[entry["tid"]].data
+                self._written[name, entry["tid"]] = (
+                    _weakref_or_none(data),
+                    entry["fname"],
+                )
+            tns[name] = tn
+
+        return tns, meta["state"]
+
+    def clear(self):
+        """Remove the checkpoint from disk."""
+        if self.exists():
+            os.remove(self._meta_path)
+        if os.path.isdir(self._arrays_dir):
+            self._written = {}
+            self._remove_stale()
+            os.rmdir(self._arrays_dir)
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(directory={self.directory!r}, "
+            f"exists={self.exists()})"
+        )
+
+
+def parse_checkpoint(checkpoint=None, resume=None):
+    """Parse the ``checkpoint`` and ``resume`` options of an iterative
+    algorithm.
+
+    Parameters
+    ----------
+    checkpoint : None, str, path-like or TensorNetworkCheckpoint, optional
+        Where to periodically save checkpoints to, if anywhere. If ``None``
+        and ``resume`` is a path, checkpoints are saved back to that.
+    resume : None, bool, str, path-like or TensorNetworkCheckpoint, optional
+        A checkpoint to load and resume from. If ``True``, resume from
+        ``checkpoint`` only if it already exists, which is convenient for
+        jobs that might be restarted.
+
+    Returns
+    -------
+    checkpoint : TensorNetworkCheckpoint or None
+        The checkpoint to save to.
+    loaded : tuple[dict, dict] or None
+        The ``(tns, state)`` loaded from ``resume``, if any.
+    """
+    if (checkpoint is not None) and not isinstance(
+        checkpoint, TensorNetworkCheckpoint
+    ):
+        checkpoint = TensorNetworkCheckpoint(checkpoint)
+
+    if resume is True:
+        if (checkpoint is None) or (not checkpoint.exists()):
+            return checkpoint, None
+        resume = checkpoint
+    elif (resume is None) or (resume is False):
+        return checkpoint, None
+    elif not isinstance(resume, TensorNetworkCheckpoint):
+        resume = TensorNetworkCheckpoint(resume)
+
+    loaded = resume.load()
+    if checkpoint is None:
+        checkpoint = resume
+    return checkpoint, loaded
@@ -4136,6 +4136,101 @@ def TN_matching(
 # --------------------------------------------------------------------------- #
 
 
+def _MPS_rand_state_abelian(
+    L,
+    bond_dim,
+    symmetry,
+    sector,
+    randn_opts,
+    **mps_opts,
+):
+    """Generate the random, charge conserving, block sparse arrays of a matrix
+    product state in a definite symmetry sector, distributing ``bond_dim``
+    among only those bond charges still compatible with the total charge.
+    """
+    import symmray as sr
+
+    from ..operator.hilbertspace import (
+        get_local_charges,
+        get_sector_charge,
+        get_symmray_symmetry,
+        parse_symmetry_and_sector,
+    )
+
+    symmetry, sector = parse_symmetry_and_sector(L, sector, symmetry)
+    if symmetry is None:
+        raise ValueError("A `sector` is required to build a symmetric MPS.")
+
+    sym = get_symmray_symmetry(symmetry)
+    local_charges = [get_local_charges(i, symmetry, sector) for i in range(L)]
+    total = get_sector_charge(symmetry, sector)
+
+    # count the configurations with each total charge, to the left of each
+    #     bond (including site i) and to the right (excluding site i)
+    left_counts = [{sym.combine(): 1}]
+    for qs in local_charges:
+        counts = collections.Counter()
+        for q, n in left_counts[-1].items():
+            for ql in qs:
+                counts[sym.combine(q, ql)] += n
+        left_counts.append(counts)
+    right_counts = [{sym.combine(): 1}]
+    for qs in reversed(local_charges):
+        counts = collections.Counter()
+        for q, n in right_counts[-1].items():
+            for ql in qs:
+                counts[sym.combine(q, ql)] += n
+        right_counts.append(counts)
+    right_counts.reverse()
+
+    bond_indices = []
+    for i in range(1, L):
+        # the charges that can still reach the total, with the max size of
+        #     each sector
+        caps = {}
+        for q, nl in left_counts[i].items():
+            nr = right_counts[i].get(sym.combine(total, sym.sign(q)), 0)
+            if nr:
+                caps[q] = min(nl, nr)
+        if not caps:
+            raise ValueError(f"Sector {sector} is not reachable.")
+
+        # distribute the bond dimension evenly across allowed charges
+        chargemap = dict.fromkeys(caps, 0)
+        D = min(bond_dim, sum(caps.values()))
+        while D:
+            for q in sorted(caps):
+                if D and chargemap[q] < caps[q]:
+                    chargemap[q] += 1
+                    D -= 1
+
+        # bonds carry the negative charge of everything to their left
+        bond_indices.append(
+            {sym.sign(q): d for q, d in chargemap.items() if d > 0}
+        )
+
+    arrays = []
+    for i in range(L):
+        indices = []
+        if i > 0:
+            indices.append(sr.BlockIndex(bond_indices[i - 1], dual=True))
+        if i < L - 1:
+            indices.append(sr.BlockIndex(bond_indices[i], dual=False))
+        indices.append(sr.BlockIndex(dict.fromkeys(local_charges[i], 1)))
+        charge = total if i == L - 1 else sym.combine()
+
+        x = sr.AbelianArray.random(indices, charge=charge, symmetry=symmetry)
+        x.set_params(
+            {
+                sector: randn(block.shape, **randn_opts)
+                for sector, block in x.get_params().items()
+            }
+        )
+        arrays.append(sensibly_scale(x))
+
+    return MatrixProductState(arrays, shape="lrp", **mps_opts)
+
+
 @random_seed_fn
 def MPS_rand_state(
     L,
@@ -4148,6 +4243,8 @@ def MPS_rand_state(
     scale=1.0,
     dtype="float64",
     trans_invar=False,
+    symmetry=None,
+    sector=None,
     **mps_opts,
 ):
     """Generate a random matrix product state.
@@ -4176,37 +4273,58 @@ def MPS_rand_state(
     trans_invar : bool (optional)
         Whether to generate a translationally invariant state,
         requires cyclic=True.
+    symmetry : {None, "Z2", "U1", "U1U1"}, optional
+        If given, along with ``sector``, generate a state made of ``symmray``
+        block sparse arrays conserving this symmetry, with the same charge
+        conventions as :meth:`~quimb.operator.SparseOperatorBuilder.build_mpo`.
+        The bond dimension is spread across the allowed bond charges.
+        Inferred from ``sector`` if not given. Only spin-1/2 (or spinless
+        fermion) sites and open boundary conditions are supported.
+    sector : {None, str, int, ((int, int), (int, int))}, optional
+        The symmetry sector to generate the state in, e.g. the number of up
+        spins for U1 symmetry, or 'even' / 'odd' for Z2 symmetry.
     mps_opts
         Supplied to :class:`~quimb.tensor.tn1d.core.MatrixProductState`.
     """
     randn_opts = {"dist": dist, "loc": loc, "scale": scale, "dtype": dtype}
 
-    if trans_invar:
-        if not cyclic:
+    if (symmetry is not None) or (sector is not None):
+        if cyclic or trans_invar or (phys_dim != 2):
             raise ValueError(
-                "State cannot be translationally invariant with open "
-                "boundary conditions."
+                "Symmetric MPS only support open boundary conditions and "
+                "`phys_dim=2`."
             )
-        array = sensibly_scale(
-            randn(shape=(bond_dim, bond_dim, phys_dim), **randn_opts)
+        mps = _MPS_rand_state_abelian(
+            L, bond_dim, symmetry, sector, randn_opts, **mps_opts
         )
 
-        def fill_fn(shape):
-            return array
-
     else:
+        if trans_invar:
+            if not cyclic:
+                raise ValueError(
+                    "State cannot be translationally invariant with open "
+                    "boundary conditions."
+                )
+            array = sensibly_scale(
+                randn(shape=(bond_dim, bond_dim, phys_dim), **randn_opts)
+            )
 
-        def fill_fn(shape):
-            return sensibly_scale(randn(shape, **randn_opts))
+            def fill_fn(shape):
+                return array
 
-    mps = MatrixProductState.from_fill_fn(
-        fill_fn,
-        L=L,
-        bond_dim=bond_dim,
-        phys_dim=phys_dim,
-        cyclic=cyclic,
-        **mps_opts,
-    )
+        else:
+
+            def fill_fn(shape):
+                return sensibly_scale(randn(shape, **randn_opts))
+
+        mps = MatrixProductState.from_fill_fn(
+            fill_fn,
+            L=L,
+            bond_dim=bond_dim,
+            phys_dim=phys_dim,
+            cyclic=cyclic,
+            **mps_opts,
+        )
 
     if normalize == "left":
         mps.left_canonicalize_(normalize=True)
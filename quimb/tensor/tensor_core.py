@@ -60,16 +60,20 @@ from .array_ops import (
     unfuse,
 )
 from .contraction import (
+    ContractionPlan,
+    _get_canonical_edge_ids,
     array_contract,
     array_contract_expression,
     array_contract_path,
     array_contract_pathinfo,
     array_contract_tree,
+    compute_geometry_hash,
     get_contract_backend,
     get_symbol,
     get_tensor_linop_backend,
     inds_to_eq,
     inds_to_symbols,
+    maybe_get_cached_tree,
 )
 from .decomp import (
     array_split,
@@ -305,6 +309,10 @@ def tensor_contract(
     else:
         inds_out = tuple(output_inds)
 
+    if get != "symbol-map":
+        # check any persistent contraction tree cache
+        optimize = maybe_get_cached_tree(inds, inds_out, shapes, optimize)
+
     if get is not None:
         return _tensor_contract_get_other(
             arrays=arrays,
@@ -1668,6 +1676,151 @@ def tensor_network_sum(
     return tnAB
 
 
+def _align_tensor_network_arrays(tn, tn0, output_inds):
+    """Get the arrays of ``tn``, which has the same geometry as ``tn0`` but
+    possibly relabelled and permuted indices, transposed to match the index
+    order of the corresponding tensors in ``tn0``.
+    """
+    inputs0 = tuple(t.inds for t in tn0)
+    inputs = tuple(t.inds for t in tn)
+    if inputs == inputs0:
+        return tn.arrays
+
+    if all(ix in tn.ind_map for ix in output_inds):
+        output = output_inds
+    else:
+        output = tn.outer_inds()
+
+    # match indices via their label independent identities
+    id_to_ix0 = {
+        eid: ix
+        for ix, eid in _get_canonical_edge_ids(
+            inputs0, output_inds, tn0.ind_sizes()
+        ).items()
+    }
+    ixmap = {
+        ix: id_to_ix0[eid]
+        for ix, eid in _get_canonical_edge_ids(
+            inputs, output, tn.ind_sizes()
+        ).items()
+    }
+    return tuple(
+        t.reindex(ixmap).transpose(*t0.inds).data for t0, t in zip(tn0, tn)
+    )
+
+
+def tensor_network_contract_batched(
+    tns,
+    output_inds=None,
+    optimize=None,
+    backend=None,
+    check=True,
+    **contract_opts,
+):
+    """Contract many tensor networks that share the same geometry but have
+    different data, as a single vectorized contraction. Arrays that differ
+    between the networks are stacked along a new batch index, whilst arrays
+    that are shared (the same object) are used once, so that a single
+    contraction tree is used and the individual contractions are fused into
+    larger ones.
+
+    Parameters
+    ----------
+    tns : sequence of TensorNetwork
+        The tensor networks to contract. These should all have the same
+        :meth:`~quimb.tensor.tensor_core.TensorNetwork.geometry_hash` and
+        tensor order. If their indices are labelled or ordered differently
+        to the first network, the arrays are aligned automatically.
+    output_inds : sequence of str, optional
+        The output indices of the first network, if not given, and the
+        networks have no hyper-indices, these are computed automatically as
+        every index appearing once.
+    optimize : str, PathOptimizer, ContractionTree or path_like, optional
+        The contraction path optimization strategy to use for the batched
+        contraction.
+    backend : str, optional
+        Which backend to use to perform the contraction. Supplied to
+        `cotengra`.
+    check : bool, optional
+        Whether to check that the geometry hashes of all networks match.
+    contract_opts
+        Supplied to :func:`~quimb.tensor.contraction.array_contract`.
+
+    Returns
+    -------
+    array_like
+        The results stacked along a new leading batch dimension, with shape
+        ``(len(tns), *output_shape)``.
+    """
+    tn0, *others = tns
+    inputs = [t.inds for t in tn0]
+    if output_inds is None:
+        output_inds = tuple(_gen_output_inds(concat(inputs)))
+    else:
+        output_inds = tuple(output_inds)
+
+    if check:
+        ghash = tn0.geometry_hash(output_inds)
+        for tn in others:
+            if all(ix in tn.ind_map for ix in output_inds):
+                ghash_other = tn.geometry_hash(output_inds)
+            else:
+                ghash_other = tn.geometry_hash()
+            if ghash_other != ghash:
+                raise ValueError(
+                    "All tensor networks must have the same geometry hash "
+                    "to be contracted in a batch."
+                )
+
+    arrays_batch = [tn0.arrays]
+    arrays_batch.extend(
+        _align_tensor_network_arrays(tn, tn0, output_inds) for tn in others
+    )
+
+    # stack any arrays which vary along the batch, sharing the others
+    batch_ind = rand_uuid()
+    arrays = []
+    for i, xs in enumerate(zip(*arrays_batch)):
+        x0 = xs[0]
+        if all(x is x0 for x in xs):
+            arrays.append(x0)
+        else:
+            arrays.append(do("stack", xs))
+            inputs[i] = (batch_ind, *inputs[i])
+
+    if len(arrays_batch) == 1 or all(batch_ind not in ix for ix in inputs):
+        # no batch dimension to vectorize over
+        out = array_contract(
+            arrays,
+            inputs,
+            output_inds,
+            optimize=optimize,
+            backend=backend,
+            **contract_opts,
+        )
+        out = do("stack", (out,) * len(arrays_batch))
+    else:
+        shapes = [do("shape", x) for x in arrays]
+        output = (batch_ind, *output_inds)
+        optimize = maybe_get_cached_tree(inputs, output, shapes, optimize)
+        out = array_contract(
+            arrays,
+            inputs,
+            output,
+            optimize=optimize,
+            backend=backend,
+            **contract_opts,
+        )
+
+    exponents = [tn.exponent for tn in tns]
+    if any(exponents):
+        scales = 10 ** np.array(exponents)
+        scales = do("reshape", scales, (-1,) + (1,) * len(output_inds))
+        out = out * do("array", scales, like=out)
+
+    return out
+
+
 def bonds(
     t1: "Tensor | TensorNetwork",
     t2: "Tensor | TensorNetwork",
@@ -5155,38 +5308,15 @@ class TensorNetwork:
 
 
         """
-        import hashlib
-        import pickle
-
-        inputs, output, size_dict = self.get_inputs_output_size_dict(
-            output_inds=output_inds,
+        if output_inds is None:
+            output_inds = self.outer_inds()
+        return compute_geometry_hash(
+            tuple(t.inds for t in self),
+            output_inds,
+            self.ind_sizes(),
+            strict_index_order=strict_index_order,
         )
 
-        if strict_index_order:
-            return hashlib.sha1(
-                pickle.dumps(
-                    (
-                        tuple(map(tuple, inputs)),
-                        tuple(output),
-                        sortedtuple(size_dict.items()),
-                    )
-                )
-            ).hexdigest()
-
-        edges = collections.defaultdict(list)
-        for ix in output:
-            edges[ix].append(-1)
-        for i, term in enumerate(inputs):
-            for ix in term:
-                edges[ix].append(i)
-
-        # then sort edges by each's incidence nodes
-        canonical_edges = sortedtuple(map(sortedtuple, edges.values()))
-
-        return hashlib.sha1(
-            pickle.dumps((canonical_edges, sortedtuple(size_dict.items())))
-        ).hexdigest()
-
     def tensors_sorted(self):
         """Return a tuple of tensors sorted by their respective tags, such that
         the tensors of two networks with the same tag structure can be
@@ -9420,6 +9550,7 @@ class TensorNetwork:
         list[tuple[int, int]]
         """
         inputs, shapes = zip(*((t.inds, t.shape) for t in self))
+        optimize = maybe_get_cached_tree(inputs, output_inds, shapes, optimize)
         return array_contract_path(
             inputs,
             output=output_inds,
@@ -9464,6 +9595,7 @@ class TensorNetwork:
         opt_einsum.PathInfo
         """
         inputs, shapes = zip(*((t.inds, t.shape) for t in self))
+        optimize = maybe_get_cached_tree(inputs, output_inds, shapes, optimize)
         return array_contract_pathinfo(
             inputs,
             output=output_inds,
@@ -9507,6 +9639,7 @@ class TensorNetwork:
         cotengra.ContractionTree
         """
         inputs, shapes = zip(*((t.inds, t.shape) for t in self))
+        optimize = maybe_get_cached_tree(inputs, output_inds, shapes, optimize)
         return array_contract_tree(
             inputs,
             output=output_inds,
@@ -9515,6 +9648,65 @@ class TensorNetwork:
             **kwargs,
         )
 
+    def compile_contraction(
+        self,
+        output_inds=None,
+        optimize=None,
+        backend=None,
+        **contract_opts,
+    ):
+        """Compile the contraction of this entire tensor network into a
+        reusable :class:`~quimb.tensor.contraction.ContractionPlan`, with the
+        array order, equation and contraction tree precomputed. This is useful
+        for repeatedly contracting networks with the same geometry but
+        different data, e.g. within optimization or sampling loops, where it
+        avoids the overhead of parsing the network on every call.
+
+        Parameters
+        ----------
+        output_inds : sequence of str, optional
+            The indices to specify as outputs of the contraction. If not given,
+            and the tensor network has no hyper-indices, these are computed
+            automatically as every index appearing once.
+        optimize : str, PathOptimizer, ContractionTree or path_like, optional
+            The contraction path optimization strategy to use, only called
+            once when compiling.
+        backend : str, optional
+            The default backend to perform the contraction with.
+        contract_opts
+            Supplied to :func:`cotengra.array_contract_expression`.
+
+        Returns
+        -------
+        ContractionPlan
+            Call it with either a sequence of arrays, matching the order of
+            ``tn.arrays``, or another tensor network with the same geometry
+            and tensor order, to get the raw contracted array or scalar.
+
+        Examples
+        --------
+
+            >>> tn = qtn.TN2D_rand(4, 4, 2, seed=42)
+            >>> plan = tn.compile_contraction(optimize="auto-hq")
+            >>> plan
+            ContractionPlan(eq='ab,acd,cef,...,xu->', log10[FLOPs]=2.76)
+
+            >>> for seed in range(3):
+            ...     tn.randomize_(seed=seed)
+            ...     print(plan(tn))
+        """
+        if output_inds is None:
+            output_inds = tuple(_gen_output_inds(concat(t.inds for t in self)))
+        inputs, shapes = zip(*((t.inds, t.shape) for t in self))
+        return ContractionPlan(
+            inputs,
+            output_inds,
+            shapes,
+            optimize=optimize,
+            backend=backend,
+            **contract_opts,
+        )
+
     def contraction_width(self, optimize=None, **contract_opts):
         """Compute the 'contraction width' of this tensor network. This
         is defined as log2 of the maximum tensor size produced during the
@@ -11936,6 +12128,24 @@ class TNLinearOperator(spla.LinearOperator):
             )
         return self._contractors["trace"]
 
+    def diagonal(self):
+        """Get the diagonal of this operator as a flat array, without forming
+        it densely, by joining each left index with its matching right index
+        into a single output index.
+        """
+        if "diagonal" not in self._contractors:
+            tn = TensorNetwork(self._tensors)
+            tn.reindex_(dict(zip(self.left_inds, self.right_inds)))
+            d = tn.contract(
+                output_inds=self.right_inds,
+                optimize=self.optimize,
+                preserve_tensor=True,
+            )
+            self._contractors["diagonal"] = do("reshape", d.data, (-1,))
+
+        diag = self._contractors["diagonal"]
+        return conj(diag) if self.is_conj else diag
+
     def copy(self, conj=False, transpose=False):
         if transpose:
             inds = self.right_inds, self.left_inds
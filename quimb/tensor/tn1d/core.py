@@ -3,6 +3,7 @@
 import functools
 import itertools
 import operator
+import weakref
 from math import log, log2
 from numbers import Integral
 
@@ -38,6 +39,7 @@ from ..tensor_core import (
     tags_to_oset,
     tensor_canonize_bond,
     tensor_compress_bond,
+    tensor_contract,
 )
 from ..tnag.core import (
     TensorNetworkGen,
@@ -1582,6 +1584,9 @@ class TensorNetwork1DFlat(TensorNetwork1D):
         num_can_r = 0
 
         def isidentity(x):
+            if ops.isblocksparse(x):
+                # only a (D, D) matrix, cheap to check densely
+                x = x.to_dense()
             d = x.shape[0]
             if get_dtype_name(x) in ("float32", "complex64"):
                 rtol, atol = 1e-5, 1e-6
@@ -1667,6 +1672,256 @@ class TensorNetwork1DFlat(TensorNetwork1D):
         print_multi_line(l1, l2, l3, max_width=max_width)
 
 
+# persistent environment caches, keyed weakly by the MPS they belong to
+_MPS_ENV_CACHES = weakref.WeakKeyDictionary()
+
+
+class MPSEnvironmentCache:
+    """Persistent cache of the left and right environments of the norm
+    network ``<psi|psi>`` of an open boundary MPS, for computing many local
+    expectations. The data object and indices of each site tensor are
+    recorded when an environment is formed, and each time environments are
+    requested only those containing sites that have since changed are
+    recomputed. Since tensor operations such as ``gate_split_`` or
+    ``normalize`` replace rather than modify site arrays, a single local
+    update followed by re-measurement nearby thus costs ``O(1)`` rather than
+    ``O(L)`` environment contractions. Arrays modified inplace are not
+    detected, in which case call :meth:`clear`.
+
+    Usually accessed via :attr:`MatrixProductState.env_cache`.
+
+    Parameters
+    ----------
+    mps : MatrixProductState
+        The state, which is only weakly referenced.
+    """
+
+    def __init__(self, mps):
+        self._mps_ref = weakref.ref(mps)
+        # map of ket inner index -> bra inner index
+        self._bra_ixmap = {}
+        self.ncontractions = 0
+        self.clear()
+
+    @property
+    def mps(self):
+        return self._mps_ref()
+
+    def clear(self):
+        """Clear all cached environments."""
+        # left_envs[i] contains sites < i, right_envs[i] sites > i
+        self.left_envs = {}
+        self.right_envs = {}
+        # the site keys each environment was formed with, and references to
+        # their arrays so that the ids can't be reused while cached
+        self._left_keys = []
+        self._right_keys = []
+        self._refs = {}
+
+    def _site_tensors(self, i):
+        mps = self.mps
+        return mps.select_tensors(mps.site_tag(i))
+
+    def _site_key(self, ts):
+        return tuple((id(t.data), t.inds) for t in ts)
+
+    def _bra_tensors(self, i, ts):
+        site_ix = self.mps.site_ind(i)
+        bts = []
+        for t in ts:
+            ixmap = {}
+            for ix in t.inds:
+                if ix != site_ix:
+                    try:
+                        ixmap[ix] = self._bra_ixmap[ix]
+                    except KeyError:
+                        ixmap[ix] = self._bra_ixmap[ix] = rand_uuid()
+            bts.append(t.conj().reindex_(ixmap))
+        return bts
+
+    def _contract(self, ts, **contract_opts):
+        self.ncontractions += 1
+        return tensor_contract(*ts, **contract_opts)
+
+    def _invalidate_changed(self, stored_keys, sites):
+        # find the first site that has changed since its key was stored,
+        # and drop it and all keys beyond, returning the number remaining
+        for n, (key, i) in enumerate(zip(stored_keys, sites)):
+            if key != self._site_key(self._site_tensors(i)):
+                del stored_keys[n:]
+                return n
+        return len(stored_keys)
+
+    def _validate_left(self, stop=None):
+        # remove any left environments containing changed sites < stop,
+        # returning the number of sites covered by valid environments
+        nkeys = len(self._left_keys)
+        if stop is None:
+            stop = nkeys
+        n = self._invalidate_changed(self._left_keys, range(stop))
+        if n < min(stop, nkeys):
+            for i in range(n + 1, nkeys + 1):
+                del self.left_envs[i]
+            return n
+        return nkeys
+
+    def _validate_right(self, start=None):
+        # remove any right environments containing changed sites > start,
+        # returning the number of sites covered by valid environments
+        L = self.mps.L
+        nkeys = len(self._right_keys)
+        if start is None:
+            start = L - 1 - nkeys
+        n = self._invalidate_changed(self._right_keys, range(L - 1, start, -1))
+        if n < min(L - 1 - start, nkeys):
+            for j in range(n + 1, nkeys + 1):
+                del self.right_envs[L - 1 - j]
+            return n
+        return nkeys
+
+    def update_left(self, stop, **contract_opts):
+        """Make sure the left environments up to and including ``stop``
+        (i.e. containing sites ``< stop``) are up to date.
+        """
+        n = self._validate_left(stop)
+        for i in range(n + 1, stop + 1):
+            ts = self._site_tensors(i - 1)
+            self._left_keys.append(self._site_key(ts))
+            self._refs["L", i - 1] = tuple(t.data for t in ts)
+            tn = (*ts, *self._bra_tensors(i - 1, ts))
+            if i > 1:
+                tn = (self.left_envs[i - 1], *tn)
+            self.left_envs[i] = self._contract(tn, **contract_opts)
+
+    def update_right(self, start, **contract_opts):
+        """Make sure the right environments down to and including
+        ``start`` (i.e. containing sites ``> start``) are up to date.
+        """
+        L = self.mps.L
+        n = self._validate_right(start)
+        for i in range(L - 2 - n, start - 1, -1):
+            ts = self._site_tensors(i + 1)
+            self._right_keys.append(self._site_key(ts))
+            self._refs["R", i + 1] = tuple(t.data for t in ts)
+            tn = (*ts, *self._bra_tensors(i + 1, ts))
+            if i < L - 2:
+                tn = (self.right_envs[i + 1], *tn)
+            self.right_envs[i] = self._contract(tn, **contract_opts)
+
+    def rescale_site(self, i, factor, old_arrays):
+        """Notify the cache that the arrays at site ``i``, previously
+        ``old_arrays``, have been replaced by themselves multiplied by scalar
+        ``factor``. Any environments formed with ``old_arrays`` are then
+        updated by scalar multiplication rather than recontraction.
+        """
+        L = self.mps.L
+        i = i % L
+        ts = self._site_tensors(i)
+        key = self._site_key(ts)
+        refs = tuple(t.data for t in ts)
+        f2 = abs(factor) ** 2
+
+        old_refs = self._refs.get(("L", i), ())
+        if (i < len(self._left_keys)) and all(
+            x is y for x, y in zip(old_refs, old_arrays)
+        ):
+            self._left_keys[i] = key
+            self._refs["L", i] = refs
+            for j in range(i + 1, len(self._left_keys) + 1):
+                self.left_envs[j] = self.left_envs[j] * f2
+
+        old_refs = self._refs.get(("R", i), ())
+        if (L - 1 - i < len(self._right_keys)) and all(
+            x is y for x, y in zip(old_refs, old_arrays)
+        ):
+            self._right_keys[L - 1 - i] = key
+            self._refs["R", i] = refs
+            for j in range(L - 1 - len(self._right_keys), i):
+                self.right_envs[j] = self.right_envs[j] * f2
+
+    def overlap(self, gates=(), where=None, **contract_opts):
+        """Compute ``<psi|G_1 G_2 ... |psi>`` for local operators ``G_k``
+        acting on (possibly multiple) sites, using and updating the cached
+        environments.
+
+        Parameters
+        ----------
+        gates : sequence of (array_like, int or tuple[int])
+            The operators and the sites they act on, applied in order.
+        where : int or tuple[int], optional
+            Extra sites to form the local overlap over, e.g. to compute the
+            norm at a location where the environments are already valid.
+        contract_opts
+            Supplied to :func:`~quimb.tensor.tensor_core.tensor_contract`.
+
+        Returns
+        -------
+        scalar
+        """
+        mps = self.mps
+        wheres = [w for _, w in gates]
+        if where is not None:
+            wheres.append(where)
+        sites = [
+            site
+            for w in wheres
+            for site in ((w,) if isinstance(w, Integral) else w)
+        ]
+        sitemin = min(sites)
+        sitemax = max(sites)
+
+        self.update_left(sitemin, **contract_opts)
+        self.update_right(sitemax, **contract_opts)
+
+        tags = [mps.site_tag(i) for i in range(sitemin, sitemax + 1)]
+        k = mps.select_any(tags, virtual=False)
+        bts = [
+            bt
+            for i in range(sitemin, sitemax + 1)
+            for bt in self._bra_tensors(i, self._site_tensors(i))
+        ]
+        for G, gwhere in gates:
+            k.gate_(G, gwhere, contract=False)
+
+        ts = [*k, *bts]
+        if sitemin > 0:
+            ts.append(self.left_envs[sitemin])
+        if sitemax < mps.L - 1:
+            ts.append(self.right_envs[sitemax])
+
+        return tensor_contract(*ts, output_inds=(), **contract_opts)
+
+    def norm(self, where=None, **contract_opts):
+        """Compute ``<psi|psi>`` using the cached environments. If ``where``
+        is not given, the local overlap is formed between wherever the
+        currently valid left and right environments end, such that no
+        environments need recomputing.
+        """
+        if where is None:
+            # span the gap between the valid left and right environments
+            i = self._validate_left()
+            j = self.mps.L - 1 - self._validate_right()
+            where = tuple(range(min(i, j), max(i, j) + 1))
+        return self.overlap(where=where, **contract_opts)
+
+    def local_expectation(self, G, where, normalized=True, **contract_opts):
+        """Compute the local expectation ``<psi|G|psi>`` of operator ``G``
+        acting on site(s) ``where``.
+        """
+        x = self.overlap(((G, where),), **contract_opts)
+        if normalized:
+            x = x / self.norm(**contract_opts)
+        return x
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__}("
+            f"left_envs={len(self.left_envs)}, "
+            f"right_envs={len(self.right_envs)}, "
+            f"ncontractions={self.ncontractions})>"
+        )
+
+
 class MatrixProductState(TensorNetwork1DVector, TensorNetwork1DFlat):
     """Initialise a matrix product state, with auto labelling and tagging.
 
@@ -2038,12 +2293,22 @@ class MatrixProductState(TensorNetwork1DVector, TensorNetwork1DFlat):
         old_norm : float
             The old norm ``self.H @ self``.
         """
-        norm = expec_TN_1D(self.H, self, eps=eps)
+        cache = _MPS_ENV_CACHES.get(self, None)
+        if (cache is not None) and (not self.cyclic):
+            # reuse any cached environments
+            norm = cache.norm()
+        else:
+            norm = expec_TN_1D(self.H, self, eps=eps)
 
         if insert is None:
             insert = -1
 
-        self[insert].modify(data=self[insert].data / norm**0.5)
+        old_data = self[insert].data
+        self[insert].modify(data=old_data / norm**0.5)
+
+        if cache is not None:
+            # update any cached environments without recontracting
+            cache.rescale_site(insert, norm**-0.5, (old_data,))
         if bra is not None:
             bra[insert].modify(data=bra[insert].data / norm**0.5)
 
@@ -2946,6 +3211,62 @@ class MatrixProductState(TensorNetwork1DVector, TensorNetwork1DFlat):
 
         return functools.reduce(operator.add, expecs.values())
 
+    @property
+    def env_cache(self):
+        """The persistent :class:`~quimb.tensor.tn1d.core.MPSEnvironmentCache`
+        of left and right norm environments attached to this MPS, used by
+        :meth:`compute_local_expectation_via_envs` and :meth:`correlation`.
+        Copies of the MPS get their own, empty, cache.
+        """
+        try:
+            return _MPS_ENV_CACHES[self]
+        except KeyError:
+            cache = _MPS_ENV_CACHES[self] = MPSEnvironmentCache(self)
+            return cache
+
+    def correlation(self, A, i, j, B=None, **expec_opts):
+        """Correlation of operator ``A`` between ``i`` and ``j``. For open
+        boundary conditions this uses the persistent environment cache, see
+        :attr:`env_cache`.
+
+        Parameters
+        ----------
+        A : array
+            The operator to act with, can be multi site.
+        i : int or sequence of int
+            The first site(s).
+        j : int or sequence of int
+            The second site(s).
+        expec_opts
+            If given, or the MPS is cyclic, supplied to
+            :func:`~quimb.tensor.tn1d.core.expec_TN_1D` instead.
+
+        Returns
+        -------
+        C : float
+            The correlation ``<A(i)> + <A(j)> - <A(ij)>``.
+
+        Examples
+        --------
+        >>> ghz = (MPS_computational_state('0000') +
+        ...        MPS_computational_state('1111')) / 2**0.5
+        >>> ghz.correlation(pauli('Z'), 0, 1)
+        1.0
+        >>> ghz.correlation(pauli('Z'), 0, 1, B=pauli('X'))
+        0.0
+        """
+        if self.cyclic or expec_opts:
+            return super().correlation(A, i, j, B=B, **expec_opts)
+
+        if B is None:
+            B = A
+
+        cache = self.env_cache
+        cA = cache.overlap(((A, i),))
+        cB = cache.overlap(((B, j),))
+        cAB = cache.overlap(((A, i), (B, j)))
+        return cAB - cA * cB
+
     def compute_local_expectation_via_envs(
         self,
         terms,
@@ -2956,7 +3277,10 @@ class MatrixProductState(TensorNetwork1DVector, TensorNetwork1DFlat):
         """Compute many local expectations at once, via forming the relevant
         local overlaps using left and right environments formed via
         contraction. This does not require any canonicalization and can be
-        quicker if the canonical center is not already aligned.
+        quicker if the canonical center is not already aligned. The
+        environments are persistently cached, see
+        :attr:`~quimb.tensor.tn1d.core.MatrixProductState.env_cache`, such
+        that subsequent calls only recompute those containing changed sites.
 
         Parameters
         ----------
@@ -2980,27 +3304,19 @@ class MatrixProductState(TensorNetwork1DVector, TensorNetwork1DFlat):
 
         See Also
         --------
-        compute_local_expectation_canonical, compute_left_environments,
-        compute_right_environments
+        compute_local_expectation_canonical, env_cache
         """
-        norm, ket, bra = self.make_norm(return_all=True)
+        if not terms:
+            return {} if return_all else 0.0
 
-        left_envs = norm.compute_left_environments(**contract_opts)
-        right_envs = norm.compute_right_environments(**contract_opts)
-
-        expecs = {}
+        cache = self.env_cache
 
         if normalized:
-            nfactor = (norm.select(0) | right_envs[0]).contract(
-                all, **contract_opts
-            )
-        else:
-            nfactor = None
+            # form the norm where the first local overlap will be formed
+            nfactor = cache.norm(where=next(iter(terms)), **contract_opts)
 
+        expecs = {}
         for where, G in terms.items():
-            sitemin = min(where)
-            sitemax = max(where)
-            tags = [ket.site_tag(i) for i in range(sitemin, sitemax + 1)]
             # form:
             #     sitemin sitemax
             #          :   :
@@ -3015,18 +3331,9 @@ class MatrixProductState(TensorNetwork1DVector, TensorNetwork1DFlat):
             #      │  ┌┴┐ ┌┴┐  │
             #      └──┤b├─┤b├──┘
             #         └─┘ └─┘
-            # (n.b. might be non-gated sites in between as well)
-            k = ket.select_any(tags, virtual=False)
-            b = bra.select_any(tags, virtual=False)
-            k.gate_(G, where, contract=False)
-
-            tn_local_overlap = k | b
-            if sitemin in left_envs:
-                tn_local_overlap |= left_envs[sitemin]
-            if sitemax in right_envs:
-                tn_local_overlap |= right_envs[sitemax]
-
-            x = tn_local_overlap.contract(all, **contract_opts)
+            # (n.b. might be non-gated sites in between as well), with the
+            # left and right environments taken from the persistent cache
+            x = cache.overlap(((G, where),), **contract_opts)
             if normalized:
                 x = x / nfactor
 
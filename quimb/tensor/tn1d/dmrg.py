@@ -1,19 +1,27 @@
 """DMRG-like variational algorithms, but in tensor network language."""
 
-import itertools
+import copy
+import functools
+import time
 import warnings
 
 import numpy as np
+import scipy.sparse.linalg as spla
+from autoray import do
 
-from ...core import prod
+from ...core import get_thread_pool, prod
 from ...linalg.base_linalg import IdentityLinearOperator, eigh
 from ...utils import progbar
+from ..storage import parse_checkpoint
 from ..tensor_core import (
     Tensor,
     TNLinearOperator,
     asarray,
+    bonds,
+    rand_uuid,
     tensor_contract,
 )
+from ..tnag.core import tensor_network_align
 
 
 def get_default_opts(cyclic=False):
@@ -30,6 +38,13 @@ def get_default_opts(cyclic=False):
     bond_expand_rand_strength : float
         In DMRG1, strength of randomness to expand bonds with. Needed to avoid
         singular matrices after expansion.
+    bond_expand_subspace_alpha : float
+        In DMRG3S, the initial strength of the subspace expansion term mixed
+        into each site before it is truncated.
+    bond_expand_subspace_decay : float
+        In DMRG3S, the factor by which ``bond_expand_subspace_alpha`` is
+        multiplied after each sweep. Since the expansion leaves the state
+        unchanged before truncation, the default is not to decay it.
     local_eig_tol : float
         Relative tolerance to solve inner eigenproblem to, larger = quicker but
         more unstable, default: 1e-3. Note this can be much looser than the
@@ -37,11 +52,29 @@ def get_default_opts(cyclic=False):
         previous state, and the overall accuracy comes from multiple sweeps.
     local_eig_ncv : int
         Number of inner eigenproblem lanczos vectors. Smaller can mean quicker.
-    local_eig_backend : {None, 'AUTO', 'SCIPY', 'SLEPC'}
+    local_eig_backend : {None, 'AUTO', 'SCIPY', 'SLEPC', 'DAVIDSON'}
         Which to backend to use for the inner eigenproblem. None or 'AUTO' to
         choose best. Generally ``'SLEPC'`` best if available for large
         problems, but it can't currently handle ``LinearOperator`` Neff as well
-        as ``'lobpcg'``.
+        as ``'lobpcg'``. ``'DAVIDSON'`` uses
+        :func:`~quimb.linalg.davidson.eigs_davidson`, which can make use of
+        the two options below, and reports the number of matrix-vector
+        products used per sweep in ``local_eig_nmatvecs``.
+    local_eig_residual_tol : float
+        If ``local_eig_backend='davidson'``, the tolerance used in place of
+        ``local_eig_tol``. This bounds the residual norm of the local
+        groundstate, relative to the local energy, rather than the error in
+        the local energy, and so needs to be tighter, default: 1e-5.
+    local_eig_precondition : bool
+        If ``local_eig_backend='davidson'``, whether to precondition the
+        inner eigensolve with the diagonal of the effective hamiltonian,
+        which is cheaply contracted from the environments.
+    local_eig_warm_start : bool
+        If ``local_eig_backend='davidson'``, whether to start each inner
+        eigensolve from the previous local groundstate *and* the other Ritz
+        vectors kept from the last solve at the same position, rather than
+        from the previous local groundstate only. This only helps once the
+        bond bases have settled between sweeps, default: False.
     local_eig_maxiter : int
         Maximum number of inner eigenproblem iterations.
     local_eig_ham_dense : bool
@@ -78,15 +111,24 @@ def get_default_opts(cyclic=False):
         distance to 1 (pseudo-orthogonoalized), then the generalized eigen
         decomposition is *not* used, which is much more efficient. If set too
         large the total normalization can become unstable.
+    parallel_inv_cutoff : float
+        In real-space parallel DMRG, the relative cutoff below which singular
+        values of the boundary gauges are discarded, rather than inverted,
+        when stitching the segments back together.
     """
     return {
         "default_sweep_sequence": "R",
         "bond_compress_method": "svd",
         "bond_compress_cutoff_mode": "rel" if cyclic else "sum2",
         "bond_expand_rand_strength": 1e-6,
+        "bond_expand_subspace_alpha": 1e-2,
+        "bond_expand_subspace_decay": 1.0,
         "local_eig_tol": 1e-3,
         "local_eig_ncv": 4,
         "local_eig_backend": None,
+        "local_eig_residual_tol": 1e-5,
+        "local_eig_precondition": True,
+        "local_eig_warm_start": False,
         "local_eig_maxiter": None,
         "local_eig_EPSType": None,
         "local_eig_ham_dense": None,
@@ -99,6 +141,7 @@ def get_default_opts(cyclic=False):
         "periodic_nullspace_fudge_factor": 1e-12,
         "periodic_canonize_inv_tol": 1e-10,
         "periodic_orthog_tol": 1e-6,
+        "parallel_inv_cutoff": 1e-10,
     }
 
 
@@ -209,6 +252,11 @@ class MovingEnvironment:
     norm : bool, optional
         If True, treat this ``MovingEnvironment`` as the state overlap, which
         enables a few extra checks.
+    segment : None or (int, int), optional
+        If given (and not cyclic), only sweep within the sites
+        ``range(*segment)``. In this case ``tn`` should only contain these
+        sites, plus any boundary environments already contracted and tagged
+        ``'_LEFT'`` and ``'_RIGHT'`` respectively.
 
     Notes
     -----
@@ -231,6 +279,7 @@ class MovingEnvironment:
         method="isvd",
         max_bond=-1,
         norm=False,
+        segment=None,
     ):
         self.tn = tn.copy(virtual=True)
         self.begin = begin
@@ -271,7 +320,9 @@ class MovingEnvironment:
             }[begin]
         else:
             self.segmented = False
-            start, stop = (0, self.L - self.bsz + 1)
+            if segment is None:
+                segment = (0, self.L)
+            start, stop = (segment[0], segment[1] - self.bsz + 1)
 
         self.init_segment(begin, start, stop)
 
@@ -329,9 +380,10 @@ class MovingEnvironment:
 
         if not self.segmented:
             if not self.cyclic:
-                # generate dummy left and right envs
-                self.tnc |= Tensor(tags="_LEFT").astype(self.tn.dtype)
-                self.tnc |= Tensor(tags="_RIGHT").astype(self.tn.dtype)
+                # generate dummy left and right envs, if not supplied
+                for tag in ("_LEFT", "_RIGHT"):
+                    if tag not in self.tnc.tag_map:
+                        self.tnc |= Tensor(tags=tag).astype(self.tn.dtype)
                 return
 
             # if cyclic just contract other section and tag
@@ -494,6 +546,181 @@ def parse_2site_inds_dims(k, b, i):
     return dims, lix_L, lix_R, lix, uix_L, uix_R, uix, l_bond_ind, u_bond_ind
 
 
+def get_parallel_segments(L, nsegments, shift=False):
+    """Split a chain of ``L`` sites into ``nsegments`` contiguous segments for
+    real-space parallel DMRG.
+
+    Parameters
+    ----------
+    L : int
+        The number of sites.
+    nsegments : int
+        The number of segments.
+    shift : bool, optional
+        If True, shift the boundaries between segments by half a segment, so
+        that they lie in the middle of the unshifted segments.
+
+    Returns
+    -------
+    segments : tuple[(int, int)]
+        The ``(start, stop)`` of each segment.
+    """
+    offset = 0.5 if shift else 0.0
+    bounds = (
+        0,
+        *(round((j + offset) * L / nsegments) for j in range(1, nsegments)),
+        L,
+    )
+    segments = tuple(zip(bounds[:-1], bounds[1:]))
+
+    if any(stop - start < 3 for start, stop in segments):
+        raise ValueError(
+            f"Can't split {L} sites into {nsegments} segments of at least "
+            "3 sites each."
+        )
+
+    return segments
+
+
+def _pinv_gauge(R, cutoff):
+    """Regularized pseudo-inverse of the bond gauge matrix ``R``, discarding
+    singular values smaller than ``cutoff`` relative to the largest.
+    """
+    U, s, VH = do("linalg.svd", R)
+    smax = float(do("max", s))
+    if smax == 0.0:
+        raise ValueError(
+            "Can't stitch parallel DMRG segments, the bond gauge is zero."
+        )
+    keep = s > cutoff * smax
+    s_inv = do("where", keep, 1 / do("where", keep, s, 1.0), 0.0)
+    VH = do("conj", do("transpose", VH))
+    U = do("conj", do("transpose", U))
+    return (VH * s_inv[None, :]) @ U
+
+
+def _sweep_dmrg_segment(dmrg, envs, direction, start, stop, update_opts):
+    """Sweep ``dmrg``, whose state only contains the sites
+    ``range(start, stop)``, with fixed boundary environments ``envs``,
+    returning the updated segment state and the local and total energies.
+    Module level so that it can be submitted to a process pool.
+    """
+    # form the energy network here so that it views the (possibly unpickled)
+    #     segment state tensors
+    dmrg.TN_energy = dmrg._b | dmrg.ham | dmrg._k
+    for env in envs:
+        dmrg.TN_energy |= env
+
+    direction, begin, sweep = {
+        "R": ("right", "left", range(start, stop - 1)),
+        "L": ("left", "right", range(stop - 2, start - 1, -1)),
+    }[direction]
+
+    if direction == "left":
+        # segments start right canonical, move the center to the last site
+        dmrg._k.left_canonize(start=start, stop=stop - 1, bra=dmrg._b)
+
+    dmrg.ME_eff_ham = MovingEnvironment(
+        dmrg.TN_energy, begin=begin, bsz=2, segment=(start, stop)
+    )
+    dmrg._sweep_nmatvec = 0
+
+    local_ens, tot_ens = zip(
+        *[
+            dmrg._update_local_state(i, direction=direction, **update_opts)
+            for i in sweep
+        ]
+    )
+
+    return dmrg._k, local_ens, tot_ens, dmrg._sweep_nmatvec
+
+
+class BlockSparseEffectiveHam(spla.LinearOperator):
+    """The effective hamiltonian, given by ``tensors``, as a linear operator
+    acting on the flattened blocks of a block sparse local tensor with the
+    same structure as ``template``. This allows standard iterative
+    eigensolvers to be used without ever forming any dense array.
+
+    Parameters
+    ----------
+    tensors : sequence of Tensor
+        The tensors forming the effective hamiltonian.
+    template : block sparse array
+        The current local tensor, with indices ``right_inds``, which fixes the
+        sectors (and their order) of the flattened vectors.
+    left_inds : sequence of str
+        The output indices, matching ``right_inds`` position-wise.
+    right_inds : sequence of str
+        The input indices.
+    optimize : str or PathOptimizer, optional
+        How to contract the effective hamiltonian with the local tensor.
+    """
+
+    def __init__(
+        self,
+        tensors,
+        template,
+        left_inds,
+        right_inds,
+        optimize="auto-hq",
+    ):
+        self.template = template.copy()
+        self.template.fill_missing_blocks()
+        self.sectors = tuple(self.template.sectors)
+        self.shapes = tuple(
+            self.template.get_block(sector).shape for sector in self.sectors
+        )
+        self.offsets = np.cumsum([0, *map(prod, self.shapes)])
+        self.tensors = tuple(tensors)
+        self.left_inds = tuple(left_inds)
+        self.right_inds = tuple(right_inds)
+        self.optimize = optimize
+        d = int(self.offsets[-1])
+        super().__init__(dtype=self.template.dtype, shape=(d, d))
+
+    def ravel(self, x):
+        """Flatten the blocks of ``x`` into a single vector, filling any
+        sectors that ``x`` is missing with zeros.
+        """
+        return np.concatenate(
+            [
+                np.ravel(x.get_block(sector))
+                if x.has_sector(sector)
+                else np.zeros(prod(shape), dtype=self.dtype)
+                for sector, shape in zip(self.sectors, self.shapes)
+            ]
+        )
+
+    def unravel(self, vec):
+        """Inverse of ``ravel``, creating a new block sparse array."""
+        vec = np.ravel(vec)
+        x = self.template.copy()
+        x.set_params(
+            {
+                sector: np.reshape(vec[a:b], shape)
+                for sector, shape, a, b in zip(
+                    self.sectors, self.shapes, self.offsets, self.offsets[1:]
+                )
+            }
+        )
+        return x
+
+    def _matvec(self, vec):
+        iT = Tensor(self.unravel(vec), inds=self.right_inds)
+        oT = tensor_contract(
+            *self.tensors,
+            iT,
+            output_inds=self.left_inds,
+            optimize=self.optimize,
+            preserve_tensor=True,
+        )
+        return self.ravel(oT.data)
+
+    def _adjoint(self):
+        # the effective hamiltonian is hermitian
+        return self
+
+
 class DMRGError(Exception):
     pass
 
@@ -507,7 +734,11 @@ class DMRG:
     Parameters
     ----------
     ham : MatrixProductOperator
-        The hamiltonian in MPO form.
+        The hamiltonian in MPO form. This can be made of ``symmray`` block
+        sparse arrays, e.g. from ``SparseOperatorBuilder.build_mpo(
+        symmetry=...)``, in which case ``p0`` must be given, in the desired
+        sector, and the local problems are solved directly on the blocks. For
+        ``bsz=1`` the bond charges are then fixed by ``p0``.
     bond_dims : int or sequence of ints.
         The bond-dimension of the MPS to optimize. If ``bsz > 1``, then this
         corresponds to the maximum bond dimension when splitting the effective
@@ -539,6 +770,12 @@ class DMRG:
     total_energies : list of list of float
         The total energies per sweep: ``local_energies[i, j]`` contains the
         total energy after the jth step of the (i+1)th sweep.
+    sweep_times : list of float
+        The wall time, in seconds, taken by each sweep.
+    local_eig_nmatvecs : list of int or None
+        The total number of effective hamiltonian matrix-vector products
+        performed by the inner eigensolver in each sweep, if using the
+        ``'davidson'`` local eigensolver backend, else ``None``.
     opts : dict
         Advanced options e.g. relating to the inner eigensolve or compression,
         see :func:`~quimb.tensor.tn1d.dmrg.get_default_opts`.
@@ -561,26 +798,69 @@ class DMRG:
         self._set_bond_dim_seq(bond_dims)
         self._set_cutoff_seq(cutoffs)
 
-        # create internal states and ham
+        self.ham = ham.copy()
+        self.ham.add_tag("_HAM")
+
+        # block sparse (symmetric) hamiltonian -> the local tensors are
+        #     never densified, and the sector is fixed by the initial state
+        self._blocksparse = self.ham[0].isblocksparse()
+        if self._blocksparse:
+            if self.cyclic:
+                raise NotImplementedError(
+                    "Block sparse DMRG only supports open boundaries."
+                )
+            if p0 is None:
+                raise ValueError(
+                    "A block sparse hamiltonian requires an initial state "
+                    "``p0`` in the target sector, e.g. from "
+                    "``MPS_rand_state(..., symmetry=..., sector=...)``."
+                )
+
+        # create internal states
         if p0 is not None:
-            self._k = p0.copy()
+            self._set_ket(p0.copy())
         else:
-            self._k = ham.rand_state(self._bond_dim0)
+            self._set_ket(ham.rand_state(self._bond_dim0))
+
+        self.energies = []
+        self.local_energies = []
+        self.total_energies = []
+        self.sweep_times = []
+        self.local_eig_nmatvecs = []
+        self._sweep_nmatvec = 0
+        self._eig_subspaces = {}
+
+        if self.cyclic:
+            self.bond_sizes_ham = []
+            self.bond_sizes_norm = []
+
+        self.opts = get_default_opts(self.cyclic)
+
+    def _set_ket(self, k):
+        """Set the internal ket state, creating the matching bra and the
+        overlap networks with the hamiltonian (and identity if cyclic).
+        """
+        self._k = k
         self._b = self._k.H
-        self.ham = ham.copy()
         self._k.add_tag("_KET")
+        if "_KET" in self._b.tags:
+            # e.g. resuming from a checkpoint
+            self._b.drop_tags("_KET")
         self._b.add_tag("_BRA")
-        self.ham.add_tag("_HAM")
 
-        # Line up and overlap for energy calc
-        self._k.align_(self.ham, self._b)
+        # Line up and overlap for energy calc, the bra is contracted with
+        #     the upper (output) indices of the hamiltonian
+        tensor_network_align(
+            self._b,
+            self.ham,
+            self._k,
+            ind_ids=(rand_uuid() + "{}", self._k.site_ind_id),
+            inplace=True,
+        )
 
         # want to contract this multiple times while
         #   manipulating k/b -> make virtual
         self.TN_energy = self._b | self.ham | self._k
-        self.energies = []
-        self.local_energies = []
-        self.total_energies = []
 
         # if cyclic need to keep track of normalization
         if self.cyclic:
@@ -588,19 +868,30 @@ class DMRG:
             eye.add_tag("_EYE")
             self.TN_norm = self._b | eye | self._k
 
-            self.bond_sizes_ham = []
-            self.bond_sizes_norm = []
-
-        self.opts = get_default_opts(self.cyclic)
-
     def _set_bond_dim_seq(self, bond_dims):
         bds = (bond_dims,) if isinstance(bond_dims, int) else tuple(bond_dims)
         self._bond_dim0 = bds[0]
-        self._bond_dims = itertools.chain(bds, itertools.repeat(bds[-1]))
+        self._bond_dim_seq = bds
+        self._bond_dim_pos = 0
 
     def _set_cutoff_seq(self, cutoffs):
         bds = (cutoffs,) if isinstance(cutoffs, float) else tuple(cutoffs)
-        self._cutoffs = itertools.chain(bds, itertools.repeat(bds[-1]))
+        self._cutoff_seq = bds
+        self._cutoff_pos = 0
+
+    def _next_bond_dim_and_cutoff(self):
+        """Get the bond dimension and cutoff for the next sweep, repeating
+        the final values of each sequence once exhausted.
+        """
+        max_bond = self._bond_dim_seq[
+            min(self._bond_dim_pos, len(self._bond_dim_seq) - 1)
+        ]
+        cutoff = self._cutoff_seq[
+            min(self._cutoff_pos, len(self._cutoff_seq) - 1)
+        ]
+        self._bond_dim_pos += 1
+        self._cutoff_pos += 1
+        return max_bond, cutoff
 
     @property
     def energy(self):
@@ -614,7 +905,7 @@ class DMRG:
 
     # -------------------- standard DMRG update methods --------------------- #
 
-    def _canonize_after_1site_update(self, direction, i):
+    def _canonize_after_1site_update(self, direction, i, **compress_opts):
         """Compress a site having updated it. Also serves to move the
         orthogonality center along.
         """
@@ -623,8 +914,67 @@ class DMRG:
         elif (direction == "left") and ((i > 0) or self.cyclic):
             self._k.right_canonize_site(i, bra=self._b)
 
-    def _eigs(self, A, B=None, v0=None):
+    def _uses_davidson(self):
+        backend = self.opts.get("local_eig_backend", None)
+        return (backend is not None) and (backend.upper() == "DAVIDSON")
+
+    def _eigs_davidson(self, A, B=None, v0=None, where=None):
+        """Find single eigenpair with the davidson solver, possibly
+        preconditioned with the diagonal of ``A`` and warm started with the
+        subspace stored from the last solve at position ``where``.
+        """
+        if B is not None:
+            # generalized problem, fallback to the default
+            return eigh(
+                A,
+                k=1,
+                B=B,
+                which=self.which,
+                v0=v0,
+                backend="LOBPCG",
+                tol=self.opts["local_eig_tol"],
+                maxiter=self.opts["local_eig_maxiter"],
+                fallback_to_scipy=True,
+            )
+
+        opts = {}
+        if self.opts["local_eig_precondition"]:
+            if isinstance(A, TNLinearOperator):
+                opts["precond"] = A.diagonal()
+            elif not isinstance(A, spla.LinearOperator):
+                opts["precond"] = np.diag(A)
+
+        if self.opts["local_eig_warm_start"] and (v0 is not None):
+            v0 = np.reshape(v0, (-1, 1))
+            subspace = self._eig_subspaces.get(where, None)
+            if (subspace is not None) and (subspace.shape[0] == len(v0)):
+                v0 = np.concatenate((v0, subspace), axis=1)
+
+        info = {}
+        loc_en, loc_gs = eigh(
+            A,
+            k=1,
+            which=self.which,
+            v0=v0,
+            backend="DAVIDSON",
+            ncv=self.opts["local_eig_ncv"],
+            tol=self.opts["local_eig_residual_tol"],
+            maxiter=self.opts["local_eig_maxiter"],
+            info=info,
+            **opts,
+        )
+        self._sweep_nmatvec += info["nmatvec"]
+        if self.opts["local_eig_warm_start"]:
+            # keep the rest of the ritz vectors, the first is ``loc_gs``
+            self._eig_subspaces[where] = info["subspace"][:, 1:]
+
+        return loc_en, loc_gs
+
+    def _eigs(self, A, B=None, v0=None, where=None):
         """Find single eigenpair, using all the internal settings."""
+        if self._uses_davidson():
+            return self._eigs_davidson(A, B=B, v0=v0, where=where)
+
         # intercept generalized eigen
         backend = self.opts["local_eig_backend"]
         if (backend is None) and (B is not None):
@@ -684,6 +1034,18 @@ class DMRG:
             self._eff_norm = self.ME_eff_norm()
         self._eff_ham = self.ME_eff_ham()
 
+        if self._blocksparse:
+            # act directly on the blocks of the current local tensor
+            template = tensor_contract(
+                *(self._k[j] for j in range(i, i + self.bsz)),
+                output_inds=uix,
+                preserve_tensor=True,
+            ).data
+            Heff = BlockSparseEffectiveHam(
+                self._eff_ham["_HAM"], template, lix, uix
+            )
+            return Heff, None
+
         # choose a rough value at which dense effective ham should not be used
         dense = self.opts["local_eig_ham_dense"]
         if dense is None:
@@ -775,16 +1137,22 @@ class DMRG:
         Heff, Neff = self.form_local_ops(i, dims, lix, uix)
 
         # get the old local groundstate to use as initial guess
-        loc_gs_old = self._k[i].data.ravel()
+        if self._blocksparse:
+            loc_gs_old = Heff.ravel(Heff.template)
+        else:
+            loc_gs_old = self._k[i].data.ravel()
 
         # find the local energy and groundstate
-        loc_en, loc_gs = self._eigs(Heff, B=Neff, v0=loc_gs_old)
+        loc_en, loc_gs = self._eigs(Heff, B=Neff, v0=loc_gs_old, where=i)
 
         # perform some minor checks and corrections
         loc_en, loc_gs = self.post_check(i, Neff, loc_gs, loc_en, loc_gs_old)
 
         # insert back into state and all tensor networks viewing it
-        loc_gs = loc_gs.toarray().reshape(dims)
+        if self._blocksparse:
+            loc_gs = Heff.unravel(loc_gs.toarray())
+        else:
+            loc_gs = loc_gs.toarray().reshape(dims)
         self._k[i].modify(data=loc_gs)
         self._b[i].modify(data=loc_gs.conj())
 
@@ -796,7 +1164,7 @@ class DMRG:
 
         tot_en = self._eff_ham ^ all
 
-        self._canonize_after_1site_update(direction, i)
+        self._canonize_after_1site_update(direction, i, **compress_opts)
 
         return loc_en.item(), tot_en
 
@@ -829,16 +1197,22 @@ class DMRG:
         Heff, Neff = self.form_local_ops(i, dims, lix, uix)
 
         # get the old 2-site local groundstate to use as initial guess
-        loc_gs_old = self._k[i].contract(self._k[i + 1]).to_dense(uix)
+        if self._blocksparse:
+            loc_gs_old = Heff.ravel(Heff.template)
+        else:
+            loc_gs_old = self._k[i].contract(self._k[i + 1]).to_dense(uix)
 
         # find the 2-site local groundstate and energy
-        loc_en, loc_gs = self._eigs(Heff, B=Neff, v0=loc_gs_old)
+        loc_en, loc_gs = self._eigs(Heff, B=Neff, v0=loc_gs_old, where=i)
 
         # perform some minor checks and corrections
         loc_en, loc_gs = self.post_check(i, Neff, loc_gs, loc_en, loc_gs_old)
 
         # split the two site local groundstate
-        T_AB = Tensor(loc_gs.toarray().reshape(dims), uix)
+        if self._blocksparse:
+            T_AB = Tensor(Heff.unravel(loc_gs.toarray()), uix)
+        else:
+            T_AB = Tensor(loc_gs.toarray().reshape(dims), uix)
         L, R = T_AB.split(
             left_inds=uix_L,
             get="arrays",
@@ -996,8 +1370,227 @@ class DMRG:
             **update_opts,
         )
 
+    def sweep_parallel(
+        self,
+        direction,
+        nsegments,
+        executor=None,
+        shift=False,
+        verbosity=0,
+        **update_opts,
+    ):
+        r"""Perform a real-space parallel sweep [1]. The chain is split into
+        ``nsegments`` segments which are each swept concurrently, in
+        ``direction``, with the rest of the state held fixed. First the state
+        is gauged such that for the bond between every pair of segments::
+
+            >->->->-R-<-<-<-<
+            | | | |   | | | |
+
+        with ``R`` the 'gauge' at that bond. Each segment absorbs the gauge to
+        its left and forms its fixed environments from the left and right
+        canonical tensors either side of it. After the segments have been
+        swept, they are stitched back together by inserting the regularized
+        inverse gauge, ``R^-1``, at each boundary. Since neighbouring segments
+        were optimized independently, this is only approximate, so finally
+        a cheap serial sweep reoptimizes just the bonds between segments.
+        These bonds are otherwise not updated, so ``shift`` should be
+        alternated between sweeps.
+
+        Parameters
+        ----------
+        direction : {'R', 'L'}
+            Sweep each segment from left to right (->) or right to left (<-).
+        nsegments : int
+            How many segments to split the chain into, each of which should
+            contain at least 3 sites.
+        executor : Executor, optional
+            A ``concurrent.futures`` style executor to sweep the segments
+            with, by default a thread pool.
+        shift : bool, optional
+            Whether to shift the segment boundaries by half a segment, see
+            :func:`~quimb.tensor.tn1d.dmrg.get_parallel_segments`.
+        verbosity : {0, 1, 2}, optional
+            Show a progress bar over the segments.
+        update_opts :
+            Supplied to ``self._update_local_state``.
+
+        Returns
+        -------
+        energy : float
+            The energy of the stitched and reoptimized state.
+
+        References
+        ----------
+        .. [1] E. M. Stoudenmire and S. R. White, "Real-space parallel
+           density matrix renormalization group", Phys. Rev. B 87, 155137
+           (2013).
+        """
+        if self.cyclic or (self.bsz != 2):
+            raise ValueError(
+                "Parallel sweeps are only supported for OBC and ``bsz=2``."
+            )
+
+        if executor is None:
+            executor = get_thread_pool()
+
+        k, b = self._k, self._b
+        segments = get_parallel_segments(self.L, nsegments, shift=shift)
+        starts = {start for start, _ in segments[1:]}
+        stops = {stop for _, stop in segments[:-1]}
+        max_start = max(starts, default=0)
+        min_stop = min(stops, default=self.L)
+
+        # right canonical form, psi = C-B-B-B-...
+        kB = k.right_canonicalize()
+        Bs = {i: kB[i].transpose(*k[i].inds).data for i in range(self.L)}
+
+        # left canonical form, and the gauges at each bond, psi = A-...-A-R-B-B
+        #     the gauged tensors 'R-B' also form the first site of segments
+        As, Rs, cores = {}, {}, {0: Bs[0]}
+        t = kB[0]
+        for i in range(max_start):
+            bix = k.bond(i, i + 1)
+            left_inds = tuple(ix for ix in t.inds if ix != bix)
+            Q, Rs[i] = t.split(left_inds, method="qr", get="arrays")
+            As[i] = Tensor(Q, (*left_inds, bix)).transpose(*k[i].inds).data
+
+            tmp = rand_uuid()
+            t = Tensor(Rs[i], (bix, tmp)) @ kB[i + 1].reindex({bix: tmp})
+            t.transpose_(*k[i + 1].inds)
+            if i + 1 in starts:
+                cores[i + 1] = t.data
+
+        def site_tensors(i, data):
+            return (
+                Tensor(data, k[i].inds, tags=k[i].tags),
+                self.ham[i],
+                Tensor(data.conj(), b[i].inds, tags=b[i].tags),
+            )
+
+        # the fixed boundary environments of each segment
+        envs_L, env = {}, ()
+        for i in range(max_start):
+            env = (tensor_contract(*env, *site_tensors(i, As[i])),)
+            if i + 1 in starts:
+                envs_L[i + 1] = env[0].copy()
+                envs_L[i + 1].add_tag("_LEFT")
+
+        envs_R, env = {}, ()
+        for i in range(self.L - 1, min_stop - 1, -1):
+            env = (tensor_contract(*env, *site_tensors(i, Bs[i])),)
+            if i in stops:
+                envs_R[i] = env[0].copy()
+                envs_R[i].add_tag("_RIGHT")
+
+        futures = []
+        for start, stop in segments:
+            tags = tuple(map(k.site_tag, range(start, stop)))
+
+            # a lightweight copy of this DMRG instance for the segment only
+            seg = copy.copy(self)
+            seg.TN_energy = seg.ME_eff_ham = None
+            seg._k = k.select_any(tags, virtual=False)
+            seg._b = b.select_any(tags, virtual=False)
+            for i in range(start, stop):
+                data = cores[i] if i == start else Bs[i]
+                seg._k[i].modify(data=data)
+                seg._b[i].modify(data=data.conj())
+            seg.ham = self.ham.select_any(tags, virtual=False)
+            envs = [
+                env
+                for env in (envs_L.get(start), envs_R.get(stop))
+                if env is not None
+            ]
+
+            futures.append(
+                executor.submit(
+                    _sweep_dmrg_segment,
+                    seg,
+                    envs,
+                    direction,
+                    start,
+                    stop,
+                    update_opts,
+                )
+            )
+
+        if verbosity:
+            futures = progbar(futures, ncols=80, total=len(futures))
+
+        local_ens, tot_ens = [], []
+        inv_cutoff = self.opts["parallel_inv_cutoff"]
+
+        for (start, stop), future in zip(segments, futures):
+            k_seg, seg_local_ens, seg_tot_ens, nmatvec = future.result()
+            self._sweep_nmatvec += nmatvec
+            local_ens.extend(seg_local_ens)
+            tot_ens.extend(seg_tot_ens)
+
+            for i in range(start, stop):
+                t = k_seg[i]
+                if i == start and i > 0:
+                    # stitch to the previous segment with the inverse gauge
+                    bix, tmp = k.bond(i - 1, i), rand_uuid()
+                    Rinv = _pinv_gauge(Rs[i - 1], inv_cutoff)
+                    t = Tensor(Rinv, (bix, tmp)) @ t.reindex({bix: tmp})
+                data = t.transpose(*k[i].inds).data
+                k[i].modify(data=data)
+                b[i].modify(data=data.conj())
+
+        if verbosity:
+            futures.close()
+
+        if starts:
+            # the stitched state is only approximate where two independently
+            #     optimized segments meet, so finally reoptimize those bonds
+            boundary_local_ens, boundary_tot_ens = self._sweep_boundaries(
+                sorted(start - 1 for start in starts), **update_opts
+            )
+            local_ens.extend(boundary_local_ens)
+            tot_ens.extend(boundary_tot_ens)
+
+        self.local_energies.append(tuple(local_ens))
+        self.total_energies.append(tuple(tot_ens))
+
+        return tot_ens[-1]
+
+    def _sweep_boundaries(self, sites, **update_opts):
+        """Perform a serial rightwards sweep that only locally optimizes the
+        bonds ``(i, i + 1) for i in sites``, simply moving the orthogonality
+        center across all other sites.
+        """
+        self._k.right_canonize(bra=self._b)
+        self.ME_eff_ham = MovingEnvironment(self.TN_energy, "left", bsz=2)
+
+        local_ens, tot_ens = [], []
+        for i in range(max(sites) + 1):
+            if i in sites:
+                loc_en, tot_en = self._update_local_state(
+                    i, direction="right", **update_opts
+                )
+                local_ens.append(loc_en)
+                tot_ens.append(tot_en)
+            else:
+                self._k.left_canonize_site(i, bra=self._b)
+
+        return local_ens, tot_ens
+
     # ----------------- overloadable 'plugin' style methods ----------------- #
 
+    def _expand_bond_dimension(self, max_bond):
+        """Grow the bonds before each single site sweep, which can't itself
+        increase them, by padding with small random entries.
+        """
+        if self._blocksparse:
+            # the charge sectors of each bond are fixed by the initial state
+            return
+        self._k.expand_bond_dimension(
+            max_bond,
+            bra=self._b,
+            rand_strength=self.opts["bond_expand_rand_strength"],
+        )
+
     def _print_pre_sweep(self, i, direction, max_bond, cutoff, verbosity=0):
         """Print this before each sweep."""
         if verbosity > 0:
@@ -1021,6 +1614,10 @@ class DMRG:
                 self.energy, "converged!" if converged else "not converged."
             )
             print(msg, flush=True)
+            msg = f"Sweep time: {self.sweep_times[-1]:.3g}s"
+            if self.local_eig_nmatvecs[-1] is not None:
+                msg += f", local eig matvecs: {self.local_eig_nmatvecs[-1]}"
+            print(msg, flush=True)
 
     def _check_convergence(self, tol):
         """By default check the absolute change in energy."""
@@ -1039,6 +1636,11 @@ class DMRG:
         max_sweeps=10,
         verbosity=0,
         suppress_warnings=True,
+        checkpoint=None,
+        checkpoint_every=1,
+        resume=None,
+        nsegments=None,
+        executor=None,
     ):
         """Solve the system with a sequence of sweeps, up to a certain
         absolute tolerance in the energy or maximum number of sweeps.
@@ -1061,6 +1663,27 @@ class DMRG:
         suppress_warnings : bool, optional
             Whether to suppress warnings about non-convergence, usually due to
             the intentional low accuracy of the inner eigensolve.
+        checkpoint : None, str or TensorNetworkCheckpoint, optional
+            If given, a directory to save a checkpoint to every
+            ``checkpoint_every`` sweeps, storing the state, energies, options
+            and position in the bond dimension, cutoff and sweep sequences.
+            Only the site tensors changed since the last checkpoint are
+            written. See :class:`~quimb.tensor.storage.TensorNetworkCheckpoint`.
+        checkpoint_every : int, optional
+            How many sweeps to perform between checkpoints.
+        resume : None, bool, str or TensorNetworkCheckpoint, optional
+            A checkpoint to resume an interrupted ``solve`` call from, with
+            the same arguments otherwise. If ``True``, resume from
+            ``checkpoint`` only if it exists. See
+            :func:`~quimb.tensor.storage.parse_checkpoint`.
+        nsegments : None or int, optional
+            If given, perform real-space parallel sweeps, splitting the chain
+            into this many segments which are swept concurrently, with the
+            segment boundaries shifted every other sweep. Only for OBC and
+            ``bsz=2``. See :meth:`~quimb.tensor.tn1d.dmrg.DMRG.sweep_parallel`.
+        executor : Executor, optional
+            If ``nsegments`` is given, the ``concurrent.futures`` style
+            executor to sweep the segments with, by default a thread pool.
 
         Returns
         -------
@@ -1077,16 +1700,23 @@ class DMRG:
         if sweep_sequence is None:
             sweep_sequence = self.opts["default_sweep_sequence"]
 
-        directions = itertools.cycle(sweep_sequence)
-        previous_direction = "0"
+        checkpoint, loaded = parse_checkpoint(checkpoint, resume)
+        if loaded is not None:
+            tns, state = loaded
+            self._set_ket(tns["ket"])
+            sweep_sequence = state.pop("sweep_sequence")
+            for k, v in state.pop("attrs").items():
+                setattr(self, k, v)
+            sweep0, previous_direction = state["sweep"], state["direction"]
+        else:
+            sweep0, previous_direction = 0, "0"
+
+        converged = False
 
-        for _ in range(max_sweeps):
+        for sweep in range(sweep0, max_sweeps):
             # Get the next direction, bond dimension and cutoff
-            direction, max_bond, cutoff = (
-                next(directions),
-                next(self._bond_dims),
-                next(self._cutoffs),
-            )
+            direction = sweep_sequence[sweep % len(sweep_sequence)]
+            max_bond, cutoff = self._next_bond_dim_and_cutoff()
             self._print_pre_sweep(
                 len(self.energies),
                 direction,
@@ -1104,11 +1734,7 @@ class DMRG:
 
             # need to manually expand bond dimension for DMRG1
             if self.bsz == 1:
-                self._k.expand_bond_dimension(
-                    max_bond,
-                    bra=self._b,
-                    rand_strength=self.opts["bond_expand_rand_strength"],
-                )
+                self._expand_bond_dimension(max_bond)
 
             # inject all options and defaults
             sweep_opts = {
@@ -1120,14 +1746,32 @@ class DMRG:
                 "verbosity": verbosity,
             }
 
+            if nsegments is None:
+                sweep_fn = self.sweep
+            else:
+                # the parallel sweep always regauges the whole state itself
+                del sweep_opts["canonize"]
+                sweep_fn = functools.partial(
+                    self.sweep_parallel,
+                    nsegments=nsegments,
+                    executor=executor,
+                    shift=bool(sweep % 2),
+                )
+
             # perform the sweep
+            self._sweep_nmatvec = 0
+            t0 = time.time()
             if suppress_warnings:
                 with warnings.catch_warnings():
                     warnings.simplefilter("ignore")
-                    energy = self.sweep(direction=direction, **sweep_opts)
+                    energy = sweep_fn(direction=direction, **sweep_opts)
             else:
-                energy = self.sweep(direction=direction, **sweep_opts)
+                energy = sweep_fn(direction=direction, **sweep_opts)
 
+            self.sweep_times.append(time.time() - t0)
+            self.local_eig_nmatvecs.append(
+                self._sweep_nmatvec if self._uses_davidson() else None
+            )
             self.energies.append(energy)
 
             # any plugin computations
@@ -1141,8 +1785,47 @@ class DMRG:
 
             previous_direction = direction
 
+            if (checkpoint is not None) and (
+                (sweep + 1) % checkpoint_every == 0
+            ):
+                self._save_checkpoint(
+                    checkpoint, sweep + 1, direction, sweep_sequence
+                )
+
         return converged
 
+    _CHECKPOINT_ATTRS = (
+        "energies",
+        "local_energies",
+        "total_energies",
+        "sweep_times",
+        "local_eig_nmatvecs",
+        "opts",
+        "_bond_dim_seq",
+        "_bond_dim_pos",
+        "_cutoff_seq",
+        "_cutoff_pos",
+        "bond_sizes_ham",
+        "bond_sizes_norm",
+    )
+
+    def _save_checkpoint(self, checkpoint, sweep, direction, sweep_sequence):
+        """Save the state between sweeps to ``checkpoint``. The effective
+        environments are rebuilt from the state at the start of each sweep,
+        so only the ket and these attributes need storing.
+        """
+        checkpoint.save(
+            tns={"ket": self._k},
+            attrs={
+                k: getattr(self, k)
+                for k in self._CHECKPOINT_ATTRS
+                if hasattr(self, k)
+            },
+            sweep=sweep,
+            direction=direction,
+            sweep_sequence=sweep_sequence,
+        )
+
 
 class DMRG1(DMRG):
     """Simple alias of one site ``DMRG``."""
@@ -1182,6 +1865,118 @@ class DMRG2(DMRG):
         )
 
 
+class DMRG3S(DMRG):
+    r"""Single site DMRG with subspace expansion, or 'DMRG3S'
+    (https://arxiv.org/abs/1501.05504). After each local update, the bond
+    to the next site is enlarged with the perturbation term ``alpha * P``,
+    formed from the effective hamiltonian acting on one side only, e.g.
+    for a right sweep::
+
+            ╭─●─
+            │ │
+        P = L─H═   (right ket and mpo bonds fused)
+            │ │
+
+        M_i -> [M_i | alpha P],    M_{i+1} -> [M_{i+1} ; 0]
+
+    which leaves the state unchanged, before truncating the enlarged bond
+    with an SVD. The bond dimension can thus grow, and escape local minima,
+    as in two site DMRG, but at roughly the cost of single site DMRG, which
+    makes the most difference for large local dimensions. Only for OBC.
+    """
+
+    __doc__ += DMRG.__doc__
+
+    def __init__(self, ham, which="SA", bond_dims=None, cutoffs=1e-8, p0=None):
+        if ham.cyclic:
+            raise NotImplementedError("DMRG3S is only implemented for OBC.")
+        if ham[0].isblocksparse():
+            raise NotImplementedError(
+                "DMRG3S doesn't support block sparse hamiltonians yet."
+            )
+
+        if bond_dims is None:
+            bond_dims = [8, 16, 32, 64, 128, 256, 512, 1024]
+
+        super().__init__(
+            ham,
+            bond_dims=bond_dims,
+            cutoffs=cutoffs,
+            which=which,
+            p0=p0,
+            bsz=1,
+        )
+
+    @property
+    def alpha(self):
+        """The current strength of the subspace expansion term."""
+        return self.opts["bond_expand_subspace_alpha"] * (
+            self.opts["bond_expand_subspace_decay"] ** len(self.energies)
+        )
+
+    def _expand_bond_dimension(self, max_bond):
+        # bonds are grown by the subspace expansion during the sweep
+        pass
+
+    def _canonize_after_1site_update(self, direction, i, **compress_opts):
+        """Expand the bond from site ``i`` to the next site in ``direction``
+        with the subspace expansion term, then truncate it, which also moves
+        the orthogonality center along.
+        """
+        if direction == "right":
+            if i == self.L - 1:
+                return
+            j, env_tag = i + 1, "_LEFT"
+        else:
+            if i == 0:
+                return
+            j, env_tag = i - 1, "_RIGHT"
+
+        ki, kj = self._k[i], self._k[j]
+        bix = self._k.bond(i, j)
+        (hix,) = bonds(self.ham[i], self.ham[j])
+
+        # the expansion term, mapped from the bra to the ket space, with
+        #     the mpo bond fused into the bond to the next site
+        P = tensor_contract(
+            self._eff_ham[env_tag], ki, self.ham[i], preserve_tensor=True
+        )
+        P.reindex_(dict(zip(self._b[i].inds, ki.inds)))
+        P.fuse_({bix: (bix, hix)})
+        P.transpose_(*ki.inds)
+
+        # enlarge then truncate the bond, leaving site i an isometry
+        tmp = rand_uuid()
+        T = Tensor(
+            data=do(
+                "concatenate",
+                (ki.data, self.alpha * P.data),
+                axis=ki.inds.index(bix),
+            ),
+            inds=ki.inds,
+        ).reindex_({bix: tmp})
+        Mi, C = T.split(
+            left_inds=[ix for ix in T.inds if ix != tmp],
+            get="tensors",
+            absorb="right",
+            bond_ind=bix,
+            **compress_opts,
+        )
+
+        # the next site is padded with zeros, so only absorb the part of
+        #     the gauge acting on the original bond
+        C.transpose_(bix, tmp)
+        C.modify(data=C.data[:, : kj.ind_size(bix)])
+        Mj = C @ kj.reindex({bix: tmp})
+
+        Mi = Mi.transpose(*ki.inds).data
+        Mj = Mj.transpose(*kj.inds).data
+        ki.modify(data=Mi)
+        self._b[i].modify(data=do("conj", Mi))
+        kj.modify(data=Mj)
+        self._b[j].modify(data=do("conj", Mj))
+
+
 # --------------------------------------------------------------------------- #
 #                                    DMRGX                                    #
 # --------------------------------------------------------------------------- #
@@ -1220,14 +2015,6 @@ class DMRGX(DMRG):
         super().__init__(
             ham, bond_dims=bond_dims, p0=p0, bsz=bsz, cutoffs=cutoffs
         )
-        # Want to keep track of energy variance as well
-        var_ham1 = self.ham.copy()
-        var_ham2 = self.ham.copy()
-        var_ham1.upper_ind_id = self._k.site_ind_id
-        var_ham1.lower_ind_id = "__ham2{}__"
-        var_ham2.upper_ind_id = "__ham2{}__"
-        var_ham2.lower_ind_id = self._b.site_ind_id
-        self.TN_energy2 = self._k | var_ham1 | var_ham2 | self._b
         self.energies.append(self.TN_energy ^ ...)
         self.variances = [(self.TN_energy2 ^ ...) - self.energies[-1] ** 2]
         self._target_energy = self.energies[-1]
@@ -1243,6 +2030,20 @@ class DMRGX(DMRG):
             "bond_expand_rand_strength": 1e-9,
         }
 
+    _CHECKPOINT_ATTRS = DMRG._CHECKPOINT_ATTRS + (
+        "variances",
+        "_target_energy",
+    )
+
+    def _set_ket(self, k):
+        super()._set_ket(k)
+        # Want to keep track of energy variance as well
+        var_ham1 = self.ham.copy()
+        var_ham2 = self.ham.copy()
+        var_ham1.lower_ind_id = "__ham2{}__"
+        var_ham2.upper_ind_id = "__ham2{}__"
+        self.TN_energy2 = self._b | var_ham1 | var_ham2 | self._k
+
     @property
     def variance(self):
         return self.variances[-1]
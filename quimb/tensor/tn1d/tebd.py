@@ -8,6 +8,7 @@ from autoray import do
 from ...utils import continuous_progbar, deprecated, ensure_dict
 from ...utils import progbar as Progbar
 from ..array_ops import norm_fro
+from ..storage import parse_checkpoint
 from ..tnag.tebd import LocalHamGen
 
 
@@ -480,7 +481,34 @@ class TEBD:
 
     TARGET_TOL = 1e-13  # tolerance to have 'reached' target time
 
-    def update_to(self, T, dt=None, tol=None, order=4, progbar=None):
+    def _save_checkpoint(self, checkpoint):
+        checkpoint.save(
+            tns={"pt": self._pt},
+            t=self.t,
+            err=self._err,
+            dt=self._dt,
+            queued_sweep=getattr(self, "_queued_sweep", None),
+        )
+
+    def _load_checkpoint(self, loaded):
+        tns, state = loaded
+        self._pt = tns["pt"]
+        self.t = state["t"]
+        self._err = state["err"]
+        self._dt = state["dt"]
+        self._queued_sweep = state["queued_sweep"]
+
+    def update_to(
+        self,
+        T,
+        dt=None,
+        tol=None,
+        order=4,
+        progbar=None,
+        checkpoint=None,
+        checkpoint_every=1,
+        resume=None,
+    ):
         """Update the state to time ``T``.
 
         Parameters
@@ -495,20 +523,42 @@ class TEBD:
             Trotter order to use.
         progbar : bool, optional
             Manually turn the progress bar off.
+        checkpoint : None, str or TensorNetworkCheckpoint, optional
+            If given, a directory to save a checkpoint of the state, time,
+            error, time step and any queued sweep to every
+            ``checkpoint_every`` steps. Only the site tensors changed since
+            the last checkpoint are written. See
+            :class:`~quimb.tensor.storage.TensorNetworkCheckpoint`.
+        checkpoint_every : int, optional
+            How many steps to take between checkpoints.
+        resume : None, bool, str or TensorNetworkCheckpoint, optional
+            A checkpoint to resume an interrupted ``update_to`` call from. If
+            ``True``, resume from ``checkpoint`` only if it exists. See
+            :func:`~quimb.tensor.storage.parse_checkpoint`.
         """
-        if T < self.t - self.TARGET_TOL:
-            # can't go backwards yet
-            raise NotImplementedError
+        checkpoint, loaded = parse_checkpoint(checkpoint, resume)
+
+        if loaded is not None:
+            # time step is restored rather than recomputed from remaining T
+            self._load_checkpoint(loaded)
+        else:
+            if T < self.t - self.TARGET_TOL:
+                # can't go backwards yet
+                raise NotImplementedError
 
-        self._compute_sweep_dt_tol(T, dt, tol, order)
+            self._compute_sweep_dt_tol(T, dt, tol, order)
 
         # set up progress bar and start evolution
         progbar = self.progbar if (progbar is None) else progbar
         progbar = continuous_progbar(self.t, T) if progbar else None
 
+        nsteps = 0
         while self.t < T - self._dt:
             # get closer until we can reach in a single step
             self.step(order=order, progbar=progbar, dt=None, queue=True)
+            nsteps += 1
+            if (checkpoint is not None) and (nsteps % checkpoint_every == 0):
+                self._save_checkpoint(checkpoint)
 
         # always perform final sweep with queue draining
         self.step(order=order, progbar=progbar, dt=T - self.t, queue=False)
@@ -17,6 +17,7 @@ from ...utils import (
 from ...utils import progbar as Progbar
 from ...utils_plot import default_to_neutral_style
 from ..drawing import get_colors, get_positions
+from ..storage import parse_checkpoint
 from ..tensor_core import Tensor
 from ..tnag.core import TensorNetworkGenVector
 
@@ -624,9 +625,81 @@ class TEBDSweepMixin:
             desc += f", energy≈{float(self.energies[-1]):.6g}"
         pbar.set_description(desc)
 
-    def evolve(self, steps, tau=None, progbar=None):
+    # attributes, where present, stored in checkpoints alongside the state
+    _CHECKPOINT_ATTRS = (
+        "_n",
+        "tau",
+        "last_tau",
+        "taus",
+        "best",
+        "gate_opts",
+        "energy_ns",
+        "energies",
+        "energy_diffs",
+        "egrdm",
+        "_gauges",
+        "gauges_prev",
+        "gauge_diffs",
+        "equilibration_ns",
+        "equilibration_iterations",
+        "equilibration_max_sdiffs",
+        "bp_ns",
+        "bp_iterations",
+    )
+
+    def _save_checkpoint(self, checkpoint, it):
+        checkpoint.save(
+            tns={"psi": self._psi},
+            attrs={
+                k: getattr(self, k)
+                for k in self._CHECKPOINT_ATTRS
+                if hasattr(self, k)
+            },
+            it=it,
+        )
+
+    def _load_checkpoint(self, loaded):
+        tns, state = loaded
+        self._psi = tns["psi"]
+        for k, v in state["attrs"].items():
+            setattr(self, k, v)
+        if getattr(self, "_next_psi", None) is not None:
+            # parallel update 'next' state is recreated from the current
+            self._next_psi = self._next_gauges = None
+        return state["it"]
+
+    def evolve(
+        self,
+        steps,
+        tau=None,
+        progbar=None,
+        checkpoint=None,
+        checkpoint_every=1,
+        resume=None,
+    ):
         """Evolve the state with the local Hamiltonian for ``steps`` steps with
         time step ``tau``.
+
+        Parameters
+        ----------
+        steps : int
+            The number of sweeps to perform.
+        tau : float or sequence of float, optional
+            The time step(s) to use, by default ``self.tau``.
+        progbar : bool, optional
+            Whether to show a progress bar.
+        checkpoint : None, str or TensorNetworkCheckpoint, optional
+            If given, a directory to save a checkpoint of the state, gauges
+            and tracked information to every ``checkpoint_every`` sweeps.
+            Only the tensors changed since the last checkpoint are written.
+            See :class:`~quimb.tensor.storage.TensorNetworkCheckpoint`.
+        checkpoint_every : int, optional
+            How many sweeps to perform between checkpoints.
+        resume : None, bool, str or TensorNetworkCheckpoint, optional
+            A checkpoint to resume an interrupted ``evolve`` call from, with
+            the same arguments otherwise. If ``True``, resume from
+            ``checkpoint`` only if it exists. See
+            :func:`~quimb.tensor.storage.parse_checkpoint`.
         """
 
         if tau is None:
@@ -638,13 +711,21 @@ class TEBDSweepMixin:
             self.tau = tau
             taus = itertools.repeat(tau)
 
+        checkpoint, loaded = parse_checkpoint(checkpoint, resume)
+        if loaded is not None:
+            it0 = self._load_checkpoint(loaded)
+        else:
+            it0 = 0
+
         if progbar is None:
             progbar = self.progbar
 
-        pbar = Progbar(total=steps, disable=not progbar)
+        pbar = Progbar(total=steps, initial=it0, disable=not progbar)
 
         try:
-            for it, tau in zip(range(steps), taus):
+            for it, tau in itertools.islice(
+                zip(range(steps), taus), it0, None
+            ):
                 # anything required by both energy and sweep
                 self.presweep()
 
@@ -674,6 +755,11 @@ class TEBDSweepMixin:
                 pbar.update()
                 self._set_progbar_description(pbar)
 
+                if (checkpoint is not None) and (
+                    (it + 1) % checkpoint_every == 0
+                ):
+                    self._save_checkpoint(checkpoint, it + 1)
+
                 if self.callback is not None:
                     if self.callback(self):
                         break
@@ -853,6 +939,9 @@ class GateBasicMixin:
         D=None,
         cutoff=1e-10,
         gate_opts=None,
+        *,
+        gauge_bp=False,
+        bp_opts=None,
     ):
         self.gate_opts = ensure_dict(gate_opts)
         # gating options
@@ -862,11 +951,57 @@ class GateBasicMixin:
         self.gate_opts.setdefault("cutoff", cutoff)
         self.gate_opts.setdefault("contract", "reduce-split")
 
+        # belief propagation gauging options
+        self.gauge_bp = bool(gauge_bp)
+        self.bp_opts = ensure_dict(bp_opts)
+        self.bp_opts.setdefault("max_iterations", 100)
+        self.bp_opts.setdefault("tol", 1e-4)
+        self.bp_ns = array.array("L")
+        self.bp_iterations = array.array("L")
+
     def gate(self, U, where):
         """Perform single gate ``U`` at coordinate pair ``where``. This is the
         the most common method to override.
         """
-        self._psi.gate_(U, where, **self.gate_opts)
+        if not self.gauge_bp:
+            self._psi.gate_(U, where, **self.gate_opts)
+            return
+
+        # gauge with, and update inplace, the live BP messages
+        self.get_bp().gate_(U, where, **self.gate_opts)
+        # then re-converge only the messages affected by the gate
+        self._run_bp()
+
+    def get_bp(self):
+        """Get the live dense 2-norm belief propagation object, which shares
+        its tensors with the current state, creating and converging it first
+        if necessary.
+
+        Returns
+        -------
+        D2BP
+        """
+        bp = getattr(self, "_bp", None)
+        if (bp is None) or (bp.tn is not self._psi):
+            from ..belief_propagation import D2BP
+
+            self._bp = D2BP(self._psi, inplace=True)
+            # no messages touched yet -> converges all messages
+            self._run_bp()
+        return self._bp
+
+    def _run_bp(self):
+        """Run the live BP object, with local convergence only the messages
+        marked as touched (and any they affect) are updated.
+        """
+        info = {}
+        self._bp.run(info=info, **self.bp_opts)
+
+        if (not self.bp_ns) or (self._n != self.bp_ns[-1]):
+            self.bp_ns.append(self._n)
+            self.bp_iterations.append(0)
+        # aggregate all info per sweep
+        self.bp_iterations[-1] += info["iterations"]
 
     def get_state(self) -> TensorNetworkGenVector:
         """The default method for retrieving the current state - simply a copy.
@@ -879,6 +1014,8 @@ class GateBasicMixin:
         Subclasses can override this to perform additional transformations.
         """
         self._psi = psi.copy()
+        # any live BP object is now out of date
+        self._bp = None
 
 
 class GateSimpleUpdateMixin:
@@ -1223,6 +1360,18 @@ class TEBDGen(
         Whether to plot the energy and energy difference every this many steps.
     progbar : bool, optional
         Whether to show a progress bar during evolution.
+    gauge_bp : bool, optional
+        Whether to gauge each gate application using dense 2-norm belief
+        propagation, see
+        :meth:`quimb.tensor.belief_propagation.D2BP.gate_`. A single live
+        :class:`~quimb.tensor.belief_propagation.D2BP` object is kept
+        throughout the evolution, sharing tensors with the state. After each
+        gate only the messages around the changed tensors, and any that these
+        in turn change, are re-converged.
+    bp_opts : dict, optional
+        Options to supply to
+        :meth:`quimb.tensor.belief_propagation.D2BP.run` after each gate.
+        By default `max_iterations` is set to 100 and `tol` to 1e-4.
 
     Attributes
     ----------
@@ -1247,6 +1396,10 @@ class TEBDGen(
         energy found during evolution under the key ``'energy'``, the state
         which achieved this energy under the key ``'state'``, and the iteration
         number under the key ``'it'``.
+    bp_ns : list[int]
+        If ``gauge_bp``, the iteration numbers at which BP was run.
+    bp_iterations : list[int]
+        If ``gauge_bp``, the total number of BP iterations during each sweep.
 
     See Also
     --------
@@ -1275,6 +1428,9 @@ class TEBDGen(
         keep_best=False,
         plot_every=None,
         progbar=True,
+        *,
+        gauge_bp=False,
+        bp_opts=None,
     ):
         self.setup_sweep_opts(
             psi0,
@@ -1294,6 +1450,8 @@ class TEBDGen(
             D=D,
             cutoff=cutoff,
             gate_opts=gate_opts,
+            gauge_bp=gauge_bp,
+            bp_opts=bp_opts,
         )
         self.setup_energy_opts(
             compute_energy_every=compute_energy_every,
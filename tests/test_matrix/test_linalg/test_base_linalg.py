@@ -179,6 +179,38 @@ class TestLOBPCG:
         assert_allclose(np.eye(6), abs(vk.H @ svk), atol=1e-9, rtol=1e-9)
 
 
+class TestDavidson:
+    @pytest.mark.parametrize("k", [1, 4])
+    @pytest.mark.parametrize("which", ["SA", "LA"])
+    @pytest.mark.parametrize("precond", [False, True])
+    @pytest.mark.parametrize("dtype", [float, complex])
+    def test_against_numpy(self, k, which, precond, dtype):
+        A = qu.rand_herm(64, dtype=dtype, seed=42)
+        A = A + np.diag(np.arange(64))
+        opts = {"precond": np.diag(A)} if precond else {}
+        lk, vk = qu.eigh(A, k=k, which=which, backend="davidson", **opts)
+        elk, evk = qu.eigh(A, k=k, which=which, backend="numpy")
+        assert_allclose(lk, elk)
+        assert_allclose(np.eye(k), abs(vk.H @ evk), atol=1e-7)
+
+    def test_warm_start(self):
+        A = qu.ham_heis(8, sparse=True)
+        info = {}
+        lk, _ = qu.eigh(A, k=2, backend="davidson", info=info)
+        assert info["converged"]
+        nmatvec = info["nmatvec"]
+        lk_w = qu.eigh(
+            A,
+            k=2,
+            backend="davidson",
+            v0=info["subspace"],
+            info=info,
+            return_vecs=False,
+        )
+        assert_allclose(lk, lk_w)
+        assert info["nmatvec"] < nmatvec // 2
+
+
 class TestEvalsWindowed:
     @pytest.mark.parametrize("backend", eigs_backends)
     def test_bound_spectrum(self, ham1, backend):
@@ -1,8 +1,15 @@
+import importlib
+
 import pytest
 from numpy.testing import assert_allclose
 
 import quimb.operator as qop
 
+requires_symmray = pytest.mark.skipif(
+    importlib.util.find_spec("symmray") is None,
+    reason="symmray not installed",
+)
+
 
 def assert_all_matrices_match(
     sob: qop.SparseOperatorBuilder,
@@ -38,3 +45,82 @@ def test_rand_operator_matrices(n, m, k, kmin, seed):
     assert_all_matrices_match(sob, extras=[A0])
     sob.pauli_decompose(use_zx=True)
     assert_all_matrices_match(sob, extras=[A0])
+
+
+def _heisenberg_and_hubbard(model):
+    if model == "heisenberg":
+        edges = [(i, i + 1) for i in range(5)]
+        return qop.heisenberg_from_edges(
+            edges, j=(1.0, 1.0, 0.7), b=0.3, sector=3, symmetry="U1"
+        )
+    if model == "ising":
+        H = qop.SparseOperatorBuilder(
+            hilbert_space=qop.HilbertSpace(5, sector="odd", symmetry="Z2")
+        )
+        for i in range(4):
+            H += 1.0, ("z", i), ("z", i + 1)
+            H += 0.5, ("x", i), ("y", i + 1)
+        for i in range(5):
+            H += 0.2, ("z", i)
+        return H
+    edges = [(i, i + 1) for i in range(2)]
+    return qop.fermi_hubbard_from_edges(
+        edges, sector=((3, 1), (3, 2)), symmetry="U1U1"
+    )
+
+
+@requires_symmray
+@pytest.mark.parametrize("model", ["heisenberg", "ising", "hubbard"])
+def test_build_mpo_symmetric(model):
+    H = _heisenberg_and_hubbard(model)
+    mpo = H.build_mpo(symmetry=True)
+    assert all(t.isblocksparse() for t in mpo)
+    assert mpo.max_bond() == H.build_mpo().max_bond()
+    A = mpo.contract(all, output_inds=(*mpo.upper_inds, *mpo.lower_inds))
+    d = 2**H.nsites
+    assert_allclose(A.data.to_dense().reshape(d, d), H.build_mpo().to_dense())
+
+
+@requires_symmray
+def test_build_mpo_symmetric_charged():
+    import quimb.tensor as qtn
+
+    H = qop.SparseOperatorBuilder()
+    H += ("+", 0), ("+", 2)
+    H += 0.5, ("n", 0), ("+", 1), ("+", 2)
+    mpo = H.build_mpo(symmetry="U1")
+    assert mpo[-1].data.charge == 2
+
+    psi = qtn.MPS_rand_state(3, 4, symmetry="U1", sector=1, seed=42)
+    psi_dense = psi.copy()
+    for t in psi_dense:
+        t.modify(data=t.data.to_dense())
+    phi = mpo.apply(psi)
+    phi_dense = H.build_dense() @ psi_dense.to_dense()
+    assert_allclose(phi.H @ phi, (phi_dense.conj().T @ phi_dense).item())
+
+
+@requires_symmray
+def test_build_mpo_symmetric_raises():
+    H = qop.SparseOperatorBuilder()
+    H += ("x", 0), ("x", 1)
+    with pytest.raises(ValueError):
+        H.build_mpo(symmetry="U1")
+    H = qop.SparseOperatorBuilder()
+    H += ("+", 0), ("n", 1)
+    H += ("n", 0), ("n", 1)
+    with pytest.raises(ValueError):
+        H.build_mpo(symmetry="U1")
+
+
+@requires_symmray
+@pytest.mark.parametrize("model", ["heisenberg", "ising", "hubbard"])
+def test_build_local_ham_symmetric(model):
+    H = _heisenberg_and_hubbard(model)
+    ham_dense = H.build_local_ham()
+    ham = H.build_local_ham(symmetry=True)
+    assert ham.terms.keys() == ham_dense.terms.keys()
+    for where, hk in ham.items():
+        assert_allclose(
+            hk.to_dense().reshape(4, 4), ham_dense.terms[where], atol=1e-12
+        )
@@ -51,3 +51,33 @@ def test_get_gauged_tn():
     tn_gauged = bp.get_gauged_tn()
     Zg = qu.prod(array.item(0) for array in tn_gauged.arrays)
     assert Z == pytest.approx(Zg, rel=1e-1)
+
+
+@pytest.mark.parametrize("thread_pool", [True, 2])
+def test_thread_pool_matches_serial(thread_pool):
+    tn = qtn.TN2D_from_fill_fn(lambda s: qu.randn(s, dist="uniform"), 5, 5, 2)
+    bpa = qbp.D1BP(tn, update="parallel", damping=0.1)
+    bpa.run(max_iterations=20, tol=0.0)
+    bpb = qbp.D1BP(tn, update="parallel", damping=0.1)
+    bpb.run(max_iterations=20, tol=0.0, thread_pool=thread_pool)
+    assert bpb.pool is None
+    assert bpa.mdiffs == bpb.mdiffs
+    assert bpa.contract() == bpb.contract()
+
+
+@pytest.mark.parametrize("damping", [0.0, 0.1])
+@pytest.mark.parametrize("local_convergence", [False, True])
+def test_residual_update(damping, local_convergence):
+    tn = qtn.TN2D_from_fill_fn(lambda s: qu.randn(s, dist="uniform"), 6, 6, 2)
+    Zs = qbp.contract_d1bp(tn, tol=1e-8)
+    info = {}
+    Zr = qbp.contract_d1bp(
+        tn,
+        update="residual",
+        damping=damping,
+        local_convergence=local_convergence,
+        tol=1e-8,
+        info=info,
+    )
+    assert info["converged"]
+    assert Zr == pytest.approx(Zs, rel=1e-5)
@@ -157,3 +157,43 @@ def test_gate(seed):
     d2 = bp.tn.distance_normalized(peps_g_ex)
     assert d2 < d1
     assert abs(bp.contract()) ** 0.5 > 0.5
+
+
+def test_gate_single_site_reconverges_locally():
+    peps = qtn.PEPS.rand(3, 4, 2, seed=42)
+    bp = qbp.D2BP(peps)
+    bp.run(tol=1e-9)
+    bp.gate_(qu.rand_matrix(2, seed=7), [(1, 1)])
+    assert bp.touched
+    bp.run(tol=1e-9)
+    bp_fresh = qbp.D2BP(bp.tn)
+    bp_fresh.run(tol=1e-9)
+    assert bp.contract() == pytest.approx(bp_fresh.contract(), rel=1e-6)
+
+
+@pytest.mark.parametrize("thread_pool", [True, 2])
+def test_thread_pool_matches_serial(thread_pool):
+    peps = qtn.PEPS.rand(3, 4, 3, seed=42)
+    bpa = qbp.D2BP(peps, update="parallel")
+    bpa.run(max_iterations=20, tol=0.0)
+    bpb = qbp.D2BP(peps, update="parallel")
+    bpb.run(max_iterations=20, tol=0.0, thread_pool=thread_pool)
+    assert bpb.pool is None
+    assert bpa.mdiffs == bpb.mdiffs
+    assert bpa.contract() == bpb.contract()
+    assert qbp.contract_d2bp(
+        peps, update="parallel", thread_pool=thread_pool
+    ) == pytest.approx(qbp.contract_d2bp(peps, update="parallel"))
+
+
+@pytest.mark.parametrize("damping", [0.0, 0.1])
+@pytest.mark.parametrize("dtype", ["float32", "complex64"])
+def test_residual_update(damping, dtype):
+    peps = qtn.PEPS.rand(3, 4, 3, seed=42, dtype=dtype)
+    Ns = qbp.contract_d2bp(peps, tol=1e-6)
+    info = {}
+    Nr = qbp.contract_d2bp(
+        peps, update="residual", damping=damping, tol=1e-6, info=info
+    )
+    assert info["converged"]
+    assert Nr == pytest.approx(Ns, rel=1e-3)
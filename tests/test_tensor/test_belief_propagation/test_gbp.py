@@ -0,0 +1,64 @@
+import pytest
+
+import quimb as qu
+import quimb.tensor as qtn
+import quimb.tensor.belief_propagation as qbp
+
+
+@pytest.mark.parametrize("dtype", ["float64", "complex128"])
+def test_tree_exact_g1bp(dtype):
+    tn = qtn.TN_rand_tree(10, 3, seed=42, dtype=dtype)
+    Z = tn.contract()
+    info = {}
+    Z_bp = qbp.contract_g1bp(tn, info=info, progbar=True)
+    assert info["converged"]
+    assert Z_bp == pytest.approx(Z, rel=1e-5)
+
+
+@pytest.mark.parametrize("dtype", ["float64", "complex128"])
+def test_tree_exact_g2bp(dtype):
+    psi = qtn.TN_rand_tree(10, 3, 2, seed=42, dtype=dtype)
+    psi.equalize_norms_(1.7)
+    norm2 = psi.H @ psi
+    info = {}
+    norm2_bp = qbp.contract_g2bp(psi, info=info, progbar=True)
+    assert info["converged"]
+    assert norm2_bp == pytest.approx(norm2, rel=1e-5)
+
+
+def test_singleton_regions_match_d1bp():
+    qu.seed_rand(7)
+    tn = qtn.TN2D_from_fill_fn(lambda s: qu.randn(s, dist="uniform"), 3, 3, 2)
+    Z_d1 = qbp.contract_d1bp(tn, damping=0.0, tol=1e-12)
+    Z_g1 = qbp.contract_g1bp(tn, regions=(), damping=0.0, tol=1e-12)
+    assert Z_g1 == pytest.approx(Z_d1, rel=1e-6)
+
+
+def test_singleton_regions_match_d2bp():
+    peps = qtn.PEPS.rand(3, 3, 2, seed=42, dist="uniform")
+    norm2_d2 = qbp.contract_d2bp(peps, damping=0.0, tol=1e-12)
+    norm2_g2 = qbp.contract_g2bp(peps, regions=(), damping=0.0, tol=1e-12)
+    assert norm2_g2 == pytest.approx(norm2_d2, rel=1e-6)
+
+
+def test_plaquettes_more_accurate_than_d2bp():
+    peps = qtn.PEPS.rand(4, 4, 2, seed=3, dist="uniform")
+    norm2 = peps.H @ peps
+    err_d2 = abs(qbp.contract_d2bp(peps) / norm2 - 1)
+    info = {}
+    bp = qbp.G2BP(peps)
+    bp.run(info=info)
+    assert info["converged"]
+    err_g2 = abs(bp.contract() / norm2 - 1)
+    assert err_g2 < err_d2 / 100
+
+
+@pytest.mark.parametrize("thread_pool", [True, 2])
+def test_thread_pool_matches_serial(thread_pool):
+    peps = qtn.PEPS.rand(3, 3, 2, seed=42, dist="uniform")
+    bpa = qbp.G2BP(peps)
+    bpa.run(max_iterations=10, tol=0.0)
+    bpb = qbp.G2BP(peps)
+    bpb.run(max_iterations=10, tol=0.0, thread_pool=thread_pool)
+    assert bpb.pool is None
+    assert bpa.contract() == pytest.approx(bpb.contract(), rel=1e-12)
@@ -176,3 +176,23 @@ def test_mps():
         site_tags=[f"I{i}" for i in range(L)],
     )
     assert O == pytest.approx(expec ^ ..., abs=1e-6)
+
+
+def test_residual_update_fewer_updates():
+    tn = qtn.TN2D_from_fill_fn(
+        lambda s: qu.randn(s, dist="uniform", seed=7), 8, 8, 2
+    )
+    Zex = tn.contract()
+
+    counts = {}
+    for update in ["sequential", "residual"]:
+        bp = qbp.L1BP(tn, update=update)
+        counts[update] = 0
+        for _ in range(1000):
+            r = bp.iterate(tol=1e-6)
+            counts[update] += r.get("nupdates", r["ncheck"])
+            if r["max_mdiff"] < 1e-6:
+                break
+        assert bp.contract() == pytest.approx(Zex, rel=0.1)
+
+    assert counts["residual"] < counts["sequential"]
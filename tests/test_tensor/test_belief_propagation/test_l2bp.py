@@ -119,3 +119,27 @@ def test_compress_double_layer_loopy(dtype, damping, update):
     # assert we did better than basic local compression
     fid_bp = abs(tn_bp.H @ tn_lazy)
     assert fid_bp > fid_basic
+
+
+@pytest.mark.parametrize("thread_pool", [True, 2])
+def test_thread_pool_matches_serial(thread_pool):
+    peps = qtn.PEPS.rand(3, 4, 3, seed=42)
+    bpa = qbp.L2BP(peps, update="parallel")
+    bpa.run(max_iterations=10, tol=0.0)
+    bpb = qbp.L2BP(peps, update="parallel")
+    bpb.run(max_iterations=10, tol=0.0, thread_pool=thread_pool)
+    assert bpb.pool is None
+    assert bpa.mdiffs == bpb.mdiffs
+    assert bpa.contract() == pytest.approx(bpb.contract())
+
+
+@pytest.mark.parametrize("damping", [0.0, 0.1])
+def test_residual_update(damping):
+    peps = qtn.PEPS.rand(3, 4, 2, seed=42)
+    Ns = qbp.contract_l2bp(peps, tol=1e-6)
+    info = {}
+    Nr = qbp.contract_l2bp(
+        peps, update="residual", damping=damping, tol=1e-6, info=info
+    )
+    assert info["converged"]
+    assert Nr == pytest.approx(Ns, rel=1e-3)
@@ -0,0 +1,61 @@
+import pytest
+
+import quimb as qu
+import quimb.tensor as qtn
+import quimb.tensor.belief_propagation as qbp
+
+
+@pytest.mark.parametrize("damping", [0.0, 0.1])
+@pytest.mark.parametrize("dtype", ["float32", "complex64"])
+@pytest.mark.parametrize("local_convergence", [True, False])
+def test_contract_matches_d2bp(damping, dtype, local_convergence):
+    peps = qtn.PEPS.rand(3, 4, 3, seed=42, dtype=dtype)
+    Z_d2bp = qbp.contract_d2bp(
+        peps,
+        damping=damping,
+        update="parallel",
+        local_convergence=local_convergence,
+    )
+    info = {}
+    Z_v2bp = qbp.contract_v2bp(
+        peps,
+        damping=damping,
+        local_convergence=local_convergence,
+        info=info,
+    )
+    assert info["converged"]
+    assert Z_v2bp == pytest.approx(Z_d2bp, rel=1e-4)
+
+
+@pytest.mark.parametrize("diis", [True, False])
+def test_tree_exact(diis):
+    psi = qtn.TN_rand_tree(20, 3, 2, seed=42)
+    norm2 = psi.H @ psi
+    info = {}
+    norm2_bp = qbp.contract_v2bp(psi, diis=diis, info=info)
+    assert info["converged"]
+    assert norm2_bp == pytest.approx(norm2, rel=1e-4)
+
+
+def test_messages_and_inherited_methods():
+    peps = qtn.PEPS.rand(3, 3, 3, seed=7)
+    bp = qbp.V2BP(peps)
+    bp.run()
+    bp_d = qbp.D2BP(peps, messages=dict(bp.messages))
+    assert bp.contract() == pytest.approx(bp_d.contract())
+
+    # messages can be modified and are restacked
+    bp.messages = {k: 2 * m for k, m in bp.messages.items()}
+    bp.run()
+    assert bp.contract() == pytest.approx(bp_d.contract(), rel=1e-4)
+
+    # gate the tensors using the messages, then re-converge
+    G = qu.rand_uni(4, seed=42)
+    for bpi in (bp, bp_d):
+        bpi.gate_(G, ((0, 0), (0, 1)), max_bond=2)
+        bpi.gate_(G, ((1, 1), (2, 1)), max_bond=4)
+        bpi.run()
+    assert bp.contract() == pytest.approx(bp_d.contract(), rel=1e-4)
+
+    with pytest.raises(ValueError):
+        qbp.V2BP(peps, update="sequential")
@@ -1,5 +1,7 @@
 import itertools
 import math
+import os
+import pickle
 
 import numpy as np
 import pytest
@@ -149,6 +151,93 @@ class TestCircuit:
             c = circ.amplitude(b)
             assert c == pytest.approx(psi[i, 0])
 
+    def test_amplitudes(self):
+        L = 5
+        circ = random_a2a_circ(L, 3)
+        psi = circ.to_dense()
+        bs = [f"{i:0>{L}b}" for i in range(2**L)]
+        cs = circ.amplitudes(bs)
+        assert cs.shape == (2**L,)
+        assert_allclose(cs, psi[:, 0])
+
+    def test_amplitudes_sliced(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        L = 6
+        circ = random_a2a_circ(L, 4)
+        psi = circ.to_dense()
+        bs = [f"{i:0>{L}b}" for i in range(0, 2**L, 3)]
+
+        cs = circ.amplitudes_sliced(bs, target_slices=4)
+        assert cs.shape == (len(bs),)
+        assert_allclose(cs, psi[[int(b, 2) for b in bs], 0])
+
+        with ThreadPoolExecutor(2) as executor:
+            cs_ex = circ.amplitudes_sliced(
+                bs, target_slices=4, executor=executor
+            )
+        assert_allclose(cs_ex, cs)
+
+    def test_amplitudes_sliced_checkpoint(self, tmp_path, monkeypatch):
+        from quimb.tensor.circuit import exact
+
+        L = 6
+        circ = random_a2a_circ(L, 4)
+        bs = [f"{i:0>{L}b}" for i in range(0, 2**L, 5)]
+        cs = circ.amplitudes_sliced(bs, target_slices=4)
+        fname = tmp_path / "amps.pkl"
+
+        contract_slices = exact._contract_slices
+        calls = []
+
+        def counted(tree, arrays, ids, backend=None):
+            if len(calls) == fail_after:
+                raise KeyboardInterrupt
+            calls.append(ids)
+            return contract_slices(tree, arrays, ids, backend)
+
+        monkeypatch.setattr(exact, "_contract_slices", counted)
+        fail_after = 2
+        with pytest.raises(KeyboardInterrupt):
+            circ.amplitudes_sliced(bs, target_slices=4, checkpoint=fname)
+
+        with open(fname, "rb") as f:
+            _, tree, done, _ = pickle.load(f)
+        assert len(done) == 2
+
+        # resuming only contracts the remaining slices
+        calls.clear()
+        fail_after = None
+        cs_resumed = circ.amplitudes_sliced(
+            bs, target_slices=4, checkpoint=fname
+        )
+        assert len(calls) == tree.nslices - 2
+        assert_allclose(cs_resumed, cs)
+
+        with pytest.raises(ValueError):
+            circ.amplitudes_sliced(bs[1:], checkpoint=fname)
+
+        # different parameters or dtype are a different contraction
+        circ_b = circ.copy()
+        circ_b.rx(0.3, 0)
+        with pytest.raises(ValueError):
+            circ_b.amplitudes_sliced(bs, checkpoint=fname)
+        with pytest.raises(ValueError):
+            circ.amplitudes_sliced(bs, checkpoint=fname, dtype="complex64")
+
+    def test_amplitudes_sliced_empty(self):
+        circ = random_a2a_circ(4, 2)
+        cs = circ.amplitudes_sliced([])
+        assert cs.shape == (0,)
+
+    def test_xeb_sliced(self):
+        L = 5
+        circ = random_a2a_circ(L, 3)
+        samples = list(circ.sample(64, seed=42))
+        assert circ.xeb(samples, sliced=True, target_slices=2) == (
+            pytest.approx(circ.xeb(samples))
+        )
+
     def test_partial_trace(self):
         L = 5
         circ = random_a2a_circ(L, 3)
@@ -184,6 +273,124 @@ class TestCircuit:
 
         assert power_divergence(f_obs, f_exp)[0] < 100
 
+    @pytest.mark.parametrize("use_store", (False, True))
+    def test_sample_executor(self, use_store, tmp_path):
+        import collections
+        from concurrent.futures import ThreadPoolExecutor
+
+        from scipy.stats import power_divergence
+
+        C = 2**10
+        L = 5
+        circ = random_a2a_circ(L, 3, seed=42)
+        store = tmp_path if use_store else None
+
+        psi = circ.to_dense()
+        p_exp = abs(psi.reshape(-1)) ** 2
+        f_exp = p_exp * C
+
+        with ThreadPoolExecutor(2) as executor:
+            samples = list(
+                circ.sample(
+                    C, group_size=2, seed=42, executor=executor, store=store
+                )
+            )
+            # reproducible for fixed number of shards
+            assert samples == list(
+                circ.copy().sample(
+                    C, group_size=2, seed=42, executor=executor, num_shards=2
+                )
+            )
+
+        assert len(samples) == C
+        # worker marginals are merged back into the cache
+        assert len(circ._marginal_trie) > 0
+
+        counts = collections.Counter(samples)
+        f_obs = np.zeros(2**L)
+        for b, c in counts.items():
+            f_obs[int(b, 2)] = c
+
+        assert power_divergence(f_obs, f_exp)[0] < 100
+
+    def test_sample_store_different_circuits(self, tmp_path):
+        circ_a = qtn.Circuit(3)
+        circ_a.apply_gate("X", 0)
+        circ_a.apply_gate("X", 1)
+        # same structure, different parameters
+        circ_b = qtn.Circuit(3)
+        circ_b.apply_gate("RX", 0.0, 0)
+        circ_b.apply_gate("RX", 0.0, 1)
+
+        assert set(circ_a.sample(20, group_size=1, store=tmp_path)) == {"110"}
+        assert set(circ_b.sample(20, group_size=1, store=tmp_path)) == {"000"}
+        # and the in-memory cache is not poisoned either
+        assert set(circ_b.sample(20, group_size=1)) == {"000"}
+        # same circuit and options -> shared
+        circ_c = circ_a.copy()
+        circ_c.clear_storage()
+        assert set(circ_c.sample(20, group_size=1, store=tmp_path)) == {"110"}
+        assert len(os.listdir(tmp_path)) == 2
+
+    @pytest.mark.parametrize("group_size", (1, 3))
+    def test_sample_batch(self, group_size):
+        import collections
+
+        from scipy.stats import power_divergence
+
+        C = 2**10
+        L = 5
+        circ = random_a2a_circ(L, 3, seed=42)
+
+        psi = circ.to_dense()
+        p_exp = abs(psi.reshape(-1)) ** 2
+        f_exp = p_exp * C
+
+        samples = list(circ.sample(C, group_size=group_size, batch=True))
+        assert len(samples) == C
+
+        # each distinct prefix marginal is computed once only
+        trie = circ._marginal_trie
+        assert trie.hits == 0
+        assert trie.misses == len(trie) < C
+
+        counts = collections.Counter(samples)
+        f_obs = np.zeros(2**L)
+        for b, c in counts.items():
+            f_obs[int(b, 2)] = c
+
+        assert power_divergence(f_obs, f_exp)[0] < 100
+
+    def test_sample_marginal_eviction(self):
+        circ = random_a2a_circ(5, 3, seed=42)
+        samples = list(
+            circ.sample(64, group_size=1, max_marginal_storage=8, seed=7)
+        )
+        assert len(samples) == 64
+        trie = circ._marginal_trie
+        assert 0 < trie.nbytes <= 8 * 8
+        assert len(trie) <= 4
+
+        # reproducible regardless of what has been evicted
+        assert samples == list(circ.copy().sample(64, group_size=1, seed=7))
+
+    @pytest.mark.parametrize("batch", (False, True))
+    def test_sample_marginal_trie_nodes_bounded(self, batch):
+        circ = random_a2a_circ(6, 3, seed=42)
+        trie = circ._marginal_trie
+        for seed in range(4):
+            for _ in circ.sample(
+                256,
+                group_size=1,
+                max_marginal_storage=8,
+                seed=seed,
+                batch=batch,
+            ):
+                pass
+            # only nodes along the paths of the few stored marginals remain
+            assert len(trie) <= 4
+            assert trie.num_nodes() <= 1 + 5 * len(trie)
+
     @pytest.mark.parametrize("group_size", (1, 3))
     def test_sample_gate_by_gate(self, group_size):
         import collections
@@ -270,6 +477,80 @@ class TestCircuit:
         circ.apply_gate("H", 0, gate_round=0)
         circ.local_expectation([qu.pauli("X")], (0,))
 
+    @pytest.mark.parametrize("dtype", [None, "complex64"])
+    def test_local_expectation_sweep(self, dtype):
+        L = 5
+        circ = qtn.Circuit(L)
+        for i in range(L):
+            circ.h(i)
+        for i in range(L - 1):
+            circ.rzz(0.1, i, i + 1, parametrize=True)
+        for i in range(L):
+            circ.rx(0.2, i, parametrize=True)
+            circ.t(i)
+        circ.cx(0, 1)
+
+        rng = np.random.default_rng(42)
+        points = [
+            {i: rng.uniform(0, 1, 1) for i in circ.get_params()}
+            for _ in range(4)
+        ]
+        G = [qu.pauli("Z") & qu.pauli("Z"), qu.rand_matrix(4)]
+
+        xs = circ.local_expectation_sweep(
+            G, (1, 2), points, optimize="greedy", dtype=dtype
+        )
+        # the circuit's own parameters are left untouched
+        assert circ.get_params()[L][0] == pytest.approx(0.1)
+
+        for point, x in zip(points, xs):
+            circ.set_params(point)
+            psi = circ.to_dense()
+            for Gi, xi in zip(G, x):
+                y = qu.expec(qu.pkron(Gi, [2] * L, (1, 2)), psi)
+                assert xi == pytest.approx(y, rel=1e-4, abs=1e-6)
+
+            # structure preserving cache survives setting parameters
+            rho = circ.get_rdm_lightcone_simplified(
+                (1, 2), preserve_params=True
+            )
+            assert any(isinstance(t, qtn.PTensor) for t in rho)
+            y = circ.local_expectation(G[0], (1, 2))
+            assert x[0] == pytest.approx(y, rel=1e-4, abs=1e-6)
+
+    def test_compute_local_expectation_grouped(self):
+        L = 6
+        circ = random_a2a_circ(L, 2)
+        psi = circ.to_dense()
+        terms = {i: qu.pauli("X") for i in range(L)}
+        for i in range(L - 1):
+            terms[(i + 1, i)] = qu.rand_matrix(4)
+
+        groups = circ.get_local_expectation_groups(terms, max_group_qubits=3)
+        assert sorted(w for _, ws in groups for w in ws) == sorted(
+            (w,) if isinstance(w, int) else w for w in terms
+        )
+        for qubits, ws in groups:
+            assert len(qubits) <= 3
+            assert all(set(w) <= set(qubits) for w in ws)
+
+        exs = circ.compute_local_expectation(
+            terms, max_group_qubits=3, optimize="greedy", return_all=True
+        )
+        for where, G in terms.items():
+            if isinstance(where, int):
+                where = (where,)
+            x = qu.expec(qu.pkron(G, [2] * L, where), psi)
+            assert exs[where] == pytest.approx(x)
+
+        ex = circ.compute_local_expectation(terms, optimize="greedy")
+        assert ex == pytest.approx(sum(exs.values()))
+
+        with pytest.raises(ValueError):
+            circ.compute_local_expectation(
+                {(0, 1, 2): qu.rand_matrix(8)}, max_group_qubits=2
+            )
+
     def test_uni_to_dense(self):
         import cmath
 
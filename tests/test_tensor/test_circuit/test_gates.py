@@ -4,6 +4,7 @@ from numpy.testing import assert_allclose
 
 import quimb as qu
 import quimb.tensor as qtn
+from quimb.tensor.circuit import fuse_gates
 
 
 class TestCircuitGates:
@@ -250,3 +251,63 @@ class TestGate:
         assert mpo.L == L
         U = mpo.to_dense()
         assert_allclose(U @ U.conj().T, np.eye(U.shape[0]), atol=1e-10)
+
+
+def _rand_brickwork_gates(N, depth, seed=42):
+    rng = np.random.default_rng(seed)
+    gates = []
+    for d in range(depth):
+        for i in range(N):
+            gates.append(("U3", *rng.uniform(0, 2 * np.pi, 3), i))
+            gates.append(("RZ", rng.uniform(0, 2 * np.pi), i))
+        for i in range(d % 2, N - 1, 2):
+            gates.append(("CZ", i, i + 1))
+        gates.append(("RZZ", rng.normal(), 0, N - 1))
+    gates.append(("CCX", 0, 1, 2))
+    gates.append(("H", 1))
+    return gates
+
+
+class TestFuseGates:
+    @pytest.mark.parametrize("max_qubits", (1, 2, 3))
+    def test_fuse_gates(self, max_qubits):
+        gates = _rand_brickwork_gates(6, 4)
+        fused = fuse_gates(gates, max_qubits=max_qubits)
+        assert len(fused) < len(gates)
+        # only gates already larger than max_qubits are left unfused
+        assert all(
+            (len(g.qubits) <= max_qubits) or (g.label in ("CZ", "RZZ", "CCX"))
+            for g in fused
+        )
+
+        circ = qtn.Circuit(6)
+        circ.apply_gates(gates)
+        circ_f = qtn.Circuit(6)
+        circ_f.apply_gates(gates, fuse=max_qubits)
+        assert circ_f.num_gates == len(fused)
+        assert circ_f.psi.num_tensors < circ.psi.num_tensors
+        assert_allclose(circ_f.to_dense(), circ.to_dense(), atol=1e-10)
+
+    def test_fuse_gates_parametrized(self):
+        gates = _rand_brickwork_gates(4, 3)
+        circ = qtn.Circuit(4)
+        for g in gates:
+            circ.apply_gate(*g, parametrize=g[0] in ("U3", "RZ", "RZZ"))
+
+        # parametrized gates are kept by default
+        circ_k = qtn.Circuit(4)
+        circ_k.apply_gates(circ.gates, fuse=True)
+        assert circ_k.num_gates == circ.num_gates
+
+        circ_f = qtn.Circuit(4)
+        circ_f.apply_gates(circ.gates, fuse={"fuse_parametrized": True})
+        assert circ_f.num_gates < circ.num_gates
+        assert_allclose(circ_f.to_dense(), circ.to_dense(), atol=1e-10)
+
+        # parameters are fused symbolically
+        params = circ_f.get_params()
+        nparams = sum(p.size for p in circ.get_params().values())
+        assert sum(p.size for p in params.values()) == nparams
+        params = {i: np.zeros_like(p) for i, p in params.items()}
+        circ_f.set_params(params)
+        assert not np.allclose(circ_f.to_dense(), circ.to_dense())
@@ -166,6 +166,71 @@ class TestCircuitMPS:
         # error estimate is the complementary norm loss
         assert trunc.error_estimate() == pytest.approx(1.0 - f, abs=1e-10)
 
+    def _hidden_chain_gates(self, N=10, depth=6, seed=2):
+        # a 1D brickwork circuit on randomly permuted qubits
+        rng = np.random.default_rng(seed)
+        perm = [int(q) for q in rng.permutation(N)]
+        gates = []
+        for d in range(depth):
+            for i in range(N):
+                gates.append(("U3", *rng.uniform(0, 2 * np.pi, 3), i))
+            for i in range(d % 2, N - 1, 2):
+                gates.append(("CZ", perm[i], perm[i + 1]))
+        return gates, perm
+
+    def test_calc_mps_qubit_ordering(self):
+        gates, perm = self._hidden_chain_gates()
+        order = qtn.circuit.calc_mps_qubit_ordering(gates)
+        assert sorted(order) == list(range(10))
+        # the hidden chain is recovered, up to reflection
+        assert list(order) in (perm, perm[::-1])
+        assert qtn.circuit.count_mps_swaps(gates, order) == 0
+        assert qtn.circuit.count_mps_swaps(gates) > 0
+        assert qtn.circuit.count_mps_swaps(
+            gates, swap_back=False
+        ) < qtn.circuit.count_mps_swaps(gates)
+
+    def test_qubit_order(self):
+        gates, _ = self._hidden_chain_gates()
+        circ = qtn.CircuitMPS.from_gates(gates, qubit_order="auto")
+        exact = qtn.Circuit.from_gates(gates)
+        assert tuple(circ.qubits) != tuple(range(10))
+        assert circ.get_psi_unordered().max_bond() <= 32
+        psi_ex = exact.to_dense()
+        assert abs(qu.fidelity(circ.to_dense(), psi_ex)) == pytest.approx(1.0)
+        assert abs(qu.fidelity(circ.psi.to_dense(), psi_ex)) == (
+            pytest.approx(1.0)
+        )
+        b = "0110100111"
+        assert circ.amplitude(b) == pytest.approx(exact.amplitude(b))
+        ZZ = qu.pauli("Z") & qu.pauli("Z")
+        assert circ.local_expectation(ZZ, (7, 2)) == pytest.approx(
+            exact.local_expectation(ZZ, (7, 2))
+        )
+        # sample in logical order
+        circ = qtn.CircuitMPS(4, qubit_order=(2, 0, 3, 1))
+        circ.x(1)
+        circ.cx(1, 2)
+        assert set(circ.sample(10, seed=42)) == {"0110"}
+        with pytest.raises(ValueError):
+            qtn.CircuitMPS(3, qubit_order=(0, 0, 1))
+
+    @pytest.mark.parametrize("qubit_order", [None, "auto"])
+    def test_target_fidelity(self, qubit_order):
+        gates, _ = self._hidden_chain_gates(N=12, depth=8)
+        exact = qtn.Circuit.from_gates(gates).to_dense()
+        full = qtn.CircuitMPS.from_gates(gates, qubit_order=qubit_order)
+        circ = qtn.CircuitMPS.from_gates(
+            gates, target_fidelity=0.9, qubit_order=qubit_order
+        )
+        f = circ.fidelity_estimate()
+        assert 0.85 < f < 0.95
+        assert circ.psi.max_bond() < full.psi.max_bond()
+        # the estimate tracks the actual fidelity
+        psi = circ.to_dense()
+        f_true = abs(np.vdot(psi, exact)) ** 2 / abs(np.vdot(psi, psi))
+        assert f_true == pytest.approx(f, abs=0.05)
+
     def test_uni_unsupported(self):
         circ = qtn.CircuitMPS(3)
         circ.h(0)
@@ -0,0 +1,159 @@
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+
+import quimb as qu
+import quimb.tensor as qtn
+from quimb.tensor.circuit import (
+    Channel,
+    amplitude_damping_channel,
+    dephasing_channel,
+    depolarizing_channel,
+    fuse_gates,
+    parse_to_gate,
+)
+
+
+def rand_noisy_gates(N, depth, seed=42):
+    rng = np.random.default_rng(seed)
+    gates = []
+    for _ in range(depth):
+        for i in range(N):
+            gates.append(("U3", *rng.uniform(0, 2 * np.pi, 3), i))
+            gates.append(amplitude_damping_channel(0.2, i))
+        for i in range(N - 1):
+            gates.append(("CX", i, i + 1))
+            gates.append(depolarizing_channel(0.1, i + 1))
+        gates.append(("RZZ", 0.4, 0, N - 1))
+        gates.append(dephasing_channel(0.3, 0))
+    gates.append(("CCX", 0, 1, 2))
+    gates.append(("SWAP", 1, 3))
+    return gates
+
+
+def dense_rho(N, gates):
+    dims = [2] * N
+    rho = qu.dop(qu.computational_state("0" * N))
+    for gate in gates:
+        if isinstance(gate, Channel):
+            rho = qu.kraus_op(rho, gate.kraus, dims=dims, where=gate.qubits)
+        else:
+            gate = parse_to_gate(gate)
+            U = gate.array.reshape(2 ** len(gate.qubits), -1)
+            U = qu.pkron(U, dims, gate.qubits)
+            rho = U @ rho @ U.H
+    return rho
+
+
+class TestChannel:
+    @pytest.mark.parametrize(
+        "fn",
+        [depolarizing_channel, dephasing_channel, amplitude_damping_channel],
+    )
+    def test_trace_preserving(self, fn):
+        channel = fn(0.3, 2)
+        assert channel.qubits == (2,)
+        Channel(channel.kraus, 0, check=True)
+        assert channel.unravelling_probs().sum() == pytest.approx(1.0)
+
+        # superoperator acts on the interleaved vectorized density matrix
+        rho = qu.rand_rho(2)
+        S = channel.superoperator()
+        vrho = S @ np.asarray(rho).reshape(-1)
+        assert_allclose(
+            vrho.reshape(2, 2), qu.kraus_op(rho, channel.kraus), atol=1e-12
+        )
+
+    def test_check(self):
+        with pytest.raises(ValueError):
+            Channel([np.eye(2), np.eye(2)], 0, check=True)
+        with pytest.raises(ValueError):
+            Channel([np.eye(2)], (0, 1))
+
+    def test_unitary_circuit_raises(self):
+        circ = qtn.Circuit(2)
+        with pytest.raises(TypeError):
+            circ.apply_gates([depolarizing_channel(0.1, 0)])
+
+    def test_fuse_gates_barrier(self):
+        gates = [("H", 0), dephasing_channel(0.1, 0), ("X", 0), ("CX", 0, 1)]
+        fused = fuse_gates(gates)
+        assert len(fused) == 3
+        assert isinstance(fused[1], Channel)
+
+
+class TestCircuitDensityMatrix:
+    @pytest.mark.parametrize(
+        "cls", [qtn.CircuitDensityMatrix, qtn.CircuitDensityMatrixMPS]
+    )
+    def test_matches_dense(self, cls):
+        N = 4
+        gates = rand_noisy_gates(N, 2)
+        rho = dense_rho(N, gates)
+
+        circ = cls(N)
+        circ.apply_gates(gates)
+        assert_allclose(circ.to_dense(), rho, atol=1e-6)
+        assert circ.trace() == pytest.approx(1.0)
+
+        ZZ = qu.pauli("Z") & qu.pauli("Z")
+        x = circ.local_expectation(ZZ, (1, 3))
+        assert x == pytest.approx(qu.expec(qu.pkron(ZZ, [2] * N, (1, 3)), rho))
+        xs = circ.local_expectation([qu.pauli("X"), qu.pauli("Z")], 2)
+        assert xs[1] == pytest.approx(
+            qu.expec(qu.ikron(qu.pauli("Z"), [2] * N, 2), rho)
+        )
+
+    def test_apply_channel_kraus(self):
+        circ = qtn.CircuitDensityMatrix(2)
+        circ.h(0)
+        circ.apply_channel(dephasing_channel(1.0, 0).kraus, 0)
+        assert circ.local_expectation(qu.pauli("X"), 0) == pytest.approx(-1)
+        assert circ.copy().num_qubits == 2
+
+    @pytest.mark.parametrize(
+        "cls", [qtn.CircuitDensityMatrix, qtn.CircuitDensityMatrixMPS]
+    )
+    def test_parametrized_gate_raises(self, cls):
+        circ = cls(2)
+        circ.rx(0.3, 0)
+        with pytest.raises(ValueError):
+            circ.rx(0.3, 0, parametrize=True)
+
+
+class TestCircuitTrajectories:
+    def test_matches_dense(self):
+        N = 4
+        gates = rand_noisy_gates(N, 2)
+        rho = dense_rho(N, gates)
+
+        circ = qtn.CircuitTrajectories(N)
+        circ.apply_gates(gates)
+        assert circ.num_channels == 2 * 2 * N
+
+        ZZ = qu.pauli("Z") & qu.pauli("Z")
+        x, err = circ.local_expectation(
+            ZZ,
+            (1, 3),
+            num_trajectories=2**12,
+            batch_size=1000,
+            seed=42,
+            return_std_err=True,
+        )
+        y = qu.expec(qu.pkron(ZZ, [2] * N, (1, 3)), rho)
+        assert 0 < err < 0.05
+        assert abs(x - y) < 5 * err
+        assert x == circ.local_expectation(
+            ZZ, (1, 3), num_trajectories=2**12, batch_size=1000, seed=42
+        )
+
+    def test_unitary_channels_exact(self):
+        # a channel with a single kraus operator is deterministic
+        circ = qtn.CircuitTrajectories(2)
+        circ.h(0)
+        circ.apply_channel([qu.pauli("Z")], 0)
+        circ.cx(0, 1)
+        x = circ.local_expectation(
+            qu.pauli("X") & qu.pauli("X"), (0, 1), num_trajectories=4
+        )
+        assert x == pytest.approx(-1)
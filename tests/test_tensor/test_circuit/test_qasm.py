@@ -1,4 +1,5 @@
 import math
+import warnings
 
 import numpy as np
 import pytest
@@ -6,6 +7,7 @@ from numpy.testing import assert_allclose
 
 import quimb.tensor as qtn
 from quimb.tensor.circuit import (
+    parse_openqasm2_iter,
     parse_openqasm3_file,
     parse_openqasm3_str,
     parse_openqasm3_url,
@@ -710,3 +712,72 @@ class TestCircuitQASM:
         """
         circ = qtn.Circuit.from_openqasm2_str(qasm_str)
         assert len(circ.gates) == 2
+
+    @pytest.mark.parametrize("fmt", ["qsim", "openqasm2", "openqasm3"])
+    def test_from_file_streaming(self, fmt, tmp_path):
+        if fmt == "qsim":
+            contents = graph_to_qsim(rand_reg_graph(reg=3, n=10, seed=42))
+        elif fmt == "openqasm2":
+            contents = example_openqasm2_qft()
+        else:
+            contents = example_openqasm3_qft()
+
+        fname = tmp_path / f"example.{fmt}"
+        fname.write_text(contents)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", SyntaxWarning)
+            circ_str = getattr(qtn.Circuit, f"from_{fmt}_str")(contents)
+            circ_file = getattr(qtn.Circuit, f"from_{fmt}_file")(fname)
+
+        assert circ_file.N == circ_str.N
+        assert_same_gates(circ_str, circ_file)
+
+    @pytest.mark.parametrize("fmt", ["openqasm2", "openqasm3"])
+    def test_from_file_register_declared_after_gates(self, fmt, tmp_path):
+        if fmt == "openqasm2":
+            contents = """
+            OPENQASM 2.0;
+            include "qelib1.inc";
+            qreg q[2];
+            h q[0];
+            qreg r[2];
+            cx q[0],r[1];
+            """
+        else:
+            contents = """
+            OPENQASM 3.0;
+            include "stdgates.inc";
+            qubit[2] q;
+            h q[0];
+            qubit[2] r;
+            cx q[0], r[1];
+            """
+        fname = tmp_path / f"example.{fmt}"
+        fname.write_text(contents)
+
+        circ_str = getattr(qtn.Circuit, f"from_{fmt}_str")(contents)
+        circ_file = getattr(qtn.Circuit, f"from_{fmt}_file")(fname)
+        assert circ_str.N == circ_file.N == 4
+        assert_same_gates(circ_str, circ_file)
+        assert circ_file.gates[-1].qubits == (0, 3)
+        assert_allclose(circ_file.to_dense(), circ_str.to_dense())
+
+    def test_parse_iter_is_lazy(self):
+        def lines():
+            yield "OPENQASM 2.0;"
+            yield "qreg q[2];"
+            yield "gate g(t) a,b { rx(t) a; cx a,b; }"
+            yield "g(pi/2) q[1],q[0];"
+            raise RuntimeError("should not be read yet")
+
+        info = {}
+        gates = parse_openqasm2_iter(lines(), info)
+        gate = next(gates)
+        assert info["n"] == 2
+        assert (gate.label, gate.qubits) == ("RX", (1,))
+        assert gate.params == (pytest.approx(math.pi / 2),)
+        gate = next(gates)
+        assert (gate.label, gate.qubits) == ("CX", (1, 0))
+        with pytest.raises(RuntimeError):
+            next(gates)
@@ -0,0 +1,117 @@
+import collections
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+
+import quimb as qu
+import quimb.tensor as qtn
+
+
+def rand_gates(N, depth, seed=42):
+    rng = np.random.default_rng(seed)
+    gates = []
+    for d in range(depth):
+        for i in range(N):
+            gates.append(("U3", *rng.uniform(0, 2 * np.pi, 3), i))
+        qs = rng.permutation(N)
+        for i in range(0, N - 1, 2):
+            g = rng.choice(["CX", "CZ", "ISWAP", "RZZ", "SWAP"])
+            if g == "RZZ":
+                gates.append((g, rng.normal(), qs[i], qs[i + 1]))
+            else:
+                gates.append((g, qs[i], qs[i + 1]))
+        gates.append(("CCX", *qs[:3]))
+        gates.append(("T", qs[3]))
+    return gates
+
+
+class TestCircuitStatevector:
+    def test_matches_dense(self):
+        N = 6
+        gates = rand_gates(N, 4)
+        circ = qtn.CircuitStatevector(N)
+        circ.apply_gates(gates)
+        circ_d = qtn.CircuitDense(N)
+        circ_d.apply_gates(gates)
+        assert circ.num_gates == len(gates)
+        assert_allclose(circ.to_dense(), circ_d.to_dense(), atol=1e-10)
+        assert_allclose(
+            circ.to_dense(reverse=True),
+            circ_d.to_dense(reverse=True),
+            atol=1e-10,
+        )
+        assert_allclose(circ.psi.to_dense(), circ_d.to_dense(), atol=1e-10)
+        assert circ.amplitude("010110") == pytest.approx(
+            circ_d.to_dense()[int("010110", 2), 0]
+        )
+
+    def test_controlled_gates(self):
+        N = 4
+        circ = qtn.CircuitStatevector(N)
+        circ_d = qtn.CircuitDense(N)
+        for c in (circ, circ_d):
+            for i in range(N):
+                c.apply_gate("H", i)
+            c.apply_gate("U3", 0.1, 0.2, 0.3, 2, controls=(0, 3))
+            c.apply_gate("RZ", 0.7, 1, controls=(2,))
+        assert_allclose(circ.to_dense(), circ_d.to_dense(), atol=1e-10)
+
+    @pytest.mark.parametrize("dtype", ["complex64", "complex128"])
+    def test_local_expectation(self, dtype):
+        N = 5
+        circ = qtn.CircuitStatevector(N, dtype=dtype)
+        circ.apply_gates(rand_gates(N, 3))
+        psi = circ.to_dense().astype("complex128")
+
+        ZZ = qu.pauli("Z") & qu.pauli("Z")
+        X = qu.pauli("X")
+        ex = circ.local_expectation(ZZ, (3, 1))
+        assert ex == pytest.approx(
+            qu.expec(qu.pkron(ZZ, [2] * N, (1, 3)), psi), rel=1e-4
+        )
+        ex_x, ex_z = circ.local_expectation([X, qu.pauli("Z")], 2)
+        assert ex_x == pytest.approx(
+            qu.expec(qu.ikron(X, [2] * N, 2), psi), rel=1e-4
+        )
+        assert ex_z == pytest.approx(
+            qu.expec(qu.ikron(qu.pauli("Z"), [2] * N, 2), psi), rel=1e-4
+        )
+
+    def test_sample(self):
+        N = 5
+        C = 2**12
+        circ = qtn.CircuitStatevector(N)
+        circ.apply_gates(rand_gates(N, 2))
+        p = abs(np.asarray(circ.to_dense()).reshape(-1)) ** 2
+
+        samples = list(circ.sample(C, seed=42))
+        assert samples == list(circ.sample(C, seed=42))
+        counts = collections.Counter(samples)
+        f_obs = np.array([counts[f"{i:0>{N}b}"] for i in range(2**N)])
+        assert_allclose(f_obs / C, p, atol=0.03)
+
+        # marginal sampling
+        for b in circ.sample(10, qubits=(4, 0)):
+            assert len(b) == 2
+
+    def test_gate_stream_api(self):
+        circ = qtn.CircuitStatevector(3)
+        circ_d = qtn.CircuitDense(3)
+        for c in (circ, circ_d):
+            c.h(0)
+            c.cx(0, 1)
+            c.rz(0.3, 2)
+            c.apply_gate_raw(qu.pauli("Y"), [2])
+        assert circ.num_gates == 4
+        assert_allclose(circ.to_dense(), circ_d.to_dense(), atol=1e-10)
+
+        circ2 = qtn.CircuitStatevector.from_gates(circ.gates)
+        assert circ2.N == 3
+        assert_allclose(circ2.to_dense(), circ.to_dense())
+
+    def test_no_tensor_network_methods(self):
+        circ = qtn.CircuitStatevector(4)
+        assert not isinstance(circ, qtn.Circuit)
+        for method in ("get_params", "compute_marginal", "partial_trace"):
+            assert not hasattr(circ, method)
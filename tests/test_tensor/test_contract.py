@@ -171,6 +171,103 @@ class TestContractOpts:
 
         assert info["num_calls"] == 1
 
+    def test_contract_tree_cache(self, tmp_path):
+        import cotengra as ctg
+
+        tn = qtn.TN2D_rand(3, 3, 2, seed=42)
+        Zex = tn.contract(all, optimize="greedy")
+        opt = ctg.HyperOptimizer(
+            methods=["greedy"],
+            max_repeats=2,
+            slicing_opts={"target_slices": 2},
+        )
+
+        with qtn.contract_tree_cache(tmp_path) as cache:
+            assert qtn.get_contract_tree_cache() is cache
+            tree = tn.contraction_tree(optimize=opt)
+            assert tree.sliced_inds
+            assert cache.misses == 1
+            assert len(cache) == 1
+            Z = tn.contract(all, optimize=opt)
+            assert Z == pytest.approx(Zex)
+            assert cache.hits == 1
+
+        assert qtn.get_contract_tree_cache() is None
+
+        # relabelled network with new data, in a 'new process'
+        tn2 = qtn.TN2D_rand(3, 3, 2, seed=7)
+        tn2.reindex_({ix: f"new_{ix}" for ix in tn2.ind_map})
+        t = tn2["I1,1"]
+        t.transpose_(*reversed(t.inds))
+        assert tn2.geometry_hash() == tn.geometry_hash()
+
+        cache = qtn.ContractionTreeCache(tmp_path)
+        with qtn.contract_tree_cache(cache):
+            tree2 = tn2.contraction_tree(optimize=opt)
+            assert cache.hits == 1
+            assert cache.misses == 0
+            assert tree2.contraction_cost() == tree.contraction_cost()
+            assert len(tree2.sliced_inds) == len(tree.sliced_inds)
+            Z2 = tn2.contract(all, optimize=opt)
+            assert Z2 == pytest.approx(tn2.contract(all, optimize="greedy"))
+
+    def test_contract_tree_cache_optimizer_settings(self, tmp_path):
+        import cotengra as ctg
+
+        tn = qtn.TN2D_rand(3, 3, 2, seed=42)
+        opts = [
+            ctg.HyperOptimizer(methods=["greedy"], max_repeats=2),
+            ctg.HyperOptimizer(methods=["greedy"], max_repeats=4),
+            ctg.HyperOptimizer(
+                methods=["greedy"], max_repeats=2, minimize="size"
+            ),
+        ]
+        with qtn.contract_tree_cache(tmp_path) as cache:
+            for opt in opts:
+                tn.contraction_tree(optimize=opt)
+            assert cache.misses == 3
+            assert cache.hits == 0
+            # same settings, new instance -> shared
+            tn.contraction_tree(
+                optimize=ctg.HyperOptimizer(methods=["greedy"], max_repeats=2)
+            )
+            assert cache.hits == 1
+            # unidentifiable optimizer objects bypass the cache
+            tn.contraction_tree(optimize=ctg.ReusableHyperOptimizer())
+            assert (cache.hits, cache.misses) == (1, 3)
+            assert len(cache) == 3
+
+    def test_contract_tree_cache_eviction(self, tmp_path):
+        cache = qtn.ContractionTreeCache(tmp_path, max_size=1)
+        with qtn.contract_tree_cache(cache):
+            for L in range(3, 6):
+                qtn.MPS_rand_state(L, 2).H.contract(optimize="greedy")
+        assert len(cache) <= 1
+
+
+@pytest.mark.parametrize("output_inds", [None, ("k0,0", "k2,1")])
+def test_compile_contraction(output_inds):
+    psi = qtn.PEPS.rand(3, 2, 2, seed=42)
+    if output_inds is None:
+        tn = psi.make_norm()
+    else:
+        tn = psi.copy()
+    plan = tn.compile_contraction(output_inds=output_inds, optimize="greedy")
+    assert isinstance(plan, qtn.ContractionPlan)
+
+    ex = tn.contract(all, output_inds=output_inds, optimize="greedy")
+    if output_inds is not None:
+        ex = ex.data
+    assert plan(tn.arrays) == pytest.approx(ex)
+
+    # same geometry, new data
+    tn.randomize_(seed=7)
+    tn.exponent = 1.0
+    ex = tn.contract(all, output_inds=output_inds, optimize="greedy")
+    if output_inds is not None:
+        ex = ex.data
+    assert plan(tn) == pytest.approx(ex)
+
 
 @pytest.mark.parametrize("around", ["I3,3", "I0,0", "I1,2"])
 @pytest.mark.parametrize("equalize_norms", [False, True])
@@ -181,6 +181,39 @@ def test_optimize_pbc_heis(heis_pbc, backend, method):
     assert loss_fn(psi_opt, H) == pytest.approx(en_ex, rel=1e-2)
 
 
+@pytest.mark.parametrize("optimizer", ["adam", "L-BFGS-B"])
+def test_optimize_checkpoint_resume(heis_pbc, tmp_path, optimizer):
+    psi0, H, norm_fn, loss_fn, _ = heis_pbc
+
+    def get_tnopt():
+        return qtn.TNOptimizer(
+            psi0,
+            loss_fn,
+            norm_fn,
+            loss_constants={"H": H},
+            autodiff_backend="autograd",
+            optimizer=optimizer,
+            progbar=False,
+        )
+
+    # 'interrupted' run
+    tnopt = get_tnopt()
+    tnopt.optimize(10, checkpoint=tmp_path, checkpoint_every=5)
+
+    tnopt = get_tnopt()
+    tnopt.optimize(20, resume=tmp_path)
+    assert tnopt.nevals > 10
+
+    if optimizer == "adam":
+        # stateful optimizers resume exactly
+        assert tnopt._method._i == 20
+        tnopt_ref = get_tnopt()
+        tnopt_ref.optimize(20)
+        assert_allclose(
+            tnopt.vectorizer.vector, tnopt_ref.vectorizer.vector, atol=1e-10
+        )
+
+
 @pytest.mark.parametrize(
     "backend", [jax_case, autograd_case, tensorflow_case, pytorch_case]
 )
@@ -0,0 +1,140 @@
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+
+import quimb.tensor as qtn
+
+
+@pytest.mark.parametrize("mmap_mode", ["c", "r", None])
+@pytest.mark.parametrize("dtype", ["float32", "complex128"])
+def test_save_load_roundtrip(tmp_path, mmap_mode, dtype):
+    psi = qtn.MPS_rand_state(6, 5, dtype=dtype, tags="KET")
+    psi.exponent = 0.5
+    fname = tmp_path / "psi.qtn"
+    qtn.save_tensor_network(psi, fname)
+
+    psi2 = qtn.load_tensor_network(fname, mmap_mode=mmap_mode)
+    assert isinstance(psi2, qtn.MatrixProductState)
+    assert psi2.L == psi.L
+    assert psi2.site_tag_id == psi.site_tag_id
+    assert psi2.exponent == 0.5
+    assert set(psi2.tensor_map) == set(psi.tensor_map)
+    for tid, t in psi.tensor_map.items():
+        t2 = psi2.tensor_map[tid]
+        assert t2.inds == t.inds
+        assert t2.tags == t.tags
+        assert t2.dtype == dtype
+        assert_allclose(t2.data, t.data)
+        if mmap_mode is not None:
+            assert isinstance(t2.data, np.memmap)
+
+    if mmap_mode != "r":
+        # can modify in memory without touching the file
+        psi2.arrays[0][...] = 0.0
+        psi3 = qtn.load_tensor_network(fname)
+        assert_allclose(psi3.arrays[0], psi.arrays[0])
+
+    # overwriting doesn't invalidate existing maps
+    qtn.save_tensor_network(psi.H, fname)
+    assert_allclose(psi2.arrays[1], psi.arrays[1])
+
+
+def test_save_load_select(tmp_path):
+    peps = qtn.PEPS.rand(3, 3, 2, seed=42)
+    fname = tmp_path / "peps.qtn"
+    qtn.save_tensor_network(peps, fname)
+
+    sub = qtn.load_tensor_network(fname, tags=["X0", "Y1"], which="any")
+    ex = peps.select(["X0", "Y1"], which="any")
+    assert isinstance(sub, qtn.PEPS)
+    assert sub.num_tensors == ex.num_tensors == 5
+    for tid, t in ex.tensor_map.items():
+        assert_allclose(sub.tensor_map[tid].data, t.data)
+
+    sub = qtn.load_tensor_network(fname, tags=["X0", "Y1"])
+    assert sub.num_tensors == 1
+
+
+def test_save_load_tensor(tmp_path):
+    t = qtn.rand_tensor((2, 3, 4), inds="abc", tags="T", left_inds="ab")
+    fname = tmp_path / "t.qtn"
+    qtn.save_tensor_network(t, fname)
+    t2 = qtn.load_tensor_network(fname)
+    assert isinstance(t2, qtn.Tensor)
+    assert t2.inds == t.inds
+    assert t2.tags == t.tags
+    assert t2.left_inds == t.left_inds
+    assert_allclose(t2.data, t.data)
+
+
+def test_load_bad_file(tmp_path):
+    fname = tmp_path / "bad.qtn"
+    fname.write_bytes(b"not a tensor network")
+    with pytest.raises(ValueError):
+        qtn.load_tensor_network(fname)
+
+
+def test_checkpoint_incremental(tmp_path):
+    psi = qtn.MPS_rand_state(6, 3, tags="KET")
+    ckpt = qtn.TensorNetworkCheckpoint(tmp_path / "ckpt")
+    assert not ckpt.exists()
+    ckpt.save(tns={"psi": psi}, n=1)
+    assert ckpt.exists()
+    assert ckpt.nwritten == 6
+
+    # only the modified tensor is rewritten
+    psi[2].modify(data=2 * psi[2].data)
+    ckpt.save(tns={"psi": psi}, n=2)
+    assert ckpt.nwritten == 7
+    assert len(list((tmp_path / "ckpt" / "arrays").iterdir())) == 6
+
+    ckpt2 = qtn.TensorNetworkCheckpoint(tmp_path / "ckpt")
+    tns, state = ckpt2.load()
+    assert state == {"n": 2}
+    psi2 = tns["psi"]
+    assert isinstance(psi2, qtn.MatrixProductState)
+    for x2, x in zip(psi2.arrays, psi.arrays):
+        assert_allclose(x2, x)
+
+    # loaded tensors don't need rewriting
+    psi2[0].modify(data=2 * psi2[0].data)
+    ckpt2.save(tns={"psi": psi2}, n=3)
+    assert ckpt2.nwritten == 1
+
+    ckpt2.clear()
+    assert not ckpt2.exists()
+
+
+def test_checkpoint_new_instance_keeps_existing(tmp_path):
+    psi = qtn.MPS_rand_state(4, 3, seed=7)
+    ckpt = qtn.TensorNetworkCheckpoint(tmp_path / "ckpt")
+    ckpt.save(tns={"psi": psi}, n=1)
+
+    # a fresh instance saving without loading first must not overwrite any
+    # array files that the current metadata refers to
+    psi_new = qtn.MPS_rand_state(4, 3, seed=8)
+    ckpt2 = qtn.TensorNetworkCheckpoint(tmp_path / "ckpt")
+    assert ckpt2._counter == 4
+    ckpt2.save(tns={"psi": psi_new}, n=2)
+    tns, state = qtn.TensorNetworkCheckpoint(tmp_path / "ckpt").load()
+    assert state == {"n": 2}
+    for x2, x in zip(tns["psi"].arrays, psi_new.arrays):
+        assert_allclose(x2, x)
+
+
+def test_parse_checkpoint(tmp_path):
+    from quimb.tensor.storage import parse_checkpoint
+
+    ckpt, loaded = parse_checkpoint(tmp_path / "ckpt", resume=True)
+    assert loaded is None
+    ckpt.save(x=1)
+
+    ckpt, loaded = parse_checkpoint(tmp_path / "ckpt", resume=True)
+    assert loaded == ({}, {"x": 1})
+
+    # resuming continues checkpointing to the same location
+    ckpt, loaded = parse_checkpoint(None, resume=tmp_path / "ckpt")
+    assert ckpt.directory == str(tmp_path / "ckpt")
+
+    with pytest.raises(FileNotFoundError):
+        parse_checkpoint(None, resume=tmp_path / "missing")
@@ -1068,6 +1068,39 @@ class TestTensorNetwork:
         d2 = (AmB | AmB.H).contract(all) ** 0.5
         assert d1 == pytest.approx(d2)
 
+    @pytest.mark.parametrize("output_inds", [None, ("k0,0", "k1,1")])
+    def test_tensor_network_contract_batched(self, output_inds):
+        psi = qtn.PEPS.rand(2, 3, 2, seed=42)
+        tns = []
+        for seed in range(4):
+            tn = psi.copy()
+            # only modify some tensors, the rest are shared
+            tn["I0,1"].randomize_(seed=seed)
+            tn["I1,2"].randomize_(seed=seed + 10)
+            tns.append(tn)
+        tns[1].exponent = 0.5
+        if output_inds is None:
+            tns = [tn.make_norm() for tn in tns]
+
+        # relabel and permute indices of one network
+        tns[2].reindex_({ix: ix + "_" for ix in tns[2].inner_inds()})
+        t = tns[2].tensors[3]
+        t.transpose_(*reversed(t.inds))
+
+        xs = qtn.tensor_network_contract_batched(tns, output_inds=output_inds)
+        assert xs.shape[0] == 4
+        for x, tn in zip(xs, tns):
+            ex = tn.contract(all, output_inds=output_inds)
+            if output_inds is not None:
+                ex = ex.data
+            assert_allclose(x, ex)
+
+        ix = next(iter(tns[0].ind_map))
+        with pytest.raises(ValueError):
+            qtn.tensor_network_contract_batched(
+                [tns[0], tns[0].isel({ix: 0})], output_inds=output_inds
+            )
+
     def test_contracting_tensors(self):
         a = rand_tensor((2, 3, 4), inds=[0, 1, 2], tags="red")
         b = rand_tensor((3, 4, 5), inds=[1, 2, 3], tags="blue")
@@ -2106,6 +2139,20 @@ class TestTensorNetworkAsLinearOperator:
         tn_d = tn.to_dense(["a", "b"], ["c", "d"])
         assert np.trace(tn_lo) == pytest.approx(np.trace(tn_d))
 
+    def test_diagonal(self):
+        tn = qtn.TensorNetwork(
+            (
+                rand_tensor([3, 5, 5], "aef", dtype=complex),
+                rand_tensor([3, 5, 5], "beg", dtype=complex),
+                rand_tensor([3, 5, 5], "cfh", dtype=complex),
+                rand_tensor([3, 5, 5], "dhg", dtype=complex),
+            )
+        )
+        tn_lo = tn.aslinearoperator(("a", "b"), ("c", "d"))
+        tn_d = tn.to_dense(["a", "b"], ["c", "d"])
+        assert_allclose(tn_lo.diagonal(), np.diag(tn_d))
+        assert_allclose(tn_lo.H.diagonal(), np.diag(tn_d).conj())
+
     @pytest.mark.parametrize("dtype", (float, complex))
     @pytest.mark.parametrize("method", ("isvd", "rsvd"))
     def test_replace_with_svd_using_linear_operator(self, dtype, method):
@@ -59,6 +59,27 @@ class TestMatrixProductState:
         assert_allclose(z0, z3)
         assert_allclose(z3, z7)
 
+    @pytest.mark.parametrize(
+        "symmetry,sector",
+        [("Z2", "odd"), ("U1", 3), ("U1U1", ((4, 2), (4, 1)))],
+    )
+    def test_rand_state_symmetric(self, symmetry, sector):
+        pytest.importorskip("symmray")
+        psi = qtn.MPS_rand_state(8, 7, symmetry=symmetry, sector=sector)
+        assert all(t.isblocksparse() for t in psi)
+        assert psi.max_bond() <= 7
+        assert psi.H @ psi == pytest.approx(1.0)
+
+        if symmetry == "U1":
+            # check every configuration with non-zero amplitude is in sector
+            psi_dense = psi.copy()
+            for t in psi_dense:
+                t.modify(data=t.data.to_dense())
+            p = np.abs(psi_dense.to_dense().ravel()) ** 2
+            assert p.sum() == pytest.approx(1.0)
+            nup = [bin(i).count("1") for i in range(2**8)]
+            assert all(n == 3 for n, pi in zip(nup, p) if pi > 1e-12)
+
     def test_from_dense(self):
         L = 8
         psi = qu.rand_ket(2**L)
@@ -804,6 +825,42 @@ class TestMatrixProductState:
         assert xa == pytest.approx(ex)
         xb = psi.compute_local_expectation(terms, method="envs")
         assert xb == pytest.approx(ex)
+        assert psi.compute_local_expectation({}, method="envs") == 0.0
+        assert (
+            psi.compute_local_expectation({}, method="envs", return_all=True)
+            == {}
+        )
+
+    def test_env_cache_incremental(self):
+        psi = qtn.MPS_rand_state(10, 7, dtype="complex128")
+        terms = {(i, i + 1): qu.rand_herm(4) for i in range(9)}
+        cache = psi.env_cache
+        assert psi.env_cache is cache
+        assert psi.copy().env_cache is not cache
+
+        xa = psi.compute_local_expectation(terms, method="envs")
+        assert xa == pytest.approx(psi.compute_local_expectation_exact(terms))
+        nc = cache.ncontractions
+        assert nc == 16
+
+        # single local update then re-measurement needs no new environments
+        psi.gate_split_(qu.rand_uni(4), (4, 5))
+        psi.normalize()
+        term = {(4, 5): terms[4, 5]}
+        xb = psi.compute_local_expectation(term, method="envs")
+        assert xb == pytest.approx(psi.compute_local_expectation_exact(term))
+        assert cache.ncontractions == nc
+
+        # measuring elsewhere only recomputes the invalidated environments
+        term = {(1, 2): terms[1, 2]}
+        xc = psi.compute_local_expectation(term, method="envs")
+        assert xc == pytest.approx(psi.compute_local_expectation_exact(term))
+        assert cache.ncontractions == nc + 3
+
+        A = qu.pauli("Z")
+        assert psi.correlation(A, 2, 7) == pytest.approx(
+            psi.correlation(A, 2, 7, compress=False)
+        )
 
     def test_single_site_constructor(self):
         arrays = [np.random.randn(2)]
@@ -13,6 +13,7 @@ from quimb import (
 from quimb.tensor import (
     DMRG1,
     DMRG2,
+    DMRG3S,
     DMRGX,
     MovingEnvironment,
     MPO_ham_heis,
@@ -310,6 +311,83 @@ class TestDMRG2:
         dmrg.solve(verbosity=1)
         assert dmrg.energy == pytest.approx(-1 / 4)
 
+    def test_checkpoint_resume(self, tmp_path):
+        H = MPO_ham_heis(12)
+        p0 = MPS_rand_state(12, 4, seed=7)
+        opts = dict(bond_dims=[4, 8, 16], cutoffs=1e-10, p0=p0)
+
+        dmrg_ref = DMRG2(H, **opts)
+        dmrg_ref.solve(tol=1e-12, max_sweeps=5)
+
+        # 'interrupted' run
+        dmrg = DMRG2(H, **opts)
+        dmrg.solve(tol=1e-12, max_sweeps=3, checkpoint=tmp_path)
+
+        dmrg = DMRG2(H, **opts)
+        dmrg.solve(tol=1e-12, max_sweeps=5, resume=tmp_path)
+        assert_allclose(dmrg.energies, dmrg_ref.energies)
+        assert dmrg._bond_dim_pos == dmrg_ref._bond_dim_pos
+        assert dmrg.state.distance(dmrg_ref.state) < 1e-8
+
+    @pytest.mark.parametrize("nsegments", [1, 2, 3])
+    @pytest.mark.parametrize("executor", [None, "process"])
+    def test_parallel_sweeps(self, nsegments, executor):
+        H = MPO_ham_heis(18)
+
+        dmrg_ref = DMRG2(H, bond_dims=[8, 16, 32], cutoffs=1e-10)
+        dmrg_ref.solve(tol=1e-10)
+
+        if executor == "process":
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor = ProcessPoolExecutor(2)
+
+        dmrg = DMRG2(H, bond_dims=[8, 16, 32], cutoffs=1e-10)
+        assert dmrg.solve(
+            tol=1e-7, max_sweeps=20, nsegments=nsegments, executor=executor
+        )
+        assert dmrg.energy == pytest.approx(dmrg_ref.energy, rel=1e-8)
+        assert dmrg.state.H @ dmrg.state == pytest.approx(1.0)
+        assert abs(dmrg.state.H @ dmrg_ref.state) == pytest.approx(1.0)
+
+        if executor is not None:
+            executor.shutdown()
+
+    def test_parallel_pinv_gauge(self):
+        from quimb.tensor.tn1d.dmrg import _pinv_gauge
+
+        rng = np.random.default_rng(42)
+        R = rng.normal(size=(6, 6))
+        assert_allclose(_pinv_gauge(R, 1e-12), np.linalg.inv(R), atol=1e-8)
+        # small singular values are discarded
+        R[:, 0] = 0.0
+        assert_allclose(_pinv_gauge(R, 1e-12), np.linalg.pinv(R), atol=1e-8)
+        with pytest.raises(ValueError):
+            _pinv_gauge(np.zeros((4, 4)), 1e-12)
+
+    @pytest.mark.parametrize("precondition", [False, True])
+    @pytest.mark.parametrize("warm_start", [False, True])
+    def test_davidson_local_eig(self, precondition, warm_start):
+        H = MPO_ham_heis(20)
+
+        dmrg_ref = DMRG2(H, bond_dims=[8, 16, 32], cutoffs=1e-10)
+        dmrg_ref.solve(tol=1e-9)
+
+        dmrg = DMRG2(H, bond_dims=[8, 16, 32], cutoffs=1e-10)
+        dmrg.opts["local_eig_backend"] = "davidson"
+        dmrg.opts["local_eig_precondition"] = precondition
+        dmrg.opts["local_eig_warm_start"] = warm_start
+        # force the use of the TNLinearOperator for the larger bonds
+        dmrg.opts["local_eig_ham_dense"] = False
+        assert dmrg.solve(tol=1e-9, max_sweeps=20)
+        assert dmrg.energy == pytest.approx(dmrg_ref.energy, rel=1e-8)
+
+        nsweeps = len(dmrg.energies)
+        assert len(dmrg.sweep_times) == nsweeps
+        assert len(dmrg.local_eig_nmatvecs) == nsweeps
+        assert all(n >= 19 for n in dmrg.local_eig_nmatvecs)
+        assert all(n is None for n in dmrg_ref.local_eig_nmatvecs)
+
     def test_variable_bond_ham(self):
         import quimb as qu
 
@@ -336,6 +414,80 @@ class TestDMRG2:
         assert_allclose(H_explicit, H_sps.toarray())
 
 
+class TestDMRG3S:
+    @pytest.mark.parametrize("MPO_ham", [MPO_ham_XY, MPO_ham_heis])
+    def test_matches_exact(self, MPO_ham):
+        h = MPO_ham(12)
+        # start from a product state, so the bonds can only be grown
+        #     by the subspace expansion
+        p0 = MPS_computational_state("01" * 6)
+        dmrg = DMRG3S(h, bond_dims=[4, 8, 16, 32], cutoffs=1e-12, p0=p0)
+        assert dmrg.solve(tol=1e-10, max_sweeps=20, verbosity=0)
+        assert dmrg.state.max_bond() > 1
+
+        actual_e, gs = eigh(h.to_qarray(), k=1)
+        assert_allclose(dmrg.energy, actual_e, rtol=1e-8)
+        assert_allclose(abs(expec(dmrg.state.to_qarray(), gs)), 1.0)
+        assert_allclose(dmrg.state.H @ dmrg.state, 1.0)
+
+    def test_spin_one(self):
+        h = MPO_ham_heis(16, S=1)
+        dmrg_ref = DMRG2(h, bond_dims=[8, 16, 32], cutoffs=1e-10)
+        dmrg_ref.solve(tol=1e-8, max_sweeps=20)
+
+        dmrg = DMRG3S(h, bond_dims=[8, 16, 32], cutoffs=1e-10)
+        dmrg.solve(tol=1e-8, max_sweeps=20)
+        assert dmrg.energy == pytest.approx(dmrg_ref.energy, rel=1e-6)
+
+    def test_cyclic_raises(self):
+        with pytest.raises(NotImplementedError):
+            DMRG3S(MPO_ham_heis(8, cyclic=True))
+
+
+class TestDMRGBlockSparse:
+    @pytest.mark.parametrize(
+        "symmetry,sector", [("U1", 4), ("Z2", "even"), ("U1U1", None)]
+    )
+    @pytest.mark.parametrize("bsz", [1, 2])
+    def test_matches_exact_in_sector(self, symmetry, sector, bsz):
+        pytest.importorskip("symmray")
+        import quimb.operator as qop
+
+        L = 8
+        edges = [(i, i + 1) for i in range(L - 1)]
+        if symmetry == "U1U1":
+            sector = ((4, 2), (4, 1))
+            H = qop.fermi_hubbard_from_edges(
+                edges[:3], U=4.0, sector=sector, symmetry=symmetry
+            )
+        else:
+            H = qop.heisenberg_from_edges(
+                edges,
+                j=(1.0, 1.0, 0.5),
+                b=0.2,
+                sector=sector,
+                symmetry=symmetry,
+            )
+
+        mpo = H.build_mpo(symmetry=True)
+        p0 = MPS_rand_state(L, 16, symmetry=symmetry, sector=sector, seed=7)
+        cls = {1: DMRG1, 2: DMRG2}[bsz]
+        dmrg = cls(mpo, bond_dims=16, p0=p0)
+        assert dmrg.solve(tol=1e-10, max_sweeps=20)
+        assert all(t.isblocksparse() for t in dmrg.state)
+
+        en_exact, _ = eigh(H.build_sparse_matrix().toarray(), k=1)
+        assert_allclose(dmrg.energy, en_exact, rtol=1e-7)
+
+    def test_requires_p0(self):
+        pytest.importorskip("symmray")
+        import quimb.operator as qop
+
+        H = qop.heisenberg_from_edges([(0, 1), (1, 2)], sector=1)
+        with pytest.raises(ValueError):
+            DMRG2(H.build_mpo(symmetry=True), bond_dims=8)
+
+
 class TestDMRGX:
     def test_explicit_sweeps(self):
         n = 8
@@ -134,6 +134,20 @@ class TestTEBD:
 
         assert tebd.err <= 1e-5
 
+    def test_checkpoint_resume(self, tmp_path):
+        n = 10
+        psi0 = qtn.MPS_neel_state(n)
+        H_int = qu.ham_heis(2, cyclic=False)
+
+        tebd_ref = qtn.TEBD(psi0, H_int, progbar=False)
+        tebd_ref.update_to(1.0, tol=1e-3, checkpoint=tmp_path)
+
+        # the checkpoint is from the last step before the final one
+        tebd = qtn.TEBD(psi0, H_int, progbar=False)
+        tebd.update_to(1.0, resume=tmp_path)
+        assert tebd.t == approx(1.0)
+        assert tebd.pt.distance(tebd_ref.pt) == approx(0.0, abs=1e-6)
+
     def test_local_ham_1d_and_single_site_terms(self):
         n = 10
         psi0 = qtn.MPS_neel_state(n)
@@ -216,6 +230,38 @@ class TestTEBD:
         ef_mpo = qtn.expec_TN_1D(tebd.pt.H, H_mpo, tebd.pt)
         assert ef_mpo == pytest.approx(e0, 1e-5)
 
+    def test_block_sparse_sector(self):
+        pytest.importorskip("symmray")
+        import quimb.operator as qop
+
+        L = 8
+        edges = [(i, i + 1) for i in range(L - 1)]
+        H = qop.heisenberg_from_edges(
+            edges, j=(1.0, 1.0, 0.5), sector=3, symmetry="U1"
+        )
+        lham = qtn.LocalHam1D(L, H2=H.build_local_terms(symmetry=True))
+        p0 = qtn.MPS_rand_state(L, 8, symmetry="U1", sector=3, seed=7)
+
+        tebd = qtn.TEBD(p0, lham, progbar=False)
+        tebd.split_opts["cutoff"] = 1e-10
+        tebd.update_to(0.5, tol=1e-5)
+        assert all(t.isblocksparse() for t in tebd.pt)
+
+        def to_dense(psi):
+            psi = psi.copy()
+            for t in psi:
+                t.modify(data=t.data.to_dense())
+            return psi.to_dense()
+
+        Hd = qop.heisenberg_from_edges(
+            edges, j=(1.0, 1.0, 0.5)
+        ).build_sparse_matrix()
+        evo = qu.Evolution(to_dense(p0), Hd)
+        evo.update_to(0.5)
+        assert qu.fidelity(to_dense(tebd.pt), evo.pt) == pytest.approx(
+            1.0, rel=1e-4
+        )
+
     def test_build_mpo_propagator_trotterized(self):
         n = 5
         ham = qtn.ham_1d_mbl(n, dh=1.7, cyclic=False, seed=42)
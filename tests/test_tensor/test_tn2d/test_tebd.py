@@ -111,6 +111,29 @@ class TestSimpleUpdate:
 
         assert su.best["energy"] < -6.25
 
+    def test_checkpoint_resume(self, tmp_path):
+        ham = qtn.ham_2d_heis(3, 3)
+        psi0 = qtn.PEPS.rand(3, 3, 2, seed=3)
+        opts = dict(progbar=False, compute_energy_every=2, ordering="sort")
+
+        su_ref = qtn.SimpleUpdateGen(psi0, ham, **opts)
+        su_ref.evolve(6, tau=0.1)
+
+        # 'interrupted' run
+        def callback(su):
+            if su.n == 4:
+                raise KeyboardInterrupt
+
+        su = qtn.SimpleUpdateGen(psi0, ham, callback=callback, **opts)
+        su.evolve(6, tau=0.1, checkpoint=tmp_path, checkpoint_every=2)
+        assert su.n == 4
+
+        su = qtn.SimpleUpdateGen(psi0, ham, **opts)
+        su.evolve(6, tau=0.1, resume=tmp_path)
+        assert su.n == 6
+        assert list(su.energies) == pytest.approx(list(su_ref.energies))
+        assert su.state.distance(su_ref.state) == pytest.approx(0.0, abs=1e-6)
+
 
 class TestFullUpdate:
     @pytest.mark.parametrize("backend", ["numpy", pytorch_case])
@@ -142,3 +165,35 @@ class TestFullUpdate:
         su.state = su.best["state"]
 
         assert su.best["energy"] < -6.30
+
+
+class TestTEBDGen:
+    def test_gauge_bp(self):
+        ham = qtn.ham_2d_heis(3, 3)
+        psi0 = qtn.PEPS.rand(3, 3, 2, seed=42)
+        te = qtn.TEBDGen(
+            psi0,
+            ham,
+            D=2,
+            gauge_bp=True,
+            progbar=False,
+            compute_energy_every=1,
+            ordering="sort",
+        )
+        bp = te.get_bp()
+        te.evolve(6, tau=0.1)
+        # the same live BP object is patched throughout
+        assert te.get_bp() is bp
+        assert bp.tn is te._psi
+        assert len(te.bp_iterations) == 6
+        assert te.energies[-1] < te.energies[0]
+
+        # locally re-converged messages should match a fresh BP run
+        bp_fresh = qtn.belief_propagation.D2BP(te.state)
+        bp_fresh.run(tol=1e-9)
+        norm_live = bp.contract()
+        assert norm_live == pytest.approx(bp_fresh.contract(), rel=1e-2)
+
+        # setting a new state resets the BP object
+        te.state = psi0
+        assert te.get_bp() is not bp